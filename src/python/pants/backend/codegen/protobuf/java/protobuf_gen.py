@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import shutil
 from collections import OrderedDict
 from hashlib import sha1
 
@@ -22,6 +23,8 @@ from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.address import Address
 from pants.fs.archive import ZIP
 from pants.task.simple_codegen_task import SimpleCodegenTask
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import fast_relpath, safe_mkdir_for, safe_walk
 from pants.util.process_handler import subprocess
 
 
@@ -98,17 +101,102 @@ class ProtobufGen(SimpleCodegenTask):
     return isinstance(target, JavaProtobufLibrary)
 
   def execute_codegen(self, target, target_workdir):
-    sources_by_base = self._calculate_sources(target)
-    sources = target.sources_relative_to_buildroot()
+    self._run_protoc(target_workdir,
+                     self._proto_paths(target),
+                     target.sources_relative_to_buildroot())
 
+  def codegen_batch_key(self, target):
+    # The outputs of plugins can't be attributed to the sources they were generated from (see
+    # `_generated_from`), so only the java generator's outputs are batched.
+    if self.plugins:
+      return None
+    return tuple(self._proto_paths(target))
+
+  def execute_codegen_batch(self, targets_and_workdirs):
+    workdir_by_source = OrderedDict()
+    for target, target_workdir in targets_and_workdirs:
+      for source in target.sources_relative_to_buildroot():
+        workdir_by_source.setdefault(source, []).append(target_workdir)
+
+    # NB: protoc generates code for a source only once per invocation, so targets that share
+    # sources are not batched.
+    if all(len(workdirs) == 1 for workdirs in workdir_by_source.values()):
+      proto_paths = self._proto_paths(targets_and_workdirs[0][0])
+      with temporary_dir(root_dir=self.workdir) as batch_workdir:
+        if self._run_protoc(batch_workdir, proto_paths, workdir_by_source.keys(), check=False):
+          workdir_by_proto_name = {self._proto_name(source, proto_paths): workdirs[0]
+                                   for source, workdirs in workdir_by_source.items()}
+          if self._demultiplex(batch_workdir, workdir_by_proto_name):
+            return
+
+    # Fall back to generating code for each target separately, which also attributes any errors
+    # to the targets that caused them.
+    self.context.log.debug('Generating code for {} targets separately, rather than in a batch.'
+                           .format(len(targets_and_workdirs)))
+    for target, target_workdir in targets_and_workdirs:
+      self.execute_codegen(target, target_workdir)
+
+  def _demultiplex(self, batch_workdir, workdir_by_proto_name):
+    """Moves the files generated in the batch workdir into the workdirs of their targets.
+
+    :returns: True if every generated file was moved, or False (having moved none) if any couldn't
+              be attributed to a source.
+    """
+    moves = []
+    for root, _, files in safe_walk(batch_workdir):
+      for f in files:
+        path = os.path.join(root, f)
+        target_workdir = workdir_by_proto_name.get(self._generated_from(path))
+        if target_workdir is None:
+          self.context.log.debug('Could not attribute {} to a source.'.format(path))
+          return False
+        moves.append((path, os.path.join(target_workdir, fast_relpath(path, batch_workdir))))
+
+    for path, dest in moves:
+      safe_mkdir_for(dest)
+      shutil.move(path, dest)
+    return True
+
+  def _proto_paths(self, target):
     bases = OrderedSet()
     # Note that the root import must come first, otherwise protoc can get confused
     # when trying to resolve imports from the root against the import's source root.
     if self.get_options().import_from_root:
       bases.add('.')
-    bases.update(sources_by_base.keys())
+    bases.update(self._calculate_sources(target).keys())
     bases.update(self._proto_path_imports([target]))
+    return bases
+
+  @staticmethod
+  def _proto_name(source, proto_paths):
+    """Returns the name protoc gives the given source: its path relative to the first proto path
+    containing it."""
+    for proto_path in proto_paths:
+      if proto_path == '.':
+        return source
+      if source.startswith(proto_path + os.sep):
+        return fast_relpath(source, proto_path)
+    return source
 
+  _GENERATED_FROM_PREFIX = '// source: '
+
+  @classmethod
+  def _generated_from(cls, path):
+    """Returns the name of the source that protoc's java generator generated the given file from,
+    as recorded in its header, or None if it has no such header."""
+    with open(path, 'rb') as f:
+      for _ in range(4):
+        line = f.readline().decode('utf-8').strip()
+        if line.startswith(cls._GENERATED_FROM_PREFIX):
+          return line[len(cls._GENERATED_FROM_PREFIX):]
+    return None
+
+  def _run_protoc(self, target_workdir, proto_paths, sources, check=True):
+    """Runs protoc to generate code for the given sources.
+
+    :returns: True if protoc succeeded. If it failed, raises a TaskError if `check`, or else
+              returns False.
+    """
     gen_flag = '--java_out'
 
     gen = '{0}={1}'.format(gen_flag, target_workdir)
@@ -119,7 +207,7 @@ class ProtobufGen(SimpleCodegenTask):
       for plugin in self.plugins:
         args.append("--{0}_out={1}".format(plugin, target_workdir))
 
-    for base in bases:
+    for base in proto_paths:
       args.append('--proto_path={0}'.format(base))
 
     args.extend(sources)
@@ -140,7 +228,10 @@ class ProtobufGen(SimpleCodegenTask):
                                stdout=workunit.output('stdout'),
                                stderr=workunit.output('stderr'))
       if result != 0:
-        raise TaskError('{} ... exited non-zero ({})'.format(self.protobuf_binary, result))
+        if check:
+          raise TaskError('{} ... exited non-zero ({})'.format(self.protobuf_binary, result))
+        return False
+    return True
 
   def _calculate_sources(self, target):
     gentargets = OrderedSet()
@@ -6,15 +6,23 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import json
+import os
 from collections import defaultdict
 
-from pants.base.specs import DescendantAddresses
+from pants.base.project_tree_factory import get_project_tree
+from pants.base.specs import DescendantAddresses, SiblingAddresses
+from pants.build_graph.dependee_index import DependeeIndex
+from pants.source.source_digest_cache import SourceDigests
 from pants.task.console_task import ConsoleTask
 
 
 class ReverseDepmap(ConsoleTask):
   """List all targets that depend on any of the input targets."""
 
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(ReverseDepmap, cls).subsystem_dependencies() + (SourceDigests,)
+
   @classmethod
   def register_options(cls, register):
     super(ReverseDepmap, cls).register_options(register)
@@ -25,6 +33,12 @@ class ReverseDepmap(ConsoleTask):
     # TODO: consider refactoring out common output format methods into MultiFormatConsoleTask.
     register('--output-format', default='text', choices=['text', 'json'],
              help='Output format of results.')
+    register('--dependee-index', advanced=True, type=bool, default=False,
+             help='Find dependees with an index that is persisted across runs, and which re-parses '
+                  'only the BUILD files changed since it was last used, rather than by parsing '
+                  'every BUILD file. Unlike a full parse, this does not validate the BUILD files '
+                  'of unrelated targets, and dependencies that targets compute from options are '
+                  'not updated until their BUILD files change.')
 
   def __init__(self, *args, **kwargs):
     super(ReverseDepmap, self).__init__(*args, **kwargs)
@@ -33,15 +47,25 @@ class ReverseDepmap(ConsoleTask):
     self._closed = self.get_options().closed
 
   def console_output(self, _):
-    dependees_by_target = defaultdict(set)
-    for address in self.context.build_graph.inject_specs_closure([DescendantAddresses('')]):
-      target = self.context.build_graph.get_target(address)
-      # TODO(John Sirois): tighten up the notion of targets written down in a BUILD by a
-      # user vs. targets created by pants at runtime.
-      concrete_target = self.get_concrete_target(target)
-      for dependency in concrete_target.dependencies:
-        dependency = self.get_concrete_target(dependency)
-        dependees_by_target[dependency].add(concrete_target)
+    if self.get_options().dependee_index:
+      dependee_index = self._updated_dependee_index()
+
+      def dependent_addresses(roots):
+        return dependee_index.dependees([root.address for root in roots],
+                                        transitive=self._transitive)
+    else:
+      dependees_by_target = defaultdict(set)
+      for address in self.context.build_graph.inject_specs_closure([DescendantAddresses('')]):
+        target = self.context.build_graph.get_target(address)
+        # TODO(John Sirois): tighten up the notion of targets written down in a BUILD by a
+        # user vs. targets created by pants at runtime.
+        concrete_target = self.get_concrete_target(target)
+        for dependency in concrete_target.dependencies:
+          dependency = self.get_concrete_target(dependency)
+          dependees_by_target[dependency].add(concrete_target)
+
+      def dependent_addresses(roots):
+        return [dependent.address for dependent in self.get_dependents(dependees_by_target, roots)]
 
     roots = set(self.context.target_roots)
     if self.get_options().output_format == 'json':
@@ -49,8 +73,8 @@ class ReverseDepmap(ConsoleTask):
       for root in roots:
         if self._closed:
           deps[root.address.spec].append(root.address.spec)
-        for dependent in self.get_dependents(dependees_by_target, [root]):
-          deps[root.address.spec].append(dependent.address.spec)
+        for address in dependent_addresses([root]):
+          deps[root.address.spec].append(address.spec)
       for address in deps.keys():
         deps[address].sort()
       yield json.dumps(deps, indent=4, separators=(',', ': '), sort_keys=True)
@@ -59,8 +83,8 @@ class ReverseDepmap(ConsoleTask):
         for root in roots:
           yield root.address.spec
 
-      for dependent in self.get_dependents(dependees_by_target, roots):
-        yield dependent.address.spec
+      for address in dependent_addresses(roots):
+        yield address.spec
 
   def get_dependents(self, dependees_by_target, roots):
     check = set(roots)
@@ -76,3 +100,21 @@ class ReverseDepmap(ConsoleTask):
 
   def get_concrete_target(self, target):
     return target.concrete_derived_from
+
+  def _updated_dependee_index(self):
+    global_options = self.context.options.for_global_scope()
+    dependee_index = DependeeIndex(os.path.join(self.workdir, 'index'),
+                                   get_project_tree(global_options),
+                                   build_ignore_patterns=global_options.build_ignore,
+                                   digest=SourceDigests.digest)
+    dependee_index.update(self._parse_dependencies)
+    dependee_index.save()
+    return dependee_index
+
+  def _parse_dependencies(self, build_dirs):
+    """Yields the address and dependency addresses of each target in the given BUILD dirs."""
+    build_graph = self.context.build_graph
+    for address in build_graph.inject_specs_closure([SiblingAddresses(d) for d in build_dirs]):
+      target = build_graph.get_target(address)
+      yield address, [self.get_concrete_target(dependency).address
+                      for dependency in target.dependencies]
@@ -6,6 +6,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+import threading
+from contextlib import contextmanager
 
 from twitter.common.collections import OrderedSet
 
@@ -15,6 +17,7 @@ from pants.backend.jvm.tasks.classpath_products import ClasspathProducts
 from pants.backend.jvm.tasks.jvm_binary_task import JvmBinaryTask
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.build_graph.bundle_mixin import BundleMixin
 from pants.build_graph.target_scopes import Scopes
 from pants.fs import archive
@@ -31,6 +34,11 @@ class BundleCreate(BundleMixin, JvmBinaryTask):
   LIBS_DIR = 'libs'
   _target_closure_kwargs = dict(include_scopes=Scopes.JVM_RUNTIME_SCOPES, respect_intransitive=True)
 
+  # Semaphores bounding the number of workers assembling jars and creating archives at once. They
+  # are created by `_bundle_apps` before any work is submitted; None means unbounded.
+  _jar_slots = None
+  _archive_slots = None
+
   @classmethod
   def register_options(cls, register):
     super(BundleCreate, cls).register_options(register)
@@ -41,6 +49,17 @@ class BundleCreate(BundleMixin, JvmBinaryTask):
                   "directory, the root will only contain a synthetic jar with its manifest's "
                   "Class-Path set to those jars. This option is also defined in jvm_app target. "
                   "Precedence is CLI option > target option > pants.ini option.")
+    register('--worker-count', advanced=True, type=int, default=1,
+             help='The number of apps to bundle concurrently. Bundling an app is mostly IO and '
+                  'compression, so independent apps are bundled on a pool of threads.')
+    register('--max-concurrent-jars', advanced=True, type=int, default=0,
+             help='The maximum number of apps whose jars are assembled and shaded concurrently. '
+                  'Each of these runs a JVM tool with its own heap, so this bounds memory use. '
+                  'If 0, only --worker-count applies.')
+    register('--max-concurrent-archives', advanced=True, type=int, default=0,
+             help='The maximum number of bundle archives created concurrently. Archiving reads '
+                  'the whole bundle and writes the whole archive, so this bounds the disk '
+                  'bandwidth used. If 0, only --worker-count applies.')
 
   @classmethod
   def implementation_version(cls):
@@ -92,20 +111,20 @@ class BundleCreate(BundleMixin, JvmBinaryTask):
       bundle_archive_product = self.context.products.get('deployable_archives')
       jvm_archive_product = self.context.products.get('jvm_archives')
 
-      for vt in invalidation_check.all_vts:
-        app = self.App.create_app(vt.target,
+      apps = [self.App.create_app(vt.target,
                                   self.resolved_option(self.get_options(), vt.target, 'deployjar'),
                                   self.resolved_option(self.get_options(), vt.target, 'archive'))
+              for vt in invalidation_check.all_vts]
+      self._bundle_apps([(app, vt.results_dir)
+                         for app, vt in zip(apps, invalidation_check.all_vts) if not vt.valid])
+
+      for app, vt in zip(apps, invalidation_check.all_vts):
         archiver = archive.create_archiver(app.archive) if app.archive else None
 
         bundle_dir = self.get_bundle_dir(app.id, vt.results_dir)
         ext = archive.archive_extensions.get(app.archive, app.archive)
         filename = '{}.{}'.format(app.id, ext)
         archive_path = os.path.join(vt.results_dir, filename) if app.archive else ''
-        if not vt.valid:
-          self.bundle(app, vt.results_dir)
-          if app.archive:
-            archiver.create(bundle_dir, vt.results_dir, app.id)
 
         self._add_product(jvm_bundles_product, app, bundle_dir)
         if archiver:
@@ -122,6 +141,57 @@ class BundleCreate(BundleMixin, JvmBinaryTask):
                                app.id,
                                app.archive)
 
+  def _bundle_apps(self, apps_and_results_dirs):
+    """Bundles and archives the given apps, concurrently if --worker-count is greater than 1.
+
+    Apps are independent of one another, so each worker bundles and then archives one app at a
+    time: while some workers assemble jars, others write archives. The number of workers in either
+    stage at once is further capped by --max-concurrent-jars and --max-concurrent-archives.
+
+    :param apps_and_results_dirs: A list of (App, results_dir) pairs.
+    """
+    self._jar_slots = self._create_slots(self.get_options().max_concurrent_jars)
+    self._archive_slots = self._create_slots(self.get_options().max_concurrent_archives)
+    # The memoized state that workers share is created before any work is submitted, rather than
+    # lazily by whichever workers first need it: concurrent workers would each create their own.
+    if self.get_options().incremental_jar:
+      _ = self.jar_fragment_store
+    if any(app.binary.shading_rules for app, _ in apps_and_results_dirs):
+      _ = self.shader
+
+    worker_count = min(self.get_options().worker_count, len(apps_and_results_dirs))
+    if worker_count > 1:
+      # This ensures the workunit for the worker pool is set before attempting to bundle.
+      with self.context.new_workunit('{}-pool-bootstrap'.format(self.name())) as workunit:
+        worker_pool = WorkerPool(workunit.parent, self.context.run_tracker, worker_count)
+      try:
+        worker_pool.submit_work_and_wait(Work(self._bundle_and_archive, apps_and_results_dirs))
+      finally:
+        worker_pool.shutdown()
+    else:
+      for app, results_dir in apps_and_results_dirs:
+        self._bundle_and_archive(app, results_dir)
+
+  def _bundle_and_archive(self, app, results_dir):
+    bundle_dir = self.bundle(app, results_dir)
+    if app.archive:
+      with self._limited(self._archive_slots):
+        archive.create_archiver(app.archive).create(bundle_dir, results_dir, app.id)
+
+  @staticmethod
+  def _create_slots(max_concurrency):
+    return threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+
+  @staticmethod
+  @contextmanager
+  def _limited(slots):
+    """Holds one of the given slots, if any, for the duration of the context."""
+    if slots is None:
+      yield
+    else:
+      with slots:
+        yield
+
   class BasenameConflictError(TaskError):
     """Indicates the same basename is used by two targets."""
 
@@ -154,19 +224,20 @@ class BundleCreate(BundleMixin, JvmBinaryTask):
       ))
 
     bundle_jar = os.path.join(bundle_dir, '{}.jar'.format(app.binary.basename))
-    with self.monolithic_jar(app.binary, bundle_jar,
-                             manifest_classpath=classpath) as jar:
-      self.add_main_manifest_entry(jar, app.binary)
-
-      # Make classpath complete by adding the monolithic jar.
-      classpath.update([jar.path])
-
-    if app.binary.shading_rules:
-      for jar_path in classpath:
-        # In case `jar_path` is a symlink, this is still safe, shaded jar will overwrite jar_path,
-        # original file `jar_path` linked to remains untouched.
-        # TODO run in parallel to speed up
-        self.shade_jar(shading_rules=app.binary.shading_rules, jar_path=jar_path)
+    with self._limited(self._jar_slots):
+      with self.monolithic_jar(app.binary, bundle_jar,
+                               manifest_classpath=classpath) as jar:
+        self.add_main_manifest_entry(jar, app.binary)
+
+        # Make classpath complete by adding the monolithic jar.
+        classpath.update([jar.path])
+
+      if app.binary.shading_rules:
+        for jar_path in classpath:
+          # In case `jar_path` is a symlink, this is still safe, shaded jar will overwrite
+          # jar_path, original file `jar_path` linked to remains untouched.
+          # TODO run in parallel to speed up
+          self.shade_jar(shading_rules=app.binary.shading_rules, jar_path=jar_path)
 
     self.symlink_bundles(app, bundle_dir)
 
@@ -0,0 +1,284 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import struct
+import time
+import zipfile
+import zlib
+from collections import OrderedDict, namedtuple
+
+from pants.backend.jvm.targets.jvm_binary import Duplicate, Skip
+from pants.java.jar.manifest import Manifest
+from pants.java.util import relativize_classpath
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_delete, safe_mkdir_for, safe_walk
+
+
+class IncrementalJarAssembler(object):
+  """Writes the staged contents of a `Jar` in-process, applying jar rules as the jar tool does.
+
+  Entries are written without recompressing them wherever possible:
+
+  - Entries grafted from other jars are copied from those jars still compressed.
+  - Entries backed by files are copied still compressed from the jar being overwritten if it has
+    an entry of the same name, size and CRC-32, so only files that have changed since that jar was
+    written are compressed.
+
+  The jar being overwritten is only replaced once the new jar has been completely written.
+  """
+
+  _CHUNK_SIZE = 64 * 1024
+
+  # The source of an entry's contents: a file, an entry of a zip, or neither for directories.
+  _Candidate = namedtuple('_Candidate', ['name', 'path', 'zip_path'])
+
+  def __init__(self, jar, jar_rules):
+    """
+    :param jar: The staged `pants.backend.jvm.tasks.jar_task.Jar` to write.
+    :param jar_rules: The `JarRules` for skipping and handling duplicate entries.
+    """
+    self._jar = jar
+    self._jar_rules = jar_rules
+    self._skip_patterns = [rule.apply_pattern for rule in jar_rules.rules if isinstance(rule, Skip)]
+    self.reused_entry_count = 0
+    self.copied_entry_count = 0
+    self.compressed_entry_count = 0
+
+  def assemble(self):
+    """Writes the jar, overwriting the existing jar at its path, if any.
+
+    :raises: :class:`pants.backend.jvm.targets.jvm_binary.Duplicate.Error` if a duplicate entry is
+      encountered that the jar rules say to fail on.
+    """
+    path = self._jar.path
+    safe_mkdir_for(path)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    open_zips = {}
+    previous = None
+    try:
+      with temporary_dir() as scratch_dir:
+        for zip_path in self._jar._jars:
+          if zip_path not in open_zips:
+            open_zips[zip_path] = zipfile.ZipFile(zip_path, 'r')
+        candidates_by_name = self._candidates_by_name(scratch_dir, open_zips)
+        if any(candidate.path is not None
+               for candidates in candidates_by_name.values() for candidate in candidates):
+          previous = self._open_previous(path)
+        with open_zip(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as out:
+          self._write_manifest(out, scratch_dir)
+          for name, candidates in candidates_by_name.items():
+            self._write_entry(out, name, candidates, previous, open_zips)
+      os.rename(tmp_path, path)
+    finally:
+      if previous:
+        previous.close()
+      for zf in open_zips.values():
+        zf.close()
+      safe_delete(tmp_path)
+
+  @staticmethod
+  def _open_previous(path):
+    try:
+      return zipfile.ZipFile(path, 'r') if os.path.isfile(path) else None
+    except zipfile.BadZipfile:
+      return None
+
+  def _candidates_by_name(self, scratch_dir, open_zips):
+    """Returns the candidates for each entry, in the order the jar tool would encounter them.
+
+    N.B.: The jar tool is given the staged files before the staged jars. The same file staged more
+    than once under the same name (as the JarBuilder does for every subdirectory of a classpath
+    directory) is a single candidate.
+    """
+    candidates_by_name = OrderedDict()
+    seen_files = set()
+    expanded_dirs = set()
+
+    def add(name, path=None, zip_path=None):
+      if self._skipped(name):
+        return
+      if path is not None:
+        key = (name, os.path.realpath(path))
+        if key in seen_files:
+          return
+        seen_files.add(key)
+      # Like the jar tool, add entries for the parent directories of every entry.
+      parent = name.rstrip('/').rpartition('/')[0]
+      if parent and '{}/'.format(parent) not in candidates_by_name:
+        add('{}/'.format(parent))
+      candidates_by_name.setdefault(name, []).append(self._Candidate(name, path, zip_path))
+
+    for entry in self._jar._entries:
+      src = entry.materialize(scratch_dir)
+      if not os.path.isdir(src):
+        add(entry.dest, path=src)
+        continue
+      dest = entry.dest.rstrip('/') if entry.dest else ''
+      if self._covered_by_expanded_dir(src, dest, expanded_dirs):
+        continue
+      expanded_dirs.add((os.path.realpath(src), dest))
+      for root, dirs, files in safe_walk(src):
+        rel_root = os.path.relpath(root, src)
+        for name in sorted(files):
+          rel_path = os.path.normpath(os.path.join(dest, rel_root, name))
+          add(rel_path.replace(os.sep, '/'), path=os.path.join(root, name))
+
+    for zip_path in self._jar._jars:
+      for info in open_zips[zip_path].infolist():
+        add(info.filename, zip_path=zip_path)
+
+    # The manifest is written separately, from the staged manifest only.
+    candidates_by_name.pop('META-INF/', None)
+    candidates_by_name.pop(Manifest.PATH, None)
+    return candidates_by_name
+
+  @staticmethod
+  def _covered_by_expanded_dir(src, dest, expanded_dirs):
+    src = os.path.realpath(src)
+    while dest:
+      src, dest = os.path.dirname(src), os.path.dirname(dest)
+      if (src, dest) in expanded_dirs:
+        return True
+    return False
+
+  def _skipped(self, name):
+    return any(pattern.search(name) for pattern in self._skip_patterns)
+
+  def _duplicate_action(self, name):
+    for rule in self._jar_rules.rules:
+      if isinstance(rule, Duplicate) and rule.apply_pattern.search(name):
+        return rule.action
+    return self._jar_rules.default_dup_action
+
+  def _write_entry(self, out, name, candidates, previous, open_zips):
+    if name.endswith('/'):
+      # Directory entries have no contents to conflict.
+      out.writestr(self._zip_info(name), b'')
+      return
+
+    if len(candidates) > 1:
+      action = self._duplicate_action(name)
+      if action == Duplicate.FAIL:
+        raise Duplicate.Error(name)
+      elif action == Duplicate.SKIP:
+        candidates = candidates[:1]
+      elif action == Duplicate.REPLACE:
+        candidates = candidates[-1:]
+      else:
+        contents = []
+        for candidate in candidates:
+          if (action == Duplicate.CONCAT_TEXT and contents and
+              not contents[-1].endswith(b'\n')):
+            contents.append(b'\n')
+          contents.append(self._read(candidate, open_zips))
+        self._write_compressed(out, name, b''.join(contents))
+        return
+
+    candidate, = candidates
+    if candidate.zip_path is not None:
+      source = open_zips[candidate.zip_path]
+      self._copy_raw(source, source.getinfo(name), out)
+      self.copied_entry_count += 1
+    elif self._unchanged(previous, name, candidate.path):
+      self._copy_raw(previous, previous.getinfo(name), out)
+      self.reused_entry_count += 1
+    else:
+      self._write_compressed(out, name, self._read(candidate, open_zips))
+
+  @staticmethod
+  def _read(candidate, open_zips):
+    if candidate.zip_path is not None:
+      return open_zips[candidate.zip_path].read(candidate.name)
+    with open(candidate.path, 'rb') as fp:
+      return fp.read()
+
+  def _write_compressed(self, out, name, contents):
+    out.writestr(self._zip_info(name), contents, compress_type=zipfile.ZIP_DEFLATED)
+    self.compressed_entry_count += 1
+
+  @classmethod
+  def _unchanged(cls, previous, name, path):
+    if previous is None:
+      return False
+    info = previous.NameToInfo.get(name)
+    if info is None or info.file_size != os.path.getsize(path):
+      return False
+    crc = 0
+    with open(path, 'rb') as fp:
+      for chunk in iter(lambda: fp.read(cls._CHUNK_SIZE), b''):
+        crc = zlib.crc32(chunk, crc)
+    return crc & 0xffffffff == info.CRC
+
+  @staticmethod
+  def _zip_info(name):
+    info = zipfile.ZipInfo(name, date_time=time.localtime(time.time())[:6])
+    if name.endswith('/'):
+      info.external_attr = (0o40755 << 16) | 0x10  # drwxr-xr-x, plus the MS-DOS directory flag.
+    else:
+      info.external_attr = 0o644 << 16
+    return info
+
+  @classmethod
+  def _copy_raw(cls, source, info, out):
+    """Copies an entry's still compressed data from the source zip into the output zip."""
+    source.fp.seek(info.header_offset)
+    header = struct.unpack(zipfile.structFileHeader, source.fp.read(zipfile.sizeFileHeader))
+    source.fp.seek(header[zipfile._FH_FILENAME_LENGTH] + header[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+
+    copied = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    copied.compress_type = info.compress_type
+    copied.external_attr = info.external_attr
+    copied.CRC = info.CRC
+    copied.compress_size = info.compress_size
+    copied.file_size = info.file_size
+    # The CRC and sizes are written in the local header, so no data descriptor follows the data.
+    copied.flag_bits = info.flag_bits & ~0x08
+    copied.header_offset = out.fp.tell()
+    out._writecheck(copied)
+    out._didModify = True
+    out.fp.write(copied.FileHeader())
+
+    remaining = info.compress_size
+    while remaining > 0:
+      chunk = source.fp.read(min(cls._CHUNK_SIZE, remaining))
+      if not chunk:
+        raise zipfile.BadZipfile('Truncated entry {} in {}'.format(info.filename, source.filename))
+      out.fp.write(chunk)
+      remaining -= len(chunk)
+
+    out.filelist.append(copied)
+    out.NameToInfo[copied.filename] = copied
+
+  def _write_manifest(self, out, scratch_dir):
+    """Writes the staged manifest, with the staged Main-Class and Class-Path, if any."""
+    headers = OrderedDict()
+    if self._jar._manifest_entry:
+      with open(self._jar._manifest_entry.materialize(scratch_dir), 'rb') as fp:
+        header = None
+        for line in fp.read().decode('utf-8').splitlines():
+          if line.startswith(' ') and header:
+            headers[header] += line[1:]
+          elif line.strip():
+            header, _, value = line.partition(':')
+            headers[header] = value.strip()
+
+    headers.setdefault(Manifest.MANIFEST_VERSION, '1.0')
+    if self._jar._main:
+      headers[Manifest.MAIN_CLASS] = self._jar._main
+    if self._jar.classpath:
+      headers[Manifest.CLASS_PATH] = ' '.join(relativize_classpath(self._jar.classpath,
+                                                                   os.path.dirname(self._jar.path),
+                                                                   followlinks=False))
+
+    manifest = Manifest()
+    manifest.addentry(Manifest.MANIFEST_VERSION, headers.pop(Manifest.MANIFEST_VERSION))
+    for header, value in headers.items():
+      manifest.addentry(header, value)
+
+    out.writestr(self._zip_info('META-INF/'), b'')
+    self._write_compressed(out, Manifest.PATH, manifest.contents())
@@ -0,0 +1,125 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import hashlib
+import os
+import threading
+import zipfile
+
+from pants.util.contextutil import open_zip
+from pants.util.dirutil import fast_relpath, safe_concurrent_creation, safe_delete, safe_walk
+
+
+class JarFragmentStore(object):
+  """A store of jars holding the compressed contents of classpath directories.
+
+  Each jar fragment is keyed by a fingerprint of the contents of the directory it was created from,
+  so a fragment is shared by every jar that the same classes are assembled into, across tasks and
+  runs. Jars assembled by the `IncrementalJarAssembler` copy the entries of fragments without
+  recompressing them.
+
+  Fragments are touched whenever they are used, so that the least recently used fragments can be
+  pruned to keep the store from growing without bound.
+  """
+
+  _CHUNK_SIZE = 64 * 1024
+
+  def __init__(self, root, max_entries=None):
+    """
+    :param string root: The directory to store jar fragments in.
+    :param int max_entries: The maximum number of fragments to keep in the store; if unset, no
+                            fragments are pruned. Fragments used by this store instance are never
+                            pruned.
+    """
+    self._root = root
+    self._max_entries = max_entries
+    # Classpath directories don't change during a run once they've been compiled, so each is only
+    # fingerprinted once.
+    self._fragment_by_dir = {}
+    self._lock = threading.Lock()
+
+  def fragment(self, classpath_dir):
+    """Returns the path of a jar fragment holding the contents of the given directory.
+
+    The fragment is created if the store doesn't already hold one for the directory's contents.
+
+    :param string classpath_dir: A classpath directory.
+    :rtype: string
+    """
+    classpath_dir = os.path.realpath(classpath_dir)
+    with self._lock:
+      fragment = self._fragment_by_dir.get(classpath_dir)
+    if fragment is None:
+      files = self._list_files(classpath_dir)
+      fingerprint = self._fingerprint(classpath_dir, files)
+      fragment = os.path.join(self._root, '{}.jar'.format(fingerprint))
+      with self._lock:
+        self._fragment_by_dir[classpath_dir] = fragment
+      if os.path.isfile(fragment):
+        os.utime(fragment, None)
+      else:
+        self._create(fragment, classpath_dir, files)
+        self.prune()
+    return fragment
+
+  def prune(self):
+    """Removes the least recently used fragments beyond the store's maximum number of entries."""
+    if not self._max_entries or not os.path.isdir(self._root):
+      return
+    with self._lock:
+      in_use = set(self._fragment_by_dir.values())
+    fragments = []
+    for name in os.listdir(self._root):
+      # Skip the temporary files of fragments that are still being created.
+      if name.endswith('.jar'):
+        path = os.path.join(self._root, name)
+        if path not in in_use:
+          try:
+            fragments.append((os.path.getmtime(path), path))
+          except OSError:
+            # Pruned concurrently.
+            pass
+    fragments.sort(reverse=True)
+    for _, path in fragments[max(self._max_entries - len(in_use), 0):]:
+      safe_delete(path)
+
+  @staticmethod
+  def _list_files(classpath_dir):
+    files = []
+    for root, _, filenames in safe_walk(classpath_dir):
+      for filename in filenames:
+        files.append(fast_relpath(os.path.join(root, filename), classpath_dir))
+    return sorted(files)
+
+  @classmethod
+  def _fingerprint(cls, classpath_dir, files):
+    hasher = hashlib.sha1()
+    for rel_path in files:
+      hasher.update(rel_path.encode('utf-8'))
+      hasher.update(b'\0')
+      with open(os.path.join(classpath_dir, rel_path), 'rb') as fp:
+        file_hasher = hashlib.sha1()
+        for chunk in iter(lambda: fp.read(cls._CHUNK_SIZE), b''):
+          file_hasher.update(chunk)
+      hasher.update(file_hasher.digest())
+    return hasher.hexdigest()
+
+  @staticmethod
+  def _create(fragment, classpath_dir, files):
+    with safe_concurrent_creation(fragment) as tmp_path:
+      with open_zip(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        dirs = set()
+        for rel_path in files:
+          parent = os.path.dirname(rel_path)
+          missing_dirs = []
+          while parent and parent not in dirs:
+            missing_dirs.append(parent)
+            dirs.add(parent)
+            parent = os.path.dirname(parent)
+          for missing_dir in reversed(missing_dirs):
+            zf.writestr('{}/'.format(missing_dir.replace(os.sep, '/')), b'')
+          zf.write(os.path.join(classpath_dir, rel_path), rel_path.replace(os.sep, '/'))
@@ -407,10 +407,17 @@ class JarBuilderTask(JarTask):
       """
       round_manager.require_data('runtime_classpath')
 
-    def __init__(self, context, jar):
+    def __init__(self, context, jar, fragment_store=None):
+      """
+      :param context: The task context.
+      :param jar: The opened `Jar` to add to.
+      :param fragment_store: An optional `JarFragmentStore`. If given, the contents of classpath
+        directories are added to the jar as fragments from the store, rather than file by file.
+      """
       self._context = context
       self._jar = jar
       self._manifest = Manifest()
+      self._fragment_store = fragment_store
 
     def add_target(self, target, recursive=False):
       """Adds the classes and resources for a target to an open jar.
@@ -459,20 +466,39 @@ class JarBuilderTask(JarTask):
       # We only gather internal classpath elements per our contract.
       target_classpath = ClasspathUtil.internal_classpath(targets,
                                                           classpath_products)
+      # NB: Fragments are written before any other jars, so that the contents of classpath
+      # directories take precedence over those of jars whether or not fragments are used.
+      jars = []
       for entry in target_classpath:
         if ClasspathUtil.is_jar(entry):
-          self._jar.writejar(entry)
-          products_added = True
+          jars.append(entry)
         elif ClasspathUtil.is_dir(entry):
-          for rel_file in ClasspathUtil.classpath_entries_contents([entry]):
-            self._jar.write(os.path.join(entry, rel_file), rel_file)
-            products_added = True
+          if self._fragment_store:
+            products_added = self._add_fragment(entry) or products_added
+          else:
+            for rel_file in ClasspathUtil.classpath_entries_contents([entry]):
+              self._jar.write(os.path.join(entry, rel_file), rel_file)
+              products_added = True
         else:
           # non-jar and non-directory classpath entries should be ignored
           pass
+      for entry in jars:
+        self._jar.writejar(entry)
+        products_added = True
 
       return products_added
 
+    def _add_fragment(self, classpath_dir):
+      if not any(True for _ in ClasspathUtil.classpath_entries_contents([classpath_dir])):
+        return False
+      # Like the manifests of jars, the manifests in fragments are ignored, so a manifest in a
+      # classpath directory is written on its own.
+      manifest = os.path.join(classpath_dir, Manifest.PATH)
+      if os.path.isfile(manifest):
+        self._jar.write(manifest, Manifest.PATH)
+      self._jar.writejar(self._fragment_store.fragment(classpath_dir))
+      return True
+
     def commit_manifest(self, jar):
       """Updates the manifest in the jar being written to.
 
@@ -488,14 +514,16 @@ class JarBuilderTask(JarTask):
     cls.JarBuilder.prepare(round_manager)
 
   @contextmanager
-  def create_jar_builder(self, jar):
+  def create_jar_builder(self, jar, fragment_store=None):
     """Creates a ``JarTask.JarBuilder`` ready for use.
 
     This method should be called during in `execute` context and only after ensuring
     `JarTask.JarBuilder.prepare` has already been called in `prepare` context.
 
     :param jar: An opened ``pants.backend.jvm.tasks.jar_task.Jar`.
+    :param fragment_store: An optional ``JarFragmentStore`` to add the contents of classpath
+      directories from.
     """
-    builder = self.JarBuilder(self.context, jar)
+    builder = self.JarBuilder(self.context, jar, fragment_store=fragment_store)
     yield builder
     builder.commit_manifest(jar)
@@ -11,8 +11,10 @@ from contextlib import contextmanager
 from twitter.common.collections.orderedset import OrderedSet
 
 from pants.backend.jvm.subsystems.shader import Shader
-from pants.backend.jvm.targets.jvm_binary import JvmBinary
-from pants.backend.jvm.tasks.jar_task import JarBuilderTask
+from pants.backend.jvm.targets.jvm_binary import Duplicate, JvmBinary
+from pants.backend.jvm.tasks.incremental_jar import IncrementalJarAssembler
+from pants.backend.jvm.tasks.jar_fragment_store import JarFragmentStore
+from pants.backend.jvm.tasks.jar_task import Jar, JarBuilderTask
 from pants.base.exceptions import TaskError
 from pants.build_graph.target_scopes import Scopes
 from pants.java.util import execute_runner
@@ -41,6 +43,20 @@ class JvmBinaryTask(JarBuilderTask):
     if main is not None:
       jar.main(main)
 
+  @classmethod
+  def register_options(cls, register):
+    super(JvmBinaryTask, cls).register_options(register)
+    register('--incremental-jar', type=bool, advanced=True,
+             help='Assemble monolithic jars in-process, copying entries still compressed from '
+                  'dependency jars and, where their contents are unchanged, from the previous '
+                  'monolithic jar, rather than recompressing every entry with the jar tool. The '
+                  'contents of classpath directories are compressed once into jar fragments, '
+                  'which are shared by every jar they are assembled into.')
+    register('--jar-fragments-max-entries', type=int, default=1000, advanced=True,
+             help='The maximum number of jar fragments to keep when assembling jars with '
+                  '--incremental-jar; the least recently used fragments are pruned first. '
+                  'If zero, fragments are never pruned.')
+
   @classmethod
   def prepare(cls, options, round_manager):
     super(JvmBinaryTask, cls).prepare(options, round_manager)
@@ -85,15 +101,14 @@ class JvmBinaryTask(JarBuilderTask):
     # TODO(benjy): There's actually nothing here that requires 'binary' to be a jvm_binary.
     # It could be any target. And that might actually be useful.
     with self.context.new_workunit(name='create-monolithic-jar'):
-      with self.open_jar(path,
-                         jar_rules=binary.deploy_jar_rules,
-                         overwrite=True,
-                         compressed=True) as monolithic_jar:
+      with self._open_monolithic_jar(path, binary.deploy_jar_rules) as monolithic_jar:
         if manifest_classpath:
           monolithic_jar.append_classpath(manifest_classpath)
         else:
           with self.context.new_workunit(name='add-internal-classes'):
-            with self.create_jar_builder(monolithic_jar) as jar_builder:
+            fragment_store = (self.jar_fragment_store if self.get_options().incremental_jar
+                              else None)
+            with self.create_jar_builder(monolithic_jar, fragment_store) as jar_builder:
               jar_builder.add_target(binary, recursive=True)
 
           # NB(gmalmquist): Shading each jar dependency with its own prefix would be a nice feature,
@@ -111,6 +126,41 @@ class JvmBinaryTask(JarBuilderTask):
         with self.context.new_workunit('shade-monolithic-jar'):
           self.shade_jar(binary.shading_rules, jar_path=path)
 
+  @contextmanager
+  def _open_monolithic_jar(self, path, jar_rules):
+    if not self.get_options().incremental_jar:
+      with self.open_jar(path, jar_rules=jar_rules, overwrite=True, compressed=True) as jar:
+        yield jar
+      return
+
+    jar = Jar(path)
+    try:
+      yield jar
+    except jar.Error as e:
+      raise TaskError('Failed to write to jar at {}: {}'.format(path, e))
+
+    assembler = IncrementalJarAssembler(jar, jar_rules)
+    try:
+      assembler.assemble()
+    except Duplicate.Error as e:
+      raise TaskError('Failed to write to jar at {}: {}'.format(path, e))
+    self.context.log.debug('Wrote {}: reused {} entries of the previous jar, copied {} entries of '
+                           'dependency jars, and compressed {} entries.'
+                           .format(path,
+                                   assembler.reused_entry_count,
+                                   assembler.copied_entry_count,
+                                   assembler.compressed_entry_count))
+
+  @memoized_property
+  def jar_fragment_store(self):
+    """The store of jar fragments shared by all tasks that assemble jars incrementally.
+
+    :rtype: :class:`pants.backend.jvm.tasks.jar_fragment_store.JarFragmentStore`
+    """
+    return JarFragmentStore(os.path.join(self.context.options.for_global_scope().pants_workdir,
+                                         'jar_fragments'),
+                            max_entries=self.get_options().jar_fragments_max_entries)
+
   @memoized_property
   def shader(self):
     return Shader.Factory.create(self.context)
@@ -0,0 +1,110 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import threading
+
+from pants.process.lock import merge_entries_file
+from pants.util.memo import memoized_method
+
+
+class CompileDurationHistory(object):
+  """A persistent record of how long targets took to compile, used to estimate compile durations.
+
+  Each target's recorded duration is an exponentially weighted moving average of its measured
+  compile times, so that it follows the target as it grows or shrinks. Targets without a history
+  are estimated by a least-squares fit of recorded duration against total source size, so all
+  estimates are in seconds and comparable.
+
+  The history is shared by concurrent processes: `save` merges the durations recorded by this
+  process into the current content of the history file under a lock, and atomically replaces it.
+  """
+
+  # The weight of each new measurement in a target's moving average.
+  SMOOTHING = 0.5
+
+  def __init__(self, path):
+    """
+    :param str path: The file to persist the history in.
+    """
+    self._path = path
+    self._lock = threading.Lock()
+    self._entries = self._read()
+    self._recorded = {}
+
+  def record(self, spec, duration, sources_size):
+    """Records that the target with the given address spec took `duration` seconds to compile.
+
+    :param str spec: The address spec of the target.
+    :param float duration: The compile time in seconds.
+    :param int sources_size: The total size in bytes of the target's sources.
+    """
+    with self._lock:
+      previous = self._recorded.get(spec) or self._entries.get(spec)
+      if previous is not None:
+        duration = self.SMOOTHING * duration + (1 - self.SMOOTHING) * previous[0]
+      self._recorded[spec] = (duration, sources_size)
+
+  def estimate(self, spec, sources_size):
+    """Returns the estimated compile time in seconds of the target with the given address spec.
+
+    :param str spec: The address spec of the target.
+    :param int sources_size: The total size in bytes of the target's sources.
+    """
+    entry = self._entries.get(spec)
+    if entry is not None:
+      return entry[0]
+    intercept, slope = self._fit()
+    return intercept + slope * sources_size
+
+  @memoized_method
+  def _fit(self):
+    """Returns the (intercept, slope) of the least-squares fit of duration against sources size."""
+    points = list(self._entries.values())
+    if not points:
+      # Without any history, estimates need only be comparable with one another.
+      return 0.0, 1.0
+    count = len(points)
+    mean_duration = sum(duration for duration, _ in points) / count
+    mean_size = sum(size for _, size in points) / count
+    variance = sum((size - mean_size) ** 2 for _, size in points)
+    if variance == 0:
+      return 0.0, (mean_duration / mean_size if mean_size else 0.0)
+    covariance = sum((size - mean_size) * (duration - mean_duration) for duration, size in points)
+    slope = max(0.0, covariance / variance)
+    intercept = max(0.0, mean_duration - slope * mean_size)
+    return intercept, slope
+
+  def save(self):
+    """Persist durations recorded since the history was loaded, if any."""
+    with self._lock:
+      recorded, self._recorded = self._recorded, {}
+    if recorded:
+      merge_entries_file(self._path, self._read, self._write, recorded)
+
+  @staticmethod
+  def _write(fp, entries):
+    for spec, (duration, sources_size) in sorted(entries.items()):
+      fp.write('{}\t{!r}\t{}\n'.format(spec, duration, sources_size).encode('utf-8'))
+
+  def _read(self):
+    entries = {}
+    try:
+      with open(self._path, 'rb') as fp:
+        for line in fp:
+          fields = line.decode('utf-8').rstrip('\n').split('\t')
+          if len(fields) != 3:
+            continue
+          spec, duration, sources_size = fields
+          try:
+            entries[spec] = (float(duration), int(sources_size))
+          except ValueError:
+            continue
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    return entries
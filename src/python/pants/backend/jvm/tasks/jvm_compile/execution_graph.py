@@ -21,7 +21,8 @@ class Job(object):
   keys of its dependent jobs.
   """
 
-  def __init__(self, key, fn, dependencies, size=0, on_success=None, on_failure=None):
+  def __init__(self, key, fn, dependencies, size=0, on_success=None, on_failure=None,
+               isolated=False, on_result=None, skip=None):
     """
 
     :param key: Key used to reference and look up jobs
@@ -31,18 +32,31 @@ class Job(object):
     :param on_success: Zero parameter callback to run if job completes successfully. Run on main
                        thread.
     :param on_failure: Zero parameter callback to run if job completes successfully. Run on main
-                       thread."""
+                       thread.
+    :param isolated: If True, `fn` shares no state with the calling process, and so may be run in
+                     a process pool: it must be picklable (eg, a `functools.partial` of a module
+                     level function), and may only hand results back by returning them.
+    :param on_result: Single parameter callback to run with the return value of `fn` if the job
+                      completes successfully, before `on_success`. Run on main thread.
+    :param skip: Zero parameter predicate to run once the job's dependencies have succeeded. If it
+                 returns True, the job succeeds without running `fn`, and `on_result` is called
+                 with None. Run on main thread."""
     self.key = key
     self.fn = fn
     self.dependencies = dependencies
     self.size = size
     self.on_success = on_success
     self.on_failure = on_failure
+    self.isolated = isolated
+    self.on_result = on_result
+    self.skip = skip
 
   def __call__(self):
-    self.fn()
+    return self.fn()
 
-  def run_success_callback(self):
+  def run_success_callback(self, result=None):
+    if self.on_result:
+      self.on_result(result)
     if self.on_success:
       self.on_success()
 
@@ -224,11 +238,47 @@ class ExecutionGraph(object):
 
     return job_priority
 
-  def execute(self, pool, log):
+  def predicted_makespan(self, num_workers):
+    """Predicts how long `execute` will take, if the size of each job is its duration.
+
+    Simulates executing the graph with `num_workers` workers, starting ready jobs in priority order
+    as `execute` does.
+
+    :param int num_workers: The number of jobs that may run concurrently.
+    :returns: The predicted duration, in the units of the job sizes.
+    """
+    pending_dependencies_count = {key: len(self._dependencies[key])
+                                  for key in self._job_keys_as_scheduled}
+    ready = []
+    running = []
+    now = 0
+
+    def make_ready(job_keys):
+      for job_key in job_keys:
+        heappush(ready, (-self._job_priority[job_key], job_key))
+
+    make_ready(self._job_keys_with_no_dependencies)
+    while ready or running:
+      while ready and len(running) < num_workers:
+        _, job_key = heappop(ready)
+        heappush(running, (now + self._jobs[job_key].size, job_key))
+      now, finished_key = heappop(running)
+      ready_dependees = []
+      for dependee in self._dependees[finished_key]:
+        pending_dependencies_count[dependee] -= 1
+        if pending_dependencies_count[dependee] == 0:
+          ready_dependees.append(dependee)
+      make_ready(ready_dependees)
+    return now
+
+  def execute(self, pool, log, process_pool=None):
     """Runs scheduled work, ensuring all dependencies for each element are done before execution.
 
     :param pool: A WorkerPool to run jobs on
     :param log: logger for logging debug information and progress
+    :param process_pool: If specified, an executor (eg, a `concurrent.futures.ProcessPoolExecutor`)
+                         to run isolated jobs on, rather than the WorkerPool. Their return values
+                         are handed to their `on_result` callbacks on the main thread.
 
     submits all the work without any dependencies to the worker pool
     when a unit of work finishes,
@@ -262,8 +312,8 @@ class ExecutionGraph(object):
     def try_to_submit_jobs_from_heap():
       def worker(worker_key, work):
         try:
-          work()
-          result = (worker_key, SUCCESSFUL, None)
+          value = work()
+          result = (worker_key, SUCCESSFUL, value)
         except Exception as e:
           result = (worker_key, FAILED, e)
         finished_queue.put(result)
@@ -275,7 +325,31 @@ class ExecutionGraph(object):
         status_table.mark_queued(job_key)
         pool.submit_async_work(Work(worker, [(job_key, (self._jobs[job_key]))]))
 
+    def submit_to_process_pool(job_key):
+      def done(future):
+        error = future.exception()
+        if error is None:
+          finished_queue.put((job_key, SUCCESSFUL, future.result()))
+        else:
+          finished_queue.put((job_key, FAILED, error))
+
+      status_table.mark_queued(job_key)
+      # The process pool queues and orders its own work, so isolated jobs are submitted as soon as
+      # they are ready, and do not occupy the WorkerPool.
+      process_pool.submit(self._jobs[job_key].fn).add_done_callback(done)
+
     def submit_jobs(job_keys):
+      skipped = [job_key for job_key in job_keys
+                 if self._jobs[job_key].skip and self._jobs[job_key].skip()]
+      for job_key in skipped:
+        status_table.mark_queued(job_key)
+        finished_queue.put((job_key, SUCCESSFUL, None))
+      job_keys = [job_key for job_key in job_keys if job_key not in skipped]
+      if process_pool is not None:
+        for job_key in job_keys:
+          if self._jobs[job_key].isolated:
+            submit_to_process_pool(job_key)
+        job_keys = [job_key for job_key in job_keys if not self._jobs[job_key].isolated]
       put_jobs_into_heap(job_keys)
       try_to_submit_jobs_from_heap()
 
@@ -298,7 +372,7 @@ class ExecutionGraph(object):
         # Queue downstream tasks.
         if result_status is SUCCESSFUL:
           try:
-            finished_job.run_success_callback()
+            finished_job.run_success_callback(value)
           except Exception as e:
             log.debug(traceback.format_exc())
             raise ExecutionFailure("Error in on_success for {}".format(finished_key), e)
@@ -7,8 +7,10 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import functools
 import os
+import zipfile
 from multiprocessing import cpu_count
 
+from concurrent.futures import ProcessPoolExecutor
 from twitter.common.collections import OrderedSet
 
 from pants.backend.jvm.subsystems.dependency_context import DependencyContext
@@ -21,6 +23,7 @@ from pants.backend.jvm.targets.scalac_plugin import ScalacPlugin
 from pants.backend.jvm.tasks.jvm_compile.class_not_found_error_patterns import \
   CLASS_NOT_FOUND_ERROR_PATTERNS
 from pants.backend.jvm.tasks.jvm_compile.compile_context import CompileContext
+from pants.backend.jvm.tasks.jvm_compile.compile_duration_history import CompileDurationHistory
 from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
                                                                  Job)
 from pants.backend.jvm.tasks.jvm_compile.missing_dependency_finder import (CompileErrorExtractor,
@@ -32,13 +35,26 @@ from pants.base.exceptions import TaskError
 from pants.base.worker_pool import WorkerPool
 from pants.base.workunit import WorkUnitLabel
 from pants.reporting.reporting_utils import items_to_report_element
-from pants.util.contextutil import Timer
+from pants.util.contextutil import Timer, open_zip
 from pants.util.dirutil import (fast_relpath, read_file, safe_delete, safe_mkdir, safe_rmtree,
                                 safe_walk)
 from pants.util.fileutil import create_size_estimators
 from pants.util.memo import memoized_method, memoized_property
 
 
+def jar_directory(root, jar_file):
+  """Jars up the content of the directory `root` as `jar_file`.
+
+  A module level function, so that it may be run in a process pool.
+  """
+  with open_zip(jar_file, mode='w', compression=zipfile.ZIP_STORED) as jar:
+    for abs_sub_dir, dirnames, filenames in safe_walk(root):
+      for name in dirnames + filenames:
+        abs_filename = os.path.join(abs_sub_dir, name)
+        arcname = fast_relpath(abs_filename, root)
+        jar.write(abs_filename, arcname)
+
+
 class JvmCompile(NailgunTaskBase):
   """A common framework for JVM compilation.
 
@@ -48,6 +64,9 @@ class JvmCompile(NailgunTaskBase):
 
   size_estimators = create_size_estimators()
 
+  # Estimates the size of each target as its compile time in previous runs.
+  _HISTORY_SIZE_ESTIMATOR = 'history'
+
   @classmethod
   def size_estimator_by_name(cls, estimation_strategy_name):
     return cls.size_estimators[estimation_strategy_name]
@@ -103,12 +122,23 @@ class JvmCompile(NailgunTaskBase):
                   'compiling with {task}. Defaults to the '
                   'current machine\'s CPU count.'.format(task=cls._name))
 
+    register('--jar-worker-count', advanced=True, type=int, default=0,
+             help='The number of processes to jar the output of each compile in. Jarring is '
+                  'CPU-bound python work, so when compiling many small targets concurrently, '
+                  'jarring in separate processes frees the compile workers to keep the compiler '
+                  'busy. If 0, the output of each compile is jarred by its compile worker.')
+
     register('--size-estimator', advanced=True,
-             choices=list(cls.size_estimators.keys()), default='filesize',
+             choices=list(cls.size_estimators.keys()) + [cls._HISTORY_SIZE_ESTIMATOR],
+             default='filesize',
              help='The method of target size estimation. The size estimator estimates the size '
                   'of targets in order to build the largest targets first (subject to dependency '
                   'constraints). Choose \'random\' to choose random sizes for each target, which '
-                  'may be useful for distributed builds.')
+                  'may be useful for distributed builds. Choose \'{history}\' to estimate each '
+                  'target by its compile time in previous runs (or, for targets without a '
+                  'history, by a fit of compile time against source size), and to report the '
+                  'predicted versus actual duration of each compile.'
+                  .format(history=cls._HISTORY_SIZE_ESTIMATOR))
 
     register('--capture-log', advanced=True, type=bool,
              removal_version='1.9.0.dev0',
@@ -342,7 +372,29 @@ class JvmCompile(NailgunTaskBase):
       worker_count = 1
     self._worker_count = worker_count
 
-    self._size_estimator = self.size_estimator_by_name(self.get_options().size_estimator)
+    try:
+      jar_worker_count = self.get_options().jar_worker_count
+    except AttributeError:
+      # As for worker_count.
+      jar_worker_count = 0
+    self._jar_worker_count = jar_worker_count
+
+    size_estimator = self.get_options().size_estimator
+    self._estimate_durations = size_estimator == self._HISTORY_SIZE_ESTIMATOR
+    if not self._estimate_durations:
+      self._size_estimator = self.size_estimator_by_name(size_estimator)
+
+  @memoized_property
+  def _duration_history(self):
+    return CompileDurationHistory(os.path.join(self.workdir, 'compile_durations'))
+
+  def _sources_size(self, sources):
+    return self.size_estimator_by_name('filesize')(sources)
+
+  def _estimate_job_size(self, target, sources):
+    if self._estimate_durations:
+      return self._duration_history.estimate(target.address.spec, self._sources_size(sources))
+    return self._size_estimator(sources)
 
   @memoized_property
   def _missing_deps_finder(self):
@@ -432,6 +484,22 @@ class JvmCompile(NailgunTaskBase):
     invalid_targets = [vt.target for vt in invalidation_check.invalid_vts]
     assert invalid_targets, "compile_chunk should only be invoked if there are invalid targets."
 
+    # The jar process pool forks all of its workers up front, before the WorkerPool starts its
+    # threads, so that no worker is forked while another thread holds a lock.
+    jar_pool = self._start_jar_pool() if self._jar_worker_count else None
+    try:
+      self._execute_compile_jobs(invalidation_check, compile_contexts, invalid_targets, jar_pool)
+    finally:
+      if jar_pool:
+        jar_pool.shutdown()
+
+  def _start_jar_pool(self):
+    jar_pool = ProcessPoolExecutor(self._jar_worker_count)
+    # The pool forks its workers on the first submission.
+    jar_pool.submit(int).result()
+    return jar_pool
+
+  def _execute_compile_jobs(self, invalidation_check, compile_contexts, invalid_targets, jar_pool):
     # This ensures the workunit for the worker pool is set before attempting to compile.
     with self.context.new_workunit('isolation-{}-pool-bootstrap'.format(self.name())) \
             as workunit:
@@ -454,10 +522,24 @@ class JvmCompile(NailgunTaskBase):
                                      invalidation_check.invalid_vts)
 
     exec_graph = ExecutionGraph(jobs)
+    # Jobs record their durations concurrently, so the history must be loaded before they run.
+    duration_history = self._duration_history
     try:
-      exec_graph.execute(worker_pool, self.context.log)
+      with Timer() as timer:
+        exec_graph.execute(worker_pool, self.context.log, process_pool=jar_pool)
     except ExecutionFailure as e:
       raise TaskError("Compilation failure: {}".format(e))
+    finally:
+      duration_history.save()
+
+    if self._estimate_durations:
+      self._report_makespan(exec_graph.predicted_makespan(self._worker_count), timer.elapsed)
+
+  def _report_makespan(self, predicted, actual):
+    self.context.log.info('Compiled in {:.1f}s, predicted {:.1f}s.'.format(actual, predicted))
+    self.context.run_tracker.run_info.add_infos(
+      ('{}_predicted_makespan'.format(self.options_scope), predicted),
+      ('{}_actual_makespan'.format(self.options_scope), actual))
 
   def _record_compile_classpath(self, classpath, targets, outdir):
     relative_classpaths = [fast_relpath(path, self.get_options().pants_workdir) for path in classpath]
@@ -715,28 +797,73 @@ class JvmCompile(NailgunTaskBase):
                                   timer.elapsed,
                                   is_incremental,
                                   'compile')
+        self._duration_history.record(tgt.address.spec,
+                                      timer.elapsed,
+                                      self._sources_size(ctx.sources))
 
         # Write any additional resources for this target to the target workdir.
         self.write_extra_resources(ctx)
 
-        # Jar the compiled output.
-        self._create_context_jar(ctx)
+        if not self._jar_worker_count:
+          # Jar the compiled output.
+          self._create_context_jar(ctx)
 
-      # Update the products with the latest classes.
-      self.register_extra_products_from_contexts([ctx.target], all_compile_contexts)
+      if not self._jar_worker_count:
+        # Update the products with the latest classes.
+        self.register_extra_products_from_contexts([ctx.target], all_compile_contexts)
+
+      return hit_cache
 
     context_for_target = all_compile_contexts[compile_target]
     compile_context = self.select_runtime_context(context_for_target)
-
-    job = Job(self.exec_graph_key_for_target(compile_target),
-              functools.partial(work_for_vts, ivts, compile_context),
-              [self.exec_graph_key_for_target(target) for target in invalid_dependencies],
-              self._size_estimator(compile_context.sources),
-              # If compilation and analysis work succeeds, validate the vts.
-              # Otherwise, fail it.
-              on_success=ivts.update,
-              on_failure=ivts.force_invalidate)
-    return [job]
+    dependency_keys = [self._final_exec_graph_key_for_target(target)
+                       for target in invalid_dependencies]
+    size = self._estimate_job_size(compile_target, compile_context.sources)
+
+    if not self._jar_worker_count:
+      job = Job(self.exec_graph_key_for_target(compile_target),
+                functools.partial(work_for_vts, ivts, compile_context),
+                dependency_keys,
+                size,
+                # If compilation and analysis work succeeds, validate the vts.
+                # Otherwise, fail it.
+                on_success=ivts.update,
+                on_failure=ivts.force_invalidate)
+      return [job]
+
+    # Jar the compiled output in a separate process, and then register the products with the
+    # latest classes, and validate the vts, on the main thread. An artifact restored from the cache
+    # already contains the jar, so it is not re-jarred.
+    cache_hits = []
+
+    def on_jarred():
+      self.register_extra_products_from_contexts([compile_target], all_compile_contexts)
+      ivts.update()
+
+    compile_job = Job(self.exec_graph_key_for_target(compile_target),
+                      functools.partial(work_for_vts, ivts, compile_context),
+                      dependency_keys,
+                      size,
+                      on_failure=ivts.force_invalidate,
+                      on_result=cache_hits.append)
+    jar_job = Job(self._jar_exec_graph_key_for_target(compile_target),
+                  functools.partial(jar_directory, compile_context.classes_dir,
+                                    compile_context.jar_file),
+                  [compile_job.key],
+                  isolated=True,
+                  on_success=on_jarred,
+                  on_failure=ivts.force_invalidate,
+                  skip=lambda: any(cache_hits))
+    return [compile_job, jar_job]
+
+  def _jar_exec_graph_key_for_target(self, compile_target):
+    return "jar({})".format(compile_target.address.spec)
+
+  def _final_exec_graph_key_for_target(self, compile_target):
+    """The key of the job after which the outputs of compiling the target are ready for use."""
+    if self._jar_worker_count:
+      return self._jar_exec_graph_key_for_target(compile_target)
+    return self.exec_graph_key_for_target(compile_target)
 
   def check_cache(self, vts, counter):
     """Manually checks the artifact cache (usually immediately before compilation.)
@@ -812,13 +939,7 @@ class JvmCompile(NailgunTaskBase):
     compile inputs would make the compiler's analysis useless.
       see https://github.com/twitter-forks/sbt/tree/stuhood/output-jars
     """
-    root = compile_context.classes_dir
-    with compile_context.open_jar(mode='w') as jar:
-      for abs_sub_dir, dirnames, filenames in safe_walk(root):
-        for name in dirnames + filenames:
-          abs_filename = os.path.join(abs_sub_dir, name)
-          arcname = fast_relpath(abs_filename, root)
-          jar.write(abs_filename, arcname)
+    jar_directory(compile_context.classes_dir, compile_context.jar_file)
 
   def _compute_sources_for_target(self, target):
     """Computes and returns the sources (relative to buildroot) for the given target."""
@@ -74,7 +74,8 @@ class DaemonPantsRunner(ProcessManager):
   """
 
   def __init__(self, socket, exiter, args, env, target_roots, graph_helper, fork_lock,
-               deferred_exception=None):
+               deferred_exception=None, warm_wait_time=None, product_graph_stats=None,
+               options_bootstrapper=None, options=None):
     """
     :param socket socket: A connected socket capable of speaking the nailgun protocol.
     :param Exiter exiter: The Exiter instance for this run.
@@ -84,9 +85,16 @@ class DaemonPantsRunner(ProcessManager):
     :param LegacyGraphSession graph_helper: The LegacyGraphSession instance to use for BuildGraph
                                             construction. In the event of an exception, this will be
                                             None.
-    :param threading.RLock fork_lock: A lock to use during forking for thread safety.
+    :param ReadWriteLock fork_lock: A lock to hold for writing during forking for thread safety.
     :param Exception deferred_exception: A deferred exception from the daemon's graph construction.
                                          If present, this will be re-raised in the client context.
+    :param float warm_wait_time: The seconds this run waited to warm the product graph, if known.
+    :param dict product_graph_stats: Stats of the daemon's product graph, if known.
+    :param OptionsBootstrapper options_bootstrapper: The OptionsBootstrapper for this run, if
+                                                     already constructed by the daemon.
+    :param Options options: The Options for this run, if the daemon parsed them against a
+                            `BuildConfiguration` that is valid for this run. If present, the
+                            daemon's loaded backends, plugins and goals are reused by the run.
     """
     super(DaemonPantsRunner, self).__init__(name=self._make_identity())
     self._socket = socket
@@ -97,6 +105,11 @@ class DaemonPantsRunner(ProcessManager):
     self._graph_helper = graph_helper
     self._fork_lock = fork_lock
     self._deferred_exception = deferred_exception
+    self._warm_wait_time = warm_wait_time
+    self._product_graph_stats = product_graph_stats
+    self._options_bootstrapper = options_bootstrapper
+    self._options = options
+    self._fork_wait_time = None
 
   def _make_identity(self):
     """Generate a ProcessManager identity for a given pants run.
@@ -183,13 +196,20 @@ class DaemonPantsRunner(ProcessManager):
         # If `_deferred_exception` isn't a 3-item tuple, treat it like a bare exception.
         raise self._deferred_exception
 
+  def _queue_wait_times(self):
+    queue_wait_times = {'warm': self._warm_wait_time, 'fork': self._fork_wait_time}
+    return {phase: wait_time for phase, wait_time in queue_wait_times.items()
+            if wait_time is not None}
+
   def _maybe_get_client_start_time_from_env(self, env):
     client_start_time = env.pop('PANTSD_RUNTRACKER_CLIENT_START_TIME', None)
     return None if client_start_time is None else float(client_start_time)
 
   def run(self):
     """Fork, daemonize and invoke self.post_fork_child() (via ProcessManager)."""
-    with self._fork_lock:
+    with self._fork_lock.write_locked() as waited:
+      # N.B. This is set pre-fork so that it is visible to the child.
+      self._fork_wait_time = waited
       self.daemonize(write_pid=False)
 
   def pre_fork(self):
@@ -231,8 +251,10 @@ class DaemonPantsRunner(ProcessManager):
         # Setup the Exiter's finalizer.
         self._exiter.set_finalizer(finalizer)
 
-        # Clean global state.
-        clean_global_runtime_state(reset_subsystem=True)
+        # Clean global state. The daemon's backends, plugins and goals survive the fork, and are
+        # only reloaded if the daemon could not parse this run's options against them.
+        clean_global_runtime_state(reset_subsystem=True,
+                                   reset_build_config=self._options is None)
 
         # Re-raise any deferred exceptions, if present.
         self._raise_deferred_exc()
@@ -243,9 +265,13 @@ class DaemonPantsRunner(ProcessManager):
           self._args,
           self._env,
           target_roots=self._target_roots,
-          daemon_build_graph=self._graph_helper
+          daemon_build_graph=self._graph_helper,
+          options_bootstrapper=self._options_bootstrapper,
+          options=self._options
         )
         runner.set_start_time(self._maybe_get_client_start_time_from_env(self._env))
+        runner.set_queue_wait_times(self._queue_wait_times())
+        runner.set_product_graph_stats(self._product_graph_stats)
         runner.run()
       except KeyboardInterrupt:
         self._exiter.exit(1, msg='Interrupted by user.\n')
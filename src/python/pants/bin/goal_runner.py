@@ -79,6 +79,7 @@ class GoalRunnerFactory(object):
     :returns: A tuple of (BuildGraph, AddressMapper, SchedulerSession, TargetRoots).
     """
     # The daemon may provide a `graph_helper`. If that's present, use it for graph construction.
+    parse_cache = None
     if not graph_helper:
       native = Native.create(self._global_options)
       native.set_panic_handler()
@@ -86,6 +87,7 @@ class GoalRunnerFactory(object):
                                                                     self._global_options,
                                                                     self._build_config)
       graph_helper = graph_scheduler_helper.new_session()
+      parse_cache = graph_scheduler_helper.parse_cache
 
     target_roots = target_roots or TargetRootsCalculator.create(
       options=self._options,
@@ -95,6 +97,10 @@ class GoalRunnerFactory(object):
     )
     graph, address_mapper = graph_helper.create_build_graph(target_roots,
                                                             self._root_dir)
+    if parse_cache:
+      parse_cache.save()
+      self._run_tracker.run_info.add_infos(('build_files_parsed', parse_cache.parsed),
+                                           ('build_files_reused', parse_cache.reused))
     return graph, address_mapper, graph_helper.scheduler_session, target_roots
 
   def _determine_goals(self, requested_goals):
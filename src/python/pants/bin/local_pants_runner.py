@@ -5,6 +5,8 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import logging
+
 from pants.base.build_environment import get_buildroot
 from pants.bin.goal_runner import GoalRunner
 from pants.goal.run_tracker import RunTracker
@@ -13,14 +15,19 @@ from pants.init.options_initializer import BuildConfigInitializer, OptionsInitia
 from pants.init.repro import Reproducer
 from pants.option.options_bootstrapper import OptionsBootstrapper
 from pants.reporting.reporting import Reporting
+from pants.source.source_digest_cache import SourceDigests
+from pants.subsystem.subsystem import Subsystem
 from pants.util.contextutil import hard_exit_handler, maybe_profiled
 
 
+logger = logging.getLogger(__name__)
+
+
 class LocalPantsRunner(object):
   """Handles a single pants invocation running in the process-local context."""
 
   def __init__(self, exiter, args, env, target_roots=None, daemon_build_graph=None,
-               options_bootstrapper=None):
+               options_bootstrapper=None, options=None):
     """
     :param Exiter exiter: The Exiter instance to use for this run.
     :param list args: The arguments (e.g. sys.argv) for this run.
@@ -28,6 +35,8 @@ class LocalPantsRunner(object):
     :param TargetRoots target_roots: The `TargetRoots` for this run.
     :param BuildGraph daemon_build_graph: A BuildGraph instance for graph reuse (optional).
     :param OptionsBootstrapper options_bootstrapper: An optional existing OptionsBootstrapper.
+    :param Options options: Optional existing Options for this run, parsed against the currently
+                            loaded `BuildConfiguration` (e.g. by pantsd before forking this run).
     """
     self._exiter = exiter
     self._args = args
@@ -35,11 +44,20 @@ class LocalPantsRunner(object):
     self._target_roots = target_roots
     self._daemon_build_graph = daemon_build_graph
     self._options_bootstrapper = options_bootstrapper
+    self._options = options
     self._run_start_time = None
+    self._queue_wait_times = None
+    self._product_graph_stats = None
 
   def set_start_time(self, start_time):
     self._run_start_time = start_time
 
+  def set_queue_wait_times(self, queue_wait_times):
+    self._queue_wait_times = queue_wait_times
+
+  def set_product_graph_stats(self, product_graph_stats):
+    self._product_graph_stats = product_graph_stats
+
   def run(self):
     profile_path = self._env.get('PANTS_PROFILE')
     with hard_exit_handler(), maybe_profiled(profile_path):
@@ -52,7 +70,11 @@ class LocalPantsRunner(object):
     bootstrap_options = options_bootstrapper.get_bootstrap_options().for_global_scope()
     setup_logging_from_options(bootstrap_options)
     build_config = BuildConfigInitializer.get(options_bootstrapper)
-    options = OptionsInitializer.create(options_bootstrapper, build_config)
+    if self._options is None:
+      options = OptionsInitializer.create(options_bootstrapper, build_config)
+    else:
+      options = self._options
+      Subsystem.set_options(options)
     global_options = options.for_global_scope()
 
     # Apply exiter options.
@@ -71,6 +93,10 @@ class LocalPantsRunner(object):
     run_tracker = RunTracker.global_instance()
     reporting = Reporting.global_instance()
     reporting.initialize(run_tracker, self._run_start_time)
+    if self._queue_wait_times:
+      run_tracker.pantsd_stats.set_queue_wait_times(self._queue_wait_times)
+    if self._product_graph_stats:
+      run_tracker.pantsd_stats.set_product_graph_stats(self._product_graph_stats)
 
     try:
       # Determine the build root dir.
@@ -97,6 +123,11 @@ class LocalPantsRunner(object):
         # TODO: Have Repro capture the 'after' state (as a diff) as well?
         repro.log_location_of_repro_file()
     finally:
+      try:
+        SourceDigests.global_instance().save(run_tracker)
+      except Exception as e:
+        # The digests are only a cache: failing to save them must not prevent finalizing the run.
+        logger.warn('Failed to save source digests: {}'.format(e))
       run_tracker_result = run_tracker.end()
 
     # Take the exit code with higher abs value in case of negative values.
@@ -0,0 +1,176 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import hashlib
+import json
+import logging
+from collections import defaultdict
+
+from pathspec import PathSpec
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
+
+from pants.base.build_file import BuildFile
+from pants.build_graph.address import Address
+from pants.process.lock import merge_entries_file
+from pants.source.source_digest_cache import file_digest
+
+
+logger = logging.getLogger(__name__)
+
+
+class DependeeIndex(object):
+  """A persistent index from each target to the targets that depend on it.
+
+  The index records the dependencies declared by the targets of each BUILD directory, keyed by a
+  digest of the BUILD files in that directory. `update` re-parses only the directories whose BUILD
+  files were added, changed or removed since the index was written, so answering a dependee query
+  need not parse every BUILD file in the repo.
+
+  The dependencies recorded for a target include those that its type computes from its arguments
+  (`Target.compute_dependency_specs`), which may also depend on options: these are re-computed
+  only when the target's BUILD files change.
+
+  The index is shared by concurrent processes: `save` merges the directories re-parsed by this
+  process into the current content of the index file under a lock, and atomically replaces it.
+  """
+
+  # Bumped when the content or format of the index changes, to discard indexes written before.
+  VERSION = 1
+
+  def __init__(self, path, project_tree, build_ignore_patterns=None, digest=file_digest):
+    """
+    :param str path: The file to persist the index in.
+    :param project_tree: The project tree to scan for BUILD files.
+    :type project_tree: :class:`pants.base.project_tree.ProjectTree`
+    :param list build_ignore_patterns: .gitignore like patterns to exclude from BUILD files scan.
+    :param digest: A function which returns the digest of the content of the file at the given
+                   absolute path: eg, `SourceDigests.digest`, to reuse digests cached across runs.
+    """
+    self._path = path
+    self._project_tree = project_tree
+    self._digest = digest
+    self._build_ignore_patterns = PathSpec.from_lines(GitWildMatchPattern,
+                                                      build_ignore_patterns or [])
+    self._entries = self._read()
+    self._updated = {}
+    self._removed = set()
+    self._dependees = None
+
+  def update(self, parse_dependencies):
+    """Brings the index up to date with the BUILD files in the project tree.
+
+    :param parse_dependencies: A function which, given a list of BUILD directories relative to the
+                               build root, returns an iterable of (Address, dependency Addresses)
+                               pairs for each of the targets declared in those directories.
+    :returns: The list of BUILD directories that were re-parsed.
+    """
+    digests = self._build_dir_digests()
+
+    stale = sorted(d for d, digest in digests.items()
+                   if d not in self._entries or self._entries[d][0] != digest)
+    removed = set(self._entries) - set(digests)
+
+    targets_by_dir = {d: {} for d in stale}
+    if stale:
+      for address, dependencies in parse_dependencies(stale):
+        # NB: Parsing may produce the targets of other directories, eg: the dependencies of the
+        # requested ones, which may be stale themselves, and are indexed separately.
+        targets = targets_by_dir.get(address.spec_path)
+        if targets is not None:
+          targets[address.spec] = sorted({d.spec for d in dependencies})
+
+    for d in stale:
+      self._entries[d] = self._updated[d] = (digests[d], targets_by_dir[d])
+    for d in removed:
+      del self._entries[d]
+      self._updated.pop(d, None)
+    self._removed.update(removed)
+
+    if stale or removed:
+      self._dependees = None
+    logger.debug('Dependee index re-parsed {} of {} BUILD directories, and removed {}.'
+                 .format(len(stale), len(digests), len(removed)))
+    return stale
+
+  def dependees(self, addresses, transitive=False):
+    """Returns the addresses of the targets that depend on any of the given addresses.
+
+    The dependees of all of the given addresses are found in a single pass over the index.
+
+    :param iterable addresses: The addresses to find the dependees of.
+    :param bool transitive: True to find transitive dependees, rather than only direct ones.
+    :returns: A set of the addresses of the dependees, excluding the given addresses.
+    """
+    dependees_by_spec = self._dependees_by_spec()
+    roots = {address.spec for address in addresses}
+    found = set()
+    to_visit = list(roots)
+    while to_visit:
+      spec = to_visit.pop()
+      for dependee in dependees_by_spec.get(spec, ()):
+        if dependee not in found and dependee not in roots:
+          found.add(dependee)
+          if transitive:
+            to_visit.append(dependee)
+    return {Address.parse(spec) for spec in found}
+
+  def save(self):
+    """Persist the BUILD directories re-parsed or removed since the index was loaded, if any."""
+    updated, removed = self._updated, self._removed
+    if not updated and not removed:
+      return
+    self._updated, self._removed = {}, set()
+    merge_entries_file(self._path, self._read, self._write, updated, removed=removed)
+
+  def _write(self, fp, entries):
+    json.dump({'version': self.VERSION,
+               'dirs': {d: {'digest': digest, 'targets': targets}
+                        for d, (digest, targets) in entries.items()}},
+              fp, sort_keys=True)
+
+  def _dependees_by_spec(self):
+    if self._dependees is None:
+      dependees = defaultdict(set)
+      for _, targets in self._entries.values():
+        for spec, dependency_specs in targets.items():
+          for dependency_spec in dependency_specs:
+            dependees[dependency_spec].add(spec)
+      self._dependees = dependees
+    return self._dependees
+
+  def _build_dir_digests(self):
+    """Returns a dict from each BUILD directory to a digest of the BUILD files it contains."""
+    build_files_by_dir = defaultdict(list)
+    for build_file in BuildFile.scan_build_files(self._project_tree, '',
+                                                 build_ignore_patterns=self._build_ignore_patterns):
+      build_files_by_dir[build_file.spec_path].append(build_file)
+
+    digests = {}
+    for d, build_files in build_files_by_dir.items():
+      hasher = hashlib.sha1()
+      for build_file in sorted(build_files, key=lambda b: b.name):
+        hasher.update(build_file.name.encode('utf-8'))
+        hasher.update(b'\0')
+        hasher.update(self._digest(build_file.full_path))
+      digests[d] = hasher.hexdigest()
+    return digests
+
+  def _read(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        content = json.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return {}
+    except ValueError:
+      logger.debug('Ignoring the corrupt dependee index at {}.'.format(self._path))
+      return {}
+    if content.get('version') != self.VERSION:
+      return {}
+    return {d: (entry['digest'], entry['targets']) for d, entry in content['dirs'].items()}
@@ -421,8 +421,6 @@ class Target(AbstractTarget):
       fingerprint_map = self._cached_all_transitive_fingerprint_map
 
     if fingerprint_strategy not in fingerprint_map:
-      hasher = sha1()
-
       def dep_hash_iter():
         dep_list = fingerprint_strategy.dependencies(self) if direct else self.dependencies
         for dep in dep_list:
@@ -437,18 +435,34 @@ class Target(AbstractTarget):
             raise self.RecursiveDepthError("{message}\n  referenced from {spec}"
                                            .format(message=e, spec=dep.address.spec))
 
-      dep_hashes = sorted(list(dep_hash_iter()))
-      for dep_hash in dep_hashes:
-        hasher.update(dep_hash)
-      target_hash = self.invalidation_hash(fingerprint_strategy)
-      if target_hash is None and not dep_hashes:
+      combined_hash = self.combine_invalidation_hashes(self.invalidation_hash(fingerprint_strategy),
+                                                       list(dep_hash_iter()))
+      if combined_hash is None:
         return None
-      dependencies_hash = hasher.hexdigest()[:12]
-      combined_hash = '{target_hash}.{deps_hash}'.format(target_hash=target_hash,
-                                                         deps_hash=dependencies_hash)
       fingerprint_map[fingerprint_strategy] = combined_hash
     return fingerprint_map[fingerprint_strategy]
 
+  @staticmethod
+  def combine_invalidation_hashes(target_hash, dep_hashes):
+    """Combines the fingerprint of a target with those of its dependencies.
+
+    :API: public
+
+    :param string target_hash: The fingerprint of the target itself, or None.
+    :param list dep_hashes: The (non-None) fingerprints of its dependencies, in any order.
+    :return: The combined fingerprint, or None if neither the target nor its dependencies
+      contributed a fingerprint.
+    :rtype: string
+    """
+    dep_hashes = sorted(dep_hashes)
+    if target_hash is None and not dep_hashes:
+      return None
+    hasher = sha1()
+    for dep_hash in dep_hashes:
+      hasher.update(dep_hash)
+    return '{target_hash}.{deps_hash}'.format(target_hash=target_hash,
+                                              deps_hash=hasher.hexdigest()[:12])
+
   def mark_transitive_invalidation_hash_dirty(self):
     """
     :API: public
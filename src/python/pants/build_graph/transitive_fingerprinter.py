@@ -0,0 +1,136 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
+from pants.build_graph.build_graph import CycleException
+from pants.build_graph.target import Target
+
+
+class TransitiveFingerprinter(object):
+  """Computes the transitive fingerprints of many targets at once.
+
+  Produces exactly the fingerprints of `Target.transitive_invalidation_hash`, but:
+
+  - computes the direct fingerprints of all targets in the closure up front, optionally using a
+    pool of threads (which only helps where fingerprinting waits on IO, eg: to read sources from a
+    cold or remote filesystem, since fingerprinting payloads is otherwise bound by the GIL),
+  - combines them in a single iterative pass over the closure in topological order, so that the
+    depth of the graph is unbounded, and each target is combined exactly once, and
+  - memoizes the results on each target, as `transitive_invalidation_hash` does, so the work is
+    shared with later checks in the same run that use an equal FingerprintStrategy: a target whose
+    transitive fingerprint is already known is neither re-fingerprinted nor walked through.
+  """
+
+  def __init__(self, parallelism=1):
+    """
+    :param int parallelism: The number of threads to compute direct fingerprints with: 1 to
+                            compute them on the calling thread.
+    """
+    self._parallelism = max(1, parallelism)
+
+  def fingerprint(self, targets, fingerprint_strategy=None):
+    """Computes the transitive fingerprints of the given targets.
+
+    :param list targets: The targets to fingerprint.
+    :param FingerprintStrategy fingerprint_strategy: The strategy to fingerprint each target with.
+    :returns: A dict from each of the given targets to its transitive fingerprint, which may be
+              None as for `Target.transitive_invalidation_hash`.
+    :raises: :class:`pants.build_graph.build_graph.CycleException` if the targets depend on
+             themselves.
+    """
+    fingerprint_strategy = fingerprint_strategy or DefaultFingerprintStrategy()
+
+    direct_roots = {t for t in targets if fingerprint_strategy.direct(t)}
+    ordered = self._unfingerprinted_closure(targets, fingerprint_strategy)
+
+    # Roots fingerprinted "directly" depend on only the direct fingerprints of their dependencies.
+    needs_direct_hash = [target for target, _ in ordered]
+    for root in direct_roots:
+      needs_direct_hash.append(root)
+      needs_direct_hash.extend(fingerprint_strategy.dependencies(root))
+    self._compute_direct_hashes(needs_direct_hash, fingerprint_strategy)
+
+    # Every dependency of a target is either earlier in the order, or had its transitive fingerprint
+    # memoized already: either way, a missing entry means that its transitive fingerprint is None.
+    for target, deps in ordered:
+      dep_hashes = []
+      for dep in deps:
+        dep_hash = dep._cached_all_transitive_fingerprint_map.get(fingerprint_strategy)
+        if dep_hash is not None:
+          dep_hashes.append(dep_hash)
+      transitive_hash = Target.combine_invalidation_hashes(
+        target.invalidation_hash(fingerprint_strategy), dep_hashes)
+      if transitive_hash is not None:
+        target._cached_all_transitive_fingerprint_map[fingerprint_strategy] = transitive_hash
+
+    # Everything needed to fingerprint the roots is now memoized, and a missing entry means None.
+    return {target: target.transitive_invalidation_hash(fingerprint_strategy)
+                    if target in direct_roots
+                    else target._cached_all_transitive_fingerprint_map.get(fingerprint_strategy)
+            for target in targets}
+
+  def _unfingerprinted_closure(self, targets, fingerprint_strategy):
+    """Returns the targets whose transitive fingerprints are not yet known, dependencies first.
+
+    Each target is paired with its dependencies. The walk stops at targets whose transitive
+    fingerprints are already memoized.
+    """
+    def known(target):
+      return fingerprint_strategy in target._cached_all_transitive_fingerprint_map
+
+    ordered = []
+    # NB: Targets hash by address, which is comparatively expensive, so these are sets of ids.
+    done = set()
+    on_path = set()
+    # Roots fingerprinted "directly" need no transitive fingerprints at all.
+    for root in targets:
+      if id(root) in done or known(root) or fingerprint_strategy.direct(root):
+        continue
+      # An explicit stack of (target, dependencies, index of next dependency) rather than recursion.
+      stack = [(root, root.dependencies, 0)]
+      on_path.add(id(root))
+      while stack:
+        target, deps, index = stack.pop()
+        while index < len(deps):
+          dep = deps[index]
+          index += 1
+          if id(dep) in on_path:
+            path = [t for t, _, _ in stack] + [target]
+            raise CycleException(path[path.index(dep):] + [dep])
+          if id(dep) not in done and not known(dep):
+            stack.append((target, deps, index))
+            stack.append((dep, dep.dependencies, 0))
+            on_path.add(id(dep))
+            break
+        else:
+          on_path.discard(id(target))
+          done.add(id(target))
+          ordered.append((target, deps))
+    return ordered
+
+  def _compute_direct_hashes(self, targets, fingerprint_strategy):
+    def compute(targets):
+      for target in targets:
+        target.invalidation_hash(fingerprint_strategy)
+
+    pending = []
+    seen = set()
+    for target in targets:
+      if id(target) not in seen and fingerprint_strategy not in target._cached_fingerprint_map:
+        seen.add(id(target))
+        pending.append(target)
+    workers = min(self._parallelism, len(pending))
+    if workers <= 1:
+      compute(pending)
+    else:
+      # Each worker takes an interleaved slice of the targets, to amortize the cost of scheduling.
+      with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Consume the results to propagate any failure.
+        for _ in pool.map(compute, [pending[i::workers] for i in range(workers)]):
+          pass
@@ -9,9 +9,15 @@ import errno
 import os
 import shutil
 import tarfile
+import tempfile
+import uuid
+from contextlib import contextmanager
 
+from pants.cache.compression import (DEFAULT_CODEC, MAGIC_LENGTH, CodecError, CompressingWriter,
+                                     DecompressingReader, detect_codec)
 from pants.util.contextutil import open_tar
-from pants.util.dirutil import safe_mkdir, safe_mkdir_for, safe_walk
+from pants.util.dirutil import (fast_relpath_optional, mergetree, safe_mkdir, safe_mkdir_for,
+                                safe_rmtree, safe_walk)
 
 
 class ArtifactError(Exception):
@@ -81,58 +87,134 @@ class DirectoryArtifact(Artifact):
 
 
 class TarballArtifact(Artifact):
-  """An artifact stored in a tarball."""
+  """An artifact stored in a (possibly compressed) tarball.
+
+  Artifacts are written with the configured codec, but read with whichever codec wrote them, as
+  detected from their header.
+  """
 
   # TODO: Expose `dereference` for tasks.
   # https://github.com/pantsbuild/pants/issues/3961
-  def __init__(self, artifact_root, tarfile_, compression=9, dereference=True):
+  def __init__(self, artifact_root, tarfile_, compression=9, dereference=True, codec=None):
+    """
+    :param str artifact_root: The path under which the files in this artifact are read/written.
+    :param str tarfile_: The path of the tarball.
+    :param int compression: The compression level to use when collecting files.
+    :param bool dereference: Dereference symlinks when collecting files.
+    :param ArtifactCodec codec: The codec to use when collecting files: defaults to gzip.
+    """
     super(TarballArtifact, self).__init__(artifact_root)
     self._tarfile = tarfile_
     self._compression = compression
     self._dereference = dereference
+    self._codec = codec or DEFAULT_CODEC
 
   def exists(self):
     return os.path.isfile(self._tarfile)
 
   def collect(self, paths):
-    # In our tests, gzip is slightly less compressive than bzip2 on .class files,
-    # but decompression times are much faster.
-    mode = 'w:gz'
-
-    tar_kwargs = {'dereference': self._dereference, 'errorlevel': 2, 'compresslevel': self._compression}
-
-    with open_tar(self._tarfile, mode, **tar_kwargs) as tarout:
-      for path in paths or ():
-        # Adds dirs recursively.
-        relpath = os.path.relpath(path, self._artifact_root)
-        tarout.add(path, relpath)
-        self._relpaths.add(relpath)
+    # In our tests, gzip is slightly less compressive than bzip2 on .class files, but decompression
+    # times are much faster. zstd and lz4 are faster still, at a similar or slightly worse ratio.
+    tar_kwargs = {'dereference': self._dereference, 'errorlevel': 2}
+
+    with open(self._tarfile, 'wb') as fp:
+      writer = CompressingWriter(fp, self._codec.compressor(self._compression))
+      # Stream mode ('|') writes the tarball sequentially, so the codec need not support seeking.
+      with open_tar(writer, 'w|', **tar_kwargs) as tarout:
+        for path in paths or ():
+          # Adds dirs recursively.
+          relpath = os.path.relpath(path, self._artifact_root)
+          tarout.add(path, relpath)
+          self._relpaths.add(relpath)
+      writer.close()
 
   def extract(self):
+    with open(self._tarfile, 'rb') as fp:
+      with self._translate_errors():
+        self._relpaths.update(self._extract_members(self._decompressed(fp), self._artifact_root))
+
+  def extract_stream(self, fileobj, results_dir=None):
+    """Extract the files in this artifact from a stream of its bytes, as they arrive.
+
+    Files are extracted into a staging directory, and only moved into place once the whole stream
+    has been successfully extracted: a stream that fails part way through leaves no trace.
+
+    :param fileobj: A file-like object supporting `read`, positioned at the start of a tarball.
+    :param str results_dir: If specified, and the artifact contains only paths under it, the
+      results_dir is atomically replaced with the extracted contents. Otherwise the extracted
+      contents are merged into the artifact root.
+    """
+    staging_dir = tempfile.mkdtemp(dir=self._artifact_root, prefix='.extract-')
     try:
-      with open_tar(self._tarfile, 'r', errorlevel=2) as tarin:
-        # Note: We create all needed paths proactively, even though extractall() can do this for us.
-        # This is because we may be called concurrently on multiple artifacts that share directories,
-        # and there will be a race condition inside extractall(): task T1 A) sees that a directory
-        # doesn't exist and B) tries to create it. But in the gap between A) and B) task T2 creates
-        # the same directory, so T1 throws "File exists" in B).
-        # This actually happened, and was very hard to debug.
-        # Creating the paths here up front allows us to squelch that "File exists" error.
-        paths = []
-        dirs = set()
-        for tarinfo in tarin.getmembers():
-          paths.append(tarinfo.name)
-          if tarinfo.isdir():
-            dirs.add(tarinfo.name)
-          else:
-            dirs.add(os.path.dirname(tarinfo.name))
-        for d in dirs:
-          try:
-            os.makedirs(os.path.join(self._artifact_root, d))
-          except OSError as e:
-            if e.errno != errno.EEXIST:
-              raise
-        tarin.extractall(self._artifact_root)
-        self._relpaths.update(paths)
-    except tarfile.ReadError as e:
+      with self._translate_errors():
+        paths = self._extract_members(self._decompressed(fileobj), staging_dir)
+
+      results_relpath = (os.path.relpath(results_dir, self._artifact_root)
+                         if results_dir is not None else None)
+      if results_relpath is not None and all(
+          fast_relpath_optional(path, results_relpath) is not None for path in paths):
+        self._swap_in(os.path.join(staging_dir, results_relpath), results_dir)
+      else:
+        mergetree(staging_dir, self._artifact_root, symlinks=True)
+      self._relpaths.update(paths)
+    finally:
+      safe_rmtree(staging_dir)
+
+  @staticmethod
+  def _decompressed(fileobj):
+    header = fileobj.read(MAGIC_LENGTH)
+    return DecompressingReader(fileobj, detect_codec(header).decompressor(), prefix=header)
+
+  @staticmethod
+  @contextmanager
+  def _translate_errors():
+    try:
+      yield
+    except (tarfile.TarError, CodecError) as e:
+      raise ArtifactError(str(e))
+    except IOError as e:
+      # The python 2 tarfile module reports truncated members as an IOError without an errno.
+      if e.errno is not None:
+        raise
       raise ArtifactError(str(e))
+
+  @staticmethod
+  def _extract_members(fileobj, root):
+    """Extract the tarball read from the given file into the given root, returning its paths."""
+    paths = []
+
+    def members(tarin):
+      # Note: We create all needed paths proactively, even though extractall() can do this for us.
+      # This is because we may be called concurrently on multiple artifacts that share directories,
+      # and there will be a race condition inside extractall(): task T1 A) sees that a directory
+      # doesn't exist and B) tries to create it. But in the gap between A) and B) task T2 creates
+      # the same directory, so T1 throws "File exists" in B).
+      # This actually happened, and was very hard to debug.
+      # Creating the paths here up front allows us to squelch that "File exists" error.
+      for tarinfo in tarin:
+        paths.append(tarinfo.name)
+        d = tarinfo.name if tarinfo.isdir() else os.path.dirname(tarinfo.name)
+        try:
+          os.makedirs(os.path.join(root, d))
+        except OSError as e:
+          if e.errno != errno.EEXIST:
+            raise
+        yield tarinfo
+
+    # Stream mode ('|') reads the tarball sequentially, so each member is extracted as it arrives.
+    with open_tar(fileobj, 'r|', errorlevel=2) as tarin:
+      tarin.extractall(root, members=members(tarin))
+    return paths
+
+  @staticmethod
+  def _swap_in(staged_dir, dest_dir):
+    safe_mkdir(staged_dir)
+    safe_mkdir_for(dest_dir)
+    replaced_dir = '{}.replaced.{}'.format(dest_dir, uuid.uuid4().hex)
+    try:
+      os.rename(dest_dir, replaced_dir)
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    os.rename(staged_dir, dest_dir)
+    safe_rmtree(replaced_dir)
@@ -135,6 +135,45 @@ class ArtifactCache(object):
     """
     pass
 
+  def fetch(self, cache_key):
+    """Fetch the artifact for the given key to local storage, without using it.
+
+    Splitting `use_cached_files` into `fetch` and `use_fetched` allows callers to overlap the IO
+    bound fetching of some artifacts with the extraction of others. Caches that have nothing to
+    fetch (because their artifacts are already local) may return `True` here, and do all of their
+    work in `use_fetched`.
+
+    :param CacheKey cache_key: A CacheKey object.
+    :returns: A truthy handle for the fetched artifact to pass to `use_fetched`, or a False-y value
+      (`False` or an `UnreadableArtifact`) as for `use_cached_files`.
+    """
+    return True
+
+  def fetched_size(self, fetched):
+    """Returns the number of bytes transferred to produce the given `fetch` handle."""
+    return 0
+
+  def use_fetched(self, cache_key, fetched, results_dir=None):
+    """Use an artifact previously returned by `fetch`.
+
+    :param CacheKey cache_key: A CacheKey object.
+    :param fetched: The handle returned by `fetch` for the cache_key.
+    :returns: As for `use_cached_files`.
+    """
+    return self.use_cached_files(cache_key, results_dir)
+
+  def discard_fetched(self, fetched):
+    """Release an artifact previously returned by `fetch` without using it."""
+    pass
+
+  def transport_stats(self):
+    """Returns a dict of counters describing the connections used by this cache, if any.
+
+    For remote caches, the dict has the number of `requests` sent and the number of `connections`
+    opened to send them.
+    """
+    return None
+
   def delete(self, cache_key):
     """Delete the artifacts for the specified key.
 
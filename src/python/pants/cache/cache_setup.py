@@ -5,6 +5,7 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import multiprocessing
 import os
 import threading
 import urlparse
@@ -14,8 +15,11 @@ from six.moves import range
 
 from pants.base.build_environment import get_buildroot
 from pants.cache.artifact_cache import ArtifactCacheError
+from pants.cache.compression import CODEC_NAMES, DEFAULT_CODEC, codec_for_name
+from pants.cache.content_addressed_artifact_cache import ContentAddressedLocalArtifactCache
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
 from pants.cache.pinger import BestUrlSelector, Pinger
+from pants.cache.pipelined_artifact_cache_reader import PipelinedArtifactCacheReader
 from pants.cache.resolver import NoopResolver, Resolver, RESTfulResolver
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
 from pants.subsystem.subsystem import Subsystem
@@ -78,12 +82,52 @@ class CacheSetup(Subsystem):
              help='The read timeout for any remote caches in use, in seconds.')
     register('--write-timeout', advanced=True, type=float, default=4.0,
              help='The write timeout for any remote caches in use, in seconds.')
+    register('--read-pipeline', advanced=True, type=bool, default=False,
+             help='Read artifacts with a pipeline of threads that first probes the cache for all '
+                  'artifacts, and then overlaps downloading them with extracting them, rather '
+                  'than with a pool of processes that each read one artifact at a time.')
+    register('--read-io-concurrency', advanced=True, type=int, default=32,
+             help='The maximum number of concurrent cache probes and downloads when '
+                  '--read-pipeline is enabled.')
+    register('--read-extract-concurrency', advanced=True, type=int,
+             default=multiprocessing.cpu_count(),
+             help='The maximum number of concurrent artifact extractions when --read-pipeline is '
+                  'enabled.')
+    register('--remote-max-connections-per-host', advanced=True, type=int, default=None,
+             help='The number of connections to keep alive to each remote cache host. Defaults '
+                  'to the larger of --read-io-concurrency and the number of cores, so that '
+                  'concurrent requests reuse connections rather than re-establishing them.')
+    register('--remote-max-retries', advanced=True, type=int, default=2,
+             help='The number of times to retry a remote cache read (GET or HEAD) that failed '
+                  'with a connection error, a timeout, or a server error.')
+    register('--remote-retry-backoff', advanced=True, type=float, default=0.1,
+             help='The base delay in seconds before retrying a remote cache read. The delay '
+                  'doubles for each retry, and is randomly jittered.')
     register('--compression-level', advanced=True, type=int, default=5,
-             help='The gzip compression level (0-9) for created artifacts.')
+             help='The compression level (1-9) for created artifacts.')
+    register('--compression-codec', advanced=True, choices=CODEC_NAMES,
+             default=DEFAULT_CODEC.name,
+             help='The compression codec for created artifacts. zstd and lz4 require the '
+                  'zstandard and lz4 python modules respectively. The codec is recorded in the '
+                  'header of each artifact, so artifacts created with any codec can be read, '
+                  'regardless of this setting.')
     register('--dereference-symlinks', type=bool, default=True, fingerprint=True,
              help='Dereference symlinks when creating cache tarball.')
     register('--max-entries-per-target', advanced=True, type=int, default=8,
              help='Maximum number of old cache files to keep per task target pair')
+    register('--local-store', advanced=True, choices=['tarball', 'content-addressed'],
+             default='tarball',
+             help='How to store artifacts in local caches. tarball: one compressed tarball per '
+                  'task target pair. content-addressed: deduplicated file contents shared by all '
+                  'tasks, restored by copying, and bounded by --max-local-bytes.')
+    register('--max-local-bytes', advanced=True, type=int, default=0,
+             help='The maximum total size in bytes of a content-addressed local cache, shared by '
+                  'all tasks using it. Least recently used artifacts are evicted to stay under '
+                  'the limit. 0 means no limit.')
+    register('--streaming-extraction', advanced=True, type=bool, default=False,
+             help='Extract remote artifacts while they are being downloaded, rather than after '
+                  'spooling them to a temporary tarball. Applies to reads that do not use '
+                  '--read-pipeline.')
     register('--pinger-timeout', advanced=True, type=float, default=0.5,
              help='number of seconds before pinger times out')
     register('--pinger-tries', advanced=True, type=int, default=2,
@@ -158,6 +202,20 @@ class CacheFactory(object):
   def overwrite(self):
     return self._options.overwrite
 
+  def get_read_pipeline(self):
+    """Returns a PipelinedArtifactCacheReader for the read cache, if one is configured.
+
+    Returns None if pipelined reads are disabled, or if there is no read cache.
+    """
+    if not self._options.read_pipeline:
+      return None
+    read_cache = self.get_read_cache()
+    if not read_cache:
+      return None
+    return PipelinedArtifactCacheReader(read_cache,
+                                        io_concurrency=self._options.read_io_concurrency,
+                                        extract_concurrency=self._options.read_extract_concurrency)
+
   def get_read_cache(self):
     """Returns the read cache for this setup, creating it if necessary.
 
@@ -260,6 +318,11 @@ class CacheFactory(object):
 
     return available_urls
 
+  @memoized_property
+  def _codec(self):
+    """The codec to create artifacts with."""
+    return codec_for_name(self._options.compression_codec)
+
   def _do_create_artifact_cache(self, spec, action):
     """Returns an artifact cache for the specified spec.
 
@@ -274,15 +337,31 @@ class CacheFactory(object):
       raise ValueError('compression_level must be an integer 1-9: {}'.format(compression))
 
     artifact_root = self._options.pants_workdir
+    codec = self._codec
 
     def create_local_cache(parent_path):
+      if self._options.local_store == 'content-addressed':
+        self._log.debug('{0} {1} content addressed local artifact cache at {2}'
+                        .format(self._task.stable_name(), action, parent_path))
+        return ContentAddressedLocalArtifactCache(
+          artifact_root, parent_path, compression,
+          namespace=self._cache_dirname,
+          max_bytes=self._options.max_local_bytes,
+          max_entries_per_target=self._options.max_entries_per_target,
+          permissions=self._options.write_permissions,
+          dereference=self._options.dereference_symlinks,
+          streaming=self._options.streaming_extraction,
+          codec=codec)
+
       path = os.path.join(parent_path, self._cache_dirname)
       self._log.debug('{0} {1} local artifact cache at {2}'
                       .format(self._task.stable_name(), action, path))
       return LocalArtifactCache(artifact_root, path, compression,
                                 self._options.max_entries_per_target,
                                 permissions=self._options.write_permissions,
-                                dereference=self._options.dereference_symlinks)
+                                dereference=self._options.dereference_symlinks,
+                                streaming=self._options.streaming_extraction,
+                                codec=codec)
 
     def create_remote_cache(remote_spec, local_cache):
       urls = self.get_available_urls(remote_spec.split('|'))
@@ -291,13 +370,19 @@ class CacheFactory(object):
         best_url_selector = BestUrlSelector(
           ['{}/{}'.format(url.rstrip('/'), self._cache_dirname) for url in urls]
         )
-        local_cache = local_cache or TempLocalArtifactCache(artifact_root, compression)
+        local_cache = local_cache or TempLocalArtifactCache(
+          artifact_root, compression, streaming=self._options.streaming_extraction, codec=codec)
         return RESTfulArtifactCache(
           artifact_root,
           best_url_selector,
           local_cache,
           read_timeout=self._options.read_timeout,
           write_timeout=self._options.write_timeout,
+          max_connections_per_host=(self._options.remote_max_connections_per_host or
+                                    max(self._options.read_io_concurrency,
+                                        multiprocessing.cpu_count())),
+          max_retries=self._options.remote_max_retries,
+          retry_backoff=self._options.remote_retry_backoff,
         )
 
     local_cache = create_local_cache(spec.local) if spec.local else None
@@ -0,0 +1,231 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import importlib
+import zlib
+from abc import abstractmethod
+
+from pants.util.chunk_buffer import ChunkBuffer
+from pants.util.meta import AbstractClass
+
+
+class CodecError(Exception):
+  """Indicates that a codec is unknown or not installed, or that a stream can't be decompressed."""
+
+
+class ArtifactCodec(AbstractClass):
+  """A compression format for artifact tarballs.
+
+  Every supported format begins with a distinct magic number, so the codec used for an artifact is
+  recorded in (and detected from) its own header: readers decode artifacts written with any codec,
+  regardless of which codec they are configured to write.
+  """
+
+  # The name used to select this codec via options.
+  name = None
+
+  # The leading bytes of every stream written by this codec.
+  magic = b''
+
+  # The python module implementing this codec, if it is not part of the standard library. It is
+  # only imported once the codec is used, so that merely loading artifact support does not require
+  # the optional codecs' native extensions.
+  module = None
+
+  def _import(self):
+    """Returns the module implementing this codec.
+
+    :raises: :class:`CodecError` if the module is not installed.
+    """
+    try:
+      return importlib.import_module(self.module)
+    except ImportError as e:
+      raise CodecError('The {} artifact codec requires the `{}` module, which could not be '
+                       'imported: {}'.format(self.name, self.module, e))
+
+  @abstractmethod
+  def compressor(self, level):
+    """Returns an object with `compress(bytes)` and `flush()` methods, as for `zlib.compressobj`.
+
+    :param int level: The compression level: higher is slower, but usually smaller.
+    """
+
+  @abstractmethod
+  def decompressor(self):
+    """Returns an object with a `decompress(bytes)` method, as for `zlib.decompressobj`."""
+
+
+class _Passthrough(object):
+
+  def compress(self, data):
+    return data
+
+  def decompress(self, data):
+    return data
+
+  def flush(self):
+    return b''
+
+
+class UncompressedCodec(ArtifactCodec):
+  """Plain tar, which is cheapest to write and read when IO is not the bottleneck."""
+
+  name = 'uncompressed'
+
+  def compressor(self, level):
+    return _Passthrough()
+
+  def decompressor(self):
+    return _Passthrough()
+
+
+class GzipCodec(ArtifactCodec):
+  """Gzip, which is compatible with artifacts written by all previous versions of pants."""
+
+  name = 'gzip'
+  magic = b'\x1f\x8b'
+
+  # Selects the gzip container, rather than a raw zlib stream.
+  _WBITS = 16 + zlib.MAX_WBITS
+
+  def compressor(self, level):
+    return zlib.compressobj(level, zlib.DEFLATED, self._WBITS)
+
+  def decompressor(self):
+    return zlib.decompressobj(self._WBITS)
+
+
+class ZstdCodec(ArtifactCodec):
+  """Zstandard, which compresses about as well as gzip at a fraction of the CPU cost."""
+
+  name = 'zstd'
+  magic = b'\x28\xb5\x2f\xfd'
+  module = 'zstandard'
+
+  def compressor(self, level):
+    return self._import().ZstdCompressor(level=level).compressobj()
+
+  def decompressor(self):
+    return self._import().ZstdDecompressor().decompressobj()
+
+
+class _Lz4FrameCompressor(object):
+  """Adapts an `lz4.frame.LZ4FrameCompressor` to the `zlib.compressobj` interface."""
+
+  def __init__(self, compressor):
+    self._compressor = compressor
+    self._header = compressor.begin()
+
+  def _with_header(self, data):
+    header, self._header = self._header, b''
+    return header + data
+
+  def compress(self, data):
+    return self._with_header(self._compressor.compress(data))
+
+  def flush(self):
+    return self._with_header(self._compressor.flush())
+
+
+class Lz4Codec(ArtifactCodec):
+  """LZ4, which trades compression ratio for the fastest compression and decompression."""
+
+  name = 'lz4'
+  magic = b'\x04\x22\x4d\x18'
+  module = 'lz4.frame'
+
+  def compressor(self, level):
+    return _Lz4FrameCompressor(self._import().LZ4FrameCompressor(compression_level=level))
+
+  def decompressor(self):
+    return self._import().LZ4FrameDecompressor()
+
+
+CODECS = (GzipCodec(), ZstdCodec(), Lz4Codec(), UncompressedCodec())
+
+DEFAULT_CODEC = CODECS[0]
+
+CODEC_NAMES = [codec.name for codec in CODECS]
+
+# The number of leading bytes needed to detect the codec of a stream.
+MAGIC_LENGTH = max(len(codec.magic) for codec in CODECS)
+
+
+def codec_for_name(name):
+  """Returns the codec with the given name.
+
+  :raises: :class:`CodecError` if the codec is unknown, or its implementation is not installed.
+  """
+  for codec in CODECS:
+    if codec.name == name:
+      if codec.module:
+        codec._import()
+      return codec
+  raise CodecError('Unknown artifact codec {!r}: choose from {}.'.format(name, CODEC_NAMES))
+
+
+def detect_codec(header):
+  """Returns the codec that wrote a stream beginning with the given bytes.
+
+  Streams that begin with no known magic number are assumed to be uncompressed tarballs, which
+  have no magic number at their start.
+  """
+  for codec in CODECS:
+    if codec.magic and header.startswith(codec.magic):
+      return codec
+  return CODECS[-1]
+
+
+class CompressingWriter(object):
+  """A writable file-like object that compresses its input into another file."""
+
+  def __init__(self, fileobj, compressor):
+    self._fileobj = fileobj
+    self._compressor = compressor
+
+  def write(self, data):
+    compressed = self._compressor.compress(data)
+    if compressed:
+      self._fileobj.write(compressed)
+
+  def close(self):
+    """Writes any buffered output: does not close the underlying file."""
+    self._fileobj.write(self._compressor.flush())
+
+
+class DecompressingReader(object):
+  """A readable file-like object that decompresses the content of another file."""
+
+  _CHUNK_SIZE = 64 * 1024
+
+  def __init__(self, fileobj, decompressor, prefix=b''):
+    """
+    :param fileobj: A file-like object to read compressed data from.
+    :param decompressor: The decompressor to use, as returned by `ArtifactCodec.decompressor`.
+    :param bytes prefix: Compressed data which has already been read from `fileobj`.
+    """
+    self._fileobj = fileobj
+    self._decompressor = decompressor
+    self._pending = prefix
+    self._buffer = ChunkBuffer()
+    self._eof = False
+
+  def _fill(self, size):
+    while not self._eof and (size < 0 or len(self._buffer) < size):
+      chunk = self._pending or self._fileobj.read(self._CHUNK_SIZE)
+      self._pending = b''
+      if not chunk:
+        self._eof = True
+      else:
+        try:
+          self._buffer.append(self._decompressor.decompress(chunk))
+        except Exception as e:
+          raise CodecError('Failed to decompress artifact: {}'.format(e))
+
+  def read(self, size=-1):
+    self._fill(size)
+    return self._buffer.read(size)
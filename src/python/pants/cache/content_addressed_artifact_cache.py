@@ -0,0 +1,533 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import json
+import logging
+import os
+import shutil
+import stat
+import time
+import uuid
+from contextlib import contextmanager
+
+from pants.base.hash_utils import hash_file
+from pants.cache.artifact_cache import UnreadableArtifact
+from pants.cache.local_artifact_cache import BaseLocalArtifactCache
+from pants.process.lock import OwnerPrintingInterProcessFileLock
+from pants.util.dirutil import safe_delete, safe_mkdir, safe_mkdir_for, safe_rmtree
+
+
+logger = logging.getLogger(__name__)
+
+
+class ContentAddressedIndex(object):
+  """A compact LRU index over the manifests and blobs of a ContentAddressedLocalArtifactCache.
+
+  The index is a single json file mapping each manifest to its last access time, and each blob to
+  its size and the number of manifests that reference it. All mutations happen under an
+  inter-process file lock, so many tasks (and many processes) may share a single store.
+
+  Cache hits must stay cheap, so they do not take the lock: they append a line to an access log
+  instead, which is folded into the index the next time it is mutated. Inserts take the lock, but
+  rather than rewriting the whole index they append a record to an insert journal, which is folded
+  into the index once it has grown to a fraction of the size of the index. This keeps the cost of
+  rewriting the index proportional to the number of inserts.
+  """
+
+  _VERSION = 1
+
+  # The insert journal is folded into the index once it is larger than this fraction of the index,
+  # or than _MIN_FOLD_BYTES, whichever is larger.
+  _FOLD_RATIO = 0.5
+  _MIN_FOLD_BYTES = 64 * 1024
+
+  def __init__(self, root):
+    """
+    :param str root: The root directory of the content addressed store.
+    """
+    self._root = root
+    self._index_path = os.path.join(root, 'index.json')
+    self._access_log_path = os.path.join(root, 'access.log')
+    self._journal_path = os.path.join(root, 'inserts.log')
+    self._lock = OwnerPrintingInterProcessFileLock(os.path.join(root, 'index.lock'))
+
+  def record_access(self, entry):
+    """Record a (lock-free) access of the given manifest entry."""
+    line = '{:.6f}\t{}\n'.format(time.time(), entry).encode('utf-8')
+    fd = os.open(self._access_log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+      # A single small O_APPEND write is atomic with respect to other appenders.
+      os.write(fd, line)
+    finally:
+      os.close(fd)
+
+  @contextmanager
+  def locked(self):
+    """Holds the index lock for the duration of the block."""
+    self._lock.acquire(message_fn=logger.debug)
+    try:
+      yield
+    finally:
+      self._lock.release()
+
+  def journal_insert(self, entry, blob_sizes, released_blobs):
+    """Journal an insert of the given manifest entry. Must be called while the index is `locked`.
+
+    :param str entry: The inserted manifest entry.
+    :param dict blob_sizes: The size in bytes of each blob referenced by the new manifest.
+    :param list released_blobs: The blobs referenced by the manifest that the new one replaced.
+    :returns: True if the journal should now be folded into the index.
+    :rtype: bool
+    """
+    record = {'entry': entry, 'time': time.time(), 'blobs': blob_sizes,
+              'released': released_blobs}
+    with open(self._journal_path, 'ab') as fp:
+      fp.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+      journal_bytes = fp.tell()
+    try:
+      index_bytes = os.path.getsize(self._index_path)
+    except OSError:
+      index_bytes = 0
+    return journal_bytes >= max(self._MIN_FOLD_BYTES, index_bytes * self._FOLD_RATIO)
+
+  @contextmanager
+  def mutate(self, apply_insert):
+    """Yields the locked, up to date index state, and persists it when the block exits cleanly.
+
+    The yielded state is a dict with an `entries` dict of `entry -> last access time`, and a `blobs`
+    dict of `blob name -> [size in bytes, reference count]`.
+
+    :param apply_insert: A function of (state, record) that applies a journaled insert record, as
+                         written by `journal_insert`, to the state.
+    """
+    with self.locked():
+      state = self._load()
+      for record in self._read_journal():
+        apply_insert(state, record)
+      self._fold_access_log(state)
+      yield state
+      self._store(state)
+      # The journal is only deleted once the index that includes it is stored, so a crash can at
+      # worst count the references of a journaled insert twice (leaking its blobs) rather than not
+      # at all (deleting blobs that are still referenced).
+      safe_delete(self._journal_path)
+
+  def _load(self):
+    try:
+      with open(self._index_path, 'rb') as fp:
+        state = json.load(fp)
+      if state.get('version') == self._VERSION:
+        return state
+      logger.warn('Ignoring content addressed cache index with unknown version at {}'
+                  .format(self._index_path))
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    except ValueError as e:
+      logger.warn('Ignoring corrupt content addressed cache index at {}: {}'
+                  .format(self._index_path, e))
+    return {'version': self._VERSION, 'entries': {}, 'blobs': {}}
+
+  def _store(self, state):
+    tmp_path = '{}.tmp.{}'.format(self._index_path, uuid.uuid4().hex)
+    with open(tmp_path, 'wb') as fp:
+      json.dump(state, fp, separators=(',', ':'))
+    # A rename is atomic, so a concurrent or crashed writer never leaves a partial index behind.
+    os.rename(tmp_path, self._index_path)
+
+  def _read_journal(self):
+    try:
+      with open(self._journal_path, 'rb') as fp:
+        lines = fp.readlines()
+    except IOError as e:
+      if e.errno == errno.ENOENT:
+        return []
+      raise
+    records = []
+    for line in lines:
+      try:
+        records.append(json.loads(line.decode('utf-8')))
+      except ValueError:
+        # A torn final record from a crashed writer.
+        continue
+    return records
+
+  def _fold_access_log(self, state):
+    # Move the log aside before reading it, so that appends racing with the fold land in a fresh
+    # log rather than being truncated away.
+    folding_path = '{}.{}'.format(self._access_log_path, uuid.uuid4().hex)
+    try:
+      os.rename(self._access_log_path, folding_path)
+    except OSError as e:
+      if e.errno == errno.ENOENT:
+        return
+      raise
+    try:
+      entries = state['entries']
+      with open(folding_path, 'rb') as fp:
+        for line in fp:
+          try:
+            timestamp, entry = line.decode('utf-8').rstrip('\n').split('\t', 1)
+            timestamp = float(timestamp)
+          except ValueError:
+            continue
+          if entry in entries and entries[entry] < timestamp:
+            entries[entry] = timestamp
+    finally:
+      safe_delete(folding_path)
+
+
+class ContentAddressedLocalArtifactCache(BaseLocalArtifactCache):
+  """A local artifact cache that stores deduplicated file contents by digest.
+
+  Rather than one tarball per cache key, each key is represented by a small json manifest listing
+  the files (by content digest), directories and symlinks of the artifact. File contents live once
+  in a shared blob store, so identical outputs of many targets (or many tasks, or many versions of
+  one target) are only stored once.
+
+  Hits are restored by copying blobs into place rather than hardlinking them: tasks may modify
+  their results in place (for example, incremental compiles), and must neither fail on read-only
+  files nor write through a link into a blob that other entries share. Blobs themselves are kept
+  read-only.
+
+  The total size of the blob store is bounded by `max_bytes`: whenever inserts are folded into the
+  index and the store is over budget, the least recently used manifests are evicted and blobs that
+  are no longer referenced by any manifest are deleted. Between folds, the store may temporarily
+  exceed its budget by the size of the journaled inserts.
+  """
+
+  def __init__(self, artifact_root, cache_root, compression, namespace=None, max_bytes=None,
+               max_entries_per_target=None, permissions=None, dereference=True, streaming=False,
+               codec=None):
+    """
+    :param str artifact_root: The path under which cacheable products will be read/written.
+    :param str cache_root: The root of the store. Unlike the tarball cache, this root may be
+      shared between many tasks, which deduplicate their outputs against one another.
+    :param int compression: The compression level for tarballs created for remote caches.
+    :param str namespace: A name to isolate the keys of this cache from other users of the store
+      (typically the task fingerprint).
+    :param int max_bytes: The maximum total size of the blobs in the store, or a false-y value for
+      no limit.
+    :param int max_entries_per_target: The maximum number of old entries to keep per cache key id.
+    :param str permissions: File permissions to use when creating tarballs, in octal.
+    :param bool dereference: Dereference symlinks when collecting artifacts.
+    :param bool streaming: Extract remote artifacts while they are being received.
+    :param ArtifactCodec codec: The compression codec for tarballs created for remote caches.
+    """
+    super(ContentAddressedLocalArtifactCache, self).__init__(
+      artifact_root,
+      compression,
+      permissions=int(permissions.strip(), base=8) if permissions else None,
+      dereference=dereference,
+      streaming=streaming,
+      codec=codec
+    )
+    self._store_root = os.path.realpath(os.path.expanduser(cache_root))
+    self._namespace = namespace
+    self._max_bytes = max_bytes
+    self._max_entries_per_target = max_entries_per_target
+
+    self._blobs_dir = os.path.join(self._store_root, 'blobs')
+    self._manifests_dir = os.path.join(self._store_root, 'manifests')
+    self._cache_root = os.path.join(self._store_root, 'tmp')
+    safe_mkdir(self._blobs_dir)
+    safe_mkdir(self._manifests_dir)
+    safe_mkdir(self._cache_root)
+
+    self._index = ContentAddressedIndex(self._store_root)
+
+  def has(self, cache_key):
+    return os.path.isfile(self._manifest_path(self._entry_for_key(cache_key)))
+
+  def use_cached_files(self, cache_key, results_dir=None):
+    entry = self._entry_for_key(cache_key)
+    manifest_path = self._manifest_path(entry)
+    try:
+      manifest = self._read_manifest(manifest_path)
+      if manifest is None:
+        return False
+      if results_dir is not None:
+        safe_rmtree(results_dir)
+      self._materialize(manifest)
+      self._index.record_access(entry)
+      return True
+    except Exception as e:
+      logger.warn('Error while reading {0} from local artifact cache: {1}'.format(manifest_path, e))
+      if results_dir is not None:
+        safe_mkdir(results_dir, clean=True)
+      self.delete(cache_key)
+      return UnreadableArtifact(cache_key, e)
+
+  def try_insert(self, cache_key, paths):
+    self._ingest(cache_key, paths)
+
+  @contextmanager
+  def insert_paths(self, cache_key, paths):
+    """Store the paths, and yield the path to an equivalent (temporary) artifact tarball.
+
+    The tarball is only created for consumers (such as a remote cache) that need to transfer it.
+    """
+    with self._tmpfile(cache_key, 'write') as tmp:
+      self._artifact(tmp.name).collect(paths)
+      self._ingest(cache_key, paths)
+      yield tmp.name
+
+  def store_and_use_tarball(self, cache_key, tarball, results_dir=None):
+    try:
+      artifact = self._artifact(tarball)
+
+      if results_dir is not None:
+        safe_mkdir(results_dir, clean=True)
+
+      try:
+        artifact.extract()
+      except Exception:
+        if results_dir is not None:
+          safe_mkdir(results_dir, clean=True)
+        raise
+    finally:
+      safe_delete(tarball)
+
+    self._store_extracted_artifact(cache_key, artifact, tarball)
+    return True
+
+  @property
+  def _stores_streamed_tarballs(self):
+    # Streamed artifacts are ingested from their extracted files.
+    return False
+
+  def _store_extracted_artifact(self, cache_key, artifact, tarball):
+    # The artifact was successfully used: failing to backfill the store is not fatal.
+    try:
+      self._ingest(cache_key, list(artifact.get_paths()))
+    except Exception as e:
+      logger.warn('Failed to store {} in the local artifact cache: {}'.format(cache_key, e))
+
+  def delete(self, cache_key):
+    entry = self._entry_for_key(cache_key)
+    with self._mutate() as state:
+      self._remove_entry(state, entry)
+
+  def prune(self, root=None):
+    """Evict least recently used entries until the store fits within its byte budget."""
+    with self._mutate() as state:
+      self._evict(state)
+
+  def _mutate(self):
+    return self._index.mutate(self._apply_insert)
+
+  def _apply_insert(self, state, record):
+    blobs = state['blobs']
+    for blob, size in record['blobs'].items():
+      blobs.setdefault(blob, [size, 0])[1] += 1
+    # Overwriting an existing entry releases the blobs it referenced (after the new references
+    # have been taken, so that blobs shared by the old and new manifests survive).
+    entries = state['entries']
+    entry = record['entry']
+    if entry in entries:
+      self._release_blobs(state, record['released'])
+    entries[entry] = record['time']
+
+  def _entry_for_key(self, cache_key):
+    # Note: it's important to use the id as well as the hash, because two different targets
+    # may have the same hash if both have no sources, but we may still want to differentiate them.
+    parts = [cache_key.id, cache_key.hash]
+    if self._namespace:
+      parts.insert(0, self._namespace)
+    return '/'.join(parts)
+
+  def _manifest_path(self, entry):
+    return os.path.join(self._manifests_dir, entry) + '.json'
+
+  def _blob_path(self, blob):
+    return os.path.join(self._blobs_dir, blob[:2], blob)
+
+  @staticmethod
+  def _read_manifest(manifest_path):
+    try:
+      with open(manifest_path, 'rb') as fp:
+        return json.load(fp)
+    except IOError as e:
+      if e.errno == errno.ENOENT:
+        return None
+      raise
+
+  def _materialize(self, manifest):
+    for relpath in manifest['dirs']:
+      safe_mkdir(os.path.join(self.artifact_root, relpath))
+    for relpath, target in manifest['links']:
+      path = os.path.join(self.artifact_root, relpath)
+      safe_mkdir_for(path)
+      self._unlink_existing(path)
+      os.symlink(target, path)
+    for relpath, blob in manifest['files']:
+      path = os.path.join(self.artifact_root, relpath)
+      safe_mkdir_for(path)
+      self._unlink_existing(path)
+      shutil.copyfile(self._blob_path(blob), path)
+      os.chmod(path, 0o755 if self._is_executable_blob(blob) else 0o644)
+
+  @staticmethod
+  def _unlink_existing(path):
+    if os.path.isdir(path) and not os.path.islink(path):
+      safe_rmtree(path)
+    else:
+      safe_delete(path)
+
+  def _ingest(self, cache_key, paths):
+    """Store the blobs for the given paths, then atomically publish a manifest for cache_key."""
+    files = {}
+    dirs = set()
+    links = {}
+    blob_sources = {}
+
+    def add_file(path):
+      relpath = os.path.relpath(path, self.artifact_root)
+      if relpath in files:
+        return
+      blob = self._store_blob(path)
+      files[relpath] = blob
+      blob_sources[blob] = path
+
+    for path in paths or ():
+      if os.path.islink(path) and not self._dereference:
+        links[os.path.relpath(path, self.artifact_root)] = os.readlink(path)
+      elif os.path.isdir(path):
+        dirs.add(os.path.relpath(path, self.artifact_root))
+        for root, dirnames, filenames in os.walk(path, followlinks=self._dereference):
+          for name in dirnames + filenames:
+            child = os.path.join(root, name)
+            relpath = os.path.relpath(child, self.artifact_root)
+            if os.path.islink(child) and not self._dereference:
+              links[relpath] = os.readlink(child)
+            elif name in dirnames:
+              dirs.add(relpath)
+            else:
+              add_file(child)
+      else:
+        add_file(path)
+
+    manifest = {
+      'dirs': sorted(dirs),
+      'links': sorted(links.items()),
+      'files': sorted(files.items()),
+    }
+    entry = self._entry_for_key(cache_key)
+    manifest_path = self._manifest_path(entry)
+
+    with self._index.locked():
+      blob_sizes = {}
+      for blob, path in blob_sources.items():
+        # Blobs are stored outside of the lock: re-store any that a concurrent eviction removed.
+        if not os.path.isfile(self._blob_path(blob)):
+          self._store_blob(path)
+        blob_sizes[blob] = os.path.getsize(self._blob_path(blob))
+
+      released_blobs = self._manifest_blobs(manifest_path)
+      safe_mkdir_for(manifest_path)
+      tmp_path = '{}.tmp.{}'.format(manifest_path, uuid.uuid4().hex)
+      with open(tmp_path, 'wb') as fp:
+        json.dump(manifest, fp, separators=(',', ':'))
+      os.rename(tmp_path, manifest_path)
+      fold = self._index.journal_insert(entry, blob_sizes, released_blobs)
+
+    if fold:
+      with self._mutate() as state:
+        self._evict(state, keep=entry)
+
+  def _store_blob(self, path):
+    """Store the content of the file at path if it is not already stored, and return its name.
+
+    Blobs are named by their content digest, plus an `x` suffix for executable files, so that files
+    restored from them get the right mode.
+    """
+    mode = os.stat(path).st_mode
+    executable = bool(mode & stat.S_IXUSR)
+    blob = hash_file(path) + ('x' if executable else '')
+    blob_path = self._blob_path(blob)
+    if not os.path.isfile(blob_path):
+      safe_mkdir_for(blob_path)
+      tmp_path = '{}.tmp.{}'.format(blob_path, uuid.uuid4().hex)
+      shutil.copyfile(path, tmp_path)
+      os.chmod(tmp_path, 0o555 if executable else 0o444)
+      # Concurrent writers of the same blob write identical content, so the last rename wins.
+      os.rename(tmp_path, blob_path)
+    return blob
+
+  @staticmethod
+  def _is_executable_blob(blob):
+    return blob.endswith('x')
+
+  def _manifest_blobs(self, manifest_path):
+    """Returns the distinct blobs referenced by the given manifest, if it exists and is readable."""
+    try:
+      manifest = self._read_manifest(manifest_path)
+    except ValueError:
+      manifest = None
+    if manifest is None:
+      return []
+    return sorted(set(blob for _, blob in manifest['files']))
+
+  def _remove_entry(self, state, entry):
+    """Remove the given entry from the store, deleting any blobs that are no longer referenced.
+
+    :returns: The number of bytes freed.
+    """
+    manifest_path = self._manifest_path(entry)
+    state['entries'].pop(entry, None)
+    blobs = self._manifest_blobs(manifest_path)
+    safe_delete(manifest_path)
+    return self._release_blobs(state, blobs)
+
+  def _release_blobs(self, state, released):
+    """Release a reference to each of the given blobs, deleting those no longer referenced.
+
+    :returns: The number of bytes freed.
+    """
+    freed = 0
+    blobs = state['blobs']
+    for blob in released:
+      record = blobs.get(blob)
+      if record is None:
+        continue
+      record[1] -= 1
+      if record[1] <= 0:
+        del blobs[blob]
+        safe_delete(self._blob_path(blob))
+        freed += record[0]
+    return freed
+
+  def _evict(self, state, keep=None):
+    entries = state['entries']
+    by_age = sorted(entries.items(), key=lambda item: item[1])
+
+    if self._max_entries_per_target:
+      # Entries are `[namespace/]id/hash`: group them by everything but the hash.
+      per_target = {}
+      for entry, _ in reversed(by_age):
+        per_target.setdefault(entry.rsplit('/', 1)[0], []).append(entry)
+      for target_entries in per_target.values():
+        for entry in target_entries[self._max_entries_per_target:]:
+          if entry != keep:
+            self._remove_entry(state, entry)
+      by_age = [(entry, atime) for entry, atime in by_age if entry in entries]
+
+    if not self._max_bytes:
+      return
+    total_bytes = sum(size for size, _ in state['blobs'].values())
+    evicted = 0
+    for entry, _ in by_age:
+      if total_bytes <= self._max_bytes:
+        break
+      if entry == keep:
+        continue
+      total_bytes -= self._remove_entry(state, entry)
+      evicted += 1
+    if evicted:
+      logger.debug('Evicted {} entries from the local artifact cache at {}.'
+                   .format(evicted, self._store_root))
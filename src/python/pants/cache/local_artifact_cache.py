@@ -11,6 +11,7 @@ from contextlib import contextmanager
 
 from pants.cache.artifact import TarballArtifact
 from pants.cache.artifact_cache import ArtifactCache, UnreadableArtifact
+from pants.util.chunk_buffer import ChunkBuffer
 from pants.util.contextutil import temporary_file
 from pants.util.dirutil import (safe_delete, safe_mkdir, safe_mkdir_for,
                                 safe_rm_oldest_items_in_dir, safe_rmtree)
@@ -19,24 +20,65 @@ from pants.util.dirutil import (safe_delete, safe_mkdir, safe_mkdir_for,
 logger = logging.getLogger(__name__)
 
 
+class _TeeReader(object):
+  """A file-like reader over an iterator of chunks, which copies each chunk to a file as it is read.
+  """
+
+  def __init__(self, src, tee):
+    """
+    :param src: Iterator over binary data.
+    :param tee: A writable file to copy all data read from `src` to, or None.
+    """
+    self._src = iter(src)
+    self._tee = tee
+    self._buffer = ChunkBuffer()
+
+  def _next_chunk(self):
+    chunk = next(self._src, b'')
+    if chunk and self._tee is not None:
+      self._tee.write(chunk)
+    return chunk
+
+  def read(self, size=-1):
+    while size < 0 or len(self._buffer) < size:
+      chunk = self._next_chunk()
+      if not chunk:
+        break
+      self._buffer.append(chunk)
+    return self._buffer.read(size)
+
+  def drain(self):
+    """Consume (and so copy) the remainder of the source."""
+    while self._next_chunk():
+      pass
+
+
 class BaseLocalArtifactCache(ArtifactCache):
 
-  def __init__(self, artifact_root, compression, permissions=None, dereference=True):
+  def __init__(self, artifact_root, compression, permissions=None, dereference=True,
+               streaming=False, codec=None):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     :param int compression: The gzip compression level for created artifacts.
                             Valid values are 0-9.
     :param str permissions: File permissions to use when creating artifact files.
     :param bool dereference: Dereference symlinks when creating the cache tarball.
+    :param bool streaming: Extract artifacts passed to `store_and_use_artifact` while they are
+                           being received, rather than after they have been stored.
+    :param ArtifactCodec codec: The compression codec for created artifacts (defaults to gzip).
+                                Artifacts created with any codec can be read.
     """
     super(BaseLocalArtifactCache, self).__init__(artifact_root)
     self._compression = compression
     self._cache_root = None
     self._permissions = permissions
     self._dereference = dereference
+    self._streaming = streaming
+    self._codec = codec
 
   def _artifact(self, path):
-    return TarballArtifact(self.artifact_root, path, self._compression, dereference=self._dereference)
+    return TarballArtifact(self.artifact_root, path, self._compression, dereference=self._dereference,
+                           codec=self._codec)
 
   @contextmanager
   def _tmpfile(self, cache_key, use):
@@ -60,11 +102,77 @@ class BaseLocalArtifactCache(ArtifactCache):
     :param str results_dir: The path to the expected destination of the artifact extraction: will
       be cleared both before extraction, and after a failure to extract.
     """
+    if self._streaming:
+      return self._stream_and_use_artifact(cache_key, src, results_dir)
+
+    with self._tmpfile(cache_key, 'read') as tmp:
+      for chunk in src:
+        tmp.write(chunk)
+      tmp.close()
+      return self.store_and_use_tarball(cache_key, tmp.name, results_dir)
+
+  def _stream_and_use_artifact(self, cache_key, src, results_dir=None):
+    """Extract the artifact from the given `src` iterator as it arrives, while also storing it.
+
+    Unlike `store_and_use_tarball`, the artifact is never read back from disk. Extraction is staged,
+    so a failure part way through the stream leaves neither a partially extracted results_dir, nor
+    a partially stored artifact, behind.
+    """
+    with self._tmpfile(cache_key, 'read') as tmp:
+      reader = _TeeReader(src, tmp if self._stores_streamed_tarballs else None)
+      artifact = self._artifact(tmp.name)
+      try:
+        artifact.extract_stream(reader, results_dir=results_dir)
+        # The tar stream may end before the source does (eg, compression trailers or padding).
+        reader.drain()
+      except Exception:
+        if results_dir is not None:
+          safe_mkdir(results_dir, clean=True)
+        raise
+      tmp.close()
+      self._store_extracted_artifact(cache_key, artifact, tmp.name)
+      return True
+
+  @property
+  def _stores_streamed_tarballs(self):
+    """Whether `_stream_and_use_artifact` should write the received tarball to disk."""
+    return True
+
+  def _store_extracted_artifact(self, cache_key, artifact, tarball):
+    """Store an artifact that has already been extracted from the given tarball."""
+    self._store_tarball(cache_key, tarball)
+
+  def spool_artifact(self, cache_key, src):
+    """Write the given `src` iterator to a new temporary tarball for the given cache_key.
+
+    The tarball is allocated on the same device as the cache, and ownership of it passes to the
+    caller: it should be handed to `store_and_use_tarball`, or deleted.
+
+    :param cache_key: Cache key for the artifact.
+    :param src: Iterator over binary data to store for the artifact.
+    :returns: The path of the spooled tarball.
+    """
     with self._tmpfile(cache_key, 'read') as tmp:
       for chunk in src:
         tmp.write(chunk)
       tmp.close()
-      tarball = self._store_tarball(cache_key, tmp.name)
+      # Move the completed tarball out from under the tempfile, which is deleted on exit.
+      spooled = '{}.spooled'.format(tmp.name)
+      os.rename(tmp.name, spooled)
+      return spooled
+
+  def store_and_use_tarball(self, cache_key, tarball, results_dir=None):
+    """Store and then extract the artifact tarball at the given path for the given cache_key.
+
+    The tarball is consumed: it is either moved into the cache, or deleted.
+
+    :param cache_key: Cache key for the artifact.
+    :param str tarball: The path of an artifact tarball, on the same device as the cache.
+    :param str results_dir: The path to the expected destination of the artifact extraction: will
+      be cleared both before extraction, and after a failure to extract.
+    """
+    try:
+      tarball = self._store_tarball(cache_key, tarball)
       artifact = self._artifact(tarball)
 
       # NOTE(mateo): The two clean=True args passed in this method are likely safe, since the cache will by
@@ -86,30 +194,40 @@ class BaseLocalArtifactCache(ArtifactCache):
         raise
 
       return True
+    finally:
+      self._release_tarball(tarball)
 
   def _store_tarball(self, cache_key, src):
     """Given a src path to an artifact tarball, store it and return stored artifact's path."""
     pass
 
+  def _release_tarball(self, tarball):
+    """Called with the path of a tarball returned by `_store_tarball` once it has been used."""
+    pass
+
 
 class LocalArtifactCache(BaseLocalArtifactCache):
   """An artifact cache that stores the artifacts in local files."""
 
   def __init__(self, artifact_root, cache_root, compression, max_entries_per_target=None,
-               permissions=None, dereference=True):
+               permissions=None, dereference=True, streaming=False, codec=None):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
     :param str cache_root: The locally cached files are stored under this directory.
-    :param int compression: The gzip compression level for created artifacts (1-9 or false-y).
+    :param int compression: The compression level for created artifacts (1-9 or false-y).
     :param int max_entries_per_target: The maximum number of old cache files to leave behind on a cache miss.
     :param str permissions: File permissions to use when creating artifact files.
     :param bool dereference: Dereference symlinks when creating the cache tarball.
+    :param bool streaming: Extract remote artifacts while they are being received.
+    :param ArtifactCodec codec: The compression codec for created artifacts.
     """
     super(LocalArtifactCache, self).__init__(
       artifact_root,
       compression,
       permissions=int(permissions.strip(), base=8) if permissions else None,
-      dereference=dereference
+      dereference=dereference,
+      streaming=streaming,
+      codec=codec
     )
     self._cache_root = os.path.realpath(os.path.expanduser(cache_root))
     self._max_entries_per_target = max_entries_per_target
@@ -180,16 +298,30 @@ class TempLocalArtifactCache(BaseLocalArtifactCache):
   actually stores files between calls, but is useful for handling file IO for a remote cache.
   """
 
-  def __init__(self, artifact_root, compression, permissions=None):
+  def __init__(self, artifact_root, compression, permissions=None, streaming=False, codec=None):
     """
     :param str artifact_root: The path under which cacheable products will be read/written.
+    :param bool streaming: Extract remote artifacts while they are being received.
+    :param ArtifactCodec codec: The compression codec for created artifacts.
     """
     super(TempLocalArtifactCache, self).__init__(artifact_root, compression=compression,
-                                                 permissions=permissions)
+                                                 permissions=permissions, streaming=streaming,
+                                                 codec=codec)
 
   def _store_tarball(self, cache_key, src):
     return src
 
+  @property
+  def _stores_streamed_tarballs(self):
+    return False
+
+  def _store_extracted_artifact(self, cache_key, artifact, tarball):
+    pass
+
+  def _release_tarball(self, tarball):
+    # Nothing is stored between calls.
+    safe_delete(tarball)
+
   def has(self, cache_key):
     return False
 
@@ -0,0 +1,137 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pants.cache.artifact_cache import NonfatalArtifactCacheError
+
+
+logger = logging.getLogger(__name__)
+
+
+class PipelinedArtifactCacheReader(object):
+  """Reads many artifacts from an ArtifactCache, overlapping the stages of each read.
+
+  Reads happen in three stages:
+  1. probe: the existence of every key is checked (concurrently) before any artifact is fetched,
+     so that misses cost a single round trip.
+  2. fetch: artifacts that exist are fetched (ie, downloaded and spooled to local storage) with
+     `io_concurrency` requests in flight at once.
+  3. extract: as soon as each artifact has been fetched it is handed to a separate pool of
+     `extract_concurrency` threads to be stored and extracted, while other fetches continue.
+
+  Since the stages are IO bound (or bound by compression libraries that release the GIL), they
+  run on threads rather than processes, which also allows a single cache instance (and its
+  connection pool) to be shared by all requests.
+  """
+
+  PROBE = 'probe'
+  FETCH = 'fetch'
+  EXTRACT = 'extract'
+
+  def __init__(self, cache, io_concurrency, extract_concurrency):
+    """
+    :param ArtifactCache cache: The cache to read from.
+    :param int io_concurrency: The maximum number of concurrent probes and fetches.
+    :param int extract_concurrency: The maximum number of concurrent extractions.
+    """
+    self._cache = cache
+    self._io_concurrency = max(1, io_concurrency)
+    self._extract_concurrency = max(1, extract_concurrency)
+
+  def read(self, items, stats=None, cache_name=None):
+    """Read the artifacts for the given items.
+
+    :param items: A list of (cache_key, results_dir) pairs, as for
+      `ArtifactCache.use_cached_files`.
+    :param ArtifactCacheStats stats: If specified, per-stage stats are recorded here.
+    :param string cache_name: The name to record stats under.
+    :returns: A list of results in the order of the given items, as returned by
+      `ArtifactCache.use_cached_files`.
+    """
+    if not items:
+      return []
+
+    stage_stats = []
+    results = [False] * len(items)
+    transport_stats_before = self._cache.transport_stats()
+    with ThreadPoolExecutor(max_workers=self._io_concurrency) as io_pool, \
+         ThreadPoolExecutor(max_workers=self._extract_concurrency) as extract_pool:
+      probes = list(io_pool.map(self._probe, [cache_key for cache_key, _ in items]))
+
+      fetches = []
+      for index, ((cache_key, results_dir), (present, elapsed)) in enumerate(zip(items, probes)):
+        stage_stats.append((self.PROBE, bool(present), 0, elapsed))
+        if present:
+          fetch = io_pool.submit(self._fetch_then_extract, extract_pool, cache_key, results_dir)
+          fetches.append((index, fetch))
+        else:
+          results[index] = present
+
+      # Each fetch resolves to the future of its extraction, which was submitted as soon as the
+      # fetch completed: wait for the fetches, and then for the extractions.
+      extractions = []
+      for index, fetch in fetches:
+        fetched, num_bytes, elapsed, extraction = fetch.result()
+        stage_stats.append((self.FETCH, bool(fetched), num_bytes, elapsed))
+        if extraction is None:
+          results[index] = fetched
+        else:
+          extractions.append((index, extraction))
+
+      for index, extraction in extractions:
+        result, elapsed = extraction.result()
+        stage_stats.append((self.EXTRACT, bool(result), 0, elapsed))
+        results[index] = result
+
+    if stats is not None:
+      for stage, hit, num_bytes, elapsed in stage_stats:
+        stats.add_stage_stat(cache_name, stage, hit, num_bytes, elapsed)
+      if transport_stats_before is not None:
+        transport_stats_after = self._cache.transport_stats()
+        stats.add_connection_stats(
+          cache_name,
+          transport_stats_after['requests'] - transport_stats_before['requests'],
+          transport_stats_after['connections'] - transport_stats_before['connections'])
+    return results
+
+  def _probe(self, cache_key):
+    start = time.time()
+    try:
+      present = self._cache.has(cache_key)
+    except NonfatalArtifactCacheError as e:
+      logger.warn('Error probing artifact cache for {0}: {1}'.format(cache_key, e))
+      present = False
+    return present, time.time() - start
+
+  def _fetch_then_extract(self, extract_pool, cache_key, results_dir):
+    start = time.time()
+    try:
+      fetched = self._cache.fetch(cache_key)
+    except NonfatalArtifactCacheError as e:
+      logger.warn('Error fetching {0} from artifact cache: {1}'.format(cache_key, e))
+      fetched = False
+    elapsed = time.time() - start
+    if not fetched:
+      return fetched, 0, elapsed, None
+
+    num_bytes = self._cache.fetched_size(fetched)
+    extraction = extract_pool.submit(self._extract, cache_key, fetched, results_dir)
+    return fetched, num_bytes, elapsed, extraction
+
+  def _extract(self, cache_key, fetched, results_dir):
+    start = time.time()
+    try:
+      result = self._cache.use_fetched(cache_key, fetched, results_dir)
+    except NonfatalArtifactCacheError as e:
+      logger.warn('Error using {0} from artifact cache: {1}'.format(cache_key, e))
+      self._cache.discard_fetched(fetched)
+      result = False
+    return result, time.time() - start
@@ -7,13 +7,18 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import logging
 import multiprocessing
+import os
 import Queue
+import random
 import threading
+import time
 
 import requests
 from requests import RequestException
+from requests.adapters import HTTPAdapter
 
 from pants.cache.artifact_cache import ArtifactCache, NonfatalArtifactCacheError, UnreadableArtifact
+from pants.util.dirutil import safe_delete
 
 
 logger = logging.getLogger(__name__)
@@ -24,27 +29,81 @@ logging.getLogger('requests').setLevel(logging.WARNING)
 
 
 class RequestsSession(object):
+  """A process-global `requests.Session`, with connection pools sized for concurrent use.
+
+  The default `requests` pools keep at most 10 connections per host alive, so with more
+  concurrent requests than that, connections are discarded after use and every subsequent
+  request pays for TCP (and TLS) setup again. The pool created here keeps up to
+  `max_connections_per_host` connections alive, and blocks (rather than opening more) when they
+  are all in use.
+  """
+
+  # The default number of per-host connections, used if none is specified on first use.
+  DEFAULT_MAX_CONNECTIONS_PER_HOST = 10
+
   _session = None
+  _lock = threading.Lock()
 
   @classmethod
-  def instance(cls):
+  def instance(cls, max_connections_per_host=None):
+    """Returns the session, creating it on first use.
+
+    :param int max_connections_per_host: The size of the per-host connection pools. Only the value
+      passed when the session is first created is used.
+    """
     if cls._session is None:
-      cls._session = requests.Session()
+      with cls._lock:
+        if cls._session is None:
+          pool_size = max_connections_per_host or cls.DEFAULT_MAX_CONNECTIONS_PER_HOST
+          session = requests.Session()
+          adapter = HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+          session.mount('http://', adapter)
+          session.mount('https://', adapter)
+          cls._session = session
     return cls._session
 
+  @classmethod
+  def connection_stats(cls):
+    """Returns a dict of the number of requests sent, and connections opened, by the session.
+
+    The difference is the number of requests that reused a kept-alive connection.
+    """
+    num_requests = 0
+    num_connections = 0
+    if cls._session is not None:
+      for adapter in set(cls._session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+          pool = pools.get(key)
+          if pool is not None:
+            num_requests += pool.num_requests
+            num_connections += pool.num_connections
+    return {'requests': num_requests, 'connections': num_connections}
+
 
 class RESTfulArtifactCache(ArtifactCache):
   """An artifact cache that stores the artifacts on a RESTful service."""
 
   READ_SIZE_BYTES = 4 * 1024 * 1024
 
-  def __init__(self, artifact_root, best_url_selector, local, read_timeout=4.0, write_timeout=4.0):
+  # Methods that are safe to retry, because they do not modify the remote cache.
+  IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD'])
+
+  # Server errors that indicate that a retry might succeed.
+  RETRYABLE_STATUS_CODES = frozenset([500, 502, 503, 504])
+
+  def __init__(self, artifact_root, best_url_selector, local, read_timeout=4.0, write_timeout=4.0,
+               max_connections_per_host=None, max_retries=0, retry_backoff=0.1):
     """
     :param string artifact_root: The path under which cacheable products will be read/written.
     :param BestUrlSelector best_url_selector: Url selector that supports fail-over. Each returned
       url represents prefix for some RESTful service. We must be able to PUT and GET to any path
       under this base.
     :param BaseLocalArtifactCache local: local cache instance for storing and creating artifacts
+    :param int max_connections_per_host: The number of connections to keep alive to each host.
+    :param int max_retries: The number of times to retry a failed GET or HEAD request.
+    :param float retry_backoff: The base delay in seconds before a retry, which is doubled for each
+      subsequent retry, and jittered.
     """
     super(RESTfulArtifactCache, self).__init__(artifact_root)
 
@@ -52,6 +111,9 @@ class RESTfulArtifactCache(ArtifactCache):
     self._read_timeout_secs = read_timeout
     self._write_timeout_secs = write_timeout
     self._localcache = local
+    self._max_connections_per_host = max_connections_per_host
+    self._max_retries = max_retries
+    self._retry_backoff_secs = retry_backoff
 
   def try_insert(self, cache_key, paths):
     # Delegate creation of artifact to local cache.
@@ -83,8 +145,11 @@ class RESTfulArtifactCache(ArtifactCache):
           )
         ).start()
         # Delegate storage and extraction to local cache
-        byte_iter = response.iter_content(self.READ_SIZE_BYTES)
-        res = self._localcache.store_and_use_artifact(cache_key, byte_iter, results_dir)
+        try:
+          byte_iter = response.iter_content(self.READ_SIZE_BYTES)
+          res = self._localcache.store_and_use_artifact(cache_key, byte_iter, results_dir)
+        finally:
+          response.close()
         queue.put(None)
         return res
     except Exception as e:
@@ -95,14 +160,74 @@ class RESTfulArtifactCache(ArtifactCache):
 
     return False
 
+  def fetch(self, cache_key):
+    """Download the artifact for the given key to a spooled tarball in the local cache.
+
+    :returns: `True` if the local cache already has the artifact, the path of the spooled tarball
+      if it was downloaded, or a False-y value for a miss.
+    """
+    if self._localcache.has(cache_key):
+      return True
+
+    try:
+      response = self._request('GET', cache_key)
+      if response is None:
+        return False
+      try:
+        byte_iter = response.iter_content(self.READ_SIZE_BYTES)
+        return self._localcache.spool_artifact(cache_key, byte_iter)
+      finally:
+        response.close()
+    except Exception as e:
+      logger.warn('\nError while reading from remote artifact cache: {0}\n'.format(e))
+      return UnreadableArtifact(cache_key, e)
+
+  def fetched_size(self, fetched):
+    return 0 if fetched is True else os.path.getsize(fetched)
+
+  def use_fetched(self, cache_key, fetched, results_dir=None):
+    if fetched is True:
+      return self._localcache.use_cached_files(cache_key, results_dir)
+    try:
+      return self._localcache.store_and_use_tarball(cache_key, fetched, results_dir)
+    except Exception as e:
+      logger.warn('\nError while reading from remote artifact cache: {0}\n'.format(e))
+      return UnreadableArtifact(cache_key, e)
+
+  def discard_fetched(self, fetched):
+    if fetched is not True:
+      safe_delete(fetched)
+
   def delete(self, cache_key):
     self._localcache.delete(cache_key)
     self._request('DELETE', cache_key)
 
+  def transport_stats(self):
+    return RequestsSession.connection_stats()
+
   # Returns a response if we get a 200, None if we get a 404 and raises an exception otherwise.
   def _request(self, method, cache_key, body=None):
+    retries = self._max_retries if method in self.IDEMPOTENT_METHODS else 0
+    attempt = 0
+    while True:
+      try:
+        return self._request_once(method, cache_key, body=body)
+      except _RetryableError as e:
+        if attempt >= retries:
+          raise
+        delay = self._retry_delay(attempt)
+        logger.debug('Retrying {0} of {1} in {2:.3f} seconds: {3}'
+                     .format(method, cache_key, delay, e))
+        time.sleep(delay)
+        attempt += 1
 
-    session = RequestsSession.instance()
+  def _retry_delay(self, attempt):
+    # "Full jitter": a uniformly random delay up to the exponential backoff, which spreads the
+    # retries of many concurrent clients rather than synchronizing them.
+    return random.uniform(0, self._retry_backoff_secs * (2 ** attempt))
+
+  def _request_once(self, method, cache_key, body=None):
+    session = RequestsSession.instance(self._max_connections_per_host)
     with self.best_url_selector.select_best_url() as best_url:
       url = self._url_for_key(best_url, cache_key)
       logger.debug('Sending {0} request to {1}'.format(method, url))
@@ -118,18 +243,25 @@ class RESTfulArtifactCache(ArtifactCache):
         else:
           raise ValueError('Unknown request method {0}'.format(method))
       except RequestException as e:
-        raise NonfatalArtifactCacheError('Failed to {0} {1}. Error: {2}'
-                                         .format(method, url, e))
+        raise _RetryableError('Failed to {0} {1}. Error: {2}'.format(method, url, e))
       # Allow all 2XX responses. E.g., nginx returns 201 on PUT. HEAD may return 204.
       if int(response.status_code / 100) == 2:
         return response
-      elif response.status_code == 404:
+      # Error bodies are short: consume this one so that closing the response returns its
+      # keep-alive connection to the pool, rather than closing the connection.
+      try:
+        response.content
+      except RequestException:
+        pass
+      response.close()
+      if response.status_code == 404:
         logger.debug('404 returned for {0} request to {1}'.format(method, url))
         return None
       else:
-        raise NonfatalArtifactCacheError('Failed to {0} {1}. Error: {2} {3}'
-                                         .format(method, url,
-                                                 response.status_code, response.reason))
+        error_class = (_RetryableError if response.status_code in self.RETRYABLE_STATUS_CODES
+                       else NonfatalArtifactCacheError)
+        raise error_class('Failed to {0} {1}. Error: {2} {3}'
+                          .format(method, url, response.status_code, response.reason))
 
   def _url_suffix_for_key(self, cache_key):
     return '{0}/{1}.tgz'.format(cache_key.id, cache_key.hash)
@@ -140,6 +272,10 @@ class RESTfulArtifactCache(ArtifactCache):
     return '{0}://{1}{2}'.format(url.scheme, url.netloc, path)
 
 
+class _RetryableError(NonfatalArtifactCacheError):
+  """A request failure that might not recur if the (idempotent) request is retried."""
+
+
 def _log_if_no_response(timeout_seconds, message, getter):
   while True:
     try:
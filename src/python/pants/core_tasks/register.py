@@ -15,6 +15,7 @@ from pants.core_tasks.pantsd_kill import PantsDaemonKill
 from pants.core_tasks.reporting_server_kill import ReportingServerKill
 from pants.core_tasks.reporting_server_run import ReportingServerRun
 from pants.core_tasks.roots import ListRoots
+from pants.core_tasks.run_stats import RunStats
 from pants.core_tasks.run_prep_command import (RunBinaryPrepCommand, RunCompilePrepCommand,
                                                RunTestPrepCommand)
 from pants.core_tasks.substitute_aliased_targets import SubstituteAliasedTargets
@@ -68,6 +69,9 @@ def register_goals():
   task(name='server', action=ReportingServerRun, serialize=False).install()
   task(name='killserver', action=ReportingServerKill, serialize=False).install()
 
+  # Run stats.
+  task(name='run-stats', action=RunStats).install()
+
   # Getting help.
   task(name='goals', action=ListGoals).install()
   task(name='options', action=ExplainOptionsTask).install()
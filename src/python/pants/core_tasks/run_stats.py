@@ -0,0 +1,61 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import time
+
+from pants.base.exceptions import TaskError
+from pants.stats.statsdb import StatsDB, StatsDBError, StatsDBFactory
+from pants.task.console_task import ConsoleTask
+
+
+class RunStats(ConsoleTask):
+  """Show percentiles of the timings of goals in past runs, as recorded in the statsdb."""
+
+  @classmethod
+  def subsystem_dependencies(cls):
+    return super(RunStats, cls).subsystem_dependencies() + (StatsDBFactory,)
+
+  @classmethod
+  def register_options(cls, register):
+    super(RunStats, cls).register_options(register)
+    register('--goals', type=list,
+             help='Show timings for these goals. By default, timings for all goals are shown.')
+    register('--percentiles', type=list, member_type=int, default=[50, 95],
+             help='Show these percentiles of the timings of each goal.')
+    register('--period', choices=sorted(StatsDB.PERIODS), default='day',
+             help='Group the timings of runs by this period.')
+    register('--days', type=int, default=30,
+             help='Include runs from this many days ago onwards.')
+
+  def console_output(self, targets):
+    options = self.get_options()
+    for percentile in options.percentiles:
+      if not 0 < percentile <= 100:
+        raise TaskError('Percentiles must be in the range (0, 100], given: {}'.format(percentile))
+
+    since = int(time.time() - options.days * 24 * 60 * 60)
+    statsdb = StatsDBFactory.global_instance().get_db()
+    try:
+      rows = statsdb.get_goal_timing_percentiles(options.percentiles,
+                                                 goals=options.goals,
+                                                 since=since,
+                                                 period=options.period)
+    except StatsDBError as e:
+      raise TaskError(e)
+
+    if not rows:
+      yield 'No runs recorded in the last {} days.'.format(options.days)
+      return
+
+    goal_width = max(len(goal) for _, goal, _, _ in rows)
+    for period, goal, count, timings in rows:
+      yield '{}  {}  {:>6} runs  {}'.format(
+        period,
+        goal.ljust(goal_width),
+        count,
+        '  '.join('p{}={:.3f}s'.format(percentile, timing / 1000.0)
+                  for percentile, timing in zip(options.percentiles, timings)))
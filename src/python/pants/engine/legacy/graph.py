@@ -6,7 +6,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
-from collections import deque
+import os
+from collections import defaultdict, deque
 from contextlib import contextmanager
 
 from twitter.common.collections import OrderedSet
@@ -342,6 +343,54 @@ def hydrated_targets(build_file_addresses):
   yield HydratedTargets(targets)
 
 
+class OwnersIndex(datatype(['hydrated_targets', 'addresses_by_file'])):
+  """An index from each file to the addresses of the HydratedTargets that own it.
+
+  A target owns the BUILD file that declares it, and the files in its glob-expanded `source` and
+  `sources`, so for files that exist, ownership is a single lookup. Files that do not exist (eg:
+  deleted files) are in no expansion, and can only be matched against the filespecs of the
+  `hydrated_targets` themselves.
+  """
+
+  @classmethod
+  def create(cls, hydrated_targets):
+    addresses_by_file = defaultdict(OrderedSet)
+    for hydrated_target in hydrated_targets:
+      address = hydrated_target.adaptor.address
+      for path in cls.owned_files(hydrated_target):
+        addresses_by_file[path].add(address)
+    return cls(tuple(hydrated_targets), dict(addresses_by_file))
+
+  @staticmethod
+  def owned_files(hydrated_target):
+    """Yields the paths of the BUILD file and the (existing) source files of a HydratedTarget."""
+    adaptor = hydrated_target.adaptor
+    build_file = getattr(adaptor.address, 'rel_path', None)
+    if build_file:
+      yield build_file
+
+    target_kwargs = adaptor.kwargs()
+    # Targets like `python_binary` have a singular `source='main.py'` declaration.
+    target_source = target_kwargs.get('source')
+    if target_source:
+      yield os.path.join(adaptor.address.spec_path, target_source)
+
+    target_sources = target_kwargs.get('sources')
+    if isinstance(target_sources, EagerFilesetWithSpec):
+      for path in target_sources.files:
+        yield os.path.join(target_sources.rel_root, path)
+
+  def owners_of(self, path):
+    """Returns the addresses of the targets that own the existing file at the given path."""
+    return self.addresses_by_file.get(path, ())
+
+
+@rule(OwnersIndex, [Select(HydratedTargets)])
+def owners_index(hydrated_targets):
+  """Indexes the owners of the files of the given HydratedTargets."""
+  return OwnersIndex.create(hydrated_targets.dependencies)
+
+
 class HydratedField(datatype(['name', 'value'])):
   """A wrapper for a fully constructed replacement kwarg for a HydratedTarget."""
 
@@ -430,6 +479,7 @@ def create_legacy_graph_tasks(symbol_table):
     transitive_hydrated_targets,
     transitive_hydrated_target,
     hydrated_targets,
+    owners_index,
     TaskRule(
       HydratedTarget,
       [Select(symbol_table_constraint)],
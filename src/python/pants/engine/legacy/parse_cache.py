@@ -0,0 +1,141 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import cPickle as pickle
+import errno
+import hashlib
+import inspect
+import logging
+import os
+import threading
+
+from pants.engine.parser import Parser
+from pants.process.lock import merge_entries_file
+from pants.version import VERSION
+
+
+logger = logging.getLogger(__name__)
+
+
+def _qualified_name(obj):
+  type_ = obj if inspect.isclass(obj) else type(obj)
+  return '{}.{}'.format(type_.__module__, type_.__name__)
+
+
+def parser_fingerprint(build_file_aliases, build_file_imports_behavior):
+  """Returns a fingerprint of the configuration that BUILD files are parsed with.
+
+  :param build_file_aliases: The BuildFileAliases that BUILD files are parsed with.
+  :type build_file_aliases: :class:`pants.build_graph.build_file_aliases.BuildFileAliases`
+  :param string build_file_imports_behavior: How the parser treats import statements.
+  """
+  hasher = hashlib.sha1()
+  hasher.update(VERSION)
+  hasher.update(build_file_imports_behavior.encode('utf-8'))
+  for aliased in (build_file_aliases.target_types,
+                  build_file_aliases.target_macro_factories,
+                  build_file_aliases.objects,
+                  build_file_aliases.context_aware_object_factories):
+    hasher.update(b'\0')
+    for alias, obj in sorted(aliased.items()):
+      hasher.update(alias.encode('utf-8'))
+      hasher.update(_qualified_name(obj).encode('utf-8'))
+  return hasher.hexdigest()
+
+
+class CachingParser(Parser):
+  """A Parser that reuses the objects parsed from BUILD files by earlier runs.
+
+  The objects parsed from each BUILD file are pickled and persisted along with the digest of the
+  file's content, so a BUILD file whose content is unchanged since it was last parsed is unpickled
+  rather than re-evaluated. The objects of a BUILD file that cannot be pickled are not cached.
+
+  The cache must only be shared by parsers with the same configuration: see `parser_fingerprint`.
+  Like the product graph of the daemon, the cache assumes that parsing a BUILD file depends only on
+  its content, so BUILD files that read other files (eg: `python_requirements`) will not observe
+  changes to them until the BUILD file itself changes.
+
+  The cache is shared by concurrent processes: `save` merges the entries parsed by this process
+  into the current content of the cache file under a lock, and atomically replaces it.
+  """
+
+  def __init__(self, parser, path, build_root):
+    """
+    :param parser: The parser to parse BUILD files with when they are not cached.
+    :type parser: :class:`pants.engine.parser.Parser`
+    :param str path: The file to persist the cache in.
+    :param str build_root: The build root that BUILD file paths are relative to.
+    """
+    super(CachingParser, self).__init__()
+    self._parser = parser
+    self._path = path
+    self._build_root = build_root
+    self._lock = threading.Lock()
+    self._entries = None
+    self._dirty = {}
+    self.parsed = 0
+    self.reused = 0
+
+  def parse(self, filepath, filecontent):
+    digest = hashlib.sha1(filecontent).hexdigest()
+    entry = self._load().get(filepath)
+    if entry is not None and entry[0] == digest:
+      try:
+        objects = pickle.loads(entry[1])
+      except Exception as e:
+        # Eg: a type of a cached object has been removed or renamed.
+        logger.debug('Failed to load the cached objects of {}: {}'.format(filepath, e))
+      else:
+        with self._lock:
+          self.reused += 1
+        return objects
+
+    objects = self._parser.parse(filepath, filecontent)
+    try:
+      blob = pickle.dumps(objects, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+      logger.debug('Not caching the objects of {}, which cannot be pickled: {}'.format(filepath, e))
+      blob = None
+    with self._lock:
+      self.parsed += 1
+      if blob is not None:
+        self._entries[filepath] = self._dirty[filepath] = (digest, blob)
+    return objects
+
+  def save(self):
+    """Persist the entries parsed since the cache was loaded, if any.
+
+    Entries for BUILD files that no longer exist are dropped.
+    """
+    with self._lock:
+      dirty, self._dirty = self._dirty, {}
+    if dirty:
+      merge_entries_file(self._path, self._read, self._write, dirty,
+                         keep=lambda filepath: os.path.isfile(os.path.join(self._build_root,
+                                                                           filepath)))
+
+  @staticmethod
+  def _write(fp, entries):
+    pickle.dump(entries, fp, pickle.HIGHEST_PROTOCOL)
+
+  def _load(self):
+    if self._entries is None:
+      with self._lock:
+        if self._entries is None:
+          self._entries = self._read()
+    return self._entries
+
+  def _read(self):
+    try:
+      with open(self._path, 'rb') as fp:
+        return pickle.load(fp)
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    except Exception as e:
+      logger.debug('Ignoring the corrupt BUILD file parse cache at {}: {}'.format(self._path, e))
+    return {}
@@ -6,14 +6,16 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+from collections import defaultdict
 
-import six
+from twitter.common.collections import OrderedSet
 
+from pants.base.build_environment import get_buildroot
 from pants.base.specs import AscendantAddresses, SingleAddress, Specs
 from pants.build_graph.address import parse_spec
 from pants.build_graph.source_mapper import SourceMapper
 from pants.engine.legacy.address_mapper import LegacyAddressMapper
-from pants.engine.legacy.graph import HydratedTargets
+from pants.engine.legacy.graph import OwnersIndex
 from pants.source.filespec import any_matches_filespec
 
 
@@ -33,10 +35,15 @@ def resolve_and_parse_specs(*args, **kwargs):
 
 
 class EngineSourceMapper(SourceMapper):
-  """A v2 engine backed SourceMapper that supports pre-`BuildGraph` cache warming in the daemon."""
+  """A v2 engine backed SourceMapper that supports pre-`BuildGraph` cache warming in the daemon.
 
-  def __init__(self, scheduler):
+  Owners are found with an `OwnersIndex` per directory of the given sources, which the scheduler
+  memoizes (and the daemon keeps warm) until the BUILD files or sources that it covers change.
+  """
+
+  def __init__(self, scheduler, build_root=None):
     self._scheduler = scheduler
+    self._build_root = build_root or get_buildroot()
 
   def _unique_dirs_for_sources(self, sources):
     """Given an iterable of sources, yield unique dirname'd paths."""
@@ -77,19 +84,32 @@ class EngineSourceMapper(SourceMapper):
 
   def iter_target_addresses_for_sources(self, sources):
     """Bulk, iterable form of `target_addresses_for_source`."""
-    # Walk up the buildroot looking for targets that would conceivably claim changed sources.
     sources_set = set(sources)
-    specs = tuple(AscendantAddresses(directory=d) for d in self._unique_dirs_for_sources(sources_set))
-
-    # Uniqify all transitive hydrated targets.
-    hydrated_target_to_address = {}
-    hydrated_targets, = self._scheduler.product_request(HydratedTargets, [Specs(specs)])
-    for hydrated_target in hydrated_targets.dependencies:
-      if hydrated_target not in hydrated_target_to_address:
-        hydrated_target_to_address[hydrated_target] = hydrated_target.adaptor.address
-
-    for hydrated_target, legacy_address in six.iteritems(hydrated_target_to_address):
-      # Handle BUILD files.
-      if (LegacyAddressMapper.any_is_declaring_file(legacy_address, sources_set) or
-          self._owns_any_source(sources_set, hydrated_target)):
-        yield legacy_address
+    source_dirs = list(self._unique_dirs_for_sources(sources_set))
+
+    # Index the targets that would conceivably claim sources in each directory: those declared in
+    # the directory or above it.
+    specs = [Specs((AscendantAddresses(directory=d),)) for d in source_dirs]
+    owners_index_by_dir = dict(zip(source_dirs,
+                                   self._scheduler.product_request(OwnersIndex, specs)))
+
+    addresses = OrderedSet()
+    missing_by_dir = defaultdict(set)
+    for source in sources_set:
+      source_dir = os.path.dirname(source)
+      owners = owners_index_by_dir[source_dir].owners_of(source)
+      if owners:
+        addresses.update(owners)
+      elif not os.path.exists(os.path.join(self._build_root, source)):
+        missing_by_dir[source_dir].add(source)
+
+    # Files that no longer exist are in no glob expansion, so are matched against filespecs.
+    for source_dir, missing in missing_by_dir.items():
+      for hydrated_target in owners_index_by_dir[source_dir].hydrated_targets:
+        legacy_address = hydrated_target.adaptor.address
+        if (LegacyAddressMapper.any_is_declaring_file(legacy_address, missing) or
+            self._owns_any_source(missing, hydrated_target)):
+          addresses.add(legacy_address)
+
+    for address in addresses:
+      yield address
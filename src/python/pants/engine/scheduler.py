@@ -294,11 +294,18 @@ class Scheduler(object):
     # so we always need to invalidate the direct parent as well.
     filenames = set(direct_filenames)
     filenames.update(os.path.dirname(f) for f in direct_filenames)
-    filenames_buf = self._native.context.utf8_buf_buf(filenames)
-    invalidated =  self._native.lib.graph_invalidate(self._scheduler, filenames_buf)
+    invalidated = self.invalidate_paths(filenames)
     logger.info('invalidated %d nodes for: %s', invalidated, filenames)
     return invalidated
 
+  def invalidate_paths(self, paths):
+    """Removes the nodes for exactly the given files and directories, and their dependents.
+
+    :returns: The number of nodes removed from the graph.
+    """
+    paths_buf = self._native.context.utf8_buf_buf(paths)
+    return self._native.lib.graph_invalidate(self._scheduler, paths_buf)
+
   def graph_len(self):
     return self._native.lib.graph_len(self._scheduler)
 
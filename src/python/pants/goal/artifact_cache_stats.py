@@ -16,6 +16,35 @@ from pants.util.dirutil import safe_mkdir
 CacheStat = namedtuple('CacheStat', ['hit_targets', 'miss_targets'])
 
 
+class CacheStageStat(object):
+  """Accumulates the outcomes of one stage (eg, probe, fetch, extract) of artifact cache reads."""
+
+  def __init__(self):
+    self.hits = 0
+    self.misses = 0
+    self.bytes = 0
+    self.seconds = 0.0
+    self.max_seconds = 0.0
+
+  def add(self, hit, num_bytes, seconds):
+    if hit:
+      self.hits += 1
+    else:
+      self.misses += 1
+    self.bytes += num_bytes
+    self.seconds += seconds
+    self.max_seconds = max(self.max_seconds, seconds)
+
+  def as_dict(self):
+    return {
+      'hits': self.hits,
+      'misses': self.misses,
+      'bytes': self.bytes,
+      'seconds': self.seconds,
+      'max_seconds': self.max_seconds,
+    }
+
+
 class ArtifactCacheStats(object):
   """Tracks the hits and misses in the artifact cache.
 
@@ -25,6 +54,8 @@ class ArtifactCacheStats(object):
     def init_stat():
       return CacheStat([], [])
     self.stats_per_cache = defaultdict(init_stat)
+    self.stage_stats_per_cache = defaultdict(lambda: defaultdict(CacheStageStat))
+    self.connection_stats_per_cache = defaultdict(lambda: {'requests': 0, 'connections': 0})
     self._dir = dir
     safe_mkdir(self._dir)
 
@@ -35,17 +66,49 @@ class ArtifactCacheStats(object):
   def add_misses(self, cache_name, targets, causes):
     self._add_stat(1, cache_name, targets, causes)
 
+  def add_stage_stat(self, cache_name, stage, hit, num_bytes, seconds):
+    """Record the outcome of one key passing through one stage of a (pipelined) cache read.
+
+    :param string cache_name: The name of the cache (typically the task name).
+    :param string stage: The name of the stage.
+    :param bool hit: Whether the stage found (or produced) an artifact for the key.
+    :param int num_bytes: The number of bytes the stage transferred for the key.
+    :param float seconds: The latency of the stage for the key.
+    """
+    self.stats_per_cache[cache_name]  # Ensure that the cache is reported by `get_all`.
+    self.stage_stats_per_cache[cache_name][stage].add(hit, num_bytes, seconds)
+
+  def add_connection_stats(self, cache_name, num_requests, num_connections):
+    """Record the number of requests made (and connections opened) while reading a cache.
+
+    :param string cache_name: The name of the cache (typically the task name).
+    :param int num_requests: The number of requests sent.
+    :param int num_connections: The number of new connections opened: requests in excess of this
+      reused kept-alive connections.
+    """
+    self.stats_per_cache[cache_name]  # Ensure that the cache is reported by `get_all`.
+    connection_stats = self.connection_stats_per_cache[cache_name]
+    connection_stats['requests'] += num_requests
+    connection_stats['connections'] += num_connections
+
   def get_all(self):
     """Returns the cache stats as a list of dicts."""
     ret = []
     for cache_name, stat in self.stats_per_cache.items():
-      ret.append({
+      cache_stats = {
         'cache_name': cache_name,
         'num_hits': len(stat.hit_targets),
         'num_misses': len(stat.miss_targets),
         'hits': stat.hit_targets,
         'misses': stat.miss_targets
-      })
+      }
+      stage_stats = self.stage_stats_per_cache.get(cache_name)
+      if stage_stats:
+        cache_stats['stages'] = {stage: stage_stat.as_dict()
+                                 for stage, stage_stat in stage_stats.items()}
+      if cache_name in self.connection_stats_per_cache:
+        cache_stats['connections'] = dict(self.connection_stats_per_cache[cache_name])
+      ret.append(cache_stats)
     return ret
 
   # hit_or_miss is the appropriate index in CacheStat, i.e., 0 for hit, 1 for miss.
@@ -14,6 +14,8 @@ class PantsDaemonStats(object):
     self.affected_targets_size = 0
     self.affected_targets_file_count = 0
     self.scheduler_metrics = {}
+    self.queue_wait_times = {}
+    self.product_graph_stats = {}
 
   def set_scheduler_metrics(self, scheduler_metrics):
     self.scheduler_metrics = scheduler_metrics
@@ -24,10 +26,27 @@ class PantsDaemonStats(object):
   def set_affected_targets_size(self, size):
     self.affected_targets_size = size
 
+  def set_queue_wait_times(self, queue_wait_times):
+    """
+    :param dict queue_wait_times: The seconds that the request for this run waited in the daemon
+                                  before each phase, by phase name.
+    """
+    self.queue_wait_times = queue_wait_times
+
+  def set_product_graph_stats(self, product_graph_stats):
+    """
+    :param dict product_graph_stats: The size of the daemon's product graph, and how much of it has
+                                     been evicted or invalidated, by stat name.
+    """
+    self.product_graph_stats = product_graph_stats
+
   def get_all(self):
     res = dict(self.scheduler_metrics)
+    res.update(self.product_graph_stats)
     res.update({
       'target_root_size': self.target_root_size,
       'affected_targets_size': self.affected_targets_size,
     })
+    for phase, wait_time in self.queue_wait_times.items():
+      res['{}_queue_wait_time'.format(phase)] = wait_time
     return res
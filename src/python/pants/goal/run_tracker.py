@@ -363,7 +363,9 @@ class RunTracker(Subsystem):
     safe_file_dump(stats_file, json.dumps(stats))
 
     # Add to local stats db.
-    StatsDBFactory.global_instance().get_db().insert_stats(stats)
+    statsdb = StatsDBFactory.global_instance().get_db()
+    statsdb.insert_stats(stats)
+    statsdb.maybe_compact()
 
     # Upload to remote stats db.
     stats_url = self.get_options().stats_upload_url
@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import logging
+import os
 
 from pants.base.build_environment import get_buildroot
 from pants.base.file_system_project_tree import FileSystemProjectTree
@@ -17,6 +18,7 @@ from pants.engine.legacy.address_mapper import LegacyAddressMapper
 from pants.engine.legacy.graph import (LegacyBuildGraph, TransitiveHydratedTargets,
                                        create_legacy_graph_tasks)
 from pants.engine.legacy.options_parsing import create_options_parsing_rules
+from pants.engine.legacy.parse_cache import CachingParser, parser_fingerprint
 from pants.engine.legacy.parser import LegacyPythonCallbacksParser
 from pants.engine.legacy.structs import (AppAdaptor, GoTargetAdaptor, JavaLibraryAdaptor,
                                          JunitTestsAdaptor, PythonLibraryAdaptor,
@@ -24,6 +26,7 @@ from pants.engine.legacy.structs import (AppAdaptor, GoTargetAdaptor, JavaLibrar
                                          RemoteSourcesAdaptor, ScalaLibraryAdaptor, TargetAdaptor)
 from pants.engine.mapper import AddressMapper
 from pants.engine.native import Native
+from pants.engine.nodes import Return
 from pants.engine.parser import SymbolTable
 from pants.engine.rules import SingletonRule
 from pants.engine.scheduler import Scheduler
@@ -74,8 +77,12 @@ class LegacySymbolTable(SymbolTable):
     return self._table
 
 
-class LegacyGraphScheduler(datatype(['scheduler', 'symbol_table'])):
-  """A thin wrapper around a Scheduler configured with @rules for a symbol table."""
+class LegacyGraphScheduler(datatype(['scheduler', 'symbol_table', 'parse_cache'])):
+  """A thin wrapper around a Scheduler configured with @rules for a symbol table.
+
+  The `parse_cache` is the CachingParser that BUILD files are parsed with, or None if parses are
+  not cached.
+  """
 
   def new_session(self):
     session = self.scheduler.new_session()
@@ -89,6 +96,7 @@ class LegacyGraphSession(datatype(['scheduler_session', 'symbol_table'])):
     """Warm the scheduler's `ProductGraph` with `TransitiveHydratedTargets` products.
 
     :param TargetRoots target_roots: The targets root of the request.
+    :returns: The `TransitiveHydratedTargets` that were computed.
     """
     logger.debug('warming target_roots for: %r', target_roots)
     subjects = [Specs(tuple(target_roots.specs))]
@@ -96,6 +104,7 @@ class LegacyGraphSession(datatype(['scheduler_session', 'symbol_table'])):
     result = self.scheduler_session.execute(request)
     if result.error:
       raise result.error
+    return [state.value for _, state in result.root_products if type(state) is Return]
 
   def create_build_graph(self, target_roots, build_root=None):
     """Construct and return a `BuildGraph` given a set of input specs.
@@ -136,6 +145,7 @@ class EngineInitializer(object):
       include_trace_on_error=bootstrap_options.print_exception_stacktrace,
       remote_store_server=bootstrap_options.remote_store_server,
       remote_execution_server=bootstrap_options.remote_execution_server,
+      build_file_parse_cache=bootstrap_options.build_file_parse_cache,
     )
 
   @staticmethod
@@ -153,7 +163,8 @@ class EngineInitializer(object):
     subproject_roots=None,
     include_trace_on_error=True,
     remote_store_server=None,
-    remote_execution_server=None
+    remote_execution_server=None,
+    build_file_parse_cache=False
   ):
     """Construct and return the components necessary for LegacyBuildGraph construction.
 
@@ -177,6 +188,8 @@ class EngineInitializer(object):
                                   under the current build root.
     :param bool include_trace_on_error: If True, when an error occurs, the error message will
                 include the graph trace.
+    :param bool build_file_parse_cache: If True, cache the objects parsed from BUILD files in the
+                                        workdir across runs.
     :returns: A LegacyGraphScheduler.
     """
 
@@ -195,6 +208,13 @@ class EngineInitializer(object):
       build_file_aliases,
       build_file_imports_behavior
     )
+    parse_cache = None
+    if build_file_parse_cache:
+      fingerprint = parser_fingerprint(build_file_aliases, build_file_imports_behavior)
+      parse_cache = CachingParser(parser,
+                                  os.path.join(workdir, 'build_file_parses', fingerprint),
+                                  build_root)
+      parser = parse_cache
     address_mapper = AddressMapper(parser=parser,
                                    build_ignore_patterns=build_ignore_patterns,
                                    exclude_target_regexps=exclude_target_regexps,
@@ -228,4 +248,4 @@ class EngineInitializer(object):
       include_trace_on_error=include_trace_on_error,
     )
 
-    return LegacyGraphScheduler(scheduler, symbol_table)
+    return LegacyGraphScheduler(scheduler, symbol_table, parse_cache)
@@ -7,24 +7,40 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import itertools
 import logging
+import os
 from collections import defaultdict
 
 from twitter.common.collections import OrderedSet
 
 from pants.base.build_environment import get_buildroot, get_scm
 from pants.base.cmd_line_spec_parser import CmdLineSpecParser
-from pants.base.specs import DescendantAddresses, SingleAddress, Specs
+from pants.base.project_tree_factory import get_project_tree
+from pants.base.specs import DescendantAddresses, SiblingAddresses, SingleAddress, Specs
 from pants.base.target_roots import TargetRoots
 from pants.build_graph.address import Address
-from pants.engine.legacy.graph import TransitiveHydratedTargets, target_types_from_symbol_table
+from pants.build_graph.dependee_index import DependeeIndex
+from pants.engine.legacy.graph import (HydratedTargets, TransitiveHydratedTargets,
+                                       target_types_from_symbol_table)
 from pants.engine.legacy.source_mapper import EngineSourceMapper
 from pants.goal.workspace import ScmWorkspace
 from pants.scm.subsystems.changed import ChangedRequest
+from pants.source.source_digest_cache import SourceDigests
 
 
 logger = logging.getLogger(__name__)
 
 
+def _iter_dependency_addresses(target_types, target_adaptor):
+  """Yields the addresses of the dependencies of a TargetAdaptor, from all sources."""
+  target_cls = target_types[target_adaptor.type_alias]
+
+  declared_deps = target_adaptor.dependencies
+  implicit_deps = (Address.parse(s)
+                   for s in target_cls.compute_dependency_specs(kwargs=target_adaptor.kwargs()))
+
+  return itertools.chain(declared_deps, implicit_deps)
+
+
 class _DependentGraph(object):
   """A graph for walking dependent addresses of TargetAdaptor objects.
 
@@ -57,13 +73,7 @@ class _DependentGraph(object):
 
   def inject_target(self, target_adaptor):
     """Inject a target, respecting all sources of dependencies."""
-    target_cls = self._target_types[target_adaptor.type_alias]
-
-    declared_deps = target_adaptor.dependencies
-    implicit_deps = (Address.parse(s)
-                     for s in target_cls.compute_dependency_specs(kwargs=target_adaptor.kwargs()))
-
-    for dep in itertools.chain(declared_deps, implicit_deps):
+    for dep in _iter_dependency_addresses(self._target_types, target_adaptor):
       self._dependent_address_map[dep].add(target_adaptor.address)
 
   def dependents_of_addresses(self, addresses):
@@ -135,7 +145,10 @@ class TargetRootsCalculator(object):
     logger.debug('changed_request is: %s', changed_request)
     logger.debug('owned_files are: %s', owned_files)
     scm = get_scm()
-    change_calculator = ChangeCalculator(session, symbol_table, scm) if scm else None
+    dependee_index = (cls._create_dependee_index(options)
+                      if changed_options.dependee_index else None)
+    change_calculator = (ChangeCalculator(session, symbol_table, scm, dependee_index=dependee_index)
+                         if scm else None)
     owner_calculator = OwnerCalculator(session, symbol_table) if owned_files else None
     targets_specified = sum(1 for item
                          in (changed_request.is_actionable(), owned_files, spec_roots)
@@ -164,16 +177,26 @@ class TargetRootsCalculator(object):
 
     return TargetRoots(spec_roots)
 
+  @staticmethod
+  def _create_dependee_index(options):
+    global_options = options.for_global_scope()
+    return DependeeIndex(os.path.join(global_options.pants_workdir, 'changed', 'dependee_index'),
+                         get_project_tree(global_options),
+                         build_ignore_patterns=global_options.build_ignore,
+                         digest=SourceDigests.digest)
+
 
 class ChangeCalculator(object):
   """A ChangeCalculator that finds the target addresses of changed files based on scm."""
 
   def __init__(self, scheduler, symbol_table, scm, workspace=None, changes_since=None,
-               diffspec=None):
+               diffspec=None, dependee_index=None):
     """
     :param scheduler: The `Scheduler` instance to use for computing file to target mappings.
     :param symbol_table: The symbol table.
     :param scm: The `Scm` instance to use for change determination.
+    :param DependeeIndex dependee_index: If specified, an index to find the dependees of changed
+                                         targets with, rather than parsing every BUILD file.
     """
     self._scm = scm or get_scm()
     self._scheduler = scheduler
@@ -182,6 +205,7 @@ class ChangeCalculator(object):
     self._workspace = workspace or ScmWorkspace(scm)
     self._changes_since = changes_since
     self._diffspec = diffspec
+    self._dependee_index = dependee_index
 
   def changed_files(self, changes_since=None, diffspec=None):
     """Determines the files changed according to SCM/workspace and options."""
@@ -208,6 +232,14 @@ class ChangeCalculator(object):
     if changed_request.include_dependees not in ('direct', 'transitive'):
       return
 
+    if self._dependee_index:
+      self._dependee_index.update(self._parse_dependencies)
+      self._dependee_index.save()
+      transitive = changed_request.include_dependees == 'transitive'
+      for address in self._dependee_index.dependees(changed_addresses, transitive=transitive):
+        yield address
+      return
+
     # TODO: For dependee finding, we technically only need to parse all build files to collect target
     # dependencies. But in order to fully validate the graph and account for the fact that deleted
     # targets do not show up as changed roots, we use the `TransitiveHydratedTargets` product.
@@ -230,6 +262,15 @@ class ChangeCalculator(object):
   def changed_target_addresses(self, changed_request):
     return list(self.iter_changed_target_addresses(changed_request))
 
+  def _parse_dependencies(self, build_dirs):
+    """Yields the address and dependency addresses of each target in the given BUILD dirs."""
+    target_types = target_types_from_symbol_table(self._symbol_table)
+    specs = tuple(SiblingAddresses(d) for d in build_dirs)
+    hydrated_targets, = self._scheduler.product_request(HydratedTargets, [Specs(specs)])
+    for hydrated_target in hydrated_targets.dependencies:
+      yield (hydrated_target.adaptor.address,
+             _iter_dependency_addresses(target_types, hydrated_target.adaptor))
+
 
 class OwnerCalculator(object):
   """An OwnerCalculator that finds the target addresses of the files passed down as arguments
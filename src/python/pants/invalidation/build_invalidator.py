@@ -5,7 +5,6 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
-import errno
 import hashlib
 import os
 from abc import abstractmethod
@@ -13,9 +12,9 @@ from collections import namedtuple
 
 from pants.base.hash_utils import hash_all
 from pants.build_graph.target import Target
-from pants.fs.fs import safe_filename
+from pants.build_graph.transitive_fingerprinter import TransitiveFingerprinter
+from pants.invalidation.fingerprint_store import FileFingerprintStore, LogFingerprintStore
 from pants.subsystem.subsystem import Subsystem
-from pants.util.dirutil import safe_mkdir
 from pants.util.meta import AbstractClass
 
 
@@ -135,8 +134,33 @@ class BuildInvalidator(object):
                              supplied the build invalidator will act globally across all build
                              tasks.
       """
-      root = os.path.join(cls.global_instance().get_options().pants_workdir, 'build_invalidator')
-      return BuildInvalidator(root, scope=build_task)
+      options = cls.global_instance().get_options()
+      root = os.path.join(options.pants_workdir, 'build_invalidator')
+      return BuildInvalidator(root, scope=build_task, store=options.store)
+
+    @classmethod
+    def create_fingerprinter(cls):
+      """Creates a TransitiveFingerprinter to precompute the transitive cache keys of targets."""
+      parallelism = cls.global_instance().get_options().fingerprint_parallelism
+      return TransitiveFingerprinter(parallelism=parallelism)
+
+    @classmethod
+    def register_options(cls, register):
+      super(BuildInvalidator.Factory, cls).register_options(register)
+      register('--store', advanced=True, choices=sorted(BuildInvalidator.STORES.keys()), default='log',
+               help='How to store target fingerprints. files: one small file per target. log: a '
+                    'single append-only file per task, which is much cheaper to read and write '
+                    'for large numbers of targets. Fingerprints stored as files are migrated '
+                    'into the log as they are read.')
+      register('--fingerprint-parallelism', advanced=True, type=int, default=1,
+               help='The number of threads to fingerprint targets with when computing the '
+                    'transitive cache keys of a set of targets. More than one only helps when '
+                    'fingerprinting waits on IO, eg: to read sources from a slow filesystem.')
+
+  STORES = {
+    'files': FileFingerprintStore,
+    'log': LogFingerprintStore,
+  }
 
   @staticmethod
   def cacheable(cache_key):
@@ -147,17 +171,17 @@ class BuildInvalidator(object):
     """
     return cache_key.cacheable
 
-  def __init__(self, root, scope=None):
+  def __init__(self, root, scope=None, store='files'):
     """Create a build invalidator using the given root fingerprint database directory.
 
     :param str root: The root directory to use for storing build invalidation fingerprints.
     :param str scope: The scope of this invalidator; if `None` then this invalidator will be global.
+    :param str store: The name of the kind of store to keep fingerprints in: one of `STORES`.
     """
     root = os.path.join(root, GLOBAL_CACHE_KEY_GEN_VERSION)
     if scope:
       root = os.path.join(root, scope)
-    self._root = root
-    safe_mkdir(self._root)
+    self._store = self.STORES[store](root)
 
   def previous_key(self, cache_key):
     """If there was a previous successful build for the given key, return the previous key.
@@ -169,7 +193,7 @@ class BuildInvalidator(object):
       # We should never successfully cache an uncacheable CacheKey.
       return None
 
-    previous_hash = self._read_sha(cache_key)
+    previous_hash = self._store.read(cache_key.id)
     if not previous_hash:
       return None
     return CacheKey(cache_key.id, previous_hash)
@@ -184,7 +208,7 @@ class BuildInvalidator(object):
       # An uncacheable CacheKey is always out of date.
       return True
 
-    return self._read_sha(cache_key) != cache_key.hash
+    return self._store.read(cache_key.id) != cache_key.hash
 
   def update(self, cache_key):
     """Makes cache_key the valid version of the corresponding target set.
@@ -192,39 +216,20 @@ class BuildInvalidator(object):
     :param cache_key: A CacheKey object (typically returned by CacheKeyGenerator.key_for()).
     """
     if self.cacheable(cache_key):
-      self._write_sha(cache_key)
+      self._store.write(cache_key.id, cache_key.hash)
 
   def force_invalidate_all(self):
     """Force-invalidates all cached items."""
-    safe_mkdir(self._root, clean=True)
+    self._store.clear()
 
   def force_invalidate(self, cache_key):
     """Force-invalidate the cached item."""
-    try:
-      if self.cacheable(cache_key):
-        os.unlink(self._sha_file(cache_key))
-    except OSError as e:
-      if e.errno != errno.ENOENT:
-        raise
-
-  def _sha_file(self, cache_key):
-    return self._sha_file_by_id(cache_key.id)
-
-  def _sha_file_by_id(self, id):
-    return os.path.join(self._root, safe_filename(id, extension='.hash'))
-
-  def _write_sha(self, cache_key):
-    with open(self._sha_file(cache_key), 'w') as fd:
-      fd.write(cache_key.hash)
-
-  def _read_sha(self, cache_key):
-    return self._read_sha_by_id(cache_key.id)
-
-  def _read_sha_by_id(self, id):
-    try:
-      with open(self._sha_file_by_id(id), 'rb') as fd:
-        return fd.read().strip()
-    except IOError as e:
-      if e.errno != errno.ENOENT:
-        raise
-      return None  # File doesn't exist.
+    if self.cacheable(cache_key):
+      self._store.delete(cache_key.id)
+
+  def batch(self):
+    """Returns a context within which many keys can be checked at the cost of a single read.
+
+    Updates made by other invalidators for the same scope may not be visible within a batch.
+    """
+    return self._store.batch()
@@ -272,9 +272,13 @@ class InvalidationCacheManager(object):
                invalidation_report=None,
                task_name=None,
                task_version=None,
-               artifact_write_callback=lambda _: None):
+               artifact_write_callback=lambda _: None,
+               transitive_fingerprinter=None):
     """
     :API: public
+
+    :param TransitiveFingerprinter transitive_fingerprinter: If specified, and dependents are
+      invalidated, used to compute the transitive fingerprints of all checked targets at once.
     """
     self._cache_key_generator = cache_key_generator
     self._task_name = task_name or 'UNKNOWN'
@@ -283,6 +287,7 @@ class InvalidationCacheManager(object):
     self._invalidator = build_invalidator
     self._fingerprint_strategy = fingerprint_strategy
     self._artifact_write_callback = artifact_write_callback
+    self._transitive_fingerprinter = transitive_fingerprinter
     self.invalidation_report = invalidation_report
 
     # Create the task-versioned prefix of the results dir, and a stable symlink to it
@@ -328,7 +333,12 @@ class InvalidationCacheManager(object):
 
     Callers can inspect these vts and rebuild the invalid ones, for example.
     """
-    all_vts = self.wrap_targets(targets, topological_order=topological_order)
+    if self._invalidate_dependents and self._transitive_fingerprinter:
+      self._precompute_transitive_fingerprints(targets)
+
+    # Read the previous keys of all targets at once.
+    with self._invalidator.batch():
+      all_vts = self.wrap_targets(targets, topological_order=topological_order)
     invalid_vts = filter(lambda vt: not vt.valid, all_vts)
     return InvalidationCheck(all_vts, invalid_vts)
 
@@ -381,6 +391,16 @@ class InvalidationCacheManager(object):
   def previous_key(self, cache_key):
     return self._invalidator.previous_key(cache_key)
 
+  def _precompute_transitive_fingerprints(self, targets):
+    """Memoize the transitive fingerprints of the targets, so that keying each is cheap."""
+    try:
+      self._transitive_fingerprinter.fingerprint(targets, self._fingerprint_strategy)
+    except Exception as e:
+      exc_info = sys.exc_info()
+      new_exception = self.CacheValidationError("Problem fingerprinting targets: {}".format(e))
+
+      raise self.CacheValidationError, new_exception, exc_info[2]
+
   def _key_for(self, target):
     try:
       return self._cache_key_generator.key_for_target(target,
@@ -0,0 +1,266 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import errno
+import os
+import uuid
+from abc import abstractmethod
+from contextlib import contextmanager
+
+from pants.fs.fs import safe_filename
+from pants.util.dirutil import safe_delete, safe_mkdir
+from pants.util.meta import AbstractClass
+
+
+class FingerprintStore(AbstractClass):
+  """A persistent map from target set id to the hash of its last successful build."""
+
+  def __init__(self, root):
+    """
+    :param str root: The directory to store fingerprints under.
+    """
+    self._root = root
+    safe_mkdir(self._root)
+
+  @abstractmethod
+  def read(self, id):
+    """Returns the hash stored for the given id, or None."""
+
+  @abstractmethod
+  def write(self, id, hash):
+    """Stores the given hash for the given id."""
+
+  @abstractmethod
+  def delete(self, id):
+    """Removes any hash stored for the given id."""
+
+  def clear(self):
+    """Removes all stored hashes."""
+    safe_mkdir(self._root, clean=True)
+
+  @contextmanager
+  def batch(self):
+    """A context within which reads may be served from a snapshot taken on entry.
+
+    Used to amortize the cost of checking many ids at once: stores for which reads are cheap need
+    not override this.
+    """
+    yield
+
+  def _legacy_file(self, id):
+    return os.path.join(self._root, safe_filename(id, extension='.hash'))
+
+
+def _read_hash_file(path):
+  try:
+    with open(path, 'rb') as fd:
+      return fd.read().strip()
+  except IOError as e:
+    if e.errno != errno.ENOENT:
+      raise
+    return None  # File doesn't exist.
+
+
+class FileFingerprintStore(FingerprintStore):
+  """Stores each fingerprint in its own small file."""
+
+  def read(self, id):
+    return _read_hash_file(self._legacy_file(id))
+
+  def write(self, id, hash):
+    with open(self._legacy_file(id), 'w') as fd:
+      fd.write(hash)
+
+  def delete(self, id):
+    try:
+      os.unlink(self._legacy_file(id))
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+
+
+class LogFingerprintStore(FingerprintStore):
+  """Stores all fingerprints in a single append-only log.
+
+  The log starts with a line holding a unique generation id, followed by one `<id>\t<hash>\n`
+  record (or `<id>\t\n` tombstone) per update, each appended with a single write. A record torn by
+  a crash is ignored on load, and the next append starts on a fresh line, so a crash can at worst
+  lose the last update, which only causes a rebuild.
+
+  The log is read incrementally: a refresh reads only the records appended since the last one, and
+  within a `batch` no refresh happens at all. When superseded records come to dominate the log it
+  is compacted, by atomically replacing it with a new generation containing only live records.
+
+  Fingerprints stored by a `FileFingerprintStore` under the same root are migrated into the log as
+  they are first read.
+
+  NB: Like the per-file layout, this assumes a single writer per workdir, which is guaranteed by
+  the workdir lock held by each run.
+  """
+
+  LOG_NAME = 'fingerprints.log'
+
+  # Don't bother to compact logs with fewer records than this.
+  _MIN_COMPACTION_RECORDS = 1000
+
+  def __init__(self, root):
+    super(LogFingerprintStore, self).__init__(root)
+    self._log = os.path.join(self._root, self.LOG_NAME)
+    self._batch_depth = 0
+    self._reset()
+
+  def _reset(self):
+    self._hashes = {}
+    self._records = 0
+    # The generation of the log, the offset up to which it has been read, and its stat signature at
+    # that point.
+    self._generation = None
+    self._offset = 0
+    self._signature = None
+    self._torn = False
+    # Legacy fingerprint file names found when the log was (re)loaded, which still need migration.
+    self._legacy_names = set()
+
+  def read(self, id):
+    if not self._batch_depth:
+      self._refresh()
+    hash = self._hashes.get(id)
+    if hash is None and self._legacy_names:
+      hash = self._migrate(id)
+    return hash or None
+
+  def write(self, id, hash):
+    self._append(id, hash)
+
+  def delete(self, id):
+    self._append(id, '')
+
+  def clear(self):
+    super(LogFingerprintStore, self).clear()
+    self._reset()
+
+  @contextmanager
+  def batch(self):
+    if not self._batch_depth:
+      self._refresh()
+    self._batch_depth += 1
+    try:
+      yield
+    finally:
+      self._batch_depth -= 1
+
+  def _append(self, id, hash):
+    record = '{}\t{}\n'.format(id, hash).encode('utf-8')
+    fd = None
+    if self._generation is not None:
+      try:
+        fd = os.open(self._log, os.O_WRONLY | os.O_APPEND)
+      except OSError as e:
+        if e.errno != errno.ENOENT:
+          raise
+    if fd is None:
+      # Start a new generation, unless another store has just done so.
+      safe_mkdir(self._root)
+      generation = uuid.uuid4().hex
+      try:
+        fd = os.open(self._log, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o644)
+        record = '{}\n'.format(generation).encode('utf-8') + record
+        self._reset_to(generation)
+      except OSError as e:
+        if e.errno != errno.EEXIST:
+          raise
+        fd = os.open(self._log, os.O_WRONLY | os.O_APPEND)
+    elif self._torn:
+      record = b'\n' + record
+    try:
+      os.write(fd, record)
+    finally:
+      os.close(fd)
+    self._torn = False
+    self._hashes[id] = hash
+    self._legacy_names.discard(os.path.basename(self._legacy_file(id)))
+
+  def _reset_to(self, generation):
+    legacy_names = self._legacy_names
+    self._reset()
+    self._generation = generation
+    self._legacy_names = legacy_names
+
+  def _refresh(self):
+    try:
+      stat = os.stat(self._log)
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      # The log was removed (or has never existed): start over, and look for files to migrate.
+      self._reset()
+      self._legacy_names = self._find_legacy_names()
+      return
+
+    # The log is only ever appended to or replaced, either of which changes this signature.
+    signature = (stat.st_ino, stat.st_size, stat.st_mtime)
+    if signature != self._signature:
+      self._load()
+      self._signature = signature
+      if self._should_compact():
+        self._compact()
+
+  def _find_legacy_names(self):
+    try:
+      return {name for name in os.listdir(self._root) if name.endswith('.hash')}
+    except OSError as e:
+      if e.errno != errno.ENOENT:
+        raise
+      return set()
+
+  def _load(self):
+    """Read any new records from the log, reloading it from scratch if it has been replaced."""
+    with open(self._log, 'rb') as fp:
+      generation = fp.readline().strip().decode('utf-8')
+      if generation != self._generation:
+        self._reset()
+        self._generation = generation
+        self._legacy_names = self._find_legacy_names()
+        self._offset = fp.tell()
+      fp.seek(self._offset)
+      data = fp.read()
+    end = data.rfind(b'\n') + 1
+    for line in data[:end].splitlines():
+      fields = line.decode('utf-8').split('\t')
+      if len(fields) == 2:
+        self._hashes[fields[0]] = fields[1]
+        self._records += 1
+    # A trailing partial record was torn by a crash, so must not be continued by the next append.
+    self._torn = end < len(data)
+    self._offset += len(data)
+
+  def _should_compact(self):
+    return (self._records > self._MIN_COMPACTION_RECORDS and
+            self._records > 2 * sum(1 for hash in self._hashes.values() if hash))
+
+  def _compact(self):
+    tmp = '{}.tmp'.format(self._log)
+    with open(tmp, 'wb') as fp:
+      fp.write('{}\n'.format(uuid.uuid4().hex).encode('utf-8'))
+      for id, hash in sorted(self._hashes.items()):
+        if hash:
+          fp.write('{}\t{}\n'.format(id, hash).encode('utf-8'))
+      fp.flush()
+      os.fsync(fp.fileno())
+    os.rename(tmp, self._log)
+    self._load()
+
+  def _migrate(self, id):
+    name = os.path.basename(self._legacy_file(id))
+    if name not in self._legacy_names:
+      return None
+    hash = _read_hash_file(self._legacy_file(id))
+    if hash:
+      self._append(id, hash)
+    self._legacy_names.discard(name)
+    safe_delete(self._legacy_file(id))
+    return hash
@@ -236,6 +236,14 @@ class GlobalOptionsRegistrar(SubsystemClientMixin, Optionable):
              help='The number of workers to use for the filesystem event service executor pool.')
     register('--pantsd-invalidation-globs', advanced=True, type=list, fromfile=True, default=[],
              help='Filesystem events matching any of these globs will trigger a daemon restart.')
+    register('--pantsd-max-graph-nodes', advanced=True, type=int, default=None,
+             help='The maximum number of nodes to keep in the daemon\'s product graph. When it '
+                  'grows beyond this, the nodes for the least recently used directories are '
+                  'evicted. If unset, the product graph is unbounded.')
+    register('--pantsd-invalidation-settle-window', advanced=True, type=float, default=0.1,
+             help='The seconds to wait for further filesystem events after one is received, so '
+                  'that bursts of events (e.g. from a `git checkout`) invalidate the daemon\'s '
+                  'product graph in a single batch.')
 
     # Watchman options.
     register('--watchman-version', advanced=True, default='4.9.0-pants1', help='Watchman version.')
@@ -255,6 +263,12 @@ class GlobalOptionsRegistrar(SubsystemClientMixin, Optionable):
     # all caches), and needs to be parsed out early, so we make it a bootstrap option.
     register('--build-file-imports', choices=['allow', 'warn', 'error'], default='warn',
       help='Whether to allow import statements in BUILD files')
+    register('--build-file-parse-cache', advanced=True, type=bool, default=False,
+             help='Cache the objects parsed from BUILD files in the workdir, keyed by the content '
+                  'of each BUILD file, so that runs without the daemon only re-parse the BUILD '
+                  'files that changed. As with the daemon, BUILD files that read other files (eg: '
+                  'python_requirements) do not observe changes to them until they change '
+                  'themselves.')
 
     register('--remote-store-server',
              help='host:port of grpc server to use as remote execution file store')
@@ -16,6 +16,7 @@ from pants.base.build_environment import get_buildroot
 from pants.base.hash_utils import stable_json_hash
 from pants.option.custom_types import (UnsetBool, dict_with_files_option, dir_option, file_option,
                                        target_option)
+from pants.option.scope import GLOBAL_SCOPE
 
 
 class Encoder(json.JSONEncoder):
@@ -61,6 +62,21 @@ class OptionsFingerprinter(object):
       )
     return hasher.hexdigest()
 
+  @classmethod
+  def daemon_options_fingerprint(cls, bootstrap_options):
+    """Given bootstrap options, compute a fingerprint of the options that affect pantsd.
+
+    The daemon must be restarted if this fingerprint changes, and a pantsd run may only reuse the
+    daemon's initialization if its fingerprint matches the daemon's.
+
+    :param Options bootstrap_options: The bootstrap `Options` to fingerprint.
+    :return: Hexadecimal string representing the fingerprint.
+    """
+    return cls.combined_options_fingerprint_for_scope(GLOBAL_SCOPE,
+                                                      bootstrap_options,
+                                                      fingerprint_key='daemon',
+                                                      invert=True)
+
   def __init__(self, build_graph=None):
     self._build_graph = build_graph
 
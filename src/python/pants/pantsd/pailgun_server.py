@@ -7,6 +7,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 
 import logging
 import socket
+import threading
 import traceback
 
 from six.moves.socketserver import BaseRequestHandler, BaseServer, TCPServer
@@ -54,8 +55,11 @@ class PailgunHandler(PailgunHandlerBase):
 
   def _run_pants(self, sock, arguments, environment):
     """Execute a given run with a pants runner."""
+    # N.B. Creating the runner warms the product graph, which concurrent requests may do at the
+    # same time: only the fork itself is guarded against abrupt teardown.
     runner = self.server.runner_factory(sock, arguments, environment)
-    runner.run()
+    with self.server.lifecycle_lock():
+      runner.run()
 
   def handle(self):
     """Request handler for a single Pailgun request."""
@@ -89,7 +93,7 @@ class PailgunHandler(PailgunHandlerBase):
 
 
 class PailgunServer(TCPServer):
-  """A (forking) pants nailgun server."""
+  """A (forking) pants nailgun server that handles each request in its own thread."""
 
   def __init__(self, server_address, runner_factory, lifecycle_lock,
                handler_class=None, bind_and_activate=True):
@@ -100,9 +104,10 @@ class PailgunServer(TCPServer):
     :param tuple server_address: An address tuple of (hostname, port) for socket.bind().
     :param class runner_factory: A factory function for creating a DaemonPantsRunner for each run.
     :param threading.RLock lifecycle_lock: A lock used to guard against abrupt teardown of the servers
-                                           execution thread during handling. All pailgun request handling
-                                           will take place under care of this lock, which would be shared with
-                                           a `PailgunServer`-external lifecycle manager to guard teardown.
+                                           execution thread during handling. Accepting pailgun requests
+                                           and forking runners will take place under care of this lock,
+                                           which would be shared with a `PailgunServer`-external
+                                           lifecycle manager to guard teardown.
     :param class handler_class: The request handler class to use for each request. (Optional)
     :param bool bind_and_activate: If True, binds and activates networking at __init__ time.
                                    (Optional)
@@ -143,14 +148,25 @@ class PailgunServer(TCPServer):
       self.handle_timeout()
       return
 
-    # After select tells us we can safely accept, guard the accept and request
-    # handling with the lifecycle lock to avoid abrupt teardown mid-request.
+    # After select tells us we can safely accept, guard the accept and the launch of the request
+    # handling thread with the lifecycle lock to avoid abrupt teardown mid-request.
     with self.lifecycle_lock():
       self._handle_request_noblock()
 
   def process_request(self, request, client_address):
-    """Override of TCPServer.process_request() that provides for forking request handlers and
-    delegates error handling to the request handler."""
+    """Override of TCPServer.process_request() that handles the request in a new thread.
+
+    This allows concurrent requests to warm the product graph in their own sessions, rather than
+    queueing behind one another.
+    """
+    thread = threading.Thread(target=self.process_request_thread,
+                              args=(request, client_address),
+                              name='pailgun-request')
+    thread.daemon = True
+    thread.start()
+
+  def process_request_thread(self, request, client_address):
+    """Provides for forking request handlers and delegates error handling to the request handler."""
     # Instantiate the request handler.
     handler = self.RequestHandlerClass(request, client_address, self)
     try:
@@ -21,7 +21,6 @@ from pants.init.engine_initializer import EngineInitializer
 from pants.init.logging import setup_logging
 from pants.init.options_initializer import BuildConfigInitializer
 from pants.init.target_roots_calculator import TargetRootsCalculator
-from pants.option.arg_splitter import GLOBAL_SCOPE
 from pants.option.options_bootstrapper import OptionsBootstrapper
 from pants.option.options_fingerprinter import OptionsFingerprinter
 from pants.pantsd.process_manager import FingerprintedProcessManager
@@ -33,6 +32,7 @@ from pants.pantsd.watchman_launcher import WatchmanLauncher
 from pants.util.collections import combined_dict
 from pants.util.contextutil import stdio_as
 from pants.util.memo import memoized_property
+from pants.util.rwlock import ReadWriteLock
 
 
 class _LoggerStream(object):
@@ -125,7 +125,9 @@ class PantsDaemon(FingerprintedProcessManager):
           build_root,
           bootstrap_options_values,
           legacy_graph_scheduler,
-          watchman
+          watchman,
+          OptionsFingerprinter.daemon_options_fingerprint(
+            options_bootstrapper.get_bootstrap_options())
         )
 
       return PantsDaemon(
@@ -144,7 +146,8 @@ class PantsDaemon(FingerprintedProcessManager):
       return OptionsBootstrapper().get_bootstrap_options()
 
     @staticmethod
-    def _setup_services(build_root, bootstrap_options, legacy_graph_scheduler, watchman):
+    def _setup_services(build_root, bootstrap_options, legacy_graph_scheduler, watchman,
+                        options_fingerprint=None):
       """Initialize pantsd services.
 
       :returns: A tuple of (`tuple` service_instances, `dict` port_map).
@@ -152,7 +155,8 @@ class PantsDaemon(FingerprintedProcessManager):
       fs_event_service = FSEventService(
         watchman,
         build_root,
-        bootstrap_options.pantsd_fs_event_workers
+        bootstrap_options.pantsd_fs_event_workers,
+        ignore_patterns=bootstrap_options.pants_ignore,
       )
 
       pidfile_absolute = PantsDaemon.metadata_file_path('pantsd', 'pid', bootstrap_options.pants_subprocessdir)
@@ -172,6 +176,8 @@ class PantsDaemon(FingerprintedProcessManager):
         build_root,
         bootstrap_options.pantsd_invalidation_globs,
         pidfile,
+        max_graph_nodes=bootstrap_options.pantsd_max_graph_nodes,
+        invalidation_settle_window=bootstrap_options.pantsd_invalidation_settle_window,
       )
 
       pailgun_service = PailgunService(
@@ -179,7 +185,8 @@ class PantsDaemon(FingerprintedProcessManager):
         exiter_class=DaemonExiter,
         runner_class=DaemonPantsRunner,
         target_roots_calculator=TargetRootsCalculator,
-        scheduler_service=scheduler_service
+        scheduler_service=scheduler_service,
+        options_fingerprint=options_fingerprint
       )
 
       store_gc_service = StoreGCService(legacy_graph_scheduler.scheduler)
@@ -216,8 +223,9 @@ class PantsDaemon(FingerprintedProcessManager):
     # to safeguard daemon-synchronous sections that should be protected from abrupt teardown.
     self._lifecycle_lock = threading.RLock()
     # A lock to guard pantsd->runner forks. This can be used by services to safeguard resources
-    # held by threads at fork time, so that we can fork without deadlocking.
-    self._fork_lock = threading.RLock()
+    # held by threads at fork time, so that we can fork without deadlocking. Forks hold it for
+    # writing, while concurrent client sessions reading the product graph share it.
+    self._fork_lock = ReadWriteLock()
     # N.B. This Event is used as nothing more than a convenient atomic flag - nothing waits on it.
     self._kill_switch = threading.Event()
     self._exiter = Exiter()
@@ -232,12 +240,7 @@ class PantsDaemon(FingerprintedProcessManager):
 
   @property
   def options_fingerprint(self):
-    return OptionsFingerprinter.combined_options_fingerprint_for_scope(
-      GLOBAL_SCOPE,
-      self._bootstrap_options,
-      fingerprint_key='daemon',
-      invert=True
-    )
+    return OptionsFingerprinter.daemon_options_fingerprint(self._bootstrap_options)
 
   def shutdown(self, service_thread_map):
     """Gracefully terminate all services and kill the main PantsDaemon loop."""
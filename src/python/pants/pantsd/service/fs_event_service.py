@@ -10,6 +10,8 @@ import os
 import traceback
 
 from concurrent.futures import ThreadPoolExecutor
+from pathspec.pathspec import PathSpec
+from pathspec.patterns.gitwildmatch import GitWildMatchPattern
 
 from pants.pantsd.service.pants_service import PantsService
 from pants.pantsd.watchman import Watchman
@@ -25,14 +27,20 @@ class FSEventService(PantsService):
 
   ZERO_DEPTH = ['depth', 'eq', 0]
 
+  # Characters of gitignore patterns that are not translated into watchman expressions: patterns
+  # containing them are applied only to the events that watchman delivers.
+  _UNTRANSLATED_PATTERN_CHARS = frozenset('\\[]')
+
   PANTS_PID_SUBSCRIPTION_NAME = 'pantsd_pid'
 
-  def __init__(self, watchman, build_root, worker_count):
+  def __init__(self, watchman, build_root, worker_count, ignore_patterns=None):
     """
     :param Watchman watchman: The Watchman instance as provided by the WatchmanLauncher subsystem.
     :param str build_root: The current build root.
     :param int worker_count: The total number of workers to use for the internally managed
                              ThreadPoolExecutor.
+    :param list ignore_patterns: Gitignore-style patterns (i.e. `--pants-ignore`) for files whose
+                                 changes the all files subscription should not report.
     """
     super(FSEventService, self).__init__()
     self._logger = logging.getLogger(__name__)
@@ -41,6 +49,13 @@ class FSEventService(PantsService):
     self._worker_count = worker_count
     self._executor = None
     self._handlers = {}
+    self._ignore_patterns = ignore_patterns or []
+    self._ignore = PathSpec.from_lines(GitWildMatchPattern, self._ignore_patterns)
+    # The names of the handlers whose events should have ignored files filtered out.
+    self._filtered_handlers = set()
+    self._received_event_count = 0
+    self._filtered_file_count = 0
+    self._delivered_file_count = 0
 
   def setup(self, lifecycle_lock, fork_lock, executor=None):
     super(FSEventService, self).setup(lifecycle_lock, fork_lock)
@@ -53,12 +68,61 @@ class FSEventService(PantsService):
       self._executor.shutdown()
     super(FSEventService, self).terminate()
 
+  @classmethod
+  def _watchman_ignore_expressions(cls, ignore_patterns):
+    """Translates gitignore-style patterns into watchman expressions that match ignored files.
+
+    Only patterns that follow the last negated pattern are translated, since the files they match
+    cannot be re-included by a later pattern. Patterns that are not translated are instead applied
+    to the events that watchman delivers.
+    """
+    negated = [i for i, pattern in enumerate(ignore_patterns) if pattern.startswith('!')]
+    translatable = ignore_patterns[negated[-1] + 1:] if negated else ignore_patterns
+
+    expressions = []
+    for pattern in translatable:
+      pattern = pattern.strip()
+      if not pattern or pattern.startswith('#') or cls._UNTRANSLATED_PATTERN_CHARS & set(pattern):
+        continue
+      dir_only = pattern.endswith('/')
+      pattern = pattern.rstrip('/')
+      if not pattern:
+        continue
+      if '/' in pattern:
+        # Anchored to the build root.
+        pattern = pattern.lstrip('/')
+        path_match = ['match', pattern, 'wholename', {'includedotfiles': True}]
+        descendants_match = ['match', pattern + '/**', 'wholename', {'includedotfiles': True}]
+      else:
+        # Matched against the name of a file or directory at any depth.
+        path_match = ['match', pattern, 'basename', {'includedotfiles': True}]
+        descendants_match = ['match', '**/' + pattern + '/**', 'wholename',
+                             {'includedotfiles': True}]
+      expressions.append(['allof', ['type', 'd'], path_match] if dir_only else path_match)
+      expressions.append(descendants_match)
+    return expressions
+
   def register_all_files_handler(self, callback, name='all_files'):
     """Registers a subscription for all files under a given watch path.
 
+    Files matched by the ignore patterns are excluded by the subscription's watchman expression
+    where possible, and otherwise filtered out of the events before they reach the callback.
+
     :param func callback: the callback to execute on each filesystem event
     :param str name:      the subscription name as used by watchman
     """
+    expression = [
+      'allof',  # All of the below rules must be true to match.
+      ['not', ['dirname', 'dist', self.ZERO_DEPTH]],  # Exclude the ./dist dir.
+      # N.B. 'wholename' ensures we match against the absolute ('x/y/z') vs base path ('z').
+      ['not', ['pcre', r'^\..*', 'wholename']],  # Exclude files in hidden dirs (.pants.d etc).
+      ['not', ['match', '*.pyc']],  # Exclude .pyc files.
+    ]
+    ignore_expressions = self._watchman_ignore_expressions(self._ignore_patterns)
+    if ignore_expressions:
+      expression.append(['not', ['anyof'] + ignore_expressions])
+    self._filtered_handlers.add(name)
+
     self.register_handler(
       name,
       dict(
@@ -69,15 +133,7 @@ class FSEventService(PantsService):
         # ...but if we were to skip watching directories, we'd still have to invalidate
         # the parents of any changed files, and we wouldn't see creation/deletion of
         # empty directories.
-        expression=[
-          'allof',  # All of the below rules must be true to match.
-          ['not', ['dirname', 'dist', self.ZERO_DEPTH]],  # Exclude the ./dist dir.
-          # N.B. 'wholename' ensures we match against the absolute ('x/y/z') vs base path ('z').
-          ['not', ['pcre', r'^\..*', 'wholename']],  # Exclude files in hidden dirs (.pants.d etc).
-          ['not', ['match', '*.pyc']]  # Exclude .pyc files.
-          # TODO(kwlzn): Make exclusions here optionable.
-          # Related: https://github.com/pantsbuild/pants/issues/2956
-        ]
+        expression=expression
       ),
       callback
     )
@@ -117,6 +173,34 @@ class FSEventService(PantsService):
     ), 'invalid handler metadata!'
     self._handlers[name] = Watchman.EventHandler(name=name, metadata=metadata, callback=callback)
 
+  def event_stats(self):
+    """Provides counts of the events received from watchman, and of the files they reported.
+
+    :returns: A dict of stat name to value.
+    """
+    return {
+      'fs_events_received': self._received_event_count,
+      'fs_event_files_filtered': self._filtered_file_count,
+      'fs_event_files_delivered': self._delivered_file_count,
+    }
+
+  def _filter_event(self, handler_name, event_data):
+    """Filters ignored files out of an event, returning None if none of its files remain."""
+    self._received_event_count += 1
+    files = event_data.get('files', [])
+    # N.B. The initial event lists every file, and so is not worth filtering.
+    if (handler_name in self._filtered_handlers and self._ignore_patterns and
+        not event_data.get('is_fresh_instance')):
+      delivered = [f for f in files if not self._ignore.match_file(f)]
+      self._filtered_file_count += len(files) - len(delivered)
+      if not delivered:
+        return None
+      if len(delivered) < len(files):
+        event_data = dict(event_data, files=delivered)
+      files = delivered
+    self._delivered_file_count += len(files)
+    return event_data
+
   def fire_callback(self, handler_name, event_data):
     """Fire an event callback for a given handler."""
     return self._handlers[handler_name].callback(event_data)
@@ -139,6 +223,9 @@ class FSEventService(PantsService):
       # On death, break from the loop and contextmgr to terminate callback threads.
       if self.is_killed: break
 
+      if event_data:
+        event_data = self._filter_event(handler_name, event_data)
+
       if event_data:
         # As we receive events from watchman, submit them asynchronously to the executor.
         future = self._executor.submit(self.fire_callback, handler_name, event_data)
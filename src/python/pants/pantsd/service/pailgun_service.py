@@ -8,11 +8,13 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import select
 import sys
+import threading
 import traceback
 from contextlib import contextmanager
 
 from pants.init.options_initializer import BuildConfigInitializer, OptionsInitializer
 from pants.option.options_bootstrapper import OptionsBootstrapper
+from pants.option.options_fingerprinter import OptionsFingerprinter
 from pants.pantsd.pailgun_server import PailgunServer
 from pants.pantsd.service.pants_service import PantsService
 
@@ -20,7 +22,8 @@ from pants.pantsd.service.pants_service import PantsService
 class PailgunService(PantsService):
   """A service that runs the Pailgun server."""
 
-  def __init__(self, bind_addr, exiter_class, runner_class, target_roots_calculator, scheduler_service):
+  def __init__(self, bind_addr, exiter_class, runner_class, target_roots_calculator, scheduler_service,
+               options_fingerprint=None):
     """
     :param tuple bind_addr: The (hostname, port) tuple to bind the Pailgun server to.
     :param class exiter_class: The `Exiter` class to be used for Pailgun runs.
@@ -29,6 +32,10 @@ class PailgunService(PantsService):
       root parsing.
     :param SchedulerService scheduler_service: The SchedulerService instance for access to the
                                                resident scheduler.
+    :param string options_fingerprint: The fingerprint of the bootstrap options that the daemon's
+                                       backends and plugins were loaded with. Runs whose bootstrap
+                                       options have the same fingerprint reuse the daemon's
+                                       initialization rather than repeating it post-fork.
     """
     super(PailgunService, self).__init__()
     self._bind_addr = bind_addr
@@ -36,9 +43,12 @@ class PailgunService(PantsService):
     self._runner_class = runner_class
     self._target_roots_calculator = target_roots_calculator
     self._scheduler_service = scheduler_service
+    self._options_fingerprint = options_fingerprint
 
     self._logger = logging.getLogger(__name__)
     self._pailgun = None
+    # Serializes the options bootstrap of concurrent requests: see `_parse_options`.
+    self._options_lock = threading.Lock()
 
   @property
   def pailgun(self):
@@ -50,6 +60,27 @@ class PailgunService(PantsService):
   def pailgun_port(self):
     return self.pailgun.server_port
 
+  def _can_reuse_initialization(self, options_bootstrapper):
+    """Whether a run with the given bootstrap options may reuse the daemon's loaded backends,
+    plugins and goals (and so the options parsed against them)."""
+    return (self._options_fingerprint is not None and
+            self._options_fingerprint == OptionsFingerprinter.daemon_options_fingerprint(
+              options_bootstrapper.get_bootstrap_options()))
+
+  def _parse_options(self, arguments, environment):
+    """Parses the options of a run, returning its `OptionsBootstrapper` and `Options`.
+
+    Each request is handled in its own thread, but bootstrapping options (which may load backends
+    and plugins) mutates global state that is not thread-safe, so it is serialized. It also
+    excludes forks (which hold the fork lock for writing), so that no child is forked while another
+    thread holds a lock mid-parse (eg: in logging or pkg_resources) which the child would inherit.
+    """
+    with self.fork_lock.read_locked(), self._options_lock:
+      options_bootstrapper = OptionsBootstrapper(env=environment, args=arguments)
+      build_config = BuildConfigInitializer.get(options_bootstrapper)
+      options = OptionsInitializer.create(options_bootstrapper, build_config)
+    return options_bootstrapper, options
+
   def _setup_pailgun(self):
     """Sets up a PailgunServer instance."""
     # Constructs and returns a runnable PantsRunner.
@@ -59,19 +90,19 @@ class PailgunService(PantsService):
       deferred_exc = None
 
       self._logger.debug('execution commandline: %s', arguments)
-      options_bootstrapper = OptionsBootstrapper(args=arguments)
-      build_config = BuildConfigInitializer.get(options_bootstrapper)
-      options = OptionsInitializer.create(options_bootstrapper, build_config)
+      options_bootstrapper, options = self._parse_options(arguments, environment)
 
-      graph_helper, target_roots = None, None
+      graph_helper, target_roots, warm_wait_time = None, None, None
+      product_graph_stats = None
       try:
         self._logger.debug('warming the product graph via %s', self._scheduler_service)
         # N.B. This call is made in the pre-fork daemon context for reach and reuse of the
         # resident scheduler.
-        graph_helper, target_roots = self._scheduler_service.warm_product_graph(
+        graph_helper, target_roots, warm_wait_time = self._scheduler_service.warm_product_graph(
           options,
           self._target_roots_calculator
         )
+        product_graph_stats = self._scheduler_service.product_graph_stats()
       except Exception:
         deferred_exc = sys.exc_info()
         self._logger.warning(
@@ -79,6 +110,13 @@ class PailgunService(PantsService):
           ''.join(traceback.format_exception(*deferred_exc))
         )
 
+      # N.B. Options are parsed against the daemon's `BuildConfiguration`: if that isn't valid for
+      # this run, the run will reload its backends and plugins and re-parse its options post-fork.
+      if not self._can_reuse_initialization(options_bootstrapper):
+        self._logger.debug('bootstrap options differ from those of the daemon, not reusing its '
+                           'initialization')
+        options = None
+
       return self._runner_class(
         sock,
         exiter,
@@ -87,7 +125,11 @@ class PailgunService(PantsService):
         target_roots,
         graph_helper,
         self.fork_lock,
-        deferred_exc
+        deferred_exc,
+        warm_wait_time,
+        product_graph_stats,
+        options_bootstrapper,
+        options
       )
 
     # Plumb the daemon's lifecycle lock to the `PailgunServer` to safeguard teardown.
@@ -38,9 +38,11 @@ class PantsService(AbstractClass):
                                            can be used by individual services to safeguard
                                            daemon-synchronous sections that should be protected
                                            from abrupt teardown.
-    :param threading.RLock fork_lock: A lock to guard pantsd->runner forks. This can be used by
-                                      services to safeguard resources held by threads at fork
-                                      time, so that we can fork without deadlocking.
+    :param ReadWriteLock fork_lock: A lock to guard pantsd->runner forks. This can be used by
+                                    services to safeguard resources held by threads at fork
+                                    time, so that we can fork without deadlocking. Holding it
+                                    for reading permits concurrent use of the resources, but
+                                    excludes forks.
     """
     self.lifecycle_lock = lifecycle_lock
     self.fork_lock = fork_lock
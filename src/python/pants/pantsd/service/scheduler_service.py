@@ -9,9 +9,12 @@ import logging
 import os
 import Queue
 import threading
+import time
+from collections import OrderedDict
 
 from twitter.common.dirutil import Fileset
 
+from pants.engine.legacy.graph import OwnersIndex
 from pants.pantsd.service.pants_service import PantsService
 
 
@@ -25,6 +28,17 @@ class SchedulerService(PantsService):
 
   QUEUE_SIZE = 64
 
+  # Events are coalesced until none have arrived for a settle window, but for no longer than this
+  # many settle windows, so that a steady stream of events cannot defer invalidation indefinitely.
+  MAX_SETTLE_WINDOWS = 10
+
+  # When the product graph exceeds its node budget, cold directories are evicted until the graph
+  # shrinks to this fraction of the budget, so that eviction isn't triggered again immediately.
+  EVICTION_TARGET_FRACTION = 0.8
+  # The fraction of the tracked directories that are evicted at a time, each under a separate
+  # (brief) hold of the fork lock so that client sessions can interleave with eviction.
+  EVICTION_BATCH_FRACTION = 0.1
+
   def __init__(
     self,
     fs_event_service,
@@ -32,6 +46,8 @@ class SchedulerService(PantsService):
     build_root,
     invalidation_globs,
     pantsd_pidfile,
+    max_graph_nodes=None,
+    invalidation_settle_window=0,
   ):
     """
     :param FSEventService fs_event_service: An unstarted FSEventService instance for setting up
@@ -41,6 +57,11 @@ class SchedulerService(PantsService):
     :param str build_root: The current build root.
     :param list invalidation_globs: A list of `globs` that when encountered in filesystem event
                                     subscriptions will tear down the daemon.
+    :param int max_graph_nodes: If set, the product graph is kept to this many nodes by evicting
+                                the subgraphs of the least recently used directories.
+    :param float invalidation_settle_window: The seconds to wait for further filesystem events
+                                             before invalidating the files of those received so
+                                             far as one batch.
     """
     super(SchedulerService, self).__init__()
     self._fs_event_service = fs_event_service
@@ -55,6 +76,22 @@ class SchedulerService(PantsService):
     self._watchman_is_running = threading.Event()
     self._invalidating_files = set()
 
+    self._max_graph_nodes = max_graph_nodes
+    # The directories containing the targets of warmed requests, least recently used first, mapped
+    # to the paths (directories, BUILD files and sources) whose nodes root the targets' subgraphs.
+    self._recently_used_dirs = OrderedDict()
+    self._recently_used_dirs_lock = threading.Lock()
+    # When eviction cannot shrink the graph to its target, it is not attempted again until the
+    # graph has grown past this size.
+    self._eviction_backoff_len = 0
+    self._evicted_node_count = 0
+    self._eviction_count = 0
+
+    self._invalidation_settle_window = invalidation_settle_window
+    self._invalidated_node_count = 0
+    self._invalidation_batch_count = 0
+    self._last_invalidation_latency = None
+
   @staticmethod
   def _combined_invalidating_fileset_from_globs(glob_strs, root):
     return set.union(*(Fileset.globs(glob_str, root=root)() for glob_str in glob_strs))
@@ -81,7 +118,7 @@ class SchedulerService(PantsService):
     """Watchman filesystem event handler for BUILD/requirements.txt updates. Called via a thread."""
     self._logger.info('enqueuing {} changes for subscription {}'
                       .format(len(event['files']), event['subscription']))
-    self._event_queue.put(event)
+    self._event_queue.put((time.time(), event))
 
   def _maybe_invalidate_scheduler_batch(self, files):
     invalidating_files = self._invalidating_files
@@ -111,44 +148,88 @@ class SchedulerService(PantsService):
     else:
       return False
 
-  def _handle_batch_event(self, files):
+  def _handle_batch_event(self, files, first_event_time):
     self._logger.debug('handling change event for: %s', files)
 
     with self.lifecycle_lock:
       self._maybe_invalidate_scheduler_batch(files)
 
-    with self.fork_lock:
-      self._scheduler.invalidate_files(files)
+    # Invalidation writes to the product graph shared by client sessions, so it excludes them, but
+    # only for as long as it takes to dirty the affected nodes.
+    with self.fork_lock.write_locked() as waited:
+      invalidated = self._scheduler.invalidate_files(files)
 
-  def _process_event_queue(self):
-    """File event notification queue processor."""
+    latency = time.time() - first_event_time
+    self._invalidated_node_count += invalidated
+    self._invalidation_batch_count += 1
+    self._last_invalidation_latency = latency
+    self._logger.info('invalidated {} nodes for a batch of {} files {:.3f}s after its first event '
+                      '(waited {:.3f}s for the fork lock)'
+                      .format(invalidated, len(files), latency, waited))
+
+  def _drain_event_queue(self):
+    """Returns the events received until the queue settles, or an empty list if there were none.
+
+    :returns: A list of `(enqueue time, event)` tuples.
+    """
     try:
-      event = self._event_queue.get(timeout=1)
+      events = [self._event_queue.get(timeout=1)]
     except Queue.Empty:
-      return
+      return []
 
-    try:
-      subscription, is_initial_event, files = (event['subscription'],
-                                               event['is_fresh_instance'],
-                                               [f.decode('utf-8') for f in event['files']])
-    except (KeyError, UnicodeDecodeError) as e:
-      self._logger.warn('%r raised by invalid watchman event: %s', e, event)
-      return
+    deadline = time.time() + self._invalidation_settle_window * self.MAX_SETTLE_WINDOWS
+    while True:
+      # N.B. Once the deadline has passed, events that have already been queued are still drained.
+      timeout = max(0, min(self._invalidation_settle_window, deadline - time.time()))
+      try:
+        events.append(self._event_queue.get(timeout=timeout))
+      except Queue.Empty:
+        return events
 
-    self._logger.debug('processing {} files for subscription {} (first_event={})'
-                       .format(len(files), subscription, is_initial_event))
+  def _process_event_queue(self):
+    """File event notification queue processor.
+
+    Events received within a settle window of one another are coalesced, so that a burst of events
+    (e.g. from a `git checkout`) invalidates their combined files in one batch.
+    """
+    events = self._drain_event_queue()
+    if not events:
+      return
 
-    # The first watchman event is a listing of all files - ignore it.
-    if not is_initial_event:
-      if subscription == self._fs_event_service.PANTS_PID_SUBSCRIPTION_NAME:
-        self._maybe_invalidate_scheduler_pidfile()
-      else:
-        self._handle_batch_event(files)
+    first_event_time = min(enqueued for enqueued, _ in events)
+    batch_files = set()
+    check_pidfile = False
+    for _, event in events:
+      try:
+        subscription, is_initial_event, files = (event['subscription'],
+                                                 event['is_fresh_instance'],
+                                                 [f.decode('utf-8') for f in event['files']])
+      except (KeyError, UnicodeDecodeError) as e:
+        self._logger.warn('%r raised by invalid watchman event: %s', e, event)
+        continue
+
+      self._logger.debug('processing {} files for subscription {} (first_event={})'
+                         .format(len(files), subscription, is_initial_event))
+
+      # The first watchman event is a listing of all files - ignore it.
+      if not is_initial_event:
+        if subscription == self._fs_event_service.PANTS_PID_SUBSCRIPTION_NAME:
+          check_pidfile = True
+        else:
+          batch_files.update(files)
+
+    if check_pidfile:
+      self._maybe_invalidate_scheduler_pidfile()
+    if batch_files:
+      self._logger.debug('coalesced {} events into a batch of {} files'
+                         .format(len(events), len(batch_files)))
+      self._handle_batch_event(sorted(batch_files), first_event_time)
 
     if not self._watchman_is_running.is_set():
       self._watchman_is_running.set()
 
-    self._event_queue.task_done()
+    for _ in events:
+      self._event_queue.task_done()
 
   def product_graph_len(self):
     """Provides the size of the captive product graph.
@@ -157,10 +238,106 @@ class SchedulerService(PantsService):
     """
     return self._scheduler.graph_len()
 
+  def product_graph_stats(self):
+    """Provides the size of the captive product graph, how much of it has been evicted or
+    invalidated, and counts of the filesystem events that invalidate it.
+
+    :returns: A dict of stat name to value.
+    """
+    stats = self._fs_event_service.event_stats()
+    stats.update({
+      'product_graph_size': self.product_graph_len(),
+      'product_graph_evicted_nodes': self._evicted_node_count,
+      'product_graph_evictions': self._eviction_count,
+      'product_graph_invalidated_nodes': self._invalidated_node_count,
+      'product_graph_invalidation_batches': self._invalidation_batch_count,
+      'product_graph_last_invalidation_latency': self._last_invalidation_latency,
+    })
+    return stats
+
+  @staticmethod
+  def _evictable_paths(hydrated_target):
+    """Returns the paths of the filesystem nodes that a HydratedTarget was computed from.
+
+    The root directory is excluded: every recursive spec scans it, so evicting it would evict the
+    whole graph.
+    """
+    paths = {hydrated_target.address.spec_path}
+    for path in OwnersIndex.owned_files(hydrated_target):
+      paths.add(path)
+      paths.add(os.path.dirname(path))
+    paths.discard('')
+    return paths
+
+  def _mark_used(self, transitive_hydrated_targets):
+    paths_by_dir = {}
+    for transitive_hydrated_target in transitive_hydrated_targets:
+      for hydrated_target in transitive_hydrated_target.closure:
+        paths = paths_by_dir.setdefault(hydrated_target.address.spec_path, set())
+        paths.update(self._evictable_paths(hydrated_target))
+    with self._recently_used_dirs_lock:
+      for d, paths in paths_by_dir.items():
+        self._recently_used_dirs[d] = self._recently_used_dirs.pop(d, set()) | paths
+
+  def _least_recently_used_paths(self):
+    with self._recently_used_dirs_lock:
+      count = max(1, int(len(self._recently_used_dirs) * self.EVICTION_BATCH_FRACTION))
+      paths = set()
+      for _ in range(min(count, len(self._recently_used_dirs))):
+        paths.update(self._recently_used_dirs.popitem(last=False)[1])
+      return paths
+
+  def _maybe_evict_product_graph(self):
+    """Evicts cold subgraphs from the product graph if it has exceeded its node budget.
+
+    The dependencies of a target are always used at least as recently as the target itself, so
+    evicting the nodes of the least recently used directories' files (along with their dependents)
+    does not evict the nodes of recently used directories.
+
+    If the graph cannot be shrunk to its target (because its remaining nodes are not rooted in
+    tracked files), eviction backs off until the graph has grown by the eviction headroom again,
+    rather than evicting the nodes of each newly warmed request as soon as it completes.
+    """
+    if not self._max_graph_nodes or not self._recently_used_dirs:
+      return
+    graph_len = self._scheduler.graph_len()
+    if graph_len <= self._max_graph_nodes:
+      self._eviction_backoff_len = 0
+      return
+    if graph_len <= self._eviction_backoff_len:
+      return
+
+    target_len = int(self._max_graph_nodes * self.EVICTION_TARGET_FRACTION)
+    evicted = 0
+    while graph_len > target_len:
+      paths = self._least_recently_used_paths()
+      if not paths:
+        break
+      with self.fork_lock.write_locked():
+        batch_evicted = self._scheduler.invalidate_paths(paths)
+        graph_len = self._scheduler.graph_len()
+      if not batch_evicted:
+        break
+      evicted += batch_evicted
+
+    if graph_len > target_len:
+      self._eviction_backoff_len = graph_len + self._max_graph_nodes - target_len
+      self._logger.warning('product graph has {} nodes, but there is nothing left to evict: '
+                           'not evicting again until it has {} nodes'
+                           .format(graph_len, self._eviction_backoff_len))
+    self._evicted_node_count += evicted
+    self._eviction_count += 1
+    self._logger.info('evicted {} nodes from the product graph, which now has {} nodes'
+                      .format(evicted, graph_len))
+
   def warm_product_graph(self, options, target_roots_calculator):
     """Runs an execution request against the captive scheduler given a set of input specs to warm.
 
-    :returns: `(LegacyGraphSession, TargetRoots)`
+    Each call gets an isolated session, and concurrent calls warm the shared product graph
+    concurrently: they exclude only forks and invalidation.
+
+    :returns: `(LegacyGraphSession, TargetRoots, float)`, where the float is the number of seconds
+              spent waiting to read the product graph.
     """
     # If any nodes exist in the product graph, wait for the initial watchman event to avoid
     # racing watchman startup vs invalidation events.
@@ -171,16 +348,18 @@ class SchedulerService(PantsService):
 
     session = self._graph_helper.new_session()
 
-    with self.fork_lock:
+    with self.fork_lock.read_locked() as waited:
       target_roots = target_roots_calculator.create(
         options,
         session,
         session.symbol_table,
       )
-      session.warm_product_graph(target_roots)
-      return session, target_roots
+      transitive_hydrated_targets = session.warm_product_graph(target_roots)
+    self._mark_used(transitive_hydrated_targets)
+    return session, target_roots, waited
 
   def run(self):
     """Main service entrypoint."""
     while not self.is_killed:
       self._process_event_queue()
+      self._maybe_evict_product_graph()
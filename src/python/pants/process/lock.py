@@ -13,7 +13,7 @@ import sys
 import psutil
 from fasteners import InterProcessLock
 
-from pants.util.dirutil import safe_delete
+from pants.util.dirutil import safe_concurrent_creation, safe_delete, safe_mkdir_for
 
 
 logger = logging.getLogger(__name__)
@@ -64,3 +64,41 @@ class OwnerPrintingInterProcessFileLock(InterProcessLock):
     if self.acquired:
       safe_delete(self.message_path)
     return super(OwnerPrintingInterProcessFileLock, self).release()
+
+
+def merge_entries_file(path, read, write, updated, removed=(), keep=None):
+  """Merges entries into a file of entries shared by concurrent processes, and replaces it.
+
+  The current entries of the file are read under an `OwnerPrintingInterProcessFileLock` on
+  `<path>.lock`, so that entries merged by concurrent processes are not lost. The merged entries are
+  written to a temporary file which atomically replaces the file, so readers that do not take the
+  lock never observe a partially written file.
+
+  :param str path: The file of entries.
+  :param read: A function returning the current entries of the file as a dict, or an empty dict if
+               it does not exist.
+  :param write: A function of (file object, entries dict) which writes the given entries to the
+                binary file object.
+  :param dict updated: Entries to add to or replace in the file.
+  :param iterable removed: Keys of entries to remove from the file.
+  :param keep: An optional predicate of an entry key: entries for which it returns False are
+               pruned from the file, eg because the file or target they describe no longer exists.
+  :returns: The merged entries.
+  :rtype: dict
+  """
+  safe_mkdir_for(path)
+  lock = OwnerPrintingInterProcessFileLock('{}.lock'.format(path))
+  lock.acquire(message_fn=logger.debug)
+  try:
+    entries = read()
+    entries.update(updated)
+    for key in removed:
+      entries.pop(key, None)
+    if keep is not None:
+      entries = {key: entry for key, entry in entries.items() if keep(key)}
+    with safe_concurrent_creation(path) as tmp:
+      with open(tmp, 'wb') as fp:
+        write(fp, entries)
+    return entries
+  finally:
+    lock.release()
@@ -77,6 +77,10 @@ pants = {
   // Creates an object that knows how to poll multiple files by periodically hitting the server.
   // Each polled file is associated with an id, so we can multiplex multiple pollings on
   // on a single server request.
+  //
+  // If the browser supports server-sent events, the files are instead streamed by the server
+  // as they change, over a single connection that is re-established whenever the set of files
+  // changes.
   createPoller: function() {
 
     // State of each file we're polling.
@@ -89,19 +93,69 @@ pants = {
     // Only allow one request in-flight at a time.
     var inFlight = false;
 
-    function pollOnce() {
-      function forgetId(id) {
-        delete polledFileStates[id];
-        var n = 0;
-        $.each(polledFileStates, function(k, v) { n += 1; });
-        if (!n) {
-          window.clearInterval(pollingEvent);
-          pollingEvent = undefined;
-        }
+    // Whether to stream the files rather than polling for them.
+    var streaming = !!window.EventSource;
+
+    // The stream of the files, when streaming.
+    var eventSource = undefined;
+
+    // A handle to a pending restart of the stream, so that many changes to the set of files
+    // result in a single restart.
+    var streamRestartEvent = undefined;
+
+    function createRequestEntry(state, id) {
+      return { id: id, path: state.path, pos: state.pos, replace: state.replace };
+    }
+
+    function forgetId(id) {
+      delete polledFileStates[id];
+      var n = 0;
+      $.each(polledFileStates, function(k, v) { n += 1; });
+      if (!n && pollingEvent) {
+        window.clearInterval(pollingEvent);
+        pollingEvent = undefined;
       }
+    }
+
+    // Appends or replaces the content of each file in data. Streamed data for a file that is being
+    // stopped is ignored: its remaining content is fetched by a final poll instead.
+    function handleData(data, streamed) {
+      $.each(data, function(id, val) {
+        if (id in polledFileStates) {
+          var state = polledFileStates[id];
+          if (streamed && state.toBeStopped) {
+            return;
+          }
+          // Execute the initFunc exactly once.
+          if (!state.hasBeenPolledAtLeastOnce) {
+            if (state.initFunc) { state.initFunc(); }
+            state.hasBeenPolledAtLeastOnce = true;
+          }
+          if (state.predicate ? state.predicate(val) : true) {
+            if (state.replace) {
+              // Replacing can reset view state, so only do it if we have to.
+              if (val != state.currentVal) {
+                $(state.selector).html(val);
+              }
+            } else {
+              $(state.selector).append(val);
+              state.pos += val.length;
+            }
+            state.currentVal = val;
+          }
+        }
+      });
+    }
 
-      function createRequestEntry(state, id) {
-        return { id: id, path: state.path, pos: state.pos };
+    function pollOnce() {
+      function checkForStopped() {
+        var toDelete = [];
+        $.each(polledFileStates, function(id, state) {
+          if (state.toBeStopped && state.hasBeenPolledAtLeastOnce) {
+            toDelete.push(id);
+          }
+        });
+        $.each(toDelete, function(idx, id) { forgetId(id); });
       }
 
       if (!inFlight) {
@@ -112,41 +166,7 @@ pants = {
           data: { q: JSON.stringify($.map(polledFileStates, createRequestEntry))},
           dataType: 'json',
           success: function(data, textStatus, jqXHR) {
-            function appendNewData() {
-              $.each(data, function(id, val) {
-                if (id in polledFileStates) {
-                  var state = polledFileStates[id];
-                  // Execute the initFunc exactly once.
-                  if (!state.hasBeenPolledAtLeastOnce) {
-                    if (state.initFunc) { state.initFunc(); }
-                    state.hasBeenPolledAtLeastOnce = true;
-                  }
-                  if (state.predicate ? state.predicate(val) : true) {
-                    if (state.replace) {
-                      // Replacing can reset view state, so only do it if we have to.
-                      if (val != state.currentVal) {
-                        $(state.selector).html(val);
-                      }
-                    } else {
-                      $(state.selector).append(val);
-                      state.pos += val.length;
-                    }
-                    state.currentVal = val;
-                  }
-                }
-              });
-            }
-
-            function checkForStopped() {
-              var toDelete = [];
-              $.each(polledFileStates, function(id, state) {
-                if (state.toBeStopped && state.hasBeenPolledAtLeastOnce) {
-                  toDelete.push(id);
-                }
-              });
-              $.each(toDelete, function(idx, id) { forgetId(id); });
-            }
-            appendNewData();
+            handleData(data, false);
             checkForStopped();
           },
           error: function(jqXHR, textStatus, errorThrown) {
@@ -159,6 +179,56 @@ pants = {
       }
     }
 
+    function restartStream() {
+      streamRestartEvent = undefined;
+      if (eventSource) {
+        eventSource.close();
+        eventSource = undefined;
+      }
+      var entries = [];
+      $.each(polledFileStates, function(id, state) {
+        if (!state.toBeStopped) {
+          entries.push(createRequestEntry(state, id));
+        }
+      });
+      if (entries.length) {
+        eventSource = new EventSource('/stream?' + $.param({ q: JSON.stringify(entries) }));
+        eventSource.onmessage = function(event) {
+          handleData(JSON.parse(event.data), true);
+        };
+        eventSource.onerror = function() {
+          // The positions in the stream's request are stale by now, so rather than letting the
+          // browser reconnect with them, reconnect with the current positions after a pause.
+          eventSource.close();
+          eventSource = undefined;
+          scheduleStreamRestart(1000);
+        };
+      }
+    }
+
+    function scheduleStreamRestart(delay) {
+      if (streamRestartEvent) {
+        window.clearTimeout(streamRestartEvent);
+      }
+      streamRestartEvent = window.setTimeout(restartStream, delay);
+    }
+
+    // Fetches the remaining content of a streamed file that is being stopped, and then forgets it.
+    function finishStreaming(id) {
+      $.ajax({
+        url: '/poll',
+        type: 'GET',
+        data: { q: JSON.stringify([createRequestEntry(polledFileStates[id], id)]) },
+        dataType: 'json',
+        success: function(data, textStatus, jqXHR) {
+          handleData(data, false);
+        },
+        complete: function(jqXHR, textStatus) {
+          forgetId(id);
+        }
+      });
+    }
+
     function doStartPolling(id, path, targetSelector, initFunc, predicate, replace) {
       polledFileStates[id] = {
         path: path,  // Path of file on server to poll, relative to build root.
@@ -171,15 +241,21 @@ pants = {
         hasBeenPolledAtLeastOnce: false,
         toBeStopped: false
       };
-      if (!pollingEvent) {
+      if (streaming) {
+        scheduleStreamRestart(0);
+      } else if (!pollingEvent) {
         pollingEvent = window.setInterval(pollOnce, 200);
       }
     }
 
     // Stop the specified polling.
     function doStopPolling(id) {
-      if (id in polledFileStates) {
+      if (id in polledFileStates && !polledFileStates[id].toBeStopped) {
         polledFileStates[id].toBeStopped = true;
+        if (streaming) {
+          finishStreaming(id);
+          scheduleStreamRestart(0);
+        }
       }
     }
 
@@ -70,6 +70,8 @@ class HtmlReporter(Reporter):
     # Useful for preventing too-frequent overwrites of, e.g., timing stats,
     # which can noticeably slow down short pants runs with many workunits.
     self._last_overwrite_time = {}
+    # Map from filename to the content we last wrote to that file.
+    self._last_overwrite_content = {}
 
   def report_path(self):
     """The path to the main report file."""
@@ -448,8 +450,13 @@ class HtmlReporter(Reporter):
     # Overwrite only once per second.
     if (now - last_overwrite_time >= 1000) or force:
       if os.path.exists(self._html_dir):  # Make sure we're not immediately after a clean-all.
-        with open(os.path.join(self._html_dir, filename), 'w') as f:
-          f.write(func())
+        content = func()
+        # Skip unchanged content, which would otherwise be re-sent to every client watching the
+        # file via the reporting server.
+        if content != self._last_overwrite_content.get(filename):
+          with open(os.path.join(self._html_dir, filename), 'w') as f:
+            f.write(content)
+          self._last_overwrite_content[filename] = content
       self._last_overwrite_time[filename] = now
 
   def _htmlify_text(self, s):
@@ -13,6 +13,9 @@ import mimetypes
 import os
 import pkgutil
 import re
+import SocketServer
+import stat
+import time
 import urllib
 import urlparse
 from collections import namedtuple
@@ -35,6 +38,40 @@ logger = logging.getLogger(__name__)
 PPP_RE = re.compile("""^lang-.*\.js$""")
 
 
+class _FileTail(object):
+  """Tracks the content of a file, re-reading it only when its size or modification time change."""
+
+  def __init__(self, abspath, pos, replace):
+    """
+    :param string abspath: The file to track.
+    :param int pos: The byte position in the file to read from.
+    :param bool replace: True if the file is overwritten rather than appended to, in which case its
+                         whole content is read on each change.
+    """
+    self._abspath = abspath
+    self._pos = pos
+    self._replace = replace
+    self._signature = None
+
+  def read_changes(self):
+    """Returns the content of the file that is new since the last call, or None if unchanged."""
+    try:
+      st = os.stat(self._abspath)
+    except OSError:
+      return None
+    signature = (st.st_size, st.st_mtime)
+    if not stat.S_ISREG(st.st_mode) or signature == self._signature:
+      return None
+    self._signature = signature
+    with open(self._abspath, 'r') as infile:
+      if self._replace:
+        return infile.read()
+      infile.seek(self._pos)
+      content = infile.read()
+      self._pos += len(content)
+      return content
+
+
 class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
   """A handler that demultiplexes various pants reporting URLs."""
 
@@ -53,6 +90,7 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
       ('/content/', self._handle_content),  # Show content of file.
       ('/assets/', self._handle_assets),  # Statically serve assets (css, js etc.)
       ('/poll', self._handle_poll),  # Handle poll requests for raw file content.
+      ('/stream', self._handle_stream),  # Stream raw file content as it changes.
       ('/latestrunid', self._handle_latest_runid),  # Return id of latest pants run.
       ('/favicon.ico', self._handle_favicon)  # Return favicon.
     ]
@@ -226,6 +264,54 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
             ret[_id] = content
     self._send_content(json.dumps(ret), 'application/json')
 
+  # How often streamed files are checked for changes.
+  STREAM_INTERVAL_SECS = 0.2
+  # How often a comment is sent to idle streams, to detect disconnected clients.
+  STREAM_KEEPALIVE_SECS = 10
+
+  def _handle_stream(self, relpath, params):
+    """Stream raw file contents as server-sent events, as the files change.
+
+    Takes the same request as `_handle_poll` (with an additional `replace` field for files that are
+    overwritten rather than appended to), and sends events with the same data as its responses:
+    first for all of the requested files that exist, and then for those that have changed. The
+    stream lasts until the client disconnects.
+    """
+    request = json.loads(params.get('q')[0])
+    tails = {}
+    for poll in request:
+      path = poll.get('path', None)
+      if path:
+        abspath = os.path.normpath(os.path.join(self._root, path))
+        tails[poll.get('id', None)] = _FileTail(abspath,
+                                                poll.get('pos', 0),
+                                                poll.get('replace', False))
+
+    self.send_response(200)
+    self.send_header('Content-Type', 'text/event-stream')
+    self.send_header('Cache-Control', 'no-cache')
+    self.end_headers()
+
+    last_write_time = None
+    while True:
+      changes = {}
+      for _id, tail in tails.items():
+        content = tail.read_changes()
+        if content is not None:
+          changes[_id] = content
+      now = time.time()
+      if changes or last_write_time is None:
+        self.wfile.write('data: {}\n\n'.format(json.dumps(changes)))
+      elif now - last_write_time >= self.STREAM_KEEPALIVE_SECS:
+        self.wfile.write(': keepalive\n\n')
+      else:
+        time.sleep(self.STREAM_INTERVAL_SECS)
+        continue
+      # A disconnected client fails the write or flush with an IOError, which ends the stream.
+      self.wfile.flush()
+      last_write_time = now
+      time.sleep(self.STREAM_INTERVAL_SECS)
+
   def _handle_latest_runid(self, relpath, params):
     """Handle request for the latest run id.
 
@@ -371,6 +457,16 @@ class PantsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
     """Silence BaseHTTPRequestHandler's logging."""
 
 
+class ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+  """An HTTP server that handles each request in a thread of its own.
+
+  Streamed requests last as long as their client watches a run, so requests must not be handled
+  serially.
+  """
+
+  daemon_threads = True
+
+
 class ReportingServer(object):
   """Reporting Server HTTP server."""
 
@@ -395,7 +491,7 @@ class ReportingServer(object):
       def __init__(self, request, client_address, server):
         PantsHandler.__init__(self, settings, renderer, request, client_address, server)
 
-    self._httpd = BaseHTTPServer.HTTPServer(('', port), MyHandler)
+    self._httpd = ThreadingHTTPServer(('', port), MyHandler)
     self._httpd.timeout = 0.1  # Not the network timeout, but how often handle_request yields.
 
   def server_port(self):
@@ -41,5 +41,11 @@ class Changed(Subsystem):
              help='Calculate changes contained within given scm spec (commit range/sha/ref/etc).')
     register('--include-dependees', choices=['none', 'direct', 'transitive'], default='none',
              help='Include direct or transitive dependees of changed targets.')
+    register('--dependee-index', advanced=True, type=bool, default=False,
+             help='Find the dependees of changed targets with an index that is persisted across '
+                  'runs, and which re-parses only the BUILD files changed since it was last used, '
+                  'rather than by parsing every BUILD file. Unlike a full parse, this does not '
+                  'validate the BUILD files of unrelated targets, and dependencies that targets '
+                  'compute from options are not updated until their BUILD files change.')
     register('--fast', type=bool,
              help='Stop searching for owners once a source is mapped to at least one owning target.')
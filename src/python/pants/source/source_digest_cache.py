@@ -0,0 +1,161 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import binascii
+import errno
+import logging
+import os
+import threading
+import time
+from hashlib import sha1
+
+from pants.process.lock import merge_entries_file
+from pants.subsystem.subsystem import Subsystem
+from pants.util.memo import memoized_property
+
+
+logger = logging.getLogger(__name__)
+
+
+def file_digest(path):
+  """Returns the sha1 digest of the content of the given file."""
+  hasher = sha1()
+  with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(64 * 1024), b''):
+      hasher.update(chunk)
+  return hasher.digest()
+
+
+class SourceDigestCache(object):
+  """A persistent cache of the digests of source files, keyed by the stat of each file.
+
+  Like git's index, a file whose path, inode, mtime and size are unchanged since it was last hashed
+  is assumed to have unchanged content, so only a stat is needed to produce its digest.
+
+  To avoid trusting a file that was modified within the granularity of its mtime after it was
+  hashed (the "racy git" problem), digests are not cached for files modified within the last
+  `RACY_SECONDS`.
+
+  The cache is shared by concurrent processes: `save` merges the entries computed by this process
+  into the current content of the cache file under a lock, and atomically replaces it. Entries for
+  files that no longer exist are dropped when the cache is saved.
+  """
+
+  RACY_SECONDS = 2
+
+  def __init__(self, path):
+    """
+    :param str path: The file to persist the cache in.
+    """
+    self._path = path
+    self._lock = threading.Lock()
+    self._entries = None
+    self._dirty = {}
+    self.computed = 0
+    self.reused = 0
+
+  def digest(self, path):
+    """Returns the sha1 digest of the content of the file at the given absolute path."""
+    stat = os.stat(path)
+    key = (stat.st_ino, stat.st_mtime, stat.st_size)
+    entry = self._load().get(path)
+    if entry is not None and entry[0] == key:
+      with self._lock:
+        self.reused += 1
+      return entry[1]
+
+    digest = file_digest(path)
+    with self._lock:
+      self.computed += 1
+      if stat.st_mtime + self.RACY_SECONDS < time.time():
+        self._entries[path] = self._dirty[path] = (key, digest)
+    return digest
+
+  def save(self):
+    """Persist digests computed since the cache was loaded, if any.
+
+    Entries for files that no longer exist are dropped.
+    """
+    with self._lock:
+      dirty, self._dirty = self._dirty, {}
+    if dirty:
+      merge_entries_file(self._path, self._read, self._write, dirty, keep=os.path.isfile)
+
+  def _load(self):
+    if self._entries is None:
+      with self._lock:
+        if self._entries is None:
+          self._entries = self._read()
+    return self._entries
+
+  @staticmethod
+  def _write(fp, entries):
+    for path, ((ino, mtime, size), digest) in entries.items():
+      fp.write('{}\t{}\t{!r}\t{}\t{}\n'.format(path, ino, mtime, size, binascii.hexlify(digest))
+               .encode('utf-8'))
+
+  def _read(self):
+    entries = {}
+    try:
+      with open(self._path, 'rb') as fp:
+        for line in fp:
+          fields = line.decode('utf-8').rstrip('\n').split('\t')
+          if len(fields) != 5:
+            continue
+          path, ino, mtime, size, digest = fields
+          try:
+            entries[path] = ((int(ino), float(mtime), int(size)), binascii.unhexlify(digest))
+          except (TypeError, ValueError, binascii.Error):
+            continue
+    except IOError as e:
+      if e.errno != errno.ENOENT:
+        raise
+    return entries
+
+
+class SourceDigests(Subsystem):
+  """Caches the digests of source files across runs."""
+
+  options_scope = 'source-digests'
+
+  @classmethod
+  def register_options(cls, register):
+    super(SourceDigests, cls).register_options(register)
+    register('--cache', advanced=True, type=bool, default=True,
+             help='Cache the digests of source files across runs, keyed by the stat of each '
+                  'file, so that unchanged sources need not be re-read to be fingerprinted.')
+
+  @classmethod
+  def digest(cls, path):
+    """Returns the sha1 digest of the content of the file at the given absolute path.
+
+    Uses the cache of the global instance if it is initialized and enabled.
+    """
+    cache = cls.global_instance().cache if cls.is_initialized() else None
+    return cache.digest(path) if cache else file_digest(path)
+
+  @memoized_property
+  def cache(self):
+    """The SourceDigestCache for this run, or None if caching is disabled."""
+    options = self.get_options()
+    if not options.cache:
+      return None
+    return SourceDigestCache(os.path.join(options.pants_workdir, 'source_digests', 'digests'))
+
+  def save(self, run_tracker=None):
+    """Persist the cache, and record how many digests were computed and reused.
+
+    :param RunTracker run_tracker: If specified, the counts are recorded in its run info.
+    """
+    cache = self.cache
+    if cache is None:
+      return
+    cache.save()
+    logger.debug('Source digests computed: {}, reused: {}'.format(cache.computed, cache.reused))
+    if run_tracker is not None:
+      run_tracker.run_info.add_infos(('source_digests_computed', cache.computed),
+                                     ('source_digests_reused', cache.reused))
@@ -13,6 +13,7 @@ from six import string_types
 from twitter.common.dirutil.fileset import Fileset
 
 from pants.base.build_environment import get_buildroot
+from pants.source.source_digest_cache import SourceDigests
 from pants.util.dirutil import fast_relpath, fast_relpath_optional
 from pants.util.memo import memoized_property
 from pants.util.meta import AbstractClass
@@ -129,8 +130,7 @@ class LazyFilesetWithSpec(FilesetWithSpec):
     h = sha1()
     for path in sorted(self.files):
       h.update(path)
-      with open(os.path.join(get_buildroot(), self.rel_root, path), 'rb') as f:
-        h.update(f.read())
+      h.update(SourceDigests.digest(os.path.join(get_buildroot(), self.rel_root, path)))
     return h.digest()
 
   def matches(self, path_from_buildroot):
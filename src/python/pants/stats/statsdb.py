@@ -5,9 +5,13 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import json
+import math
 import os
 import sqlite3
+import time
 from contextlib import contextmanager
+from itertools import groupby
 
 from pants.subsystem.subsystem import Subsystem
 from pants.util.dirutil import safe_mkdir_for
@@ -25,18 +29,52 @@ class StatsDBFactory(Subsystem):
     register('--path',
              default=os.path.join(register.bootstrap.pants_bootstrapdir, 'stats', 'statsdb.sqlite'),
              help='Location of statsdb file.')
+    register('--max-age-days', advanced=True, type=int, default=None,
+             help='If set, the stats of runs older than this many days are deleted, and the '
+                  'statsdb file compacted, at most once a day.')
 
   def get_db(self):
     """Returns a StatsDB instance configured by this factory."""
-    ret = StatsDB(self.get_options().path)
+    ret = StatsDB(self.get_options().path, max_age_days=self.get_options().max_age_days)
     ret.ensure_tables()
     return ret
 
 
 class StatsDB(object):
-  def __init__(self, path):
+  """A sqlite database of the stats of pants runs.
+
+  Besides the run info and workunit timings of each run, the per-goal timings, per-target data
+  and per-target artifact cache outcomes of runs are kept in narrow tables that carry the run
+  timestamp, and are indexed on it, so that the history of a goal or target is read without
+  scanning or joining the stats of other runs.
+  """
+
+  # The periods that timings may be grouped by, mapped to the sqlite expression for a timestamp's
+  # period.
+  PERIODS = {
+    'day': "date({}, 'unixepoch')",
+    'week': "strftime('%Y-W%W', {}, 'unixepoch')",
+    'month': "strftime('%Y-%m', {}, 'unixepoch')",
+  }
+
+  # The minimum number of seconds between compactions.
+  COMPACTION_INTERVAL_SECS = 24 * 60 * 60
+
+  # The label prefix of the cumulative timings of goals (i.e. of the workunits directly beneath
+  # the run tracker's main root workunit).
+  _GOAL_LABEL_PREFIX = 'main:'
+
+  _TIMING_TABLES = ('cumulative_timings', 'self_timings')
+  _HISTORY_TABLES = ('goal_timings', 'target_data', 'artifact_cache_outcomes')
+
+  def __init__(self, path, max_age_days=None):
+    """
+    :param string path: The path of the sqlite database file.
+    :param int max_age_days: If set, `maybe_compact` deletes the stats of runs older than this.
+    """
     super(StatsDB, self).__init__()
     self._path = path
+    self._max_age_days = max_age_days
 
   def ensure_tables(self):
     with self._cursor() as c:
@@ -57,6 +95,7 @@ class StatsDB(object):
         )
       """)
       create_index('run_info', 'cmd_line')
+      create_index('run_info', 'timestamp')
 
       def create_timings_table(tab):
         c.execute("""
@@ -68,37 +107,141 @@ class StatsDB(object):
           )
         """.format(tab=tab))
         create_index(tab, 'label')
+        create_index(tab, 'run_info_id')
+
+      for tab in self._TIMING_TABLES:
+        create_timings_table(tab)
+
+      c.execute("""
+        CREATE TABLE IF NOT EXISTS goal_timings (
+          run_info_id TEXT,
+          timestamp INTEGER,  -- Seconds since the epoch, of the run.
+          goal TEXT,
+          timing INTEGER,  -- Milliseconds
+          outcome TEXT,
+          FOREIGN KEY (run_info_id) REFERENCES run_info(id)
+        )
+      """)
+      c.execute("""
+        CREATE INDEX IF NOT EXISTS goal_timings_goal_timestamp_idx
+        ON goal_timings(goal, timestamp)
+      """)
+
+      c.execute("""
+        CREATE TABLE IF NOT EXISTS target_data (
+          run_info_id TEXT,
+          timestamp INTEGER,  -- Seconds since the epoch, of the run.
+          target TEXT,
+          scope TEXT,
+          key TEXT,  -- The dot-separated keys of the value, as reported for the target.
+          value,
+          FOREIGN KEY (run_info_id) REFERENCES run_info(id)
+        )
+      """)
+      c.execute("""
+        CREATE INDEX IF NOT EXISTS target_data_target_timestamp_idx
+        ON target_data(target, timestamp)
+      """)
 
-      create_timings_table('cumulative_timings')
-      create_timings_table('self_timings')
+      c.execute("""
+        CREATE TABLE IF NOT EXISTS artifact_cache_outcomes (
+          run_info_id TEXT,
+          timestamp INTEGER,  -- Seconds since the epoch, of the run.
+          cache_name TEXT,
+          target TEXT,
+          hit INTEGER,  -- 1 for a hit, 0 for a miss.
+          cause TEXT,
+          FOREIGN KEY (run_info_id) REFERENCES run_info(id)
+        )
+      """)
+      c.execute("""
+        CREATE INDEX IF NOT EXISTS artifact_cache_outcomes_target_timestamp_idx
+        ON artifact_cache_outcomes(target, timestamp)
+      """)
+      create_index('artifact_cache_outcomes', 'timestamp')
+
+      c.execute("""
+        CREATE TABLE IF NOT EXISTS metadata (
+          key TEXT PRIMARY KEY,
+          value
+        )
+      """)
 
   def insert_stats(self, stats):
-    try:
-      with self._cursor() as c:
-        ri = stats['run_info']
-        try:
-          c.execute("""INSERT INTO run_info VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    [ri['id'], int(float(ri['timestamp'])), ri['machine'], ri['user'],
-                     ri['version'], ri['buildroot'], ri['outcome'], ri['cmd_line']])
-        except KeyError as e:
-          raise StatsDBError('Failed to insert stats. Key {} not found in RunInfo: {}'.format(
-            e.args[0], str(ri)))
+    """Inserts the stats of a run, in a single transaction.
 
+    :param dict stats: The stats of a run, as gathered by `RunTracker.store_stats`.
+    """
+    try:
+      ri = stats['run_info']
+      try:
         rid = ri['id']
-        for table in ['cumulative_timings', 'self_timings']:
-          timings = stats[table]
-          for timing in timings:
-            try:
-              c.execute("""INSERT INTO {} VALUES (?, ?, ?)""".format(table),
-                        [rid, timing['label'], self._to_ms(timing['timing'])])
-            except KeyError as e:
-              raise StatsDBError('Failed to insert stats. Key {} not found in timing: {}'.format(
-                e.args[0], str(timing)))
+        timestamp = int(float(ri['timestamp']))
+        run_info_row = [rid, timestamp, ri['machine'], ri['user'], ri['version'], ri['buildroot'],
+                        ri['outcome'], ri['cmd_line']]
+      except KeyError as e:
+        raise StatsDBError('Failed to insert stats. Key {} not found in RunInfo: {}'.format(
+          e.args[0], str(ri)))
+
+      timing_rows = {}
+      for table in self._TIMING_TABLES:
+        timing_rows[table] = []
+        for timing in stats[table]:
+          try:
+            timing_rows[table].append([rid, timing['label'], self._to_ms(timing['timing'])])
+          except KeyError as e:
+            raise StatsDBError('Failed to insert stats. Key {} not found in timing: {}'.format(
+              e.args[0], str(timing)))
+
+      outcomes = stats.get('outcomes', {})
+      goal_timing_rows = [
+        [rid, timestamp, label[len(self._GOAL_LABEL_PREFIX):], ms, outcomes.get(label)]
+        for _, label, ms in timing_rows['cumulative_timings']
+        if label.startswith(self._GOAL_LABEL_PREFIX) and label.count(':') == 1
+      ]
 
+      target_data_rows = [
+        [rid, timestamp, target, scope, key, value]
+        for target, data_by_scope in ri.get('target_data', {}).items()
+        for scope, data in data_by_scope.items()
+        for key, value in self._flatten_target_data(data)
+      ]
+
+      artifact_cache_rows = []
+      for cache_stats in stats.get('artifact_cache_stats', []):
+        try:
+          cache_name = cache_stats['cache_name']
+          for hit, outcomes_key in ((1, 'hits'), (0, 'misses')):
+            for target, cause in cache_stats[outcomes_key]:
+              artifact_cache_rows.append([rid, timestamp, cache_name, target, hit, cause])
+        except KeyError as e:
+          raise StatsDBError('Failed to insert stats. Key {} not found in cache stats: {}'.format(
+            e.args[0], str(cache_stats)))
     except KeyError as e:
       raise StatsDBError('Failed to insert stats. Key {} not found in stats object.'.format(
         e.args[0]))
 
+    with self._cursor() as c:
+      c.execute("""INSERT INTO run_info VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", run_info_row)
+      for table, rows in timing_rows.items():
+        c.executemany("""INSERT INTO {} VALUES (?, ?, ?)""".format(table), rows)
+      c.executemany("""INSERT INTO goal_timings VALUES (?, ?, ?, ?, ?)""", goal_timing_rows)
+      c.executemany("""INSERT INTO target_data VALUES (?, ?, ?, ?, ?, ?)""", target_data_rows)
+      c.executemany("""INSERT INTO artifact_cache_outcomes VALUES (?, ?, ?, ?, ?, ?)""",
+                    artifact_cache_rows)
+
+  @classmethod
+  def _flatten_target_data(cls, data, prefix=''):
+    """Yields (dot-separated key, value) pairs for the leaves of nested target data."""
+    if not isinstance(data, dict):
+      if isinstance(data, (list, tuple)):
+        data = json.dumps(data)
+      yield prefix, data
+      return
+    for key, value in data.items():
+      for pair in cls._flatten_target_data(value, '{}.{}'.format(prefix, key) if prefix else key):
+        yield pair
+
   def get_stats_for_cmd_line(self, timing_table, cmd_line_like):
     """Returns a generator over all (label, timing) pairs for a given cmd line.
 
@@ -129,6 +272,118 @@ class StatsDB(object):
         """.format(timing_table), [cmd_line_like]):
         yield row
 
+  def get_goal_timing_percentiles(self, percentiles, goals=None, since=None, period='day'):
+    """Returns the percentiles of the cumulative timings of goals, for each period.
+
+    :param list percentiles: The percentiles (in the range (0, 100]) to compute.
+    :param list goals: The names of the goals to compute percentiles for, or None for all goals.
+    :param int since: If set, only runs at or after this many seconds since the epoch are included.
+    :param string period: One of `StatsDB.PERIODS`.
+    :returns: A list of `(period, goal, count, timings)` tuples, ordered by period and goal, where
+              timings is a list of the millisecond timing at each of the given percentiles.
+    """
+    if period not in self.PERIODS:
+      raise StatsDBError('Unknown period {}, expected one of: {}'.format(
+        period, ', '.join(sorted(self.PERIODS))))
+
+    conditions = ['timestamp >= ?']
+    params = [since or 0]
+    if goals:
+      conditions.append('goal IN ({})'.format(', '.join('?' for _ in goals)))
+      params.extend(goals)
+    with self._cursor() as c:
+      rows = c.execute("""
+        SELECT {} AS period, goal, timing
+        FROM goal_timings
+        WHERE {}
+        ORDER BY period, goal, timing
+      """.format(self.PERIODS[period].format('timestamp'), ' AND '.join(conditions)),
+                       params).fetchall()
+
+    ret = []
+    for (period_name, goal), group in groupby(rows, key=lambda row: (row[0], row[1])):
+      timings = [timing for _, _, timing in group]
+      ret.append((period_name, goal, len(timings),
+                  [self._percentile(timings, p) for p in percentiles]))
+    return ret
+
+  def get_target_history(self, target, since=None):
+    """Returns a generator over the data reported for a target by runs, oldest first.
+
+    :param string target: The address spec of the target.
+    :param int since: If set, only runs at or after this many seconds since the epoch are included.
+    :returns: `(run id, timestamp, scope, key, value)` tuples.
+    """
+    with self._cursor() as c:
+      for row in c.execute("""
+        SELECT run_info_id, timestamp, scope, key, value
+        FROM target_data
+        WHERE target = ? AND timestamp >= ?
+        ORDER BY timestamp, scope, key
+      """, [target, since or 0]):
+        yield row
+
+  def get_artifact_cache_outcomes(self, target, since=None):
+    """Returns a generator over the artifact cache hits and misses of a target, oldest first.
+
+    :param string target: The address spec of the target.
+    :param int since: If set, only runs at or after this many seconds since the epoch are included.
+    :returns: `(run id, timestamp, cache name, hit, cause)` tuples.
+    """
+    with self._cursor() as c:
+      for row in c.execute("""
+        SELECT run_info_id, timestamp, cache_name, hit, cause
+        FROM artifact_cache_outcomes
+        WHERE target = ? AND timestamp >= ?
+        ORDER BY timestamp, cache_name
+      """, [target, since or 0]):
+        yield row
+
+  def compact(self, max_age_days, now=None):
+    """Deletes the stats of runs older than the given age, and then compacts the database file.
+
+    :param int max_age_days: The age in days beyond which the stats of runs are deleted.
+    :param float now: The current time in seconds since the epoch (defaults to the wall time).
+    :returns: The number of runs deleted.
+    """
+    now = time.time() if now is None else now
+    cutoff = int(now - max_age_days * 24 * 60 * 60)
+    with self._cursor() as c:
+      for table in self._TIMING_TABLES:
+        c.execute("""
+          DELETE FROM {} WHERE run_info_id IN (SELECT id FROM run_info WHERE timestamp < ?)
+        """.format(table), [cutoff])
+      for table in self._HISTORY_TABLES:
+        c.execute("""DELETE FROM {} WHERE timestamp < ?""".format(table), [cutoff])
+      c.execute("""DELETE FROM run_info WHERE timestamp < ?""", [cutoff])
+      deleted = c.rowcount
+      c.execute("""INSERT OR REPLACE INTO metadata VALUES ('last_compaction', ?)""", [int(now)])
+    with self._connection() as conn:
+      # N.B. VACUUM cannot run within a transaction, so it gets a connection of its own.
+      conn.execute('VACUUM')
+    return deleted
+
+  def maybe_compact(self, now=None):
+    """Compacts the database if it has a maximum age, and has not been compacted recently.
+
+    :param float now: The current time in seconds since the epoch (defaults to the wall time).
+    :returns: The number of runs deleted, or None if the database was not compacted.
+    """
+    if self._max_age_days is None:
+      return None
+    now = time.time() if now is None else now
+    with self._cursor() as c:
+      row = c.execute("""SELECT value FROM metadata WHERE key = 'last_compaction'""").fetchone()
+    if row and now - row[0] < self.COMPACTION_INTERVAL_SECS:
+      return None
+    return self.compact(self._max_age_days, now=now)
+
+  @staticmethod
+  def _percentile(sorted_values, percentile):
+    """Returns the nearest-rank percentile of a non-empty sorted list."""
+    rank = int(math.ceil(len(sorted_values) * percentile / 100.0))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
   @staticmethod
   def _to_ms(timing_secs):
     """Convert a string representing a float of seconds to an int representing milliseconds."""
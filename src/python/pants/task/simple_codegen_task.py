@@ -8,15 +8,17 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import logging
 import os
 from abc import abstractmethod
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 
 from twitter.common.collections import OrderedSet
 
 from pants.base.build_environment import get_buildroot
 from pants.base.exceptions import TaskError
+from pants.base.worker_pool import Work, WorkerPool
 from pants.base.workunit import WorkUnitLabel
 from pants.build_graph.address import Address
 from pants.build_graph.address_lookup_error import AddressLookupError
+from pants.build_graph.target import Target
 from pants.source.wrapped_globs import EagerFilesetWithSpec, FilesetRelPathWrapper
 from pants.task.task import Task
 from pants.util.dirutil import fast_relpath, safe_delete, safe_walk
@@ -65,6 +67,13 @@ class SimpleCodegenTask(Task):
                    'allowed, the logic of find_sources will associate generated sources with '
                    'the least-dependent targets that generate them.',
               advanced=True)
+    register('--worker-count', type=int, default=1, advanced=True,
+             help='The number of targets to generate code for concurrently. Code is generated for '
+                  'a target only once it has been generated for all of the targets it depends on.')
+    register('--batch-size', type=int, default=1, advanced=True,
+             help='The maximum number of targets to generate code for with a single invocation of '
+                  'the code generator, for tasks that support it. Only targets that the generator '
+                  'would be invoked identically for (aside from their sources) are batched.')
 
   @classmethod
   def get_fingerprint_strategy(cls):
@@ -213,11 +222,20 @@ class SimpleCodegenTask(Task):
                           fingerprint_strategy=self.get_fingerprint_strategy()) as invalidation_check:
 
       with self.context.new_workunit(name='execute', labels=[WorkUnitLabel.MULTITOOL]):
+        options = self.get_options()
+        if options.worker_count > 1 or options.batch_size > 1:
+          generated_targets = self._execute_codegen_in_units(invalidation_check.invalid_vts)
+        else:
+          generated_targets = None
+
         for vt in invalidation_check.all_vts:
           # Build the target and handle duplicate sources.
           if not vt.valid:
-            if self._do_validate_sources_present(vt.target):
-              self.execute_codegen(vt.target, vt.results_dir)
+            if generated_targets is None:
+              if self._do_validate_sources_present(vt.target):
+                self.execute_codegen(vt.target, vt.results_dir)
+                self._handle_duplicate_sources(vt.target, vt.results_dir)
+            elif vt.target in generated_targets:
               self._handle_duplicate_sources(vt.target, vt.results_dir)
             vt.update()
 
@@ -230,6 +248,93 @@ class SimpleCodegenTask(Task):
           vt.target.address for vt in invalidation_check.all_vts
         )
 
+  def _execute_codegen_in_units(self, invalid_vts):
+    """Generates code for the given invalid targets in batches, and/or on a pool of worker threads.
+
+    Only code generation itself is batched or concurrent: duplicate sources are handled, and
+    synthetic targets injected, by the caller afterwards, in topological order.
+
+    :returns: The set of targets that code was generated for.
+    """
+    vts = [vt for vt in invalid_vts if self._do_validate_sources_present(vt.target)]
+    if not vts:
+      return set()
+
+    waves = self._codegen_unit_waves(vts)
+    worker_count = self.get_options().worker_count
+    if worker_count > 1:
+      # This ensures the workunit for the worker pool is set before attempting to generate.
+      with self.context.new_workunit('{}-pool-bootstrap'.format(self.name())) as workunit:
+        worker_pool = WorkerPool(workunit.parent, self.context.run_tracker, worker_count)
+      try:
+        for wave in waves:
+          worker_pool.submit_work_and_wait(Work(self._execute_codegen_unit,
+                                                [(unit,) for unit in wave]))
+      finally:
+        worker_pool.shutdown()
+    else:
+      for wave in waves:
+        for unit in wave:
+          self._execute_codegen_unit(unit)
+    return {vt.target for vt in vts}
+
+  def _execute_codegen_unit(self, vts):
+    if len(vts) == 1:
+      self.execute_codegen(vts[0].target, vts[0].results_dir)
+    else:
+      self.execute_codegen_batch([(vt.target, vt.results_dir) for vt in vts])
+
+  def _codegen_unit_waves(self, vts):
+    """Partitions versioned targets into units that are each generated by one invocation of the
+    code generator, and those units into waves that may each be generated concurrently.
+
+    Batches of targets don't consume the code generated for one another (see `codegen_batch_key`),
+    so they are all generated in the first wave. The remaining targets are generated one per unit,
+    in the waves computed by `_codegen_waves`.
+
+    :returns: A list of lists of units, each a list of versioned targets.
+    """
+    batch_size = self.get_options().batch_size
+    batches_by_key = OrderedDict()
+    unbatched_vts = []
+    for vt in vts:
+      key = self.codegen_batch_key(vt.target) if batch_size > 1 else None
+      if key is None:
+        unbatched_vts.append(vt)
+        continue
+      batches = batches_by_key.setdefault(key, [[]])
+      if len(batches[-1]) == batch_size:
+        batches.append([])
+      batches[-1].append(vt)
+
+    waves = [[[vt] for vt in wave] for wave in self._codegen_waves(unbatched_vts)]
+    batches = [batch for key_batches in batches_by_key.values() for batch in key_batches]
+    if batches:
+      waves.insert(0, batches)
+    return waves
+
+  @staticmethod
+  def _codegen_waves(vts):
+    """Partitions versioned targets into waves that may each be generated concurrently.
+
+    A target is in the wave after the last of those containing the targets it (transitively)
+    depends on.
+
+    :returns: A list of lists of the given versioned targets, each in their given order.
+    """
+    targets_to_generate = {vt.target for vt in vts}
+    # The number of waves that must precede the one containing each target.
+    preceding_waves = {}
+    for target in Target.closure_for_targets([vt.target for vt in vts], postorder=True):
+      preceding_waves[target] = max([preceding_waves.get(dep, 0) +
+                                     (1 if dep in targets_to_generate else 0)
+                                     for dep in target.dependencies] or [0])
+
+    waves = defaultdict(list)
+    for vt in vts:
+      waves[preceding_waves[vt.target]].append(vt)
+    return [waves[index] for index in sorted(waves)]
+
   def _mark_transitive_invalidation_hashes_dirty(self, addresses):
     self.context.build_graph.walk_transitive_dependee_graph(
       addresses,
@@ -366,6 +471,32 @@ class SimpleCodegenTask(Task):
     :param target_workdir: A clean directory into which to generate code
     """
 
+  def codegen_batch_key(self, target):
+    """Returns a key that is equal for targets whose code can be generated by one invocation.
+
+    Targets are batched regardless of the dependencies between them, so a key should only be
+    returned for a target if generating its code does not consume the code generated for its
+    dependencies. Subclasses that return keys must implement `execute_codegen_batch`.
+
+    :API: public
+
+    :param Target target: The target to compute a batch key for.
+    :return: A hashable key, or None if code for the target must be generated on its own.
+    """
+    return None
+
+  def execute_codegen_batch(self, targets_and_workdirs):
+    """Generates code for a batch of (at least two) targets with equal `codegen_batch_key`s.
+
+    The code generated for each target must end up in its own workdir, just as if
+    `execute_codegen` had been called for each of them.
+
+    :API: public
+
+    :param list targets_and_workdirs: A list of `(target, target_workdir)` tuples.
+    """
+    raise NotImplementedError
+
   def find_sources(self, target, target_workdir):
     """Determines what sources were generated by the target after the fact.
 
@@ -455,10 +455,12 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
 
     if self._cache_factory.ignore:
       cache_key_generator = UncacheableCacheKeyGenerator()
+      transitive_fingerprinter = None
     else:
       cache_key_generator = CacheKeyGenerator(
         self.context.options.for_global_scope().cache_key_gen_version,
         self.fingerprint)
+      transitive_fingerprinter = BuildInvalidator.Factory.create_fingerprinter()
 
     cache_manager = InvalidationCacheManager(self.workdir,
                                              cache_key_generator,
@@ -468,7 +470,8 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
                                              invalidation_report=self.context.invalidation_report,
                                              task_name=self._task_name,
                                              task_version=self.implementation_version_str(),
-                                             artifact_write_callback=self.maybe_write_artifact)
+                                             artifact_write_callback=self.maybe_write_artifact,
+                                             transitive_fingerprinter=transitive_fingerprinter)
 
     # If this Task's execution has been forced, invalidate all our target fingerprints.
     if self._cache_factory.ignore and not self._force_invalidated:
@@ -540,10 +543,18 @@ class TaskBase(SubsystemClientMixin, Optionable, AbstractClass):
     if not vts:
       return [], [], []
 
-    read_cache = self._cache_factory.get_read_cache()
-    items = [(read_cache, vt.cache_key, vt.current_results_dir if self.cache_target_dirs else None)
-             for vt in vts]
-    res = self.context.subproc_map(call_use_cached_files, items)
+    read_pipeline = self._cache_factory.get_read_pipeline()
+    if read_pipeline:
+      items = [(vt.cache_key, vt.current_results_dir if self.cache_target_dirs else None)
+               for vt in vts]
+      res = read_pipeline.read(items,
+                               stats=self.context.run_tracker.artifact_cache_stats,
+                               cache_name=self._task_name)
+    else:
+      read_cache = self._cache_factory.get_read_cache()
+      items = [(read_cache, vt.cache_key, vt.current_results_dir if self.cache_target_dirs else None)
+               for vt in vts]
+      res = self.context.subproc_map(call_use_cached_files, items)
 
     cached_vts = []
     uncached_vts = []
@@ -0,0 +1,50 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+from collections import deque
+
+
+class ChunkBuffer(object):
+  """A FIFO buffer of binary chunks, which may be read in pieces of any size.
+
+  Reading only copies the data read, so reading a large chunk in many small pieces takes time
+  linear in the size of the chunk.
+  """
+
+  def __init__(self):
+    self._chunks = deque()
+    # The number of bytes of the first chunk that have already been read.
+    self._offset = 0
+    self._size = 0
+
+  def __len__(self):
+    return self._size
+
+  def append(self, chunk):
+    if chunk:
+      self._chunks.append(chunk)
+      self._size += len(chunk)
+
+  def read(self, size=-1):
+    """Removes and returns up to `size` bytes from the front of the buffer, or all of them."""
+    if size < 0 or size > self._size:
+      size = self._size
+    pieces = []
+    remaining = size
+    while remaining:
+      chunk = self._chunks[0]
+      end = self._offset + remaining
+      if end < len(chunk):
+        pieces.append(chunk[self._offset:end])
+        self._offset = end
+        break
+      pieces.append(chunk[self._offset:] if self._offset else chunk)
+      remaining -= len(chunk) - self._offset
+      self._chunks.popleft()
+      self._offset = 0
+    self._size -= size
+    return pieces[0] if len(pieces) == 1 else b''.join(pieces)
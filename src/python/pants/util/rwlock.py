@@ -0,0 +1,110 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ReadWriteLock(object):
+  """A lock that may be held either by any number of readers or by a single writer.
+
+  Writers are preferred: once a writer is waiting, new readers wait behind it, so that a steady
+  stream of readers cannot starve writers. The write lock is re-entrant, and the thread holding it
+  may also acquire the read lock. Upgrading a held read lock to the write lock is not supported, and
+  will deadlock.
+
+  Using the lock itself as a context manager acquires the write lock, so it may be used in place of
+  a `threading.RLock`.
+  """
+
+  def __init__(self):
+    self._condition = threading.Condition(threading.Lock())
+    self._readers = 0
+    self._writer = None
+    self._writer_depth = 0
+    self._waiting_writers = 0
+
+  def acquire_read(self):
+    me = threading.current_thread()
+    with self._condition:
+      if self._writer is me:
+        self._writer_depth += 1
+        return
+      while self._writer is not None or self._waiting_writers:
+        self._condition.wait()
+      self._readers += 1
+
+  def release_read(self):
+    me = threading.current_thread()
+    with self._condition:
+      if self._writer is me:
+        self._writer_depth -= 1
+        return
+      if self._readers <= 0:
+        raise RuntimeError('cannot release un-acquired read lock')
+      self._readers -= 1
+      if self._readers == 0:
+        self._condition.notify_all()
+
+  def acquire_write(self):
+    me = threading.current_thread()
+    with self._condition:
+      if self._writer is me:
+        self._writer_depth += 1
+        return
+      self._waiting_writers += 1
+      try:
+        while self._writer is not None or self._readers:
+          self._condition.wait()
+      finally:
+        self._waiting_writers -= 1
+      self._writer = me
+      self._writer_depth = 1
+
+  def release_write(self):
+    me = threading.current_thread()
+    with self._condition:
+      if self._writer is not me:
+        raise RuntimeError('cannot release un-acquired write lock')
+      self._writer_depth -= 1
+      if self._writer_depth == 0:
+        self._writer = None
+        self._condition.notify_all()
+
+  @contextmanager
+  def read_locked(self):
+    """Holds the read lock for the duration of the context.
+
+    :returns: The number of seconds spent waiting to acquire the lock.
+    """
+    start = time.time()
+    self.acquire_read()
+    try:
+      yield time.time() - start
+    finally:
+      self.release_read()
+
+  @contextmanager
+  def write_locked(self):
+    """Holds the write lock for the duration of the context.
+
+    :returns: The number of seconds spent waiting to acquire the lock.
+    """
+    start = time.time()
+    self.acquire_write()
+    try:
+      yield time.time() - start
+    finally:
+      self.release_write()
+
+  def __enter__(self):
+    self.acquire_write()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.release_write()
@@ -5,6 +5,7 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import os
 from textwrap import dedent
 
 from twitter.common.collections import OrderedSet
@@ -83,3 +84,33 @@ class ProtobufGenTest(TaskTestBase):
     self.assertEquals(1, len(result.keys()))
     self.assertEquals(OrderedSet(['project/src/main/proto/proto-lib/foo.proto']),
                       result['project/src/main/proto'])
+
+  def test_proto_name(self):
+    self.assertEquals('foo/bar.proto', ProtobufGen._proto_name('src/foo/bar.proto', ['src']))
+    self.assertEquals('src/foo/bar.proto',
+                      ProtobufGen._proto_name('src/foo/bar.proto', ['.', 'src']))
+    self.assertEquals('bar.proto', ProtobufGen._proto_name('src/foo/bar.proto', ['lib', 'src/foo']))
+
+  def test_demultiplex(self):
+    self.create_file('batch/com/foo/Foo.java', contents=dedent("""
+      // Generated by the protocol buffer compiler.  DO NOT EDIT!
+      // source: com/foo/foo.proto
+      package com.foo;
+    """).lstrip())
+    self.create_file('batch/com/bar/Bar.java', contents=dedent("""
+      // Generated by the protocol buffer compiler.  DO NOT EDIT!
+      // source: com/bar/bar.proto
+      package com.bar;
+    """).lstrip())
+    task = self.create_task(self.context())
+
+    batch_workdir = os.path.join(self.build_root, 'batch')
+    foo_workdir = os.path.join(self.build_root, 'foo')
+    self.assertFalse(task._demultiplex(batch_workdir, {'com/foo/foo.proto': foo_workdir}))
+    self.assertFalse(os.path.exists(foo_workdir))
+
+    bar_workdir = os.path.join(self.build_root, 'bar')
+    self.assertTrue(task._demultiplex(batch_workdir, {'com/foo/foo.proto': foo_workdir,
+                                                      'com/bar/bar.proto': bar_workdir}))
+    self.assertTrue(os.path.isfile(os.path.join(foo_workdir, 'com/foo/Foo.java')))
+    self.assertTrue(os.path.isfile(os.path.join(bar_workdir, 'com/bar/Bar.java')))
@@ -287,3 +287,74 @@ class ReverseDepmapTest(BaseReverseDepmapTest):
       'overlaps:three',
       targets=[self.target('common/a')]
     )
+
+
+class DependeeIndexReverseDepmapTest(BaseReverseDepmapTest):
+
+  def test_normal(self):
+    self.assert_console_output(
+      'overlaps:two',
+      targets=[self.target('common/c')],
+      options={'dependee_index': True}
+    )
+
+  def test_transitive(self):
+    self.assert_console_output(
+      'overlaps:one',
+      'overlaps:three',
+      'overlaps:four',
+      'overlaps:five',
+      targets=[self.target('common/b')],
+      options={'transitive': True, 'dependee_index': True}
+    )
+
+  def test_nodups_dependees_output_format_json(self):
+    self.assert_console_output(
+      dedent("""
+      {
+          "common/a:a": [
+              "overlaps:one",
+              "overlaps:three",
+              "overlaps:two"
+          ],
+          "overlaps:one": [
+              "overlaps:three"
+          ]
+      }""").lstrip('\n'),
+      targets=[
+        self.target('common/a'),
+        self.target('overlaps:one')
+      ],
+      options={'output_format': 'json', 'dependee_index': True}
+    )
+
+  def test_compile_idls(self):
+    self.assert_console_output(
+      'src/thrift/dependent:my-example',
+      'src/thrift/example:compiled_scala',
+      targets=[
+        self.target('src/thrift/example:mybird'),
+      ],
+      options={'dependee_index': True}
+    )
+
+  def test_changed_build_files(self):
+    options = {'transitive': True, 'dependee_index': True}
+    self.assert_console_output(
+      'overlaps:one',
+      'overlaps:three',
+      'overlaps:four',
+      'overlaps:five',
+      targets=[self.target('common/b')],
+      options=options
+    )
+
+    self.create_file('overlaps/BUILD', "python_library(name='one', dependencies=['common/b'])")
+    self.add_to_build_file('common/e', "python_library(name='e', dependencies=['overlaps:one'])")
+    self.reset_build_graph()
+    self.assert_console_output(
+      'overlaps:one',
+      'common/e:e',
+      targets=[self.target('common/b')],
+      options=options
+    )
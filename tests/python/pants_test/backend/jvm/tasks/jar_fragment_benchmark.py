@@ -0,0 +1,79 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import os
+import random
+import time
+
+from pants.backend.jvm.targets.jvm_binary import JarRules
+from pants.backend.jvm.tasks.incremental_jar import IncrementalJarAssembler
+from pants.backend.jvm.tasks.jar_fragment_store import JarFragmentStore
+from pants.backend.jvm.tasks.jar_task import Jar
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+def _classes_dir(root, name, class_count, class_size):
+  classes_dir = os.path.join(root, 'classes', name)
+  for index in range(class_count):
+    # Class files compress about as well as text with a limited vocabulary.
+    contents = b' '.join(random.choice([b'java/lang/Object', b'<init>', b'Code', b'()V', name])
+                         for _ in range(class_size // 8))
+    safe_file_dump(os.path.join(classes_dir, name, 'C{}.class'.format(index)), contents)
+  return classes_dir
+
+
+def _assemble_binaries(root, core_dir, binary_dirs, fragment_store):
+  start = time.time()
+  for index, binary_dir in enumerate(binary_dirs):
+    jar = Jar(os.path.join(root, 'dist', 'binary{}.jar'.format(index)))
+    for classes_dir in (binary_dir, core_dir):
+      if fragment_store:
+        jar.writejar(fragment_store.fragment(classes_dir))
+      else:
+        jar.write(classes_dir)
+    IncrementalJarAssembler(jar, JarRules.default()).assemble()
+  return time.time() - start
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Benchmarks assembling the deploy jars of many binaries that share a common core '
+                'library, with and without a store of pre-compressed jar fragments.')
+  parser.add_argument('--binaries', type=int, default=200,
+                      help='The number of binaries to assemble deploy jars for.')
+  parser.add_argument('--core-classes', type=int, default=5000,
+                      help='The number of classes in the core library shared by all binaries.')
+  parser.add_argument('--binary-classes', type=int, default=20,
+                      help='The number of classes of each binary.')
+  parser.add_argument('--class-size', type=int, default=4096,
+                      help='The approximate size of each class, in bytes.')
+  args = parser.parse_args()
+
+  random.seed(0)
+  with temporary_dir() as root:
+    core_dir = _classes_dir(root, 'core', args.core_classes, args.class_size)
+    binary_dirs = [_classes_dir(root, 'binary{}'.format(index), args.binary_classes,
+                                args.class_size)
+                   for index in range(args.binaries)]
+
+    without_store = _assemble_binaries(root, core_dir, binary_dirs, fragment_store=None)
+    print('{:<24} {:>8.3f}s'.format('without fragment store', without_store))
+
+    store = JarFragmentStore(os.path.join(root, 'store'))
+    with_store = _assemble_binaries(root, core_dir, binary_dirs, fragment_store=store)
+    print('{:<24} {:>8.3f}s'.format('with fragment store', with_store))
+
+    # A later run reuses the fragments created by the first.
+    store = JarFragmentStore(os.path.join(root, 'store'))
+    with_warm_store = _assemble_binaries(root, core_dir, binary_dirs, fragment_store=store)
+    print('{:<24} {:>8.3f}s'.format('with warm fragment store', with_warm_store))
+
+
+if __name__ == '__main__':
+  main()
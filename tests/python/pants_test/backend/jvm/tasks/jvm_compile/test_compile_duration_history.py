@@ -0,0 +1,77 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.backend.jvm.tasks.jvm_compile.compile_duration_history import CompileDurationHistory
+from pants.util.contextutil import temporary_dir
+
+
+class CompileDurationHistoryTest(unittest.TestCase):
+
+  def test_estimates_without_history_are_sizes(self):
+    with temporary_dir() as tmpdir:
+      history = CompileDurationHistory(os.path.join(tmpdir, 'durations'))
+      self.assertEqual(100, history.estimate('a:a', 100))
+      self.assertLess(history.estimate('a:a', 100), history.estimate('b:b', 200))
+
+  def test_recorded_durations_are_estimated_after_save(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'durations')
+      history = CompileDurationHistory(path)
+      history.record('a:a', 10.0, 100)
+      history.save()
+
+      self.assertEqual(10.0, CompileDurationHistory(path).estimate('a:a', 5000))
+
+  def test_durations_are_smoothed(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'durations')
+      history = CompileDurationHistory(path)
+      history.record('a:a', 10.0, 100)
+      history.save()
+
+      history = CompileDurationHistory(path)
+      history.record('a:a', 20.0, 100)
+      history.save()
+      self.assertEqual(15.0, CompileDurationHistory(path).estimate('a:a', 100))
+
+  def test_unknown_targets_are_fit_by_size(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'durations')
+      history = CompileDurationHistory(path)
+      history.record('a:a', 3.0, 100)
+      history.record('b:b', 5.0, 200)
+      history.record('c:c', 7.0, 300)
+      history.save()
+
+      # duration = 1 + 0.02 * size
+      self.assertAlmostEqual(9.0, CompileDurationHistory(path).estimate('d:d', 400))
+
+  def test_concurrent_saves_merge(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'durations')
+      first = CompileDurationHistory(path)
+      second = CompileDurationHistory(path)
+      first.record('a:a', 1.0, 10)
+      second.record('b:b', 2.0, 20)
+      first.save()
+      second.save()
+
+      history = CompileDurationHistory(path)
+      self.assertEqual(1.0, history.estimate('a:a', 0))
+      self.assertEqual(2.0, history.estimate('b:b', 0))
+
+  def test_ignores_corrupt_entries(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'durations')
+      with open(path, 'wb') as fp:
+        fp.write(b'a:a\t1.5\t10\nb:b\tnot-a-number\t10\ntorn')
+      history = CompileDurationHistory(path)
+      self.assertEqual(1.5, history.estimate('a:a', 0))
+      self.assertEqual(15.0, history.estimate('b:b', 100))
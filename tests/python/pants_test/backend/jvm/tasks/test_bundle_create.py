@@ -176,6 +176,24 @@ class TestBundleCreate(JvmBinaryTaskTestBase):
     self.execute(self.task_context)
     self._check_archive_products('foo.foo-app', 'tar', check_copy=True)
 
+  def test_concurrent_bundles(self):
+    self.set_options(worker_count=2, max_concurrent_jars=1, max_concurrent_archives=1)
+    self.app_target = self._create_target(archive='zip')
+    other_app_target = self.make_target(spec='//foo:foo-app-other',
+                                        target_type=JvmApp,
+                                        basename='OtherFooApp',
+                                        archive='tar',
+                                        dependencies=[self.binary_target])
+    self.task_context = self.context(target_roots=[self.app_target, other_app_target])
+    self._setup_classpath(self.task_context)
+    self.execute(self.task_context)
+    self._check_bundle_products('foo.foo-app', check_symlink=True)
+    self._check_archive_products('foo.foo-app', 'zip', check_copy=True)
+
+    self.app_target = other_app_target
+    self._check_bundle_products('foo.foo-app-other', check_symlink=True)
+    self._check_archive_products('foo.foo-app-other', 'tar', check_copy=True)
+
   def _check_products(self, products, product_fullname):
     self.assertIsNotNone(products)
     product_data = products.get(self.app_target)
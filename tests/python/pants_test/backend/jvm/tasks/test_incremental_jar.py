@@ -0,0 +1,102 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+import zipfile
+
+from pants.backend.jvm.targets.jvm_binary import Duplicate, JarRules, Skip
+from pants.backend.jvm.tasks.incremental_jar import IncrementalJarAssembler
+from pants.backend.jvm.tasks.jar_task import Jar
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class IncrementalJarAssemblerTest(unittest.TestCase):
+
+  def setUp(self):
+    self.rules = JarRules.default()
+
+  def _assemble(self, path, classes_dir, jars=(), main=None):
+    jar = Jar(path)
+    jar.write(classes_dir)
+    for dep in jars:
+      jar.writejar(dep)
+    if main:
+      jar.main(main)
+    assembler = IncrementalJarAssembler(jar, self.rules)
+    assembler.assemble()
+    return assembler
+
+  def _dep_jar(self, path, entries):
+    with open_zip(path, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+      for name, contents in entries.items():
+        zf.writestr(name, contents)
+    return path
+
+  def test_reuses_unchanged_entries(self):
+    with temporary_dir() as workdir:
+      classes = os.path.join(workdir, 'classes')
+      safe_file_dump(os.path.join(classes, 'a/A.class'), b'A' * 100)
+      safe_file_dump(os.path.join(classes, 'a/B.class'), b'B' * 100)
+      dep = self._dep_jar(os.path.join(workdir, 'dep.jar'), {
+        'c/C.class': b'C' * 100,
+        'META-INF/MANIFEST.MF': b'Manifest-Version: 1.0\nMain-Class: c.C\n',
+        'META-INF/DEP.SF': b'signature',
+      })
+      path = os.path.join(workdir, 'out.jar')
+
+      assembler = self._assemble(path, classes, jars=[dep], main='a.A')
+      self.assertEqual((0, 1, 3), (assembler.reused_entry_count,
+                                   assembler.copied_entry_count,
+                                   assembler.compressed_entry_count))
+      with open_zip(path) as zf:
+        self.assertEqual({'META-INF/', 'META-INF/MANIFEST.MF', 'a/', 'a/A.class', 'a/B.class',
+                          'c/', 'c/C.class'},
+                         set(zf.namelist()))
+        self.assertEqual(b'C' * 100, zf.read('c/C.class'))
+        self.assertIn(b'Main-Class: a.A', zf.read('META-INF/MANIFEST.MF'))
+
+      safe_file_dump(os.path.join(classes, 'a/B.class'), b'b' * 100)
+      assembler = self._assemble(path, classes, jars=[dep], main='a.A')
+      self.assertEqual((1, 1, 2), (assembler.reused_entry_count,
+                                   assembler.copied_entry_count,
+                                   assembler.compressed_entry_count))
+      with open_zip(path) as zf:
+        self.assertIsNone(zf.testzip())
+        self.assertEqual(b'A' * 100, zf.read('a/A.class'))
+        self.assertEqual(b'b' * 100, zf.read('a/B.class'))
+
+  def test_duplicates(self):
+    with temporary_dir() as workdir:
+      classes = os.path.join(workdir, 'classes')
+      safe_file_dump(os.path.join(classes, 'META-INF/services/s.S'), b'a.A')
+      safe_file_dump(os.path.join(classes, 'dup.txt'), b'classes')
+      dep = self._dep_jar(os.path.join(workdir, 'dep.jar'), {
+        'META-INF/services/s.S': b'c.C\n',
+        'dup.txt': b'dep',
+      })
+      path = os.path.join(workdir, 'out.jar')
+
+      self._assemble(path, classes, jars=[dep])
+      with open_zip(path) as zf:
+        self.assertEqual(b'a.A\nc.C\n', zf.read('META-INF/services/s.S'))
+        self.assertEqual(b'classes', zf.read('dup.txt'))
+
+      self.rules = JarRules(rules=[Duplicate(r'^dup\.txt$', Duplicate.REPLACE),
+                                   Skip(r'^META-INF/services/')])
+      self._assemble(path, classes, jars=[dep])
+      with open_zip(path) as zf:
+        self.assertEqual(b'dep', zf.read('dup.txt'))
+        self.assertNotIn('META-INF/services/s.S', zf.namelist())
+
+      self.rules = JarRules(default_dup_action=Duplicate.FAIL)
+      with self.assertRaises(Duplicate.Error):
+        self._assemble(path, classes, jars=[dep])
+      # The previous jar is left intact.
+      with open_zip(path) as zf:
+        self.assertEqual(b'dep', zf.read('dup.txt'))
@@ -0,0 +1,72 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.backend.jvm.tasks.jar_fragment_store import JarFragmentStore
+from pants.util.contextutil import open_zip, temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class JarFragmentStoreTest(unittest.TestCase):
+
+  def test_fragment(self):
+    with temporary_dir() as workdir:
+      store_dir = os.path.join(workdir, 'store')
+      classes = os.path.join(workdir, 'classes')
+      safe_file_dump(os.path.join(classes, 'a/b/A.class'), b'A')
+      safe_file_dump(os.path.join(classes, 'B.class'), b'B')
+
+      fragment = JarFragmentStore(store_dir).fragment(classes)
+      with open_zip(fragment) as zf:
+        self.assertEqual(['B.class', 'a/', 'a/b/', 'a/b/A.class'], sorted(zf.namelist()))
+        self.assertEqual(b'A', zf.read('a/b/A.class'))
+
+      # Directories with the same contents share a fragment, even from another store instance.
+      copy = os.path.join(workdir, 'copy')
+      safe_file_dump(os.path.join(copy, 'a/b/A.class'), b'A')
+      safe_file_dump(os.path.join(copy, 'B.class'), b'B')
+      self.assertEqual(fragment, JarFragmentStore(store_dir).fragment(copy))
+
+      # Directories are only fingerprinted once per store instance.
+      store = JarFragmentStore(store_dir)
+      fragment = store.fragment(classes)
+      safe_file_dump(os.path.join(classes, 'B.class'), b'b')
+      self.assertEqual(fragment, store.fragment(classes))
+
+      changed = JarFragmentStore(store_dir).fragment(classes)
+      self.assertNotEqual(fragment, changed)
+      with open_zip(changed) as zf:
+        self.assertEqual(b'b', zf.read('B.class'))
+
+  def test_prune(self):
+    with temporary_dir() as workdir:
+      store_dir = os.path.join(workdir, 'store')
+
+      def classes(name):
+        classes_dir = os.path.join(workdir, name)
+        safe_file_dump(os.path.join(classes_dir, '{}.class'.format(name)), name.encode('utf-8'))
+        return classes_dir
+
+      old = JarFragmentStore(store_dir).fragment(classes('A'))
+      used = JarFragmentStore(store_dir).fragment(classes('B'))
+      os.utime(old, (1, 1))
+      os.utime(used, (0, 0))
+      # Using a fragment marks it as recently used.
+      self.assertEqual(used, JarFragmentStore(store_dir).fragment(os.path.join(workdir, 'B')))
+
+      store = JarFragmentStore(store_dir, max_entries=2)
+      created = store.fragment(classes('C'))
+      self.assertFalse(os.path.exists(old))
+      self.assertTrue(os.path.exists(used))
+      self.assertTrue(os.path.exists(created))
+
+      # Fragments used by the store are kept even beyond the maximum number of entries.
+      store.fragment(classes('D'))
+      self.assertEqual(2, len(os.listdir(store_dir)))
+      self.assertTrue(os.path.exists(created))
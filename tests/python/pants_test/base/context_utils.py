@@ -52,6 +52,10 @@ class TestContext(Context):
 
       def add_misses(self, cache_name, targets, causes): pass
 
+      def add_stage_stat(self, cache_name, stage, hit, num_bytes, seconds): pass
+
+      def add_connection_stats(self, cache_name, num_requests, num_connections): pass
+
     artifact_cache_stats = DummyArtifactCacheStats()
 
     def report_target_info(self, scope, target, keys, val): pass
@@ -0,0 +1,130 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.base.file_system_project_tree import FileSystemProjectTree
+from pants.build_graph.address import Address
+from pants.build_graph.dependee_index import DependeeIndex
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_rmtree
+
+
+class DependeeIndexTest(unittest.TestCase):
+
+  def setUp(self):
+    self.parsed = []
+    # The dependencies of each target, as "parsed" from BUILD files, by BUILD directory.
+    self.targets_by_dir = {}
+
+  def _parse_dependencies(self, build_dirs):
+    self.parsed.append(build_dirs)
+    for build_dir in build_dirs:
+      for spec, dependency_specs in self.targets_by_dir[build_dir].items():
+        yield Address.parse(spec), [Address.parse(s) for s in dependency_specs]
+
+  def _write_build_file(self, build_root, build_dir, targets, name='BUILD'):
+    self.targets_by_dir[build_dir] = targets
+    # The content of a BUILD file need only change along with the targets it declares.
+    safe_file_dump(os.path.join(build_root, build_dir, name), repr(sorted(targets.items())))
+
+  def _index(self, build_root, build_ignore_patterns=None):
+    return DependeeIndex(os.path.join(build_root, '.pants.d', 'index'),
+                         FileSystemProjectTree(build_root),
+                         build_ignore_patterns=build_ignore_patterns)
+
+  def _dependees(self, index, *specs, **kwargs):
+    return sorted(a.spec for a in index.dependees([Address.parse(s) for s in specs], **kwargs))
+
+  def _populate(self, build_root):
+    self._write_build_file(build_root, 'a', {'a:a': []})
+    self._write_build_file(build_root, 'b', {'b:b': ['a:a'], 'b:c': ['b:b']})
+    self._write_build_file(build_root, 'd', {'d:d': ['b:c', 'a:a']})
+
+  def test_dependees(self):
+    with temporary_dir() as build_root:
+      self._populate(build_root)
+      index = self._index(build_root)
+      self.assertEqual(['a', 'b', 'd'], index.update(self._parse_dependencies))
+
+      self.assertEqual(['b:b', 'd:d'], self._dependees(index, 'a'))
+      self.assertEqual(['b:b', 'b:c', 'd:d'], self._dependees(index, 'a', transitive=True))
+      self.assertEqual(['b:c', 'd:d'], self._dependees(index, 'a', 'b', transitive=True))
+      self.assertEqual([], self._dependees(index, 'd', transitive=True))
+
+  def test_reparses_only_changed_build_dirs(self):
+    with temporary_dir() as build_root:
+      self._populate(build_root)
+      index = self._index(build_root)
+      index.update(self._parse_dependencies)
+      index.save()
+
+      self._write_build_file(build_root, 'd', {'d:d': ['b:c']})
+      self._write_build_file(build_root, 'e', {'e:e': ['a:a']}, name='BUILD.e')
+      safe_rmtree(os.path.join(build_root, 'b'))
+
+      self.parsed = []
+      index = self._index(build_root)
+      self.assertEqual(['d', 'e'], index.update(self._parse_dependencies))
+      self.assertEqual([['d', 'e']], self.parsed)
+      self.assertEqual(['e:e'], self._dependees(index, 'a', transitive=True))
+      self.assertEqual(['d:d'], self._dependees(index, 'b:c'))
+
+      # Once saved, nothing need be re-parsed.
+      index.save()
+      self.parsed = []
+      index = self._index(build_root)
+      self.assertEqual([], index.update(self._parse_dependencies))
+      self.assertEqual([], self.parsed)
+      self.assertEqual(['e:e'], self._dependees(index, 'a', transitive=True))
+
+  def test_save_merges_concurrent_updates(self):
+    with temporary_dir() as build_root:
+      self._populate(build_root)
+      first = self._index(build_root)
+      second = self._index(build_root)
+      first.update(self._parse_dependencies)
+      first.save()
+
+      self._write_build_file(build_root, 'e', {'e:e': ['d:d']})
+      second.update(self._parse_dependencies)
+      second.save()
+
+      self.parsed = []
+      index = self._index(build_root)
+      self.assertEqual([], index.update(self._parse_dependencies))
+      self.assertEqual(['d:d', 'e:e'], self._dependees(index, 'b:c', transitive=True))
+
+  def test_build_ignore_patterns(self):
+    with temporary_dir() as build_root:
+      self._populate(build_root)
+      index = self._index(build_root, build_ignore_patterns=['d'])
+      self.assertEqual(['a', 'b'], index.update(self._parse_dependencies))
+      self.assertEqual(['b:b'], self._dependees(index, 'a'))
+
+  def test_corrupt_index(self):
+    with temporary_dir() as build_root:
+      self._populate(build_root)
+      safe_file_dump(os.path.join(build_root, '.pants.d', 'index'), '{')
+      index = self._index(build_root)
+      self.assertEqual(['a', 'b', 'd'], index.update(self._parse_dependencies))
+
+  def test_digest(self):
+    with temporary_dir() as build_root:
+      self._populate(build_root)
+      digested = []
+
+      def digest(path):
+        digested.append(os.path.relpath(path, build_root))
+        return b'digest'
+
+      index = DependeeIndex(os.path.join(build_root, '.pants.d', 'index'),
+                            FileSystemProjectTree(build_root),
+                            digest=digest)
+      self.assertEqual(['a', 'b', 'd'], index.update(self._parse_dependencies))
+      self.assertEqual(['a/BUILD', 'b/BUILD', 'd/BUILD'], sorted(digested))
@@ -0,0 +1,102 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+from pants.base.fingerprint_strategy import DefaultFingerprintStrategy
+from pants.build_graph.address import Address
+from pants.build_graph.build_graph import CycleException
+from pants.build_graph.target import Target
+from pants.build_graph.transitive_fingerprinter import TransitiveFingerprinter
+from pants_test.test_base import TestBase
+
+
+class CountingFingerprintStrategy(DefaultFingerprintStrategy):
+
+  def __init__(self, direct_specs=()):
+    self.fingerprinted = []
+    self._direct_specs = set(direct_specs)
+
+  def compute_fingerprint(self, target):
+    self.fingerprinted.append(target.address.spec)
+    return super(CountingFingerprintStrategy, self).compute_fingerprint(target)
+
+  def direct(self, target):
+    return target.address.spec in self._direct_specs
+
+
+class OptOutFingerprintStrategy(DefaultFingerprintStrategy):
+
+  def compute_fingerprint(self, target):
+    return None if target.address.target_name.startswith('opt-out') else target.id
+
+
+class TransitiveFingerprinterTest(TestBase):
+
+  def _diamond(self):
+    a = self.make_target(':a', Target)
+    b = self.make_target(':b', Target, dependencies=[a])
+    c = self.make_target(':c', Target, dependencies=[a])
+    d = self.make_target(':d', Target, dependencies=[b, c])
+    return a, b, c, d
+
+  def _recursive_hashes(self, targets, fingerprint_strategy=None):
+    hashes = {t: t.transitive_invalidation_hash(fingerprint_strategy) for t in targets}
+    for target in targets:
+      target.mark_invalidation_hash_dirty()
+    return hashes
+
+  def test_matches_recursive_hashes(self):
+    targets = self._diamond()
+    expected = self._recursive_hashes(targets)
+    for parallelism in (1, 4):
+      self.assertEqual(expected, TransitiveFingerprinter(parallelism).fingerprint(targets))
+      for target in targets:
+        target.mark_invalidation_hash_dirty()
+
+  def test_matches_recursive_hashes_when_opted_out(self):
+    leaf = self.make_target(':opt-out-leaf', Target)
+    mid = self.make_target(':opt-out-mid', Target, dependencies=[leaf])
+    root = self.make_target(':root', Target, dependencies=[mid])
+    targets = [root, mid, leaf]
+    expected = self._recursive_hashes(targets, OptOutFingerprintStrategy())
+    self.assertEqual({root: expected[root], mid: None, leaf: None},
+                     TransitiveFingerprinter().fingerprint(targets, OptOutFingerprintStrategy()))
+
+  def test_direct_roots(self):
+    targets = self._diamond()
+    expected = self._recursive_hashes(targets, CountingFingerprintStrategy([':d']))
+    strategy = CountingFingerprintStrategy([':d'])
+    self.assertEqual(expected, TransitiveFingerprinter().fingerprint(targets, strategy))
+
+  def test_memoized_across_checks(self):
+    a, b, c, d = self._diamond()
+    strategy = CountingFingerprintStrategy()
+    fingerprinter = TransitiveFingerprinter()
+    fingerprinter.fingerprint([b], strategy)
+    self.assertEqual(['//:a', '//:b'], sorted(strategy.fingerprinted))
+
+    # An equal strategy reuses the fingerprints memoized on the targets.
+    strategy = CountingFingerprintStrategy()
+    hashes = fingerprinter.fingerprint([d], strategy)
+    self.assertEqual(['//:c', '//:d'], sorted(strategy.fingerprinted))
+    self.assertEqual(d.transitive_invalidation_hash(strategy), hashes[d])
+
+  def test_deep_graph(self):
+    target = self.make_target(':t0', Target)
+    for i in range(1, Target._MAX_RECURSION_DEPTH * 2):
+      target = self.make_target(':t{}'.format(i), Target, dependencies=[target])
+
+    hashes = TransitiveFingerprinter().fingerprint([target])
+    self.assertIsNotNone(hashes[target])
+    self.assertEqual(hashes[target], target.transitive_invalidation_hash())
+
+  def test_cycle(self):
+    a = self.make_target(':a', Target)
+    b = self.make_target(':b', Target, dependencies=[a])
+    self.make_target(':c', Target, dependencies=[b])
+    a.inject_dependency(Address.parse(':c'))
+    with self.assertRaises(CycleException):
+      TransitiveFingerprinter().fingerprint([a])
@@ -0,0 +1,119 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+from pants.base.build_root import BuildRoot
+from pants.base.payload import Payload
+from pants.base.payload_field import PrimitiveField
+from pants.build_graph.address import Address
+from pants.build_graph.mutable_build_graph import MutableBuildGraph
+from pants.build_graph.target import Target
+from pants.build_graph.transitive_fingerprinter import TransitiveFingerprinter
+from pants.source.payload_fields import SourcesField
+from pants.source.wrapped_globs import LazyFilesetWithSpec
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+def _create_graph(count, max_deps, chain_length, seed, buildroot, sources_per_target, source_size):
+  """Creates a random DAG of `count` targets, plus a chain of `chain_length` targets on top of it."""
+  rng = random.Random(seed)
+  build_graph = MutableBuildGraph(address_mapper=None)
+
+  def inject(i, deps):
+    address = Address('src/{}'.format(i // 100), 't{}'.format(i))
+    payload = Payload()
+    payload.add_field('value', PrimitiveField(i))
+    if sources_per_target:
+      files = ['t{}_{}.src'.format(i, j) for j in range(sources_per_target)]
+      for f in files:
+        safe_file_dump(os.path.join(buildroot, address.spec_path, f), os.urandom(source_size))
+      payload.add_field('sources', SourcesField(
+        LazyFilesetWithSpec(address.spec_path, {'globs': []}, lambda files=files: files)))
+    target = Target(name=address.target_name, address=address, build_graph=build_graph,
+                    payload=payload)
+    build_graph.inject_target(target, dependencies=[d.address for d in deps])
+    return target
+
+  targets = []
+  for i in range(count):
+    deps = rng.sample(targets, min(len(targets), rng.randint(0, max_deps)))
+    targets.append(inject(i, deps))
+  for i in range(count, count + chain_length):
+    targets.append(inject(i, [targets[-1]]))
+  return targets
+
+
+def _timed(description, fn):
+  start = time.time()
+  try:
+    fn()
+  except Target.RecursiveDepthError as e:
+    print('{:<44} failed: {}'.format(description, str(e).splitlines()[0]))
+    return
+  print('{:<44} {:>8.3f}s'.format(description, time.time() - start))
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Benchmarks computing the transitive fingerprints of every target in a synthetic '
+                'graph, recursively per target and with a TransitiveFingerprinter.')
+  parser.add_argument('--targets', type=int, default=50000,
+                      help='The number of targets in the random part of the graph.')
+  parser.add_argument('--max-deps', type=int, default=8,
+                      help='The maximum number of direct dependencies of each target.')
+  parser.add_argument('--chain-length', type=int, default=0,
+                      help='The length of a chain of targets to add on top of the random graph: '
+                           'chains longer than {} cannot be fingerprinted recursively.'
+                           .format(Target._MAX_RECURSION_DEPTH))
+  parser.add_argument('--sources-per-target', type=int, default=0,
+                      help='The number of source files to create for each target.')
+  parser.add_argument('--source-size', type=int, default=4096,
+                      help='The size in bytes of each source file.')
+  parser.add_argument('--parallelism', type=int, default=multiprocessing.cpu_count(),
+                      help='The number of threads for the parallel fingerprinter.')
+  parser.add_argument('--seed', type=int, default=0,
+                      help='The seed of the random graph.')
+  args = parser.parse_args()
+
+  with temporary_dir() as buildroot, BuildRoot().temporary(buildroot):
+    targets = _create_graph(args.targets, args.max_deps, args.chain_length, args.seed, buildroot,
+                            args.sources_per_target, args.source_size)
+    _benchmark(targets, args.parallelism)
+
+
+def _benchmark(targets, parallelism):
+  print('Fingerprinting {} targets'.format(len(targets)))
+
+  def reset():
+    for target in targets:
+      target.mark_invalidation_hash_dirty()
+
+  def recursive():
+    # Dependees first, as when fingerprinting the roots of a task.
+    for target in reversed(targets):
+      target.transitive_invalidation_hash()
+
+  reset()
+  _timed('recursive transitive_invalidation_hash', recursive)
+
+  for parallelism in sorted({1, parallelism}):
+    fingerprinter = TransitiveFingerprinter(parallelism=parallelism)
+    reset()
+    _timed('fingerprinter (parallelism={})'.format(parallelism),
+           lambda: fingerprinter.fingerprint(targets))
+    _timed('fingerprinter, memoized (parallelism={})'.format(parallelism),
+           lambda: fingerprinter.fingerprint(targets))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,73 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import os
+import time
+
+from pants.cache.artifact import TarballArtifact
+from pants.cache.compression import CODEC_NAMES, codec_for_name
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_walk
+
+
+def _directory_size(path):
+  return sum(os.path.getsize(os.path.join(root, f))
+             for root, _, files in safe_walk(path) for f in files)
+
+
+def _best_of(repeat, fn):
+  best = None
+  for _ in range(repeat):
+    start = time.time()
+    fn()
+    elapsed = time.time() - start
+    best = elapsed if best is None else min(best, elapsed)
+  return best
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Benchmarks packing and unpacking a directory (such as the classes directory '
+                'of a zinc compile) as an artifact with each compression codec.')
+  parser.add_argument('directory',
+                      help='The directory to pack: eg, .pants.d/compile/zinc/.../classes')
+  parser.add_argument('--codecs', nargs='+', choices=CODEC_NAMES, default=CODEC_NAMES,
+                      help='The codecs to benchmark.')
+  parser.add_argument('--levels', type=int, nargs='+', default=[1, 5, 9],
+                      help='The compression levels to benchmark.')
+  parser.add_argument('--repeat', type=int, default=3,
+                      help='Report the best of this many packs and unpacks.')
+  args = parser.parse_args()
+
+  directory = os.path.realpath(args.directory)
+  artifact_root = os.path.dirname(directory)
+  size = _directory_size(directory)
+  megabytes = size / (1024 * 1024)
+  print('Packing {} ({:.1f} MB)'.format(directory, megabytes))
+  print('{:<14} {:>5} {:>8} {:>12} {:>14}'.format('codec', 'level', 'ratio', 'pack MB/s',
+                                                   'unpack MB/s'))
+
+  for name in args.codecs:
+    codec = codec_for_name(name)
+    for level in (args.levels if name != 'uncompressed' else args.levels[:1]):
+      with temporary_dir() as tmpdir:
+        tarball = os.path.join(tmpdir, 'artifact.tar')
+        packed = TarballArtifact(artifact_root, tarball, compression=level, codec=codec)
+        pack_time = _best_of(args.repeat, lambda: packed.collect([directory]))
+
+        extract_root = os.path.join(tmpdir, 'extracted')
+        unpacked = TarballArtifact(extract_root, tarball)
+        unpack_time = _best_of(args.repeat, unpacked.extract)
+
+        print('{:<14} {:>5} {:>8.2f} {:>12.1f} {:>14.1f}'.format(
+          name, level, size / os.path.getsize(tarball), megabytes / pack_time,
+          megabytes / unpack_time))
+
+
+if __name__ == '__main__':
+  main()
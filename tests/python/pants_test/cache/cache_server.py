@@ -8,6 +8,8 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 import re
 import SocketServer
+import time
+from collections import Counter
 from contextlib import contextmanager
 from multiprocessing import Process, Queue
 
@@ -36,17 +38,26 @@ class SimpleRESTHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
     with open(path, 'wb') as outfile:
       outfile.write(content)
     self.send_response(200)
-    self.end_headers()
+    self._end_empty_response()
 
   def do_DELETE(self):
     path = self.translate_path(self.path)
     if os.path.exists(path):
       os.unlink(path)
       self.send_response(200)
+      self._end_empty_response()
     else:
       self.send_error(404, 'File not found')
+
+  def _end_empty_response(self):
+    # Kept-alive (HTTP/1.1) connections need to know that there is no body to wait for.
+    self.send_header('Content-Length', '0')
     self.end_headers()
 
+  def log_message(self, *args):
+    if not getattr(self, 'quiet', False):
+      SimpleHTTPServer.SimpleHTTPRequestHandler.log_message(self, *args)
+
 
 class FailRESTHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
   """Reject all requests"""
@@ -57,6 +68,7 @@ class FailRESTHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
 
   def _return_failed(self):
     self.send_response(401, 'Forced test failure')
+    self.send_header('Content-Length', '0')
     self.end_headers()
 
   def do_HEAD(self):
@@ -72,6 +84,41 @@ class FailRESTHandler(SimpleHTTPServer.SimpleHTTPRequestHandler):
     return self._return_failed()
 
 
+def _stand_in_handler(base, keep_alive, latency, fail_first):
+  """Returns a subclass of the given handler class that stands in for a real remote cache.
+
+  :param bool keep_alive: Speak HTTP/1.1, and so keep connections alive between requests.
+  :param float latency: Seconds to delay each response by, to simulate a distant server.
+  :param int fail_first: Respond to the first `fail_first` GETs and HEADs of each path with a 503.
+  """
+  failures = Counter()
+
+  class StandInRESTHandler(base):
+    protocol_version = 'HTTP/1.1' if keep_alive else base.protocol_version
+    quiet = latency > 0
+
+    def do_HEAD(self):
+      if self._delay_or_fail():
+        base.do_HEAD(self)
+
+    def do_GET(self):
+      if self._delay_or_fail():
+        base.do_GET(self)
+
+    def _delay_or_fail(self):
+      if latency:
+        time.sleep(latency)
+      if failures[self.path] < fail_first:
+        failures[self.path] += 1
+        self.send_response(503, 'Forced transient test failure')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        return False
+      return True
+
+  return StandInRESTHandler
+
+
 class TestCacheServer(object):
   """A wrapper class that represents the underlying REST server.
 
@@ -104,7 +151,7 @@ class TestCacheServer(object):
     return count
 
 
-def _cache_server_process(queue, return_failed, cache_root):
+def _cache_server_process(queue, return_failed, cache_root, keep_alive, latency, fail_first):
   """A pickleable top-level function to wrap a SimpleRESTHandler.
 
   We fork a separate process to avoid affecting the `cwd` of the requesting process.
@@ -118,7 +165,13 @@ def _cache_server_process(queue, return_failed, cache_root):
           handler = FailRESTHandler
         else:
           handler = SimpleRESTHandler
-        httpd = SocketServer.TCPServer(('localhost', 0), handler)
+        if keep_alive or latency or fail_first:
+          handler = _stand_in_handler(handler, keep_alive, latency, fail_first)
+          # Serve concurrent connections, as a real cache would.
+          httpd = SocketServer.ThreadingTCPServer(('localhost', 0), handler)
+          httpd.daemon_threads = True
+        else:
+          httpd = SocketServer.TCPServer(('localhost', 0), handler)
         port = httpd.server_address[1]
         queue.put(port)
         httpd.serve_forever()
@@ -128,13 +181,22 @@ def _cache_server_process(queue, return_failed, cache_root):
 
 
 @contextmanager
-def cache_server(return_failed=False, cache_root=None):
+def cache_server(return_failed=False, cache_root=None, keep_alive=False, latency=0, fail_first=0):
   """A context manager which launches a temporary cache server on a random port.
 
+  By default the server handles a single connection at a time, and closes it after each request.
+  Passing any of `keep_alive`, `latency` or `fail_first` instead launches a threaded stand-in for
+  a real (distant, occasionally flaky) cache, which is useful for benchmarking remote reads.
+
+  :param bool keep_alive: Speak HTTP/1.1, and so keep connections alive between requests.
+  :param float latency: Seconds to delay each GET and HEAD response by.
+  :param int fail_first: Respond to the first `fail_first` GETs and HEADs of each path with a 503.
+
   Yields a TestCacheServer to represent the running server.
   """
   queue = Queue()
-  process = Process(target=_cache_server_process, args=(queue,return_failed, cache_root))
+  process = Process(target=_cache_server_process,
+                    args=(queue, return_failed, cache_root, keep_alive, latency, fail_first))
   process.start()
   try:
     port = queue.get()
@@ -0,0 +1,79 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import multiprocessing
+import os
+import time
+
+from pants.cache.local_artifact_cache import TempLocalArtifactCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.pipelined_artifact_cache_reader import PipelinedArtifactCacheReader
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_mkdir
+from pants_test.cache.cache_server import cache_server
+
+
+def _create_artifacts(cache, count, size):
+  items = []
+  for i in range(count):
+    key = CacheKey('target{}'.format(i), 'hash')
+    results_dir = os.path.join(cache.artifact_root, key.id)
+    safe_mkdir(results_dir, clean=True)
+    with open(os.path.join(results_dir, 'out'), 'wb') as fp:
+      fp.write(os.urandom(size))
+    cache.insert(key, [results_dir], overwrite=True)
+    items.append((key, results_dir))
+  return items
+
+
+def _timed_read(description, cache, read):
+  before = cache.transport_stats()
+  start = time.time()
+  results = read()
+  elapsed = time.time() - start
+  after = cache.transport_stats()
+  print('{:<40} {:>8.3f}s {:>8.1f} artifacts/s  hits: {}  requests: {}  connections: {}'.format(
+    description, elapsed, len(results) / elapsed, sum(1 for r in results if r),
+    after['requests'] - before['requests'], after['connections'] - before['connections']))
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Benchmarks remote artifact cache reads against a local stand-in cache server.')
+  parser.add_argument('--artifacts', type=int, default=200,
+                      help='The number of artifacts to read.')
+  parser.add_argument('--artifact-size', type=int, default=64 * 1024,
+                      help='The (incompressible) size in bytes of each artifact.')
+  parser.add_argument('--latency', type=float, default=0.02,
+                      help='The simulated latency in seconds of each GET and HEAD.')
+  parser.add_argument('--concurrency', type=int, default=32,
+                      help='The number of connections and concurrent pipelined requests.')
+  args = parser.parse_args()
+
+  with temporary_dir() as artifact_root:
+    with cache_server(keep_alive=True, latency=args.latency) as server:
+      cache = RESTfulArtifactCache(artifact_root,
+                                   BestUrlSelector([server.url]),
+                                   TempLocalArtifactCache(artifact_root, compression=1),
+                                   max_connections_per_host=args.concurrency)
+      items = _create_artifacts(cache, args.artifacts, args.artifact_size)
+
+      _timed_read('sequential use_cached_files', cache,
+                  lambda: [cache.use_cached_files(key, results_dir) for key, results_dir in items])
+
+      reader = PipelinedArtifactCacheReader(cache,
+                                            io_concurrency=args.concurrency,
+                                            extract_concurrency=multiprocessing.cpu_count())
+      _timed_read('pipelined (concurrency={})'.format(args.concurrency), cache,
+                  lambda: reader.read(items))
+
+
+if __name__ == '__main__':
+  main()
@@ -5,10 +5,13 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import gzip
 import os
+import tarfile
 import unittest
 
-from pants.cache.artifact import DirectoryArtifact, TarballArtifact
+from pants.cache.artifact import ArtifactError, DirectoryArtifact, TarballArtifact
+from pants.cache.compression import CODECS, GzipCodec, UncompressedCodec, detect_codec
 from pants.util.contextutil import temporary_dir
 from pants.util.dirutil import safe_mkdir, safe_open
 
@@ -49,6 +52,65 @@ class TarballArtifactTest(unittest.TestCase):
 
       self.assertTrue(artifact.exists())
 
+  def test_roundtrip_with_each_codec(self):
+    for codec in CODECS:
+      with temporary_dir() as tmpdir:
+        artifact_root = os.path.join(tmpdir, 'artifacts')
+        tarball = os.path.join(tmpdir, 'some.tar')
+        path = os.path.join(artifact_root, 'a/b/some.file')
+        with safe_open(path, 'wb') as f:
+          f.write(b'content' * 100)
+
+        TarballArtifact(artifact_root, tarball, compression=1, codec=codec).collect([path])
+        with open(tarball, 'rb') as fp:
+          self.assertEquals(codec, detect_codec(fp.read(4)))
+
+        # Readers detect the codec, whatever codec they would write with.
+        os.unlink(path)
+        artifact = TarballArtifact(artifact_root, tarball, codec=GzipCodec())
+        artifact.extract()
+        self.assertEquals([os.path.join(artifact_root, 'a/b/some.file')], list(artifact.get_paths()))
+        with open(path, 'rb') as f:
+          self.assertEquals(b'content' * 100, f.read())
+
+  def test_extracts_tarballs_written_by_tarfile(self):
+    with temporary_dir() as tmpdir:
+      artifact_root = os.path.join(tmpdir, 'artifacts')
+      path = self.touch_file_in(artifact_root)
+      tarball = os.path.join(tmpdir, 'some.tgz')
+      with tarfile.open(tarball, 'w:gz') as tarout:
+        tarout.add(path, 'some.file')
+      os.unlink(path)
+
+      TarballArtifact(artifact_root, tarball, codec=UncompressedCodec()).extract()
+      self.assertTrue(os.path.isfile(path))
+
+  def test_extract_truncated_artifact(self):
+    with temporary_dir() as tmpdir:
+      artifact_root = os.path.join(tmpdir, 'artifacts')
+      path = os.path.join(artifact_root, 'some.file')
+      with safe_open(path, 'wb') as f:
+        f.write(os.urandom(64 * 1024))
+      tarball = os.path.join(tmpdir, 'some.tgz')
+      TarballArtifact(artifact_root, tarball).collect([path])
+      with open(tarball, 'rb') as fp:
+        content = fp.read()
+      with open(tarball, 'wb') as fp:
+        fp.write(content[:len(content) // 2])
+
+      with self.assertRaises(ArtifactError):
+        TarballArtifact(artifact_root, tarball).extract()
+
+  def test_gzip_artifacts_are_readable_by_gzip(self):
+    with temporary_dir() as tmpdir:
+      artifact_root = os.path.join(tmpdir, 'artifacts')
+      path = self.touch_file_in(artifact_root)
+      tarball = os.path.join(tmpdir, 'some.tgz')
+      TarballArtifact(artifact_root, tarball).collect([path])
+
+      with tarfile.open(fileobj=gzip.open(tarball, 'rb'), mode='r:') as tarin:
+        self.assertEquals(['some.file'], tarin.getnames())
+
   def touch_file_in(self, artifact_root):
     path = os.path.join(artifact_root, 'some.file')
     with safe_open(path, 'w') as f:
@@ -9,6 +9,7 @@ import os
 import unittest
 from contextlib import contextmanager
 
+from pants.cache.artifact import ArtifactError
 from pants.cache.artifact_cache import (NonfatalArtifactCacheError, call_insert,
                                         call_use_cached_files)
 from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
@@ -16,7 +17,7 @@ from pants.cache.pinger import BestUrlSelector, InvalidRESTfulCacheProtoError
 from pants.cache.restful_artifact_cache import RESTfulArtifactCache
 from pants.invalidation.build_invalidator import CacheKey
 from pants.util.contextutil import temporary_dir, temporary_file, temporary_file_path
-from pants.util.dirutil import safe_mkdir
+from pants.util.dirutil import safe_file_dump, safe_mkdir
 from pants_test.cache.cache_server import cache_server
 
 
@@ -105,6 +106,43 @@ class TestArtifactCache(unittest.TestCase):
       artifact_cache.delete(key)
       self.assertFalse(artifact_cache.has(key))
 
+  def test_restful_cache_retries_idempotent_requests(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    with temporary_dir() as artifact_root:
+      with cache_server(fail_first=2) as server:
+        local = TempLocalArtifactCache(artifact_root, 0)
+
+        def rest_cache(max_retries):
+          return RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url], max_failures=5),
+                                      local, max_retries=max_retries, retry_backoff=0.001)
+
+        with self.setup_test_file(artifact_root) as path:
+          # The PUT is not retried, but the server only fails GETs and HEADs.
+          rest_cache(max_retries=0).insert(key, [path], overwrite=True)
+
+          # The first two HEADs fail, and are not retried.
+          with self.assertRaises(NonfatalArtifactCacheError):
+            rest_cache(max_retries=0).has(key)
+          with self.assertRaises(NonfatalArtifactCacheError):
+            rest_cache(max_retries=0).has(key)
+          self.assertTrue(rest_cache(max_retries=0).has(key))
+
+          # The first two GETs fail, and are retried.
+          self.assertTrue(rest_cache(max_retries=2).use_cached_files(key))
+
+  def test_restful_cache_reuses_connections(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    with temporary_dir() as artifact_root:
+      with cache_server(keep_alive=True) as server:
+        artifact_cache = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]),
+                                              TempLocalArtifactCache(artifact_root, 0))
+        before = artifact_cache.transport_stats()
+        for _ in range(5):
+          self.assertFalse(artifact_cache.has(key))
+        after = artifact_cache.transport_stats()
+        self.assertEquals(5, after['requests'] - before['requests'])
+        self.assertEquals(1, after['connections'] - before['connections'])
+
   def test_local_backed_remote_cache(self):
     """make sure that the combined cache finds what it should and that it backfills"""
     with self.setup_server() as server:
@@ -179,6 +217,57 @@ class TestArtifactCache(unittest.TestCase):
             self.assertTrue(os.path.exists(results_dir))
             self.assertTrue(len(os.listdir(results_dir)) == 0)
 
+  def test_streaming_local_backed_remote_cache(self):
+    """Ensure that streamed artifacts replace the results_dir and are backfilled locally."""
+    with self.setup_server() as server:
+      with temporary_dir() as artifact_root, temporary_dir() as cache_root:
+        local = LocalArtifactCache(artifact_root, cache_root, compression=1, streaming=True)
+        tmp = TempLocalArtifactCache(artifact_root, compression=1)
+        remote = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]), tmp)
+        combined = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]), local)
+
+        key = CacheKey('muppet_key', 'fake_hash')
+        results_dir = os.path.join(artifact_root, 'a/sub/dir')
+        safe_mkdir(results_dir)
+        with self.setup_test_file(results_dir) as path:
+          remote.insert(key, [path])
+          os.unlink(path)
+          stale_path = os.path.join(results_dir, 'stale')
+          safe_file_dump(stale_path, b'stale')
+
+          self.assertTrue(combined.use_cached_files(key, results_dir=results_dir))
+          self.assertEquals([os.path.basename(path)], os.listdir(results_dir))
+          with open(path, 'rb') as fp:
+            self.assertEquals(TEST_CONTENT1, fp.read())
+          self.assertEquals(['a'], os.listdir(artifact_root))
+
+          # The streamed tarball was stored intact.
+          self.assertTrue(local.has(key))
+          safe_mkdir(results_dir, clean=True)
+          self.assertTrue(local.use_cached_files(key, results_dir=results_dir))
+          self.assertTrue(os.path.exists(path))
+
+  def test_streaming_truncated_artifact(self):
+    """Ensure that a stream which fails part way through leaves no partial results behind."""
+    with temporary_dir() as artifact_root, temporary_dir() as cache_root:
+      writer = LocalArtifactCache(artifact_root, cache_root, compression=1)
+      reader = LocalArtifactCache(artifact_root, cache_root, compression=1, streaming=True)
+
+      key = CacheKey('muppet_key', 'fake_hash')
+      results_dir = os.path.join(artifact_root, 'a/sub/dir')
+      safe_mkdir(results_dir)
+      safe_file_dump(os.path.join(results_dir, 'big'), os.urandom(256 * 1024))
+      with writer.insert_paths(key, [results_dir]) as tarball:
+        with open(tarball, 'rb') as fp:
+          content = fp.read()
+      writer.delete(key)
+
+      with self.assertRaises(ArtifactError):
+        reader.store_and_use_artifact(key, iter([content[:len(content) // 2]]), results_dir)
+      self.assertFalse(reader.has(key))
+      self.assertEquals([], os.listdir(results_dir))
+      self.assertEquals(['a'], os.listdir(artifact_root))
+
   def test_multiproc(self):
     key = CacheKey('muppet_key', 'fake_hash')
 
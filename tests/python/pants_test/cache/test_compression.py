@@ -0,0 +1,55 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import io
+import sys
+import unittest
+
+import lz4.frame
+import mock
+
+from pants.cache.compression import (CODECS, CodecError, CompressingWriter, DecompressingReader,
+                                     Lz4Codec, codec_for_name, detect_codec)
+
+
+class CodecTest(unittest.TestCase):
+
+  def _roundtrip(self, codec, content):
+    compressed = io.BytesIO()
+    writer = CompressingWriter(compressed, codec.compressor(1))
+    for offset in range(0, len(content), 1000):
+      writer.write(content[offset:offset + 1000])
+    writer.close()
+
+    data = compressed.getvalue()
+    self.assertEqual(codec, detect_codec(data[:4]))
+    reader = DecompressingReader(io.BytesIO(data), codec.decompressor())
+    pieces = []
+    for piece in iter(lambda: reader.read(777), b''):
+      pieces.append(piece)
+    return b''.join(pieces)
+
+  def test_streaming_roundtrip(self):
+    content = b''.join(b'line {}\n'.format(i) for i in range(20000))
+    for codec in CODECS:
+      self.assertEqual(content, self._roundtrip(codec, content), codec.name)
+
+  def test_lz4_frames_are_standard(self):
+    # The lz4 frame format is shared with the lz4 command line tool.
+    content = b'lz4' * 10000
+    compressed = io.BytesIO()
+    writer = CompressingWriter(compressed, Lz4Codec().compressor(1))
+    writer.write(content)
+    writer.close()
+    self.assertEqual(content, lz4.frame.decompress(compressed.getvalue()))
+
+  def test_unavailable_codec(self):
+    with mock.patch.dict(sys.modules, {'zstandard': None}):
+      with self.assertRaisesRegexp(CodecError, 'requires the `zstandard` module'):
+        codec_for_name('zstd')
+      # Codecs implemented by the standard library are always available.
+      self.assertEqual('gzip', codec_for_name('gzip').name)
@@ -0,0 +1,217 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import json
+import os
+import unittest
+from contextlib import contextmanager
+
+from pants.cache.artifact_cache import call_insert, call_use_cached_files
+from pants.cache.content_addressed_artifact_cache import ContentAddressedLocalArtifactCache
+from pants.cache.local_artifact_cache import TempLocalArtifactCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir
+from pants_test.cache.cache_server import cache_server
+
+
+class TestContentAddressedLocalArtifactCache(unittest.TestCase):
+
+  @contextmanager
+  def setup_cache(self, **kwargs):
+    with temporary_dir() as artifact_root:
+      with temporary_dir() as cache_root:
+        yield ContentAddressedLocalArtifactCache(artifact_root, cache_root, compression=1, **kwargs)
+
+  def write_results(self, cache, relpath, contents):
+    """Write the given dict of file name to content under relpath, and return the results dir."""
+    results_dir = os.path.join(cache.artifact_root, relpath)
+    safe_mkdir(results_dir, clean=True)
+    for name, content in contents.items():
+      safe_file_dump(os.path.join(results_dir, name), content)
+    return results_dir
+
+  def blob_paths(self, cache):
+    return [os.path.join(root, f)
+            for root, _, files in os.walk(cache._blobs_dir) for f in files]
+
+  def test_roundtrip(self):
+    key = CacheKey('muppet_key', 'fake_hash')
+    with self.setup_cache() as cache:
+      results_dir = self.write_results(cache, 'a/results', {'one': b'muppet', 'sub/two': b'kermit'})
+      safe_mkdir(os.path.join(results_dir, 'empty'))
+
+      self.assertFalse(cache.has(key))
+      self.assertFalse(bool(cache.use_cached_files(key)))
+      self.assertTrue(cache.insert(key, [results_dir]))
+      self.assertTrue(cache.has(key))
+
+      safe_mkdir(results_dir, clean=True)
+      safe_file_dump(os.path.join(results_dir, 'stale'), b'stale')
+
+      self.assertTrue(cache.use_cached_files(key, results_dir=results_dir))
+      self.assertEquals(sorted(['empty', 'one', 'sub']), sorted(os.listdir(results_dir)))
+      with open(os.path.join(results_dir, 'sub/two'), 'rb') as fp:
+        self.assertEquals(b'kermit', fp.read())
+
+      cache.delete(key)
+      self.assertFalse(cache.has(key))
+      self.assertEquals([], self.blob_paths(cache))
+
+  def test_identical_files_are_stored_once(self):
+    key1 = CacheKey('target1', 'hash1')
+    key2 = CacheKey('target2', 'hash2')
+    with self.setup_cache() as cache:
+      results1 = self.write_results(cache, 'results1', {'A.class': b'same', 'B.class': b'other'})
+      results2 = self.write_results(cache, 'results2', {'A.class': b'same'})
+      cache.insert(key1, [results1])
+      cache.insert(key2, [results2])
+      self.assertEquals(2, len(self.blob_paths(cache)))
+
+      safe_mkdir(results1, clean=True)
+      safe_mkdir(results2, clean=True)
+      self.assertTrue(cache.use_cached_files(key1, results_dir=results1))
+      self.assertTrue(cache.use_cached_files(key2, results_dir=results2))
+
+      # Deleting one user of a shared blob keeps the blob alive for the other.
+      cache.delete(key1)
+      self.assertEquals(1, len(self.blob_paths(cache)))
+      safe_mkdir(results2, clean=True)
+      self.assertTrue(cache.use_cached_files(key2, results_dir=results2))
+
+  def test_restored_files_are_private_copies(self):
+    key1 = CacheKey('target1', 'hash1')
+    key2 = CacheKey('target2', 'hash2')
+    with self.setup_cache() as cache:
+      results1 = self.write_results(cache, 'results1', {'A.class': b'same'})
+      results2 = self.write_results(cache, 'results2', {'A.class': b'same'})
+      cache.insert(key1, [results1])
+      cache.insert(key2, [results2])
+
+      safe_mkdir(results1, clean=True)
+      self.assertTrue(cache.use_cached_files(key1, results_dir=results1))
+      # Tasks (e.g. incremental compiles) modify their restored results in place.
+      with open(os.path.join(results1, 'A.class'), 'wb') as fp:
+        fp.write(b'modified')
+
+      safe_mkdir(results2, clean=True)
+      self.assertTrue(cache.use_cached_files(key2, results_dir=results2))
+      with open(os.path.join(results2, 'A.class'), 'rb') as fp:
+        self.assertEquals(b'same', fp.read())
+
+  def test_inserts_are_journaled(self):
+    with self.setup_cache() as cache:
+      index_path = os.path.join(cache._store_root, 'index.json')
+      results_dir = self.write_results(cache, 'results', {'out': b'content'})
+      for i in range(3):
+        cache.insert(CacheKey('target{}'.format(i), 'hash'), [results_dir])
+      self.assertFalse(os.path.exists(index_path))
+      self.assertTrue(cache.has(CacheKey('target0', 'hash')))
+
+      cache.prune()
+      with open(index_path, 'rb') as fp:
+        state = json.load(fp)
+      self.assertEquals(3, len(state['entries']))
+      self.assertEquals([[len(b'content'), 3]], list(state['blobs'].values()))
+
+      # The journal is folded once it grows large relative to the index.
+      cache._index._MIN_FOLD_BYTES = 0
+      cache.insert(CacheKey('target3', 'hash'), [results_dir])
+      with open(index_path, 'rb') as fp:
+        self.assertEquals(4, len(json.load(fp)['entries']))
+
+  def test_lru_eviction_by_size(self):
+    keys = [CacheKey('target{}'.format(i), 'hash') for i in range(3)]
+    with self.setup_cache(max_bytes=25) as cache:
+      for i, key in enumerate(keys):
+        results_dir = self.write_results(cache, key.id, {'out': b'{}'.format(i) * 10})
+        cache.insert(key, [results_dir])
+        if i == 1:
+          # Touch the first entry, so that the second one is least recently used.
+          self.assertTrue(cache.use_cached_files(keys[0]))
+
+      cache.prune()
+      self.assertTrue(cache.has(keys[0]))
+      self.assertFalse(cache.has(keys[1]))
+      self.assertTrue(cache.has(keys[2]))
+      self.assertEquals(2, len(self.blob_paths(cache)))
+
+  def test_max_entries_per_target(self):
+    with self.setup_cache(max_entries_per_target=1) as cache:
+      results_dir = self.write_results(cache, 'results', {'out': b'v1'})
+      cache.insert(CacheKey('target', 'v1'), [results_dir])
+      results_dir = self.write_results(cache, 'results', {'out': b'v2'})
+      cache.insert(CacheKey('target', 'v2'), [results_dir])
+
+      cache.prune()
+      self.assertFalse(cache.has(CacheKey('target', 'v1')))
+      self.assertTrue(cache.has(CacheKey('target', 'v2')))
+      self.assertEquals(1, len(self.blob_paths(cache)))
+
+  def test_overwrite_with_identical_content(self):
+    key = CacheKey('target', 'hash')
+    with self.setup_cache() as cache:
+      results_dir = self.write_results(cache, 'results', {'out': b'content'})
+      cache.insert(key, [results_dir])
+      cache.insert(key, [results_dir], overwrite=True)
+
+      safe_mkdir(results_dir, clean=True)
+      self.assertTrue(cache.use_cached_files(key, results_dir=results_dir))
+      self.assertEquals(1, len(self.blob_paths(cache)))
+
+  def test_namespaces_share_blobs(self):
+    key = CacheKey('target', 'hash')
+    with temporary_dir() as artifact_root:
+      with temporary_dir() as cache_root:
+        cache1 = ContentAddressedLocalArtifactCache(artifact_root, cache_root, 1, namespace='task1')
+        cache2 = ContentAddressedLocalArtifactCache(artifact_root, cache_root, 1, namespace='task2')
+        results_dir = self.write_results(cache1, 'results', {'out': b'shared'})
+        cache1.insert(key, [results_dir])
+        self.assertFalse(cache2.has(key))
+        cache2.insert(key, [results_dir])
+        self.assertEquals(1, len(self.blob_paths(cache1)))
+
+  def test_missing_blob_is_unreadable(self):
+    key = CacheKey('target', 'hash')
+    with self.setup_cache() as cache:
+      results_dir = self.write_results(cache, 'results', {'out': b'content'})
+      cache.insert(key, [results_dir])
+      for blob_path in self.blob_paths(cache):
+        os.unlink(blob_path)
+
+      result = cache.use_cached_files(key, results_dir=results_dir)
+      self.assertFalse(result)
+      self.assertIsNotNone(result)
+      self.assertFalse(cache.has(key))
+      self.assertEquals([], os.listdir(results_dir))
+
+  def test_multiproc(self):
+    key = CacheKey('target', 'hash')
+    with self.setup_cache() as cache:
+      results_dir = self.write_results(cache, 'results', {'out': b'content'})
+      self.assertEquals([False], map(call_use_cached_files, [(cache, key, None)]))
+      map(call_insert, [(cache, key, [results_dir], False)])
+      self.assertEquals([True], map(call_use_cached_files, [(cache, key, None)]))
+
+  def test_backs_remote_cache(self):
+    key = CacheKey('target', 'hash')
+    with cache_server() as server:
+      with self.setup_cache() as local:
+        remote = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]),
+                                      TempLocalArtifactCache(local.artifact_root, 1))
+        combined = RESTfulArtifactCache(local.artifact_root, BestUrlSelector([server.url]), local)
+        results_dir = self.write_results(local, 'results', {'out': b'content'})
+        remote.insert(key, [results_dir])
+        self.assertFalse(local.has(key))
+
+        safe_mkdir(results_dir, clean=True)
+        self.assertTrue(combined.use_cached_files(key, results_dir=results_dir))
+        self.assertTrue(local.has(key))
+        with open(os.path.join(results_dir, 'out'), 'rb') as fp:
+          self.assertEquals(b'content', fp.read())
@@ -0,0 +1,104 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+from contextlib import contextmanager
+
+from pants.cache.artifact_cache import UnreadableArtifact
+from pants.cache.local_artifact_cache import LocalArtifactCache, TempLocalArtifactCache
+from pants.cache.pinger import BestUrlSelector
+from pants.cache.pipelined_artifact_cache_reader import PipelinedArtifactCacheReader
+from pants.cache.restful_artifact_cache import RESTfulArtifactCache
+from pants.goal.artifact_cache_stats import ArtifactCacheStats
+from pants.invalidation.build_invalidator import CacheKey
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_mkdir
+from pants_test.cache.cache_server import cache_server
+
+
+class TestPipelinedArtifactCacheReader(unittest.TestCase):
+
+  @contextmanager
+  def setup_caches(self):
+    """Yields (server, remote-only cache, local-backed remote cache, local cache)."""
+    with temporary_dir() as artifact_root, temporary_dir() as local_root:
+      with temporary_dir() as remote_root, cache_server(cache_root=remote_root) as server:
+        local = LocalArtifactCache(artifact_root, local_root, compression=1)
+        remote = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]),
+                                      TempLocalArtifactCache(artifact_root, 1))
+        combined = RESTfulArtifactCache(artifact_root, BestUrlSelector([server.url]), local)
+        yield server, remote, combined, local
+
+  def write_results(self, artifact_root, name):
+    results_dir = os.path.join(artifact_root, name)
+    safe_mkdir(results_dir, clean=True)
+    safe_file_dump(os.path.join(results_dir, 'out'), name.encode('utf-8'))
+    return results_dir
+
+  def test_read(self):
+    keys = [CacheKey('target{}'.format(i), 'hash') for i in range(6)]
+    with self.setup_caches() as (_, remote, combined, local):
+      items = []
+      for i, key in enumerate(keys):
+        results_dir = self.write_results(remote.artifact_root, key.id)
+        if i % 3 == 0:
+          remote.insert(key, [results_dir])
+        elif i % 3 == 1:
+          local.insert(key, [results_dir])
+        safe_mkdir(results_dir, clean=True)
+        items.append((key, results_dir))
+
+      reader = PipelinedArtifactCacheReader(combined, io_concurrency=4, extract_concurrency=2)
+      with temporary_dir() as stats_dir:
+        stats = ArtifactCacheStats(stats_dir)
+        results = reader.read(items, stats=stats, cache_name='test')
+
+      self.assertEquals([True, True, False] * 2, results)
+      for (key, results_dir), result in zip(items, results):
+        if result:
+          with open(os.path.join(results_dir, 'out'), 'rb') as fp:
+            self.assertEquals(key.id, fp.read())
+        else:
+          self.assertEquals([], os.listdir(results_dir))
+
+      # Remote hits are backfilled into the local cache.
+      self.assertTrue(local.has(keys[0]))
+
+      stages = stats.get_all()[0]['stages']
+      self.assertEquals({'hits': 4, 'misses': 2}, {k: stages['probe'][k] for k in ('hits', 'misses')})
+      self.assertEquals(4, stages['fetch']['hits'])
+      self.assertEquals(4, stages['extract']['hits'])
+      self.assertTrue(stages['fetch']['bytes'] > 0)
+
+  def test_corrupt_remote_artifact(self):
+    key = CacheKey('target', 'hash')
+    with self.setup_caches() as (server, remote, combined, local):
+      results_dir = self.write_results(remote.artifact_root, 'results')
+      remote.insert(key, [results_dir])
+      self.assertEquals(1, server.corrupt_artifacts(r'.*target.*'))
+
+      reader = PipelinedArtifactCacheReader(combined, io_concurrency=2, extract_concurrency=1)
+      result, = reader.read([(key, results_dir)])
+
+      self.assertIsInstance(result, UnreadableArtifact)
+      self.assertFalse(local.has(key))
+      self.assertEquals([], os.listdir(results_dir))
+      self.assertEquals([], [f for f in os.listdir(local._cache_root) if 'spooled' in f])
+
+  def test_local_only(self):
+    key = CacheKey('target', 'hash')
+    with temporary_dir() as artifact_root, temporary_dir() as cache_root:
+      local = LocalArtifactCache(artifact_root, cache_root, compression=1)
+      results_dir = self.write_results(artifact_root, 'results')
+      local.insert(key, [results_dir])
+      safe_mkdir(results_dir, clean=True)
+
+      reader = PipelinedArtifactCacheReader(local, io_concurrency=2, extract_concurrency=1)
+      self.assertEquals([True, False], reader.read([(key, results_dir),
+                                                    (CacheKey('other', 'hash'), None)]))
+      self.assertEquals(['out'], os.listdir(results_dir))
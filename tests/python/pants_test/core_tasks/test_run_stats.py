@@ -0,0 +1,70 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+
+from pants.base.exceptions import TaskError
+from pants.core_tasks.run_stats import RunStats
+from pants.stats.statsdb import StatsDB
+from pants_test.task_test_base import ConsoleTaskTestBase
+
+
+class RunStatsTest(ConsoleTaskTestBase):
+  @classmethod
+  def task_type(cls):
+    return RunStats
+
+  def setUp(self):
+    super(RunStatsTest, self).setUp()
+    self.statsdb_path = os.path.join(self.build_root, 'statsdb.sqlite')
+    self.set_options_for_scope('statsdb', path=self.statsdb_path)
+
+  def _insert_run(self, run_id, timestamp, goal_timings):
+    statsdb = StatsDB(self.statsdb_path)
+    statsdb.ensure_tables()
+    statsdb.insert_stats({
+      'run_info': {
+        'id': run_id,
+        'timestamp': str(timestamp),
+        'machine': 'ernie',
+        'user': 'bert',
+        'version': '9.8.7',
+        'buildroot': self.build_root,
+        'outcome': 'SUCCESS',
+        'cmd_line': 'pants',
+      },
+      'cumulative_timings': [{'label': 'main:{}'.format(goal), 'timing': timing}
+                             for goal, timing in goal_timings.items()],
+      'self_timings': [],
+    })
+
+  def test_no_runs(self):
+    self.assert_console_output('No runs recorded in the last 30 days.')
+
+  def test_percentiles(self):
+    # N.B. Midday, so that all runs fall on the same (UTC) day.
+    timestamp = int(time.time() // 86400 * 86400 + 43200)
+    if timestamp > time.time():
+      timestamp -= 86400
+    day = time.strftime('%Y-%m-%d', time.gmtime(timestamp))
+    for i in range(1, 5):
+      self._insert_run('run{}'.format(i), timestamp, {'compile': i, 'test': 0.5})
+    self._insert_run('old', timestamp - 60 * 86400, {'compile': 100})
+
+    self.assert_console_output(
+      '{}  compile       4 runs  p50=2.000s  p95=4.000s'.format(day),
+      '{}  test          4 runs  p50=0.500s  p95=0.500s'.format(day),
+    )
+    self.assert_console_output(
+      '{}  compile       4 runs  p90=4.000s'.format(day),
+      options={'goals': ['compile'], 'percentiles': [90]},
+    )
+
+  def test_invalid_percentile(self):
+    with self.assertRaises(TaskError):
+      self.execute_console_task(options={'percentiles': [0]})
@@ -0,0 +1,114 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import os
+import time
+
+from pants.backend.jvm.register import build_file_aliases as jvm_build_file_aliases
+from pants.backend.python.register import build_file_aliases as python_build_file_aliases
+from pants.build_graph.register import build_file_aliases as core_build_file_aliases
+from pants.engine.legacy.parse_cache import CachingParser, parser_fingerprint
+from pants.engine.legacy.parser import LegacyPythonCallbacksParser
+from pants.init.engine_initializer import LegacySymbolTable
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+_BUILD_FILE_TEMPLATE = """
+java_library(
+  name='lib{i}',
+  sources=globs('*.java', exclude=['Generated*.java']),
+  dependencies=[
+    ':jars{i}',
+    'src/{dep}:lib{dep}',
+  ],
+)
+
+jar_library(
+  name='jars{i}',
+  jars=[
+    jar(org='org.pantsbuild', name='dep{i}', rev='1.0.{i}', excludes=[exclude('com.google')]),
+  ],
+)
+
+junit_tests(
+  name='tests{i}',
+  sources=rglobs('*Test.java'),
+  dependencies=[':lib{i}'],
+)
+
+python_library(
+  name='py{i}',
+  sources=globs('*.py'),
+  dependencies=[':reqs{i}'],
+)
+
+python_requirement_library(
+  name='reqs{i}',
+  requirements=[python_requirement('six==1.{i}')],
+)
+"""
+
+
+def _create_build_files(build_root, count):
+  paths = []
+  for i in range(count):
+    path = os.path.join('src', str(i), 'BUILD')
+    safe_file_dump(os.path.join(build_root, path),
+                   _BUILD_FILE_TEMPLATE.format(i=i, dep=(i + 1) % count))
+    paths.append(path)
+  return paths
+
+
+def _timed(description, parser, build_root, paths):
+  start = time.time()
+  for path in paths:
+    with open(os.path.join(build_root, path), 'rb') as fp:
+      parser.parse(path, fp.read())
+  print('{:<40} {:>8.3f}s'.format(description, time.time() - start))
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Benchmarks parsing synthetic BUILD files, cold and restored from a parse cache.')
+  parser.add_argument('--build-files', type=int, default=10000,
+                      help='The number of BUILD files to parse.')
+  parser.add_argument('--changed', type=int, default=100,
+                      help='The number of BUILD files to change before parsing from the cache.')
+  args = parser.parse_args()
+
+  aliases = (core_build_file_aliases()
+             .merge(jvm_build_file_aliases())
+             .merge(python_build_file_aliases()))
+
+  def new_parser():
+    return LegacyPythonCallbacksParser(LegacySymbolTable(aliases), aliases, 'allow')
+
+  with temporary_dir() as build_root:
+    paths = _create_build_files(build_root, args.build_files)
+    cache_path = os.path.join(build_root, '.pants.d', 'build_file_parses',
+                              parser_fingerprint(aliases, 'allow'))
+    print('Parsing {} BUILD files'.format(len(paths)))
+
+    _timed('cold', new_parser(), build_root, paths)
+
+    start = time.time()
+    caching_parser = CachingParser(new_parser(), cache_path, build_root)
+    _timed('cold, populating the cache', caching_parser, build_root, paths)
+    caching_parser.save()
+    print('{:<40} {:>8.3f}s'.format('  including save', time.time() - start))
+
+    for path in paths[:args.changed]:
+      with open(os.path.join(build_root, path), 'ab') as fp:
+        fp.write(b'\n# changed\n')
+    _timed('restored, {} changed'.format(args.changed),
+           CachingParser(new_parser(), cache_path, build_root), build_root, paths)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,98 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.build_graph.build_file_aliases import BuildFileAliases
+from pants.build_graph.target import Target
+from pants.engine.legacy.parse_cache import CachingParser, parser_fingerprint
+from pants.engine.legacy.parser import LegacyPythonCallbacksParser
+from pants.engine.legacy.structs import TargetAdaptor
+from pants.engine.parser import SymbolTable
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump, safe_rmtree
+
+
+class TargetTable(SymbolTable):
+
+  def table(self):
+    return {'target': TargetAdaptor}
+
+
+class CountingParser(LegacyPythonCallbacksParser):
+
+  def __init__(self):
+    super(CountingParser, self).__init__(TargetTable(),
+                                         BuildFileAliases(targets={'target': Target},
+                                                          objects={'unpicklable': lambda: None}),
+                                         build_file_imports_behavior='allow')
+    self.parsed = []
+
+  def parse(self, filepath, filecontent):
+    self.parsed.append(filepath)
+    return super(CountingParser, self).parse(filepath, filecontent)
+
+
+class CachingParserTest(unittest.TestCase):
+
+  def _parser(self, build_root):
+    return CachingParser(CountingParser(), os.path.join(build_root, '.pants.d', 'parses'),
+                         build_root)
+
+  def _parse(self, parser, build_root, filepath):
+    with open(os.path.join(build_root, filepath), 'rb') as fp:
+      return [obj._asdict() for obj in parser.parse(filepath, fp.read())]
+
+  def test_reuses_unchanged_build_files(self):
+    with temporary_dir() as build_root:
+      safe_file_dump(os.path.join(build_root, 'a/BUILD'), "target(name='a', dependencies=['b'])")
+      safe_file_dump(os.path.join(build_root, 'b/BUILD'), "target(name='b')")
+
+      parser = self._parser(build_root)
+      expected_a = self._parse(parser, build_root, 'a/BUILD')
+      expected_b = self._parse(parser, build_root, 'b/BUILD')
+      self.assertEqual((2, 0), (parser.parsed, parser.reused))
+      parser.save()
+
+      safe_file_dump(os.path.join(build_root, 'b/BUILD'), "target(name='c')")
+      parser = self._parser(build_root)
+      self.assertEqual(expected_a, self._parse(parser, build_root, 'a/BUILD'))
+      self.assertNotEqual(expected_b, self._parse(parser, build_root, 'b/BUILD'))
+      self.assertEqual((1, 1), (parser.parsed, parser.reused))
+      self.assertEqual(['b/BUILD'], parser._parser.parsed)
+
+  def test_unpicklable_objects(self):
+    with temporary_dir() as build_root:
+      safe_file_dump(os.path.join(build_root, 'a/BUILD'),
+                     "target(name='a', payload=unpicklable)")
+      parser = self._parser(build_root)
+      self._parse(parser, build_root, 'a/BUILD')
+      parser.save()
+
+      parser = self._parser(build_root)
+      self._parse(parser, build_root, 'a/BUILD')
+      self.assertEqual((1, 0), (parser.parsed, parser.reused))
+
+  def test_save_drops_removed_build_files(self):
+    with temporary_dir() as build_root:
+      safe_file_dump(os.path.join(build_root, 'a/BUILD'), "target(name='a')")
+      safe_file_dump(os.path.join(build_root, 'b/BUILD'), "target(name='b')")
+      parser = self._parser(build_root)
+      self._parse(parser, build_root, 'a/BUILD')
+      self._parse(parser, build_root, 'b/BUILD')
+      safe_rmtree(os.path.join(build_root, 'b'))
+      parser.save()
+
+      self.assertEqual(['a/BUILD'], list(self._parser(build_root)._read().keys()))
+
+  def test_parser_fingerprint(self):
+    aliases = BuildFileAliases(targets={'target': Target})
+    self.assertEqual(parser_fingerprint(aliases, 'allow'), parser_fingerprint(aliases, 'allow'))
+    self.assertNotEqual(parser_fingerprint(aliases, 'allow'), parser_fingerprint(aliases, 'warn'))
+    self.assertNotEqual(parser_fingerprint(aliases, 'allow'),
+                        parser_fingerprint(BuildFileAliases(targets={'other': Target}), 'allow'))
@@ -0,0 +1,95 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.build_graph.address import BuildFileAddress
+from pants.engine.legacy.graph import HydratedTarget, OwnersIndex
+from pants.engine.legacy.source_mapper import EngineSourceMapper
+from pants.engine.legacy.structs import TargetAdaptor
+from pants.source.wrapped_globs import EagerFilesetWithSpec, Globs
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import fast_relpath_optional, touch
+
+
+def hydrated_target(spec_path, name, source=None, globs=(), files=()):
+  address = BuildFileAddress(target_name=name, rel_path=os.path.join(spec_path, 'BUILD'))
+  kwargs = dict(address=address, name=name)
+  if source:
+    kwargs['source'] = source
+  if globs:
+    filespec = Globs.to_filespec(globs, root=spec_path)
+    kwargs['sources'] = EagerFilesetWithSpec(spec_path, filespec, files=files, files_hash=None)
+  return HydratedTarget(address, TargetAdaptor(**kwargs), ())
+
+
+class FakeScheduler(object):
+  """Computes the OwnersIndex of AscendantAddresses specs from a fixed set of HydratedTargets."""
+
+  def __init__(self, hydrated_targets):
+    self._hydrated_targets = hydrated_targets
+    self.requested_dirs = []
+
+  def product_request(self, product, subjects):
+    assert product is OwnersIndex
+    indexes = []
+    for specs in subjects:
+      spec, = specs.dependencies
+      self.requested_dirs.append(spec.directory)
+      indexes.append(OwnersIndex.create(
+        [ht for ht in self._hydrated_targets
+         if fast_relpath_optional(spec.directory, ht.address.spec_path) is not None]))
+    return indexes
+
+
+class OwnersIndexTest(unittest.TestCase):
+
+  def test_owners_of(self):
+    a = hydrated_target('src/a', 'a', globs=['*.py'], files=['a.py', 'b.py'])
+    b = hydrated_target('src/a', 'b', source='b.py')
+    index = OwnersIndex.create([a, b])
+
+    self.assertEqual([a.address], list(index.owners_of('src/a/a.py')))
+    self.assertEqual([a.address, b.address], list(index.owners_of('src/a/b.py')))
+    self.assertEqual([a.address, b.address], list(index.owners_of('src/a/BUILD')))
+    self.assertEqual([], list(index.owners_of('src/a/c.py')))
+
+
+class EngineSourceMapperTest(unittest.TestCase):
+
+  def setUp(self):
+    self.root = hydrated_target('', 'root', globs=['**/*.txt'], files=['src/a/notes.txt'])
+    self.a = hydrated_target('src/a', 'a', globs=['*.py'], files=['a.py'])
+    self.sibling = hydrated_target('src/b', 'b', globs=['*.py'], files=['b.py'])
+    self.scheduler = FakeScheduler([self.root, self.a, self.sibling])
+
+  def owners(self, build_root, *sources):
+    mapper = EngineSourceMapper(self.scheduler, build_root=build_root)
+    return sorted(a.spec for a in mapper.iter_target_addresses_for_sources(sources))
+
+  def test_existing_files(self):
+    with temporary_dir() as build_root:
+      for path in ('src/a/a.py', 'src/a/notes.txt', 'src/a/unowned.py', 'src/b/b.py'):
+        touch(os.path.join(build_root, path))
+
+      self.assertEqual(['//:root', 'src/a:a', 'src/b:b'],
+                       self.owners(build_root, 'src/a/a.py', 'src/a/notes.txt', 'src/a/unowned.py',
+                                   'src/b/b.py'))
+      # One index is requested per directory.
+      self.assertEqual(['src/a', 'src/b'], sorted(self.scheduler.requested_dirs))
+
+  def test_build_files(self):
+    with temporary_dir() as build_root:
+      touch(os.path.join(build_root, 'src/a/BUILD'))
+      self.assertEqual(['src/a:a'], self.owners(build_root, 'src/a/BUILD'))
+
+  def test_deleted_files(self):
+    with temporary_dir() as build_root:
+      self.assertEqual(['src/a:a'], self.owners(build_root, 'src/a/deleted.py'))
+      self.assertEqual(['//:root', 'src/a:a'],
+                       self.owners(build_root, 'src/a/deleted.py', 'src/a/deleted.txt'))
@@ -72,6 +72,33 @@ class ArtifactCacheStatsTest(TestBase):
       artifact_cache_stats.add_misses(self.TEST_CACHE_NAME_2, [self.target_a],
                                       [self.TEST_LOCAL_ERROR])
 
+  def test_add_stage_stat(self):
+    expected_stats = [
+      {
+        'cache_name': self.TEST_CACHE_NAME_1,
+        'num_hits': 1,
+        'num_misses': 0,
+        'hits': [(self.TEST_SPEC_B, '')],
+        'misses': [],
+        'stages': {
+          'probe': {'hits': 1, 'misses': 1, 'bytes': 0, 'seconds': 3.0, 'max_seconds': 2.0},
+          'fetch': {'hits': 1, 'misses': 0, 'bytes': 1024, 'seconds': 4.0, 'max_seconds': 4.0},
+        },
+      },
+    ]
+
+    expected_hit_or_miss_files = {
+      '{}.hits'.format(self.TEST_CACHE_NAME_1): '{}\n'.format(self.TEST_SPEC_B),
+    }
+
+    with self.mock_artifact_cache_stats(expected_stats,
+                                        expected_hit_or_miss_files=expected_hit_or_miss_files)\
+        as artifact_cache_stats:
+      artifact_cache_stats.add_stage_stat(self.TEST_CACHE_NAME_1, 'probe', True, 0, 1.0)
+      artifact_cache_stats.add_stage_stat(self.TEST_CACHE_NAME_1, 'probe', False, 0, 2.0)
+      artifact_cache_stats.add_stage_stat(self.TEST_CACHE_NAME_1, 'fetch', True, 1024, 4.0)
+      artifact_cache_stats.add_hits(self.TEST_CACHE_NAME_1, [self.target_b])
+
   @contextmanager
   def mock_artifact_cache_stats(self,
                                 expected_stats,
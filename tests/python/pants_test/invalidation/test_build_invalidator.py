@@ -62,10 +62,12 @@ class BaseBuildInvalidatorTest(unittest.TestCase):
 
 
 class BuildInvalidatorTest(BaseBuildInvalidatorTest):
+  store = 'files'
+
   @contextmanager
   def invalidator(self):
     with temporary_dir() as root:
-      yield BuildInvalidator(root)
+      yield BuildInvalidator(root, store=self.store)
 
   def test_cache_key_previous(self):
     with self.invalidator() as invalidator:
@@ -136,6 +138,21 @@ class BuildInvalidatorTest(BaseBuildInvalidatorTest):
       self.assertTrue(invalidator.needs_update(key2))
 
 
+class LogBuildInvalidatorTest(BuildInvalidatorTest):
+  store = 'log'
+
+  def test_batch(self):
+    with temporary_dir() as root:
+      invalidator = BuildInvalidator(root, store=self.store)
+      other = BuildInvalidator(root, store=self.store)
+      key = self.cache_key()
+      with invalidator.batch():
+        self.assertTrue(invalidator.needs_update(key))
+        other.update(key)
+        self.assertTrue(invalidator.needs_update(key))
+      self.assertFalse(invalidator.needs_update(key))
+
+
 class BuildInvalidatorFactoryTest(BaseBuildInvalidatorTest):
   def setUp(self):
     pants_workdir = tempfile.mkdtemp()
@@ -9,6 +9,7 @@ import os
 import shutil
 import tempfile
 
+from pants.build_graph.transitive_fingerprinter import TransitiveFingerprinter
 from pants.invalidation.build_invalidator import BuildInvalidator, CacheKeyGenerator
 from pants.invalidation.cache_manager import InvalidationCacheManager, VersionedTargetSet
 from pants.util.dirutil import safe_mkdir, safe_rmtree
@@ -200,3 +201,19 @@ class InvalidationCacheManagerTest(TestBase):
     vts = VersionedTargetSet.from_versioned_targets([vt])
     with self.assertRaises(VersionedTargetSet.IllegalResultsDir):
       vts.update()
+
+  def test_check_with_transitive_fingerprinter(self):
+    a = self.make_target(':a', dependencies=[])
+    b = self.make_target(':b', dependencies=[a])
+    expected = [vt.cache_key for vt in self.cache_manager.check([a, b]).all_vts]
+    for target in (a, b):
+      target.mark_invalidation_hash_dirty()
+
+    cache_manager = InvalidationCacheManager(
+      results_dir_root=os.path.join(self._dir, 'results'),
+      cache_key_generator=CacheKeyGenerator(),
+      build_invalidator=BuildInvalidator(os.path.join(self._dir, 'build_invalidator')),
+      invalidate_dependents=True,
+      transitive_fingerprinter=TransitiveFingerprinter(parallelism=2),
+    )
+    self.assertEqual(expected, [vt.cache_key for vt in cache_manager.check([a, b]).all_vts])
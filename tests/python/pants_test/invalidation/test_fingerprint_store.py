@@ -0,0 +1,102 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import unittest
+
+from pants.invalidation.fingerprint_store import FileFingerprintStore, LogFingerprintStore
+from pants.util.contextutil import temporary_dir
+
+
+class LogFingerprintStoreTest(unittest.TestCase):
+
+  def log_lines(self, store):
+    with open(store._log, 'rb') as fp:
+      return fp.read().splitlines()
+
+  def test_roundtrip_across_instances(self):
+    with temporary_dir() as root:
+      store = LogFingerprintStore(root)
+      store.write('a', '1')
+      store.write('b', '2')
+      store.write('a', '3')
+      store.delete('b')
+
+      reopened = LogFingerprintStore(root)
+      self.assertEquals('3', reopened.read('a'))
+      self.assertIsNone(reopened.read('b'))
+      self.assertEquals([LogFingerprintStore.LOG_NAME], os.listdir(root))
+
+  def test_reads_records_appended_by_others(self):
+    with temporary_dir() as root:
+      store = LogFingerprintStore(root)
+      other = LogFingerprintStore(root)
+      store.write('a', '1')
+      self.assertEquals('1', other.read('a'))
+      store.write('a', '2')
+      self.assertEquals('2', other.read('a'))
+
+  def test_clear_is_seen_by_others(self):
+    with temporary_dir() as root:
+      store = LogFingerprintStore(root)
+      other = LogFingerprintStore(root)
+      store.write('a', '1')
+      self.assertEquals('1', other.read('a'))
+      store.clear()
+      store.write('b', '1')
+      self.assertIsNone(other.read('a'))
+      self.assertEquals('1', other.read('b'))
+
+  def test_torn_record(self):
+    with temporary_dir() as root:
+      store = LogFingerprintStore(root)
+      store.write('a', '1')
+      # Simulate a crash part way through appending a record.
+      with open(store._log, 'ab') as fp:
+        fp.write(b'b\t2')
+
+      reopened = LogFingerprintStore(root)
+      self.assertIsNone(reopened.read('b'))
+      reopened.write('c', '3')
+      self.assertEquals('1', LogFingerprintStore(root).read('a'))
+      self.assertEquals('3', LogFingerprintStore(root).read('c'))
+      self.assertEquals([b'b\t2', b'c\t3'], self.log_lines(reopened)[2:])
+
+  def test_compaction(self):
+    with temporary_dir() as root:
+      store = LogFingerprintStore(root)
+      for i in range(store._MIN_COMPACTION_RECORDS + 1):
+        store.write('a', str(i))
+      store.write('b', 'b')
+
+      reopened = LogFingerprintStore(root)
+      self.assertEquals(str(store._MIN_COMPACTION_RECORDS), reopened.read('a'))
+      self.assertEquals('b', reopened.read('b'))
+      self.assertEquals(3, len(self.log_lines(reopened)))
+
+      # The original store notices that the log has been replaced.
+      store.write('a', 'new')
+      self.assertEquals('new', reopened.read('a'))
+      self.assertEquals('b', store.read('b'))
+
+  def test_migrates_files(self):
+    long_id = 'x' * 300
+    with temporary_dir() as root:
+      legacy = FileFingerprintStore(root)
+      legacy.write('a', '1')
+      legacy.write(long_id, '2')
+
+      store = LogFingerprintStore(root)
+      with store.batch():
+        self.assertEquals('1', store.read('a'))
+        self.assertEquals('2', store.read(long_id))
+        self.assertIsNone(store.read('missing'))
+      self.assertEquals([LogFingerprintStore.LOG_NAME], os.listdir(root))
+
+      reopened = LogFingerprintStore(root)
+      self.assertEquals('1', reopened.read('a'))
+      self.assertEquals('2', reopened.read(long_id))
@@ -0,0 +1,58 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import os
+import subprocess
+import time
+
+
+def _timed_runs(buildroot, command, runs):
+  timings = []
+  with open(os.devnull, 'wb') as devnull:
+    for _ in range(runs):
+      start = time.time()
+      subprocess.check_call(command, cwd=buildroot, stdout=devnull, stderr=devnull)
+      timings.append(time.time() - start)
+  return sorted(timings)
+
+
+def _report(description, timings):
+  def percentile(p):
+    return timings[min(len(timings) - 1, int(len(timings) * p))]
+  print('{:<24} min {:>7.3f}s  p50 {:>7.3f}s  p90 {:>7.3f}s  max {:>7.3f}s'
+        .format(description, timings[0], percentile(0.5), percentile(0.9), timings[-1]))
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Benchmarks the end-to-end client latency of a trivial goal, with and without '
+                'pantsd. Run it against each revision to compare.')
+  parser.add_argument('--buildroot', default=os.getcwd(),
+                      help='The buildroot to run pants in.')
+  parser.add_argument('--runs', type=int, default=20,
+                      help='The number of timed runs of each configuration.')
+  parser.add_argument('goal_args', nargs='*', default=['list', '::'],
+                      help='The goal and arguments to run.')
+  args = parser.parse_args()
+
+  pants = os.path.join(args.buildroot, 'pants')
+  daemon_command = [pants, '--enable-pantsd'] + args.goal_args
+  try:
+    # Launch the daemon and warm its product graph before timing any runs.
+    subprocess.check_call(daemon_command, cwd=args.buildroot)
+    _report('pantsd', _timed_runs(args.buildroot, daemon_command, args.runs))
+  finally:
+    subprocess.call([pants, '--enable-pantsd', 'kill-pantsd'], cwd=args.buildroot)
+
+  _report('no pantsd', _timed_runs(args.buildroot,
+                                   [pants, '--no-enable-pantsd'] + args.goal_args,
+                                   args.runs))
+
+
+if __name__ == '__main__':
+  main()
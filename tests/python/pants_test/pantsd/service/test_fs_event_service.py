@@ -92,3 +92,42 @@ class TestFSEventService(TestBase):
       self.mock_watchman.subscribed.return_value = self.FAKE_EVENT_STREAM
       self.service.run()
       assert not mock_callback.called
+
+  def test_watchman_ignore_expressions(self):
+    dotfiles = {'includedotfiles': True}
+    self.assertEqual(
+      [
+        ['allof', ['type', 'd'], ['match', '.*', 'basename', dotfiles]],
+        ['match', '**/.*/**', 'wholename', dotfiles],
+        ['allof', ['type', 'd'], ['match', 'dist', 'wholename', dotfiles]],
+        ['match', 'dist/**', 'wholename', dotfiles],
+        ['match', 'src/*.log', 'wholename', dotfiles],
+        ['match', 'src/*.log/**', 'wholename', dotfiles],
+      ],
+      FSEventService._watchman_ignore_expressions(['.*/', '/dist/', '# comment', 'src/*.log',
+                                                   'file[0-9]'])
+    )
+
+  def test_watchman_ignore_expressions_negation(self):
+    # Only the patterns following the last negation can be excluded by watchman.
+    self.assertEqual(
+      [['match', 'c', 'basename', {'includedotfiles': True}],
+       ['match', '**/c/**', 'wholename', {'includedotfiles': True}]],
+      FSEventService._watchman_ignore_expressions(['a', '!a/keep', 'b', '!b/keep', 'c'])
+    )
+
+  def test_filter_event(self):
+    service = FSEventService(self.mock_watchman, self.BUILD_ROOT, self.WORKER_COUNT,
+                             ignore_patterns=['node_modules/', '!node_modules/BUILD'])
+    service.register_all_files_handler(lambda x: None, name='filtered')
+    service.register_handler('unfiltered', dict(fields=[], expression=[]), lambda x: None)
+
+    event = dict(files=['a/BUILD', 'node_modules/x.js', 'node_modules/BUILD'])
+    self.assertEqual(['a/BUILD', 'node_modules/BUILD'],
+                     service._filter_event('filtered', event)['files'])
+    self.assertIsNone(service._filter_event('filtered', dict(files=['node_modules/y.js'])))
+    self.assertIs(event, service._filter_event('unfiltered', event))
+    self.assertEqual({'fs_events_received': 3,
+                      'fs_event_files_filtered': 2,
+                      'fs_event_files_delivered': 5},
+                     service.event_stats())
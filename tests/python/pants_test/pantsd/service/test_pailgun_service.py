@@ -5,11 +5,15 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import threading
 import unittest
 
 import mock
 
+from pants.option.options_bootstrapper import OptionsBootstrapper
+from pants.option.options_fingerprinter import OptionsFingerprinter
 from pants.pantsd.service.pailgun_service import PailgunService
+from pants.util.rwlock import ReadWriteLock
 
 
 PATCH_OPTS = dict(autospec=True, spec_set=True)
@@ -37,3 +41,51 @@ class TestPailgunService(unittest.TestCase):
     mock_setup.return_value = fake_pailgun
     self.assertIs(self.service.pailgun, fake_pailgun)
     self.assertEqual(self.service.pailgun_port, 33333)
+
+  def _options_bootstrapper(self, *args):
+    return OptionsBootstrapper(env={}, args=['./pants'] + list(args))
+
+  def test_can_reuse_initialization(self):
+    fingerprint = OptionsFingerprinter.daemon_options_fingerprint(
+      self._options_bootstrapper().get_bootstrap_options())
+    service = PailgunService(bind_addr=(None, None),
+                             exiter_class=self.mock_exiter_class,
+                             runner_class=self.mock_runner_class,
+                             target_roots_calculator=self.mock_target_roots_calculator,
+                             scheduler_service=self.mock_scheduler_service,
+                             options_fingerprint=fingerprint)
+    self.assertTrue(service._can_reuse_initialization(self._options_bootstrapper()))
+    # Options that don't affect the daemon don't affect the loaded backends and plugins either.
+    self.assertTrue(service._can_reuse_initialization(self._options_bootstrapper('-q')))
+    self.assertFalse(service._can_reuse_initialization(
+      self._options_bootstrapper('--backend-packages=[]')))
+
+  def test_cannot_reuse_initialization_without_fingerprint(self):
+    self.assertFalse(self.service._can_reuse_initialization(self._options_bootstrapper()))
+
+  @mock.patch('pants.pantsd.service.pailgun_service.OptionsInitializer', autospec=True)
+  @mock.patch('pants.pantsd.service.pailgun_service.BuildConfigInitializer', autospec=True)
+  def test_parse_options_is_serialized_and_excludes_forks(self, _, mock_options_initializer):
+    fork_lock = ReadWriteLock()
+    self.service.setup(threading.RLock(), fork_lock)
+    active = []
+    forked_while_parsing = []
+
+    def create(options_bootstrapper, build_config):
+      active.append(options_bootstrapper)
+      self.assertEqual(1, len(active))
+      fork = threading.Thread(target=lambda: fork_lock.acquire_write() or fork_lock.release_write())
+      fork.start()
+      fork.join(0.05)
+      forked_while_parsing.append(not fork.is_alive())
+      active.remove(options_bootstrapper)
+      return fork
+    mock_options_initializer.create.side_effect = create
+
+    parsers = [threading.Thread(target=self.service._parse_options, args=(['./pants'], {}))
+               for _ in range(3)]
+    for parser in parsers:
+      parser.start()
+    for parser in parsers:
+      parser.join()
+    self.assertEqual([False] * 3, forked_while_parsing)
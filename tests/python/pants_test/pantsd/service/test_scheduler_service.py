@@ -0,0 +1,229 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import threading
+import time
+import unittest
+from collections import defaultdict, namedtuple
+
+import mock
+
+from pants.build_graph.address import BuildFileAddress
+from pants.engine.legacy.graph import HydratedTarget
+from pants.engine.legacy.structs import TargetAdaptor
+from pants.pantsd.service.scheduler_service import SchedulerService
+from pants.source.wrapped_globs import EagerFilesetWithSpec, Globs
+from pants.util.rwlock import ReadWriteLock
+
+
+FakeTransitiveHydratedTargets = namedtuple('FakeTransitiveHydratedTargets', ['closure'])
+
+
+def hydrated_target(spec_path, files):
+  address = BuildFileAddress(target_name='a', rel_path=os.path.join(spec_path, 'BUILD'))
+  filespec = Globs.to_filespec(['*'], root=spec_path)
+  sources = EagerFilesetWithSpec(spec_path, filespec, files=files, files_hash=None)
+  return HydratedTarget(address, TargetAdaptor(address=address, name='a', sources=sources), ())
+
+
+class FakeScheduler(object):
+  """A product graph of filesystem nodes, which have a path subject, and nodes derived from them."""
+
+  def __init__(self):
+    self.subjects = {}
+    self.dependents = defaultdict(set)
+    self.invalidated = []
+
+  def add_node(self, node, subject=None, dependencies=()):
+    self.subjects[node] = subject
+    for dependency in dependencies:
+      self.dependents[dependency].add(node)
+
+  def add_target(self, spec_path, files, derived_nodes):
+    """Adds the subgraph of a target, as parsed from a recursive spec, with the given node count."""
+    self.add_node(('Scandir', ''), '')
+    leaves = [('Scandir', ''), ('Scandir', spec_path),
+              ('DigestFile', os.path.join(spec_path, 'BUILD'))]
+    leaves.extend(('DigestFile', os.path.join(spec_path, f)) for f in files)
+    for leaf in leaves[1:]:
+      self.add_node(leaf, leaf[1])
+    dependencies = leaves
+    for i in range(derived_nodes - len(leaves) + 1):
+      node = ('Derived', spec_path, i)
+      self.add_node(node, dependencies=dependencies)
+      dependencies = [node]
+
+  def graph_len(self):
+    return len(self.subjects)
+
+  def invalidate_files(self, files):
+    self.invalidated.append(sorted(files))
+    return len(files)
+
+  def invalidate_paths(self, paths):
+    self.invalidated.append(sorted(paths))
+    pending = [node for node, subject in self.subjects.items() if subject in paths]
+    removed = 0
+    while pending:
+      node = pending.pop()
+      if node in self.subjects:
+        del self.subjects[node]
+        removed += 1
+        pending.extend(self.dependents.pop(node, ()))
+    return removed
+
+
+class SchedulerServiceTest(unittest.TestCase):
+
+  def _service(self, scheduler, max_graph_nodes=None, invalidation_settle_window=0):
+    graph_helper = mock.Mock(scheduler=scheduler)
+    fs_event_service = mock.Mock(PANTS_PID_SUBSCRIPTION_NAME='pantsd_pid')
+    fs_event_service.event_stats.return_value = {}
+    service = SchedulerService(fs_event_service, graph_helper, '/build_root', [], None,
+                               max_graph_nodes=max_graph_nodes,
+                               invalidation_settle_window=invalidation_settle_window)
+    service.setup(threading.RLock(), ReadWriteLock())
+    # The initial watchman event would be awaited before warming a non-empty product graph.
+    service._watchman_is_running.set()
+    return service
+
+  def _warm(self, service, *spec_paths):
+    closure = [hydrated_target(spec_path, ['x.py']) for spec_path in spec_paths]
+    service._graph_helper.new_session.return_value.warm_product_graph.return_value = [
+      FakeTransitiveHydratedTargets(closure)
+    ]
+    service.warm_product_graph(mock.Mock(), mock.Mock())
+
+  def _scheduler(self, nodes_per_dir):
+    scheduler = FakeScheduler()
+    for spec_path, node_count in nodes_per_dir.items():
+      scheduler.add_target(spec_path, ['x.py'], node_count)
+    return scheduler
+
+  def test_evicts_least_recently_used_dirs(self):
+    scheduler = self._scheduler({'a': 40, 'b': 40, 'c': 39})
+    service = self._service(scheduler, max_graph_nodes=100)
+    # Including the root directory's node, which every target depends on.
+    self.assertEqual(120, service.product_graph_len())
+    self._warm(service, 'a', 'b')
+    self._warm(service, 'c')
+    self._warm(service, 'a')
+
+    service._maybe_evict_product_graph()
+    # The files of the directory are evicted as well as the directory itself: otherwise their
+    # nodes would remain in the graph.
+    self.assertEqual([['b', 'b/BUILD', 'b/x.py']], scheduler.invalidated)
+    stats = service.product_graph_stats()
+    self.assertEqual((80, 40, 1), (stats['product_graph_size'],
+                                   stats['product_graph_evicted_nodes'],
+                                   stats['product_graph_evictions']))
+
+    # The graph is within its budget, so nothing more is evicted.
+    service._maybe_evict_product_graph()
+    self.assertEqual([['b', 'b/BUILD', 'b/x.py']], scheduler.invalidated)
+
+  def test_root_dir_is_not_evicted(self):
+    scheduler = self._scheduler({'': 60, 'a': 60})
+    service = self._service(scheduler, max_graph_nodes=100)
+    self._warm(service, '')
+    self._warm(service, 'a')
+
+    service._maybe_evict_product_graph()
+    self.assertEqual([['BUILD', 'x.py']], scheduler.invalidated)
+    self.assertIn(('Scandir', ''), scheduler.subjects)
+    self.assertEqual(61, service.product_graph_len())
+
+  def test_no_budget(self):
+    scheduler = self._scheduler({'a': 40, 'b': 40, 'c': 40})
+    service = self._service(scheduler, max_graph_nodes=None)
+    self._warm(service, 'a', 'b', 'c')
+    service._maybe_evict_product_graph()
+    self.assertEqual([], scheduler.invalidated)
+
+  def test_nothing_left_to_evict(self):
+    scheduler = self._scheduler({'a': 40, 'untracked': 200})
+    service = self._service(scheduler, max_graph_nodes=100)
+    self._warm(service, 'a')
+    service._maybe_evict_product_graph()
+    self.assertEqual([['a', 'a/BUILD', 'a/x.py']], scheduler.invalidated)
+    self.assertEqual(201, service.product_graph_len())
+
+    # Eviction backs off until the graph has grown by the eviction headroom (20 nodes).
+    scheduler.add_target('b', ['x.py'], 10)
+    self._warm(service, 'b')
+    service._maybe_evict_product_graph()
+    self.assertEqual([['a', 'a/BUILD', 'a/x.py']], scheduler.invalidated)
+    self.assertEqual(211, service.product_graph_len())
+
+    scheduler.add_target('c', ['x.py'], 20)
+    self._warm(service, 'c')
+    service._maybe_evict_product_graph()
+    self.assertEqual([['a', 'a/BUILD', 'a/x.py'],
+                      ['b', 'b/BUILD', 'b/x.py'],
+                      ['c', 'c/BUILD', 'c/x.py']], scheduler.invalidated)
+    self.assertEqual(201, service.product_graph_len())
+
+  def test_stops_when_a_batch_evicts_nothing(self):
+    scheduler = self._scheduler({'a': 40, 'b': 100})
+    service = self._service(scheduler, max_graph_nodes=100)
+    self._warm(service, 'a')
+    self._warm(service, 'b')
+    # The nodes of `a` are invalidated (eg: because it was deleted) after it was warmed.
+    scheduler.invalidate_paths(['a', 'a/BUILD', 'a/x.py'])
+    self.assertEqual(101, service.product_graph_len())
+
+    service._maybe_evict_product_graph()
+    self.assertEqual([['a', 'a/BUILD', 'a/x.py']] * 2, scheduler.invalidated)
+    self.assertEqual(101, service.product_graph_len())
+    self.assertEqual(0, service.product_graph_stats()['product_graph_evicted_nodes'])
+
+    # The graph has not grown, so eviction is not attempted again.
+    service._maybe_evict_product_graph()
+    self.assertEqual([['a', 'a/BUILD', 'a/x.py']] * 2, scheduler.invalidated)
+
+  def _event(self, files, subscription='all_files', is_fresh_instance=False):
+    return dict(subscription=subscription, is_fresh_instance=is_fresh_instance,
+                files=[f.encode('utf-8') for f in files])
+
+  def test_coalesces_queued_events(self):
+    scheduler = FakeScheduler()
+    service = self._service(scheduler)
+    service._enqueue_fs_event(self._event(['a/BUILD'], is_fresh_instance=True))
+    service._enqueue_fs_event(self._event(['a/BUILD', 'b/BUILD']))
+    service._enqueue_fs_event(self._event(['b/BUILD', 'b/c.py']))
+
+    service._process_event_queue()
+    self.assertEqual([['a/BUILD', 'b/BUILD', 'b/c.py']], scheduler.invalidated)
+    self.assertTrue(service._watchman_is_running.is_set())
+    stats = service.product_graph_stats()
+    self.assertEqual(1, stats['product_graph_invalidation_batches'])
+    self.assertEqual(3, stats['product_graph_invalidated_nodes'])
+    self.assertGreaterEqual(stats['product_graph_last_invalidation_latency'], 0)
+
+  def test_settle_window(self):
+    scheduler = FakeScheduler()
+    service = self._service(scheduler, invalidation_settle_window=0.2)
+    service._enqueue_fs_event(self._event(['a/BUILD']))
+
+    def enqueue_later():
+      time.sleep(0.05)
+      service._enqueue_fs_event(self._event(['b/BUILD']))
+
+    thread = threading.Thread(target=enqueue_later)
+    thread.start()
+    service._process_event_queue()
+    thread.join()
+    self.assertEqual([['a/BUILD', 'b/BUILD']], scheduler.invalidated)
+
+  def test_initial_events_are_ignored(self):
+    scheduler = FakeScheduler()
+    service = self._service(scheduler)
+    service._enqueue_fs_event(self._event(['a/BUILD'], is_fresh_instance=True))
+    service._process_event_queue()
+    self.assertEqual([], scheduler.invalidated)
+    self.assertTrue(service._watchman_is_running.is_set())
@@ -50,18 +50,28 @@ class TestPailgunServer(unittest.TestCase):
     self.assertEquals(self.server.server_port, 31337)
     self.assertIs(mock_tcpserver_bind.called, True)
 
-  @mock.patch.object(PailgunServer, 'close_request', **PATCH_OPTS)
-  def test_process_request(self, mock_close_request):
+  @mock.patch.object(PailgunServer, 'process_request_thread', **PATCH_OPTS)
+  def test_process_request(self, mock_process_request_thread):
+    handled = threading.Event()
+    mock_process_request_thread.side_effect = lambda *args: handled.set()
     mock_request = mock.Mock()
     self.server.process_request(mock_request, ('1.2.3.4', 31338))
+    self.assertTrue(handled.wait(10))
+    mock_process_request_thread.assert_called_once_with(self.server, mock_request,
+                                                        ('1.2.3.4', 31338))
+
+  @mock.patch.object(PailgunServer, 'close_request', **PATCH_OPTS)
+  def test_process_request_thread(self, mock_close_request):
+    mock_request = mock.Mock()
+    self.server.process_request_thread(mock_request, ('1.2.3.4', 31338))
     self.assertIs(self.mock_handler_inst.handle_request.called, True)
     mock_close_request.assert_called_once_with(self.server, mock_request)
 
   @mock.patch.object(PailgunServer, 'shutdown_request', **PATCH_OPTS)
-  def test_process_request_error(self, mock_shutdown_request):
+  def test_process_request_thread_error(self, mock_shutdown_request):
     mock_request = mock.Mock()
     self.mock_handler_inst.handle_request.side_effect = AttributeError('oops')
-    self.server.process_request(mock_request, ('1.2.3.4', 31338))
+    self.server.process_request_thread(mock_request, ('1.2.3.4', 31338))
     self.assertIs(self.mock_handler_inst.handle_request.called, True)
     self.assertIs(self.mock_handler_inst.handle_error.called, True)
     mock_shutdown_request.assert_called_once_with(self.server, mock_request)
@@ -89,3 +99,23 @@ class TestPailgunHandler(unittest.TestCase):
     NailgunProtocol.send_request(self.client_sock, '/test', './pants', 'help-advanced')
     self.handler.handle_request()
     self.assertIs(mock_run_pants.called, True)
+
+  def test_run_pants_forks_under_lifecycle_lock(self):
+    held = []
+
+    @contextmanager
+    def lifecycle_lock():
+      held.append(True)
+      try:
+        yield
+      finally:
+        held.pop()
+
+    mock_runner = mock.Mock()
+    mock_runner.run.side_effect = lambda: self.assertEqual([True], held)
+    mock_server = mock.Mock(lifecycle_lock=lifecycle_lock)
+    # The runner is created (and the product graph warmed) outside of the lifecycle lock.
+    mock_server.runner_factory.side_effect = lambda *args: self.assertEqual([], held) or mock_runner
+    handler = PailgunHandler(self.server_sock, self.client_sock.getsockname()[:2], mock_server)
+    handler._run_pants(self.server_sock, ['./pants'], {})
+    self.assertIs(mock_runner.run.called, True)
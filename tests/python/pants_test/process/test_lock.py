@@ -12,7 +12,8 @@ import unittest
 from multiprocessing import Manager, Process
 from threading import Thread
 
-from pants.process.lock import OwnerPrintingInterProcessFileLock
+from pants.process.lock import OwnerPrintingInterProcessFileLock, merge_entries_file
+from pants.util.contextutil import temporary_dir
 
 
 def hold_lock_until_terminate(path, lock_held, terminate):
@@ -97,3 +98,30 @@ class TestOwnerPrintingInterProcessFileLock(unittest.TestCase):
     self.assertTrue(self.lock.acquired)
     self.lock.release()
     self.assertFalse(self.lock.acquired)
+
+
+class MergeEntriesFileTest(unittest.TestCase):
+
+  def test_merge(self):
+    with temporary_dir() as tmpdir:
+      path = os.path.join(tmpdir, 'sub', 'entries')
+
+      def read():
+        if not os.path.exists(path):
+          return {}
+        with open(path, 'rb') as fp:
+          return dict(line.decode('utf-8').rstrip('\n').split('\t') for line in fp)
+
+      def write(fp, entries):
+        for key, value in sorted(entries.items()):
+          fp.write('{}\t{}\n'.format(key, value).encode('utf-8'))
+
+      merge_entries_file(path, read, write, {'a': '1', 'b': '2', 'c': '3'})
+      self.assertEqual({'a': '1', 'b': '2', 'c': '3'}, read())
+
+      merged = merge_entries_file(path, read, write, {'b': '4'}, removed=['a'],
+                                  keep=lambda key: key != 'c')
+      self.assertEqual({'b': '4'}, merged)
+      self.assertEqual({'b': '4'}, read())
+      # No temporary files are left behind.
+      self.assertEqual(['entries', 'entries.lock'], sorted(os.listdir(os.path.dirname(path))))
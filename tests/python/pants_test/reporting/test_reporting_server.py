@@ -0,0 +1,80 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import httplib
+import json
+import os
+import threading
+import unittest
+import urllib
+from contextlib import closing, contextmanager
+
+from pants.reporting.reporting_server import ReportingServer
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class ReportingServerTest(unittest.TestCase):
+
+  def setUp(self):
+    self._root_context = temporary_dir()
+    self.root = os.path.realpath(self._root_context.__enter__())
+    self.addCleanup(self._root_context.__exit__, None, None, None)
+    settings = ReportingServer.Settings(info_dir=os.path.join(self.root, 'info'),
+                                        template_dir=None,
+                                        assets_dir=None,
+                                        root=self.root,
+                                        allowed_clients=['ALL'])
+    self.server = ReportingServer(0, settings)
+    thread = threading.Thread(target=self.server.start)
+    thread.daemon = True
+    thread.start()
+
+  @contextmanager
+  def _get(self, path, request):
+    connection = httplib.HTTPConnection('127.0.0.1', self.server.server_port(), timeout=10)
+    with closing(connection):
+      connection.request('GET', '{}?{}'.format(path, urllib.urlencode({'q': json.dumps(request)})))
+      yield connection.getresponse()
+
+  def _next_event(self, response):
+    lines = []
+    while True:
+      # N.B. The response is read unbuffered, line by line, as the stream never ends.
+      line = response.fp.readline()
+      self.assertTrue(line, 'stream ended unexpectedly')
+      if line == b'\n':
+        return json.loads(b''.join(lines).decode('utf-8'))
+      if line.startswith(b'data: '):
+        lines.append(line[len(b'data: '):])
+
+  def test_stream(self):
+    safe_file_dump(os.path.join(self.root, 'output'), 'a')
+    safe_file_dump(os.path.join(self.root, 'timings'), 'x')
+    request = [{'id': 'output', 'path': 'output', 'pos': 0},
+               {'id': 'timings', 'path': 'timings', 'pos': 0, 'replace': True},
+               {'id': 'missing', 'path': 'missing', 'pos': 0}]
+    with self._get('/stream', request) as stream:
+      self.assertEqual('text/event-stream', stream.getheader('Content-Type'))
+      self.assertEqual({'output': 'a', 'timings': 'x'}, self._next_event(stream))
+
+      with open(os.path.join(self.root, 'output'), 'a') as fp:
+        fp.write('bc')
+      self.assertEqual({'output': 'bc'}, self._next_event(stream))
+
+      safe_file_dump(os.path.join(self.root, 'timings'), 'yz')
+      self.assertEqual({'timings': 'yz'}, self._next_event(stream))
+
+      # Other requests are served while the stream is open.
+      with self._get('/poll', request) as poll:
+        self.assertEqual({'output': 'abc', 'timings': 'yz'}, json.load(poll))
+
+  def test_stream_from_pos(self):
+    safe_file_dump(os.path.join(self.root, 'output'), 'abc')
+    request = [{'id': 'output', 'path': 'output', 'pos': 2}]
+    with self._get('/stream', request) as stream:
+      self.assertEqual({'output': 'c'}, self._next_event(stream))
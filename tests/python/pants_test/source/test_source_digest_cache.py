@@ -0,0 +1,108 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import os
+import time
+import unittest
+
+from pants.source.source_digest_cache import SourceDigestCache, file_digest
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class SourceDigestCacheTest(unittest.TestCase):
+
+  def write_source(self, path, content, age=10):
+    safe_file_dump(path, content)
+    # Make the file old enough to be safely cacheable.
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+  def test_reuses_digests_across_instances(self):
+    with temporary_dir() as root:
+      db = os.path.join(root, 'digests')
+      source = self.write_source(os.path.join(root, 'A.java'), b'class A {}')
+
+      cache = SourceDigestCache(db)
+      self.assertEquals(file_digest(source), cache.digest(source))
+      self.assertEquals(file_digest(source), cache.digest(source))
+      self.assertEquals((1, 1), (cache.computed, cache.reused))
+      cache.save()
+
+      cache = SourceDigestCache(db)
+      self.assertEquals(file_digest(source), cache.digest(source))
+      self.assertEquals((0, 1), (cache.computed, cache.reused))
+
+  def test_recomputes_changed_files(self):
+    with temporary_dir() as root:
+      db = os.path.join(root, 'digests')
+      source = self.write_source(os.path.join(root, 'A.java'), b'class A {}')
+      cache = SourceDigestCache(db)
+      cache.digest(source)
+      cache.save()
+
+      self.write_source(source, b'class A { int a; }', age=5)
+      cache = SourceDigestCache(db)
+      self.assertEquals(file_digest(source), cache.digest(source))
+      self.assertEquals((1, 0), (cache.computed, cache.reused))
+
+  def test_does_not_cache_recently_modified_files(self):
+    with temporary_dir() as root:
+      db = os.path.join(root, 'digests')
+      source = self.write_source(os.path.join(root, 'A.java'), b'class A {}', age=0)
+      cache = SourceDigestCache(db)
+      cache.digest(source)
+      cache.digest(source)
+      self.assertEquals((2, 0), (cache.computed, cache.reused))
+      cache.save()
+      self.assertFalse(os.path.exists(db))
+
+  def test_drops_deleted_files(self):
+    with temporary_dir() as root:
+      db = os.path.join(root, 'digests')
+      a = self.write_source(os.path.join(root, 'A.java'), b'class A {}')
+      b = self.write_source(os.path.join(root, 'B.java'), b'class B {}')
+      cache = SourceDigestCache(db)
+      cache.digest(a)
+      cache.digest(b)
+      cache.save()
+
+      os.unlink(a)
+      c = self.write_source(os.path.join(root, 'C.java'), b'class C {}')
+      cache = SourceDigestCache(db)
+      cache.digest(c)
+      cache.save()
+      self.assertEquals({b, c}, set(SourceDigestCache(db)._read()))
+
+  def test_concurrent_saves_merge(self):
+    with temporary_dir() as root:
+      db = os.path.join(root, 'digests')
+      a = self.write_source(os.path.join(root, 'A.java'), b'class A {}')
+      b = self.write_source(os.path.join(root, 'B.java'), b'class B {}')
+
+      cache1 = SourceDigestCache(db)
+      cache2 = SourceDigestCache(db)
+      cache1.digest(a)
+      cache2.digest(b)
+      cache1.save()
+      cache2.save()
+
+      cache = SourceDigestCache(db)
+      cache.digest(a)
+      cache.digest(b)
+      self.assertEquals((0, 2), (cache.computed, cache.reused))
+
+  def test_ignores_corrupt_entries(self):
+    with temporary_dir() as root:
+      db = os.path.join(root, 'digests')
+      source = self.write_source(os.path.join(root, 'A.java'), b'class A {}')
+      safe_file_dump(db, '{}\tgarbage\n'.format(source).encode('utf-8'))
+
+      cache = SourceDigestCache(db)
+      self.assertEquals(file_digest(source), cache.digest(source))
+      self.assertEquals((1, 0), (cache.computed, cache.reused))
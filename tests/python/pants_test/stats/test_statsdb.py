@@ -8,7 +8,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
 import os
 import unittest
 
-from pants.stats.statsdb import StatsDB
+from pants.stats.statsdb import StatsDB, StatsDBError
 from pants.util.contextutil import temporary_dir
 
 
@@ -67,3 +67,111 @@ class StatsDBTest(unittest.TestCase):
       self.assertEqual(
         sorted([('2015-08-03', 'compile.java', 2, 21340), ('2015-08-03', 'resolve.ivy', 1, 56000)]),
         sorted(aggs))
+
+  def _run_stats(self, run_id, timestamp, goal_timings, target_data=None, cache_stats=None):
+    return {
+      'run_info': {
+        'id': run_id,
+        'timestamp': str(timestamp),
+        'machine': 'ernie',
+        'user': 'bert',
+        'version': '9.8.7',
+        'buildroot': '/path/to/repo',
+        'outcome': 'SUCCESS',
+        'cmd_line': 'pants compile test',
+        'target_data': target_data or {},
+      },
+      'cumulative_timings': ([t('main', sum(goal_timings.values()))] +
+                             [t('main:{}'.format(goal), timing)
+                              for goal, timing in goal_timings.items()] +
+                             [t('main:compile:zinc', 1)]),
+      'self_timings': [],
+      'artifact_cache_stats': cache_stats or [],
+      'outcomes': {'main:{}'.format(goal): 'SUCCESS' for goal in goal_timings},
+    }
+
+  def test_goal_timing_percentiles(self):
+    with temporary_dir() as tmpdir:
+      statsdb = StatsDB(os.path.join(tmpdir, 'statsdb.sqlite'))
+      statsdb.ensure_tables()
+      day = 1438600000
+      for i in range(1, 11):
+        statsdb.insert_stats(self._run_stats('run{}'.format(i), day + i,
+                                             {'compile': i, 'test': 2 * i}))
+      statsdb.insert_stats(self._run_stats('run11', day + 86400, {'compile': 7}))
+
+      self.assertEqual(
+        [('2015-08-03', 'compile', 10, [5000, 10000]),
+         ('2015-08-03', 'test', 10, [10000, 20000]),
+         ('2015-08-04', 'compile', 1, [7000, 7000])],
+        statsdb.get_goal_timing_percentiles([50, 95]))
+      self.assertEqual(
+        [('2015-08-04', 'compile', 1, [7000])],
+        statsdb.get_goal_timing_percentiles([50], goals=['compile'], since=day + 86400))
+      self.assertEqual(
+        [('2015-08', 'compile', 11, [6000])],
+        statsdb.get_goal_timing_percentiles([50], goals=['compile'], period='month'))
+
+      with self.assertRaises(StatsDBError):
+        statsdb.get_goal_timing_percentiles([50], period='fortnight')
+
+  def test_target_history(self):
+    with temporary_dir() as tmpdir:
+      statsdb = StatsDB(os.path.join(tmpdir, 'statsdb.sqlite'))
+      statsdb.ensure_tables()
+      target_data = {'a:b': {'compile.zinc': {'zinc_stats': {'sources': 3, 'warnings': [1, 2]}}}}
+      cache_stats = [{'cache_name': 'compile.zinc',
+                      'hits': [('a:b', '')],
+                      'misses': [('c:d', 'uncached')]}]
+      statsdb.insert_stats(self._run_stats('run1', 1438600000, {'compile': 1},
+                                           target_data=target_data, cache_stats=cache_stats))
+
+      self.assertEqual(
+        [('run1', 1438600000, 'compile.zinc', 'zinc_stats.sources', 3),
+         ('run1', 1438600000, 'compile.zinc', 'zinc_stats.warnings', '[1, 2]')],
+        list(statsdb.get_target_history('a:b')))
+      self.assertEqual([('run1', 1438600000, 'compile.zinc', 1, '')],
+                       list(statsdb.get_artifact_cache_outcomes('a:b')))
+      self.assertEqual([('run1', 1438600000, 'compile.zinc', 0, 'uncached')],
+                       list(statsdb.get_artifact_cache_outcomes('c:d')))
+
+  def test_insert_is_atomic(self):
+    with temporary_dir() as tmpdir:
+      statsdb = StatsDB(os.path.join(tmpdir, 'statsdb.sqlite'))
+      statsdb.ensure_tables()
+      stats = self._run_stats('run1', 1438600000, {'compile': 1})
+      stats['self_timings'] = [{'label': 'main'}]
+      with self.assertRaises(StatsDBError):
+        statsdb.insert_stats(stats)
+      self.assertEqual([], statsdb.get_goal_timing_percentiles([50]))
+
+  def test_compaction(self):
+    with temporary_dir() as tmpdir:
+      statsdb = StatsDB(os.path.join(tmpdir, 'statsdb.sqlite'), max_age_days=1)
+      statsdb.ensure_tables()
+      now = 1438600000
+      target_data = {'a:b': {'GLOBAL': {'target_type': 'UNIT'}}}
+      statsdb.insert_stats(self._run_stats('old', now - 2 * 86400, {'compile': 1},
+                                           target_data=target_data))
+      statsdb.insert_stats(self._run_stats('new', now - 3600, {'compile': 2},
+                                           target_data=target_data))
+
+      self.assertEqual(1, statsdb.maybe_compact(now=now))
+      self.assertEqual([('2015-08-03', 'compile', 1, [2000])],
+                       statsdb.get_goal_timing_percentiles([50]))
+      self.assertEqual(['new'], [row[0] for row in statsdb.get_target_history('a:b')])
+      self.assertEqual(
+        sorted([('main', 2000), ('main:compile', 2000), ('main:compile:zinc', 1000)]),
+        sorted(statsdb.get_stats_for_cmd_line('cumulative_timings', '%')))
+
+      # Compacted too recently to compact again.
+      self.assertIsNone(statsdb.maybe_compact(now=now + 3600))
+      self.assertEqual(1, statsdb.maybe_compact(now=now + 2 * 86400))
+
+  def test_no_compaction_without_max_age(self):
+    with temporary_dir() as tmpdir:
+      statsdb = StatsDB(os.path.join(tmpdir, 'statsdb.sqlite'))
+      statsdb.ensure_tables()
+      statsdb.insert_stats(self._run_stats('old', 0, {'compile': 1}))
+      self.assertIsNone(statsdb.maybe_compact())
+      self.assertEqual(1, len(statsdb.get_goal_timing_percentiles([50])))
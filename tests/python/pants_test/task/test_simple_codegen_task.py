@@ -6,6 +6,7 @@ from __future__ import (absolute_import, division, generators, nested_scopes, pr
                         unicode_literals, with_statement)
 
 import os
+from collections import namedtuple
 from textwrap import dedent
 
 from pants.base.payload import Payload
@@ -66,6 +67,7 @@ class DummyGen(SimpleCodegenTask):
     self._test_case = None
     self.setup_for_testing(None)
     self.execution_counts = 0
+    self.batches = []
 
   def setup_for_testing(self, test_case):
     """Gets this dummy generator class ready for testing.
@@ -92,6 +94,14 @@ class DummyGen(SimpleCodegenTask):
         f.write('public class {0} '.format(class_name))
         f.write('{\n\\\\ ... nothing ... \n}\n')
 
+  def codegen_batch_key(self, target):
+    return target.address.spec_path
+
+  def execute_codegen_batch(self, targets_and_workdirs):
+    self.batches.append([target for target, _ in targets_and_workdirs])
+    for target, target_workdir in targets_and_workdirs:
+      self.execute_codegen(target, target_workdir)
+
   def _dummy_sources_to_generate(self, target, target_workdir):
     for source in target.sources_relative_to_buildroot():
       source = os.path.join(self._test_case.build_root, source)
@@ -300,6 +310,86 @@ class SimpleCodegenTaskTest(TaskTestBase):
     t2_hash = syn_targets_for_t2[0].invalidation_hash()
     self.assertNotEqual(t1_hash, t2_hash)
 
+  def _get_concurrency_test_targets(self):
+    for name in ('a', 'b', 'c', 'd'):
+      self.create_file('gen/org/pantsbuild/example/{}.dummy'.format(name),
+                       'org.pantsbuild.example {}Class'.format(name.upper()))
+    self.add_to_build_file('gen', dedent("""
+      dummy_library(name='a',
+        sources=['org/pantsbuild/example/a.dummy'],
+      )
+
+      target(name='a-alias',
+        dependencies=[':a'],
+      )
+
+      dummy_library(name='b',
+        sources=['org/pantsbuild/example/b.dummy'],
+        dependencies=[':a-alias'],
+      )
+
+      dummy_library(name='c',
+        sources=['org/pantsbuild/example/c.dummy'],
+      )
+
+      dummy_library(name='d',
+        sources=['org/pantsbuild/example/d.dummy'],
+        dependencies=[':b', ':c'],
+      )
+    """))
+    return [self.target('gen:{}'.format(name)) for name in ('a', 'b', 'c', 'd')]
+
+  def test_codegen_waves(self):
+    a, b, c, d = self._get_concurrency_test_targets()
+    FakeVersionedTarget = namedtuple('FakeVersionedTarget', ['target'])
+    vts = [FakeVersionedTarget(t) for t in (a, c, b, d)]
+    waves = DummyGen._codegen_waves(vts)
+    self.assertEqual([[a, c], [b], [d]], [[vt.target for vt in wave] for wave in waves])
+
+    # Targets that aren't being generated don't delay their dependents.
+    waves = DummyGen._codegen_waves([FakeVersionedTarget(t) for t in (c, b, d)])
+    self.assertEqual([[c, b], [d]], [[vt.target for vt in wave] for wave in waves])
+
+  def test_concurrent_codegen(self):
+    targets = self._get_concurrency_test_targets()
+    task = self._create_dummy_task(target_roots=targets, worker_count=2)
+    task.execute()
+
+    self.assertEqual(4, task.execution_counts)
+    synthetic_targets = [self.build_graph.get_target(syn_addr)
+                         for syn_addr in self.build_graph.synthetic_addresses]
+    self.assertEqual(set(targets), {t.derived_from for t in synthetic_targets})
+    for target in targets:
+      synthetic_target, = [t for t in synthetic_targets if t.derived_from == target]
+      self.assertEqual(['org/pantsbuild/example/{}Class'.format(target.name.upper())],
+                       list(synthetic_target.sources_relative_to_source_root()))
+
+  def test_codegen_unit_waves(self):
+    a, b, c, d = self._get_concurrency_test_targets()
+    FakeVersionedTarget = namedtuple('FakeVersionedTarget', ['target'])
+    vts = [FakeVersionedTarget(t) for t in (a, c, b, d)]
+
+    def unit_waves(task):
+      return [[[vt.target for vt in unit] for unit in wave]
+              for wave in task._codegen_unit_waves(vts)]
+
+    task = self._create_dummy_task(target_roots=[a, b, c, d], batch_size=3)
+    self.assertEqual([[[a, c, b], [d]]], unit_waves(task))
+    task = self._create_dummy_task(target_roots=[a, b, c, d], batch_size=1)
+    self.assertEqual([[[a], [c]], [[b]], [[d]]], unit_waves(task))
+
+  def test_batched_codegen(self):
+    targets = self._get_concurrency_test_targets()
+    task = self._create_dummy_task(target_roots=targets, batch_size=3)
+    task.execute()
+
+    self.assertEqual(4, task.execution_counts)
+    self.assertEqual(1, len(task.batches))
+    self.assertEqual(3, len(task.batches[0]))
+    synthetic_targets = [self.build_graph.get_target(syn_addr)
+                         for syn_addr in self.build_graph.synthetic_addresses]
+    self.assertEqual(set(targets), {t.derived_from for t in synthetic_targets})
+
 
 class ExportingDummyGen(DummyGen):
 
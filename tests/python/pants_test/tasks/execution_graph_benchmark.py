@@ -0,0 +1,116 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import argparse
+import functools
+import logging
+import multiprocessing
+import os
+import time
+from multiprocessing.pool import ThreadPool
+
+from concurrent.futures import ProcessPoolExecutor
+
+from pants.backend.jvm.tasks.jvm_compile.execution_graph import ExecutionGraph, Job
+from pants.backend.jvm.tasks.jvm_compile.jvm_compile import jar_directory
+from pants.util.contextutil import temporary_dir
+from pants.util.dirutil import safe_file_dump
+
+
+class _ThreadPool(object):
+  """A stand-in for a WorkerPool, which needs no RunTracker."""
+
+  def __init__(self, num_workers):
+    self.num_workers = num_workers
+    self._pool = ThreadPool(num_workers)
+
+  def submit_async_work(self, work):
+    for args in work.args_tuples:
+      self._pool.apply_async(work.func, args)
+
+  def close(self):
+    self._pool.close()
+    self._pool.join()
+
+
+def _create_classes_dirs(root, count, classes, class_size):
+  dirs = []
+  for i in range(count):
+    classes_dir = os.path.join(root, 't{}'.format(i), 'classes')
+    for j in range(classes):
+      safe_file_dump(os.path.join(classes_dir, 'org', 'pantsbuild', 'C{}.class'.format(j)),
+                     os.urandom(class_size))
+    dirs.append(classes_dir)
+  return dirs
+
+
+def _compile(compile_seconds):
+  # Stands in for the wait on a nailgunned compiler, during which the GIL is released.
+  time.sleep(compile_seconds)
+
+
+def _jobs(classes_dirs, compile_seconds, isolated):
+  jobs = []
+  for i, classes_dir in enumerate(classes_dirs):
+    jar = functools.partial(jar_directory, classes_dir, classes_dir + '.jar')
+    if isolated:
+      jobs.append(Job('compile({})'.format(i), functools.partial(_compile, compile_seconds), []))
+      jobs.append(Job('jar({})'.format(i), jar, ['compile({})'.format(i)], isolated=True))
+    else:
+      def work(jar=jar):
+        _compile(compile_seconds)
+        jar()
+      jobs.append(Job('compile({})'.format(i), work, []))
+  return jobs
+
+
+def _timed(description, workers, jobs, process_pool=None):
+  pool = _ThreadPool(workers)
+  start = time.time()
+  try:
+    ExecutionGraph(jobs).execute(pool, logging.getLogger(__name__), process_pool=process_pool)
+  finally:
+    pool.close()
+  print('{:<40} {:>8.3f}s'.format(description, time.time() - start))
+
+
+def main():
+  parser = argparse.ArgumentParser(
+    description='Benchmarks executing a wide graph of jvm compile-like jobs, each of which waits '
+                'on a compiler and then jars its output, with jars created on the compile '
+                'workers versus in a process pool.')
+  parser.add_argument('--targets', type=int, default=256,
+                      help='The number of independent targets.')
+  parser.add_argument('--classes', type=int, default=200,
+                      help='The number of class files output by each target.')
+  parser.add_argument('--class-size', type=int, default=2048,
+                      help='The size in bytes of each class file.')
+  parser.add_argument('--compile-seconds', type=float, default=0.05,
+                      help='The time each target waits on the compiler.')
+  parser.add_argument('--workers', type=int, default=32,
+                      help='The number of compile workers.')
+  parser.add_argument('--jar-workers', type=int, default=multiprocessing.cpu_count(),
+                      help='The number of processes to jar in.')
+  args = parser.parse_args()
+
+  with temporary_dir() as root:
+    classes_dirs = _create_classes_dirs(root, args.targets, args.classes, args.class_size)
+    print('Compiling {} targets with {} workers'.format(args.targets, args.workers))
+
+    _timed('jars on compile workers', args.workers,
+           _jobs(classes_dirs, args.compile_seconds, isolated=False))
+
+    process_pool = ProcessPoolExecutor(args.jar_workers)
+    try:
+      _timed('jars in {} processes'.format(args.jar_workers), args.workers,
+             _jobs(classes_dirs, args.compile_seconds, isolated=True), process_pool=process_pool)
+    finally:
+      process_pool.shutdown()
+
+
+if __name__ == '__main__':
+  main()
@@ -5,8 +5,12 @@
 from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
                         unicode_literals, with_statement)
 
+import functools
+import os
 import unittest
 
+from concurrent.futures import ProcessPoolExecutor
+
 from pants.backend.jvm.tasks.jvm_compile.execution_graph import (ExecutionFailure, ExecutionGraph,
                                                                  Job, JobExistsError,
                                                                  NoRootJobError, UnknownJobError)
@@ -272,3 +276,82 @@ class ExecutionGraphTest(unittest.TestCase):
 
     self.assertEqual(self.jobs_run, ['A'])
     self.assertEqual(failures, ['A', 'B1', 'B2', 'C1', 'C2', 'E'])
+
+  def test_predicted_makespan(self):
+    exec_graph = ExecutionGraph([self.job("A", passing_fn, [], 4),
+                                 self.job("B", passing_fn, [], 2),
+                                 self.job("C", passing_fn, [], 2),
+                                 self.job("D", passing_fn, ["A", "B"], 3)])
+    # A and B run first, then C as B finishes, and D as A finishes.
+    self.assertEqual(exec_graph.predicted_makespan(2), 7)
+    self.assertEqual(exec_graph.predicted_makespan(1), 11)
+    self.assertEqual(exec_graph.predicted_makespan(4), 7)
+
+  def test_predicted_makespan_follows_priorities(self):
+    # The critical path through A is started first, even though C is scheduled first.
+    exec_graph = ExecutionGraph([self.job("C", passing_fn, [], 1),
+                                 self.job("A", passing_fn, [], 1),
+                                 self.job("B", passing_fn, ["A"], 5)])
+    self.assertEqual(exec_graph.predicted_makespan(1), 7)
+    self.assertEqual(exec_graph.predicted_makespan(2), 6)
+
+  def test_isolated_jobs_run_in_process_pool(self):
+    results = []
+
+    def job(name, fn, dependencies):
+      return Job(name, fn, dependencies, isolated=True, on_result=results.append,
+                 on_success=lambda: self.jobs_run.append(name))
+
+    exec_graph = ExecutionGraph([job("A", functools.partial(os.getpid), []),
+                                 job("B", functools.partial(pow, 2, 3), ["A"]),
+                                 self.job("C", passing_fn, ["B"])])
+    process_pool = ProcessPoolExecutor(max_workers=1)
+    try:
+      exec_graph.execute(ImmediatelyExecutingPool(), PrintLogger(), process_pool=process_pool)
+    finally:
+      process_pool.shutdown()
+
+    self.assertEqual(self.jobs_run, ["A", "B", "C"])
+    child_pid, power = results
+    self.assertNotEqual(os.getpid(), child_pid)
+    self.assertEqual(8, power)
+
+  def test_failed_isolated_job(self):
+    failures = []
+    exec_graph = ExecutionGraph([
+      Job("A", functools.partial(int, "not a number"), [], isolated=True,
+          on_failure=lambda: failures.append("A")),
+      self.job("B", passing_fn, ["A"], on_failure=lambda: failures.append("B"))])
+    process_pool = ProcessPoolExecutor(max_workers=1)
+    try:
+      with self.assertRaises(ExecutionFailure):
+        exec_graph.execute(ImmediatelyExecutingPool(), PrintLogger(), process_pool=process_pool)
+    finally:
+      process_pool.shutdown()
+
+    self.assertEqual(self.jobs_run, [])
+    self.assertEqual(failures, ["A", "B"])
+
+  def test_isolated_jobs_without_process_pool(self):
+    results = []
+    exec_graph = ExecutionGraph([Job("A", functools.partial(pow, 2, 3), [], isolated=True,
+                                     on_result=results.append)])
+    self.execute(exec_graph)
+    self.assertEqual([8], results)
+
+  def test_skipped_job(self):
+    hits = []
+    results = []
+    exec_graph = ExecutionGraph([
+      Job("A", lambda: True, [], on_result=hits.append),
+      Job("B", functools.partial(pow, 2, 3), ["A"], isolated=True, on_result=results.append,
+          on_success=lambda: self.jobs_run.append("B"), skip=lambda: any(hits)),
+      self.job("C", passing_fn, ["B"])])
+    process_pool = ProcessPoolExecutor(max_workers=1)
+    try:
+      exec_graph.execute(ImmediatelyExecutingPool(), PrintLogger(), process_pool=process_pool)
+    finally:
+      process_pool.shutdown()
+
+    self.assertEqual(self.jobs_run, ["B", "C"])
+    self.assertEqual([None], results)
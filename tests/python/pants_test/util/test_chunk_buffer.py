@@ -0,0 +1,33 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import unittest
+
+from pants.util.chunk_buffer import ChunkBuffer
+
+
+class ChunkBufferTest(unittest.TestCase):
+
+  def test_read(self):
+    buf = ChunkBuffer()
+    buf.append(b'abcd')
+    buf.append(b'')
+    buf.append(b'efg')
+    self.assertEqual(7, len(buf))
+    self.assertEqual(b'ab', buf.read(2))
+    self.assertEqual(b'cdef', buf.read(4))
+    self.assertEqual(1, len(buf))
+    buf.append(b'hij')
+    self.assertEqual(b'gh', buf.read(2))
+    self.assertEqual(b'ij', buf.read(10))
+    self.assertEqual(b'', buf.read(1))
+
+    buf.append(b'abc')
+    buf.append(b'def')
+    buf.read(1)
+    self.assertEqual(b'bcdef', buf.read())
+    self.assertEqual(0, len(buf))
@@ -0,0 +1,99 @@
+# coding=utf-8
+# Copyright 2018 Pants project contributors (see CONTRIBUTORS.md).
+# Licensed under the Apache License, Version 2.0 (see LICENSE).
+
+from __future__ import (absolute_import, division, generators, nested_scopes, print_function,
+                        unicode_literals, with_statement)
+
+import threading
+import time
+import unittest
+
+from pants.util.rwlock import ReadWriteLock
+
+
+class ReadWriteLockTest(unittest.TestCase):
+
+  def setUp(self):
+    self.lock = ReadWriteLock()
+    self.events = []
+
+  def _start(self, target):
+    thread = threading.Thread(target=target)
+    thread.daemon = True
+    thread.start()
+    return thread
+
+  def _wait_for(self, predicate):
+    deadline = time.time() + 10
+    while not predicate():
+      self.assertLess(time.time(), deadline, 'timed out waiting')
+      time.sleep(0.01)
+
+  def test_concurrent_readers(self):
+    inside = threading.Semaphore(0)
+    release = threading.Event()
+
+    def read():
+      with self.lock.read_locked():
+        inside.release()
+        release.wait()
+
+    threads = [self._start(read) for _ in range(3)]
+    for _ in threads:
+      self.assertTrue(inside.acquire())
+    release.set()
+    for thread in threads:
+      thread.join()
+
+  def test_writer_excludes_readers(self):
+    self.lock.acquire_write()
+
+    def read():
+      with self.lock.read_locked() as waited:
+        self.events.append(('read', waited))
+
+    thread = self._start(read)
+    time.sleep(0.1)
+    self.assertEqual([], self.events)
+    self.lock.release_write()
+    thread.join()
+    (event, waited), = self.events
+    self.assertEqual('read', event)
+    self.assertGreater(waited, 0)
+
+  def test_waiting_writer_is_preferred(self):
+    self.lock.acquire_read()
+
+    def write():
+      with self.lock.write_locked():
+        self.events.append('write')
+
+    def read():
+      with self.lock.read_locked():
+        self.events.append('read')
+
+    writer = self._start(write)
+    self._wait_for(lambda: self.lock._waiting_writers == 1)
+    reader = self._start(read)
+    time.sleep(0.1)
+    self.assertEqual([], self.events)
+
+    self.lock.release_read()
+    writer.join()
+    reader.join()
+    self.assertEqual(['write', 'read'], self.events)
+
+  def test_write_is_reentrant(self):
+    with self.lock:
+      with self.lock.write_locked():
+        with self.lock.read_locked():
+          pass
+      self.assertIs(threading.current_thread(), self.lock._writer)
+    self.assertIsNone(self.lock._writer)
+
+  def test_release_unacquired(self):
+    with self.assertRaises(RuntimeError):
+      self.lock.release_read()
+    with self.assertRaises(RuntimeError):
+      self.lock.release_write()